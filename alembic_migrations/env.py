@@ -134,9 +134,20 @@ def _get_dialect_name_from_configured_context() -> Optional[str]:
     except Exception: pass
     return None
 
+# Индексы, которые создаются миграциями на "сыром" SQL и не описаны в моделях (иначе autogenerate их удалит)
+UNMANAGED_INDEXES = {"ix_sdb_users_search_trgm"}
+# Таблицы планировщика задач: создаются миграцией, но описаны в core/tasks/store.py вне SDBBaseModel.metadata
+UNMANAGED_TABLES = {"sdb_task_runs", "sdb_scheduler_jobs"}
+
 def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name in UNMANAGED_TABLES:
+        return False
+    if type_ == "index" and getattr(object, "table", None) is not None and object.table.name in UNMANAGED_TABLES:
+        return False
     if type_ == "table" and object.metadata != target_metadata:
         return False
+    if type_ == "index" and reflected and compare_to is None and name in UNMANAGED_INDEXES:
+        return False
     return True
 
 def compare_type(alem_context, inspected_column, metadata_column, inspected_type, metadata_type):
@@ -0,0 +1,26 @@
+# alembic_migrations/script.py.mako
+"""Add keyset pagination indexes for users
+
+Revision ID: 4f2a9c1e7b3d
+Revises: d10040ec2cb7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op # type: ignore
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c1e7b3d'
+down_revision: Union[str, None] = 'd10040ec2cb7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sdb_users_last_activity_at_id', 'sdb_users', ['last_activity_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sdb_users_last_activity_at_id', table_name='sdb_users')
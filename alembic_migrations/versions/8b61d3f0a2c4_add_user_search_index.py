@@ -0,0 +1,89 @@
+# alembic_migrations/script.py.mako
+"""Add user search index
+
+Revision ID: 8b61d3f0a2c4
+Revises: 4f2a9c1e7b3d
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op # type: ignore
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b61d3f0a2c4'
+down_revision: Union[str, None] = '4f2a9c1e7b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite: FTS5 с триграммным токенайзером поверх sdb_users (external content), синхронизация триггерами
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sdb_users_search USING fts5("
+    "username_lower, first_name, last_name, content='sdb_users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS sdb_users_search_ai AFTER INSERT ON sdb_users BEGIN "
+    "INSERT INTO sdb_users_search(rowid, username_lower, first_name, last_name) "
+    "VALUES (new.id, new.username_lower, new.first_name, new.last_name); END",
+    "CREATE TRIGGER IF NOT EXISTS sdb_users_search_ad AFTER DELETE ON sdb_users BEGIN "
+    "INSERT INTO sdb_users_search(sdb_users_search, rowid, username_lower, first_name, last_name) "
+    "VALUES ('delete', old.id, old.username_lower, old.first_name, old.last_name); END",
+    "CREATE TRIGGER IF NOT EXISTS sdb_users_search_au AFTER UPDATE OF username_lower, first_name, last_name "
+    "ON sdb_users BEGIN "
+    "INSERT INTO sdb_users_search(sdb_users_search, rowid, username_lower, first_name, last_name) "
+    "VALUES ('delete', old.id, old.username_lower, old.first_name, old.last_name); "
+    "INSERT INTO sdb_users_search(rowid, username_lower, first_name, last_name) "
+    "VALUES (new.id, new.username_lower, new.first_name, new.last_name); END",
+    "INSERT INTO sdb_users_search(sdb_users_search) VALUES ('rebuild')",
+)
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS sdb_users_search_au",
+    "DROP TRIGGER IF EXISTS sdb_users_search_ad",
+    "DROP TRIGGER IF EXISTS sdb_users_search_ai",
+    "DROP TABLE IF EXISTS sdb_users_search",
+)
+
+# PostgreSQL: GIN pg_trgm по склеенной строке (выражение совпадает с core/users/search.py)
+POSTGRES_UPGRADE = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_sdb_users_search_trgm ON sdb_users USING gin (("
+    "lower(coalesce(username_lower, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+    ") gin_trgm_ops)",
+)
+POSTGRES_DOWNGRADE = (
+    "DROP INDEX IF EXISTS ix_sdb_users_search_trgm",
+)
+
+
+def _sqlite_supports_trigram_fts(bind) -> bool:
+    version = bind.execute(sa.text("SELECT sqlite_version()")).scalar_one()
+    if tuple(int(part) for part in version.split(".")[:2]) < (3, 34):
+        return False
+    return bool(bind.execute(sa.text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar_one())
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        if not _sqlite_supports_trigram_fts(bind):
+            # Поиск останется на LIKE (см. core/users/search.py)
+            return
+        statements = SQLITE_UPGRADE
+    elif bind.dialect.name == 'postgresql':
+        statements = POSTGRES_UPGRADE
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        statements = SQLITE_DOWNGRADE
+    elif bind.dialect.name == 'postgresql':
+        statements = POSTGRES_DOWNGRADE
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
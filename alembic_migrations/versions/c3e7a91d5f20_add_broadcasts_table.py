@@ -0,0 +1,50 @@
+# alembic_migrations/script.py.mako
+"""Add broadcasts table
+
+Revision ID: c3e7a91d5f20
+Revises: 8b61d3f0a2c4
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op # type: ignore
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a91d5f20'
+down_revision: Union[str, None] = '8b61d3f0a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sdb_broadcasts',
+    sa.Column('status', sa.String(length=16), nullable=False, comment='Статус рассылки: pending, running, paused, interrupted, completed, cancelled, failed'),
+    sa.Column('text', sa.Text(), nullable=True, comment='Текст сообщения (если рассылается текст)'),
+    sa.Column('parse_mode', sa.String(length=16), nullable=True, comment='Режим разметки текста: HTML, MarkdownV2 или NULL'),
+    sa.Column('source_chat_id', sa.BigInteger(), nullable=True, comment='Чат сообщения-образца (рассылка копией сообщения)'),
+    sa.Column('source_message_id', sa.BigInteger(), nullable=True, comment='ID сообщения-образца (рассылка копией сообщения)'),
+    sa.Column('created_by', sa.BigInteger(), nullable=True, comment='Telegram ID автора рассылки (NULL - запущена из CLI)'),
+    sa.Column('cursor_user_id', sa.Integer(), nullable=False, comment='DB ID последнего обработанного получателя (keyset-курсор)'),
+    sa.Column('total_recipients', sa.Integer(), nullable=False, comment='Получателей на момент запуска'),
+    sa.Column('sent_count', sa.Integer(), nullable=False, comment='Доставлено сообщений'),
+    sa.Column('failed_count', sa.Integer(), nullable=False, comment='Не доставлено (ошибка)'),
+    sa.Column('blocked_count', sa.Integer(), nullable=False, comment='Получатель заблокировал бота'),
+    sa.Column('last_error', sa.Text(), nullable=True, comment='Последняя ошибка отправки'),
+    sa.Column('started_at', sa.DateTime(), nullable=True, comment='Время первого запуска'),
+    sa.Column('finished_at', sa.DateTime(), nullable=True, comment='Время завершения'),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_sdb_broadcasts'))
+    )
+    op.create_index(op.f('ix_sdb_broadcasts_id'), 'sdb_broadcasts', ['id'], unique=False)
+    op.create_index(op.f('ix_sdb_broadcasts_status'), 'sdb_broadcasts', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sdb_broadcasts_status'), table_name='sdb_broadcasts')
+    op.drop_index(op.f('ix_sdb_broadcasts_id'), table_name='sdb_broadcasts')
+    op.drop_table('sdb_broadcasts')
@@ -0,0 +1,67 @@
+# alembic_migrations/script.py.mako
+"""Add task scheduler tables
+
+Revision ID: e5b2f8a4c917
+Revises: c3e7a91d5f20
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op # type: ignore
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2f8a4c917'
+down_revision: Union[str, None] = 'c3e7a91d5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Схемы совпадают с core/tasks/store.py. До этой миграции таблицы создавал сам бот при старте,
+# поэтому на существующих БД они уже могут быть - такие пропускаем.
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    existing_tables = _existing_tables()
+    if 'sdb_scheduler_jobs' not in existing_tables:
+        op.create_table('sdb_scheduler_jobs',
+        sa.Column('id', sa.Unicode(length=191), nullable=False),
+        sa.Column('next_run_time', sa.Float(precision=25), nullable=True),
+        sa.Column('job_state', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_sdb_scheduler_jobs_next_run_time', 'sdb_scheduler_jobs', ['next_run_time'], unique=False)
+    if 'sdb_task_runs' not in existing_tables:
+        op.create_table('sdb_task_runs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_id', sa.String(length=191), nullable=False),
+        sa.Column('job_name', sa.String(length=255), nullable=True),
+        sa.Column('task_type', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempt', sa.Integer(), nullable=False),
+        sa.Column('pid', sa.Integer(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_sdb_task_runs_job_id', 'sdb_task_runs', ['job_id'], unique=False)
+        op.create_index('ix_sdb_task_runs_status', 'sdb_task_runs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    existing_tables = _existing_tables()
+    if 'sdb_task_runs' in existing_tables:
+        op.drop_index('ix_sdb_task_runs_status', table_name='sdb_task_runs')
+        op.drop_index('ix_sdb_task_runs_job_id', table_name='sdb_task_runs')
+        op.drop_table('sdb_task_runs')
+    if 'sdb_scheduler_jobs' in existing_tables:
+        op.drop_index('ix_sdb_scheduler_jobs_next_run_time', table_name='sdb_scheduler_jobs')
+        op.drop_table('sdb_scheduler_jobs')
@@ -4,10 +4,12 @@ import asyncio
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
 from loguru import logger
 from aiogram import Bot
 from aiogram.types import BotCommand
 from pathlib import Path
+from typing import Optional
 from core.services_provider import BotServicesProvider
 from .utils import get_sdb_services_for_cli
 from core.module_loader import ModuleLoader
@@ -182,5 +184,160 @@ def status():
         logger.error(f"Неожиданная ошибка в status: {e}")
         raise typer.Exit(code=1)
 
+BROADCAST_PARSE_MODES = {"html": "HTML", "markdownv2": "MarkdownV2", "none": None}
+BROADCAST_STATUS_STYLES = {
+    "pending": "white", "running": "cyan", "paused": "yellow", "interrupted": "yellow",
+    "completed": "green", "cancelled": "dim", "failed": "red",
+}
+
+def _print_broadcasts_table(broadcasts) -> None:
+    table = Table(title="[bold cyan]Рассылки[/]", show_header=True, header_style="bold magenta")
+    table.add_column("ID", style="dim", justify="right")
+    table.add_column("Статус")
+    table.add_column("Доставлено", justify="right")
+    table.add_column("Заблокировали", justify="right")
+    table.add_column("Ошибки", justify="right")
+    table.add_column("Всего", justify="right")
+    table.add_column("Создана")
+    table.add_column("Автор")
+    for item in broadcasts:
+        style = BROADCAST_STATUS_STYLES.get(item.status, "white")
+        table.add_row(
+            str(item.id), f"[{style}]{item.status}[/]", str(item.sent_count), str(item.blocked_count),
+            str(item.failed_count), str(item.total_recipients),
+            item.created_at.strftime("%Y-%m-%d %H:%M") if item.created_at else "-",
+            str(item.created_by) if item.created_by else "CLI",
+        )
+    console.print(table)
+
+async def _broadcast_async(text: Optional[str], parse_mode: Optional[str], resume_id: Optional[int],
+                           pause_id: Optional[int], cancel_id: Optional[int], list_recent: bool,
+                           dry_run: bool, yes: bool):
+    settings_obj, db_m, _ = await get_sdb_services_for_cli(init_db=True, init_rbac=False)
+    if not (settings_obj and db_m):
+        console.print("[bold red]Ошибка: Не удалось инициализировать DBManager для команды 'bot broadcast'.[/]")
+        raise typer.Exit(code=1)
+
+    from core.broadcast.service import BroadcastService
+    service = BroadcastService(db_manager=db_m, settings=settings_obj.core.broadcast)
+    bot: Optional[Bot] = None
+    broadcast_id: Optional[int] = None
+    try:
+        if list_recent:
+            broadcasts = await service.list_recent(limit=20)
+            if not broadcasts:
+                console.print("[yellow]Рассылок еще не было.[/]")
+                return
+            _print_broadcasts_table(broadcasts)
+            return
+
+        for action_id, action, done_text in ((pause_id, service.pause, "приостановлена"), (cancel_id, service.cancel, "отменена")):
+            if action_id is None:
+                continue
+            if await action(action_id):
+                console.print(f"[green]Рассылка #{action_id} {done_text}.[/] Процесс, который ее выполняет, остановится после текущей пачки.")
+            else:
+                current = await service.get(action_id)
+                state = f"статус: {current.status}" if current else "не найдена"
+                console.print(f"[bold red]Рассылку #{action_id} нельзя изменить ({state}).[/]")
+                raise typer.Exit(code=1)
+            return
+
+        if resume_id is None and not (text and text.strip()):
+            console.print("[bold red]Ошибка: Укажите текст сообщения (аргумент или --file) либо --resume ID.[/]")
+            raise typer.Exit(code=1)
+
+        recipients = await service.count_recipients()
+        if resume_id is not None:
+            existing = await service.get(resume_id)
+            if existing is None:
+                console.print(f"[bold red]Рассылка #{resume_id} не найдена.[/]")
+                raise typer.Exit(code=1)
+            recipients = await service.count_recipients(after_user_id=existing.cursor_user_id)
+        console.print(f"Получателей (активные, не заблокировавшие бота): [bold]{recipients}[/]")
+        if dry_run:
+            return
+        if recipients == 0 and resume_id is None:
+            console.print("[yellow]Некому отправлять.[/]")
+            return
+
+        bot_token = settings_obj.telegram.token
+        if not bot_token:
+            console.print("[bold red]Ошибка: Токен бота не найден. Невозможно выполнить команду.[/bold red]")
+            raise typer.Exit(code=1)
+        if not yes:
+            prompt = f"Продолжить рассылку #{resume_id}?" if resume_id is not None else f"Отправить сообщение {recipients} пользователям?"
+            typer.confirm(prompt, abort=True)
+
+        if resume_id is not None:
+            broadcast_id = resume_id
+        else:
+            broadcast_id = (await service.create(text=text, parse_mode=parse_mode)).id
+        bot = Bot(token=bot_token)
+
+        with Progress(
+            TextColumn("[bold blue]Рассылка #{task.fields[broadcast_id]}"), BarColumn(),
+            TextColumn("{task.completed}/{task.total}"), TextColumn("{task.description}"), TimeElapsedColumn(),
+            console=console,
+        ) as progress_bar:
+            bar_task = progress_bar.add_task("", total=None, broadcast_id=broadcast_id)
+
+            def _on_progress(progress) -> None:
+                progress_bar.update(
+                    bar_task, completed=progress.processed, total=max(progress.total, progress.processed),
+                    description=f"✅ {progress.sent} 🚫 {progress.blocked} ❌ {progress.failed} ({progress.messages_per_second} msg/s)",
+                )
+
+            try:
+                result = await service.run(bot, broadcast_id, on_progress=_on_progress)
+            except ValueError as e_run:
+                console.print(f"[bold red]Ошибка: {e_run}[/]")
+                raise typer.Exit(code=1)
+            except asyncio.CancelledError:
+                await service.pause(broadcast_id)
+                console.print(f"\n[yellow]Рассылка #{broadcast_id} приостановлена. Продолжить: sdb bot broadcast --resume {broadcast_id}[/]")
+                raise typer.Exit(code=130)
+
+        style = BROADCAST_STATUS_STYLES.get(result.status, "white")
+        console.print(Panel(
+            f"Статус: [{style}]{result.status}[/]\n"
+            f"Доставлено: {result.sent}\nЗаблокировали бота: {result.blocked}\nОшибки: {result.failed}"
+            + (f"\nПоследняя ошибка: {result.last_error}" if result.last_error else ""),
+            title=f"Рассылка #{broadcast_id}", expand=False, border_style=style,
+        ))
+        logger.info(f"Рассылка #{broadcast_id} из CLI: {result.status}, доставлено {result.sent}.")
+    finally:
+        if bot:
+            await bot.session.close()
+        await db_m.dispose()
+
+@bot_app.command(name="broadcast", help="Разослать сообщение всем активным пользователям бота (с учетом лимитов Telegram).")
+def broadcast(
+    text: Optional[str] = typer.Argument(None, help="Текст сообщения."),
+    text_file: Optional[Path] = typer.Option(None, "--file", "-f", exists=True, dir_okay=False, help="Взять текст сообщения из файла."),
+    parse_mode: str = typer.Option("html", "--parse-mode", help="Разметка текста: html, markdownv2 или none.", case_sensitive=False),
+    resume_id: Optional[int] = typer.Option(None, "--resume", help="Продолжить приостановленную или прерванную рассылку."),
+    pause_id: Optional[int] = typer.Option(None, "--pause", help="Приостановить рассылку (в т.ч. выполняемую ботом)."),
+    cancel_id: Optional[int] = typer.Option(None, "--cancel", help="Отменить рассылку."),
+    list_recent: bool = typer.Option(False, "--list", "-l", help="Показать последние рассылки."),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Только посчитать получателей."),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Не спрашивать подтверждение."),
+):
+    """Массовая рассылка с сохранением прогресса: прерванную рассылку можно продолжить (--resume)."""
+    if parse_mode.lower() not in BROADCAST_PARSE_MODES:
+        console.print("[bold red]Ошибка: --parse-mode должен быть html, markdownv2 или none.[/]")
+        raise typer.Exit(code=1)
+    if text_file:
+        text = text_file.read_text(encoding="utf-8")
+    try:
+        asyncio.run(_broadcast_async(text, BROADCAST_PARSE_MODES[parse_mode.lower()], resume_id, pause_id,
+                                     cancel_id, list_recent, dry_run, yes))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Ошибка выполнения команды 'bot broadcast': {type(e).__name__} - {e}[/]")
+        logger.error(f"Ошибка в bot broadcast: {e}")
+        raise typer.Exit(code=1)
+
 if __name__ == "__main__":
     bot_app()
\ No newline at end of file
@@ -98,52 +98,28 @@ async def _cache_stats_async(cache_type: Optional[str], format: str):
     
     try:
         from cli.utils import get_sdb_services_for_cli
-        services = await get_sdb_services_for_cli()
-        if not services:
-            console.print("[bold red]Не удалось инициализировать сервисы.[/]")
+        settings, _, _ = await get_sdb_services_for_cli()
+        if not settings:
+            console.print("[bold red]Не удалось загрузить настройки SDB.[/]")
             raise typer.Exit(code=1)
         
-        db_manager, rbac_service, cache_manager = services
-        
         stats = {}
         
-        # Memory кэш статистика
+        # Memory кэш живет в процессе бота, поэтому счетчики берем из его снимка runtime-статистики
         if cache_type in ["memory", None]:
             console.print("[cyan]Сбор статистики memory кэша...[/]")
-            try:
-                memory_stats = {
-                    "type": "memory",
-                    "status": "available" if cache_manager.is_available() else "unavailable",
-                    "backend": "TTLCache",
-                    "maxsize": "1024",
-                    "default_ttl": "300s",
-                    "current_size": "N/A",
-                    "hit_count": "N/A",
-                    "miss_count": "N/A"
-                }
-                
-                # Попытка получить более детальную статистику
-                if hasattr(cache_manager, '_cache'):
-                    cache_obj = cache_manager._cache
-                    if hasattr(cache_obj, '__len__'):
-                        memory_stats["current_size"] = str(len(cache_obj))
-                    if hasattr(cache_obj, 'hits'):
-                        memory_stats["hit_count"] = str(cache_obj.hits)
-                    if hasattr(cache_obj, 'misses'):
-                        memory_stats["miss_count"] = str(cache_obj.misses)
-                
-                stats["memory"] = memory_stats
-            except Exception as e:
-                stats["memory"] = {
-                    "type": "memory",
-                    "status": "error",
-                    "error": str(e)
-                }
+            stats["memory"] = _get_memory_cache_stats(settings)
         
         # Redis кэш статистика
         if cache_type in ["redis", None]:
             console.print("[cyan]Сбор статистики Redis кэша...[/]")
-            redis_client = cache_manager.get_redis_client_instance()
+            redis_stats = {"type": "redis", "status": "unavailable"}
+            cache_manager = None
+            if settings.cache.type in ("redis", "tiered"):
+                from core.cache.manager import CacheManager
+                cache_manager = CacheManager(cache_settings=settings.cache)
+                await cache_manager.initialize()
+            redis_client = await cache_manager.get_redis_client_instance() if cache_manager else None
             if redis_client:
                 try:
                     info = await redis_client.info()
@@ -155,6 +131,7 @@ async def _cache_stats_async(cache_type: Optional[str], format: str):
                         "total_commands_processed": info.get("total_commands_processed", "N/A"),
                         "keyspace_hits": info.get("keyspace_hits", "N/A"),
                         "keyspace_misses": info.get("keyspace_misses", "N/A"),
+                        "evicted_keys": info.get("evicted_keys", "N/A"),
                         "total_keys": info.get("db0", {}).get("keys", "N/A"),
                         "uptime_seconds": info.get("uptime_in_seconds", "N/A")
                     }
@@ -175,11 +152,8 @@ async def _cache_stats_async(cache_type: Optional[str], format: str):
                         "status": "error",
                         "error": str(e)
                     }
-            else:
-                redis_stats = {
-                    "type": "redis",
-                    "status": "unavailable"
-                }
+            if cache_manager:
+                await cache_manager.dispose()
             
             stats["redis"] = redis_stats
         
@@ -190,6 +164,51 @@ async def _cache_stats_async(cache_type: Optional[str], format: str):
         console.print(f"[bold red]Ошибка при сборе статистики кэша: {e}[/]")
         raise typer.Exit(code=1)
 
+def _get_memory_cache_stats(settings) -> Dict[str, Any]:
+    """Статистика memory кэша из снимка работающего бота, иначе - только конфигурация."""
+    from core.monitoring.runtime_stats import read_runtime_stats, get_runtime_stats_path
+
+    cache_settings = settings.cache
+    memory_stats: Dict[str, Any] = {
+        "type": "memory",
+        "status": "not_configured" if cache_settings.type != "memory" else "bot_not_running",
+        "policy": cache_settings.memory_eviction_policy,
+        "maxsize": cache_settings.memory_maxsize,
+        "max_bytes": cache_settings.memory_max_bytes or "без лимита",
+        "shards": cache_settings.memory_shards,
+        "default_ttl": f"{cache_settings.default_ttl_seconds}s",
+    }
+    if cache_settings.type == "tiered":
+        # Для tiered показываем L1 - локальную память процесса бота
+        memory_stats.update({"status": "bot_not_running", "maxsize": cache_settings.l1_maxsize,
+                             "max_bytes": "без лимита", "default_ttl": f"{cache_settings.l1_ttl_seconds}s"})
+    snapshot = read_runtime_stats(get_runtime_stats_path(settings.core.project_data_path))
+    cache_section = (snapshot or {}).get("sections", {}).get("cache") or {}
+    if cache_section.get("backend") == "tiered":
+        memory_stats.update({
+            "tier": "L1",
+            "invalidations_published": cache_section.get("invalidations_published"),
+            "invalidations_received": cache_section.get("invalidations_received"),
+            "invalidation_listener": cache_section.get("invalidation_listener"),
+        })
+        cache_section = {**cache_section.get("l1", {}), "available": cache_section.get("available")}
+    if cache_section.get("backend") != "memory":
+        return memory_stats
+
+    hit_ratio = cache_section.get("hit_ratio")
+    memory_stats.update({
+        "status": "available" if cache_section.get("available") else "unavailable",
+        "bot_pid": snapshot.get("pid"),
+        "current_size": cache_section.get("current_size"),
+        "bytes_used": cache_section.get("bytes_used") if cache_section.get("bytes_used") is not None else "N/A",
+        "hit_count": cache_section.get("hits"),
+        "miss_count": cache_section.get("misses"),
+        "hit_ratio": f"{hit_ratio * 100:.2f}%" if hit_ratio is not None else "N/A",
+        "evictions": cache_section.get("evictions"),
+        "expirations": cache_section.get("expirations"),
+    })
+    return memory_stats
+
 async def _display_cache_stats(stats: dict, format: str):
     """Отобразить статистику кэша"""
     
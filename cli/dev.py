@@ -13,6 +13,7 @@ import json
 from datetime import datetime
 import tempfile
 import shutil
+import time
 
 console = Console()
 dev_app = typer.Typer(name="dev", help="🔧 Инструменты разработки")
@@ -388,18 +389,19 @@ async def _serve_documentation(output_path: Path, format: str):
 def dev_debug_cmd(
     level: str = typer.Option("DEBUG", "--level", "-l", help="Уровень отладки: DEBUG, INFO, WARNING, ERROR"),
     log_file: Optional[str] = typer.Option(None, "--log-file", help="Файл для логов отладки"),
-    profiling: bool = typer.Option(False, "--profiling", help="Включить профилирование"),
+    profiling: bool = typer.Option(False, "--profiling", help="Снять профиль event loop запущенного бота (нужен `sdb run --profile`)"),
+    duration: float = typer.Option(30.0, "--duration", help="Длительность профиля в секундах"),
     memory: bool = typer.Option(False, "--memory", help="Мониторинг использования памяти")
 ):
     """Режим отладки"""
     try:
-        asyncio.run(_dev_debug_async(level, log_file, profiling, memory))
+        asyncio.run(_dev_debug_async(level, log_file, profiling, memory, duration))
     except typer.Exit: raise
     except Exception as e:
         console.print(f"[bold red]Неожиданная ошибка в команде 'dev debug': {e}[/]")
         raise typer.Exit(code=1)
 
-async def _dev_debug_async(level: str, log_file: Optional[str], profiling: bool, memory: bool):
+async def _dev_debug_async(level: str, log_file: Optional[str], profiling: bool, memory: bool, duration: float = 30.0):
     """Асинхронная обработка команды debug"""
     console.print(Panel("[bold blue]РЕЖИМ ОТЛАДКИ[/]", expand=False, border_style="blue"))
     
@@ -420,7 +422,7 @@ async def _dev_debug_async(level: str, log_file: Optional[str], profiling: bool,
     
     # Профилирование
     if profiling:
-        await _setup_profiling()
+        await _setup_profiling(duration)
     
     # Мониторинг памяти
     if memory:
@@ -454,17 +456,45 @@ async def _setup_debug_logging(level: str, log_file: str):
     logger.info(f"Отладка активирована с уровнем {level}")
     logger.debug("Это тестовое отладочное сообщение")
 
-async def _setup_profiling():
-    """Настроить профилирование"""
-    try:
-        import cProfile
-        import pstats
-        
-        console.print("[cyan]Профилирование:[/] Включено")
-        console.print("[dim]Используйте cProfile для анализа производительности[/]")
-        
-    except ImportError:
-        console.print("[yellow]cProfile недоступен[/]")
+async def _setup_profiling(duration: float = 30.0):
+    """Снять сэмплирующий профиль event loop запущенного бота"""
+    from cli.utils import get_sdb_services_for_cli
+    from core.monitoring.loop_profiler import get_profiler_dir, read_last_profile, request_profile
+    from core.monitoring.runtime_stats import get_runtime_stats_path, read_runtime_stats
+
+    settings, _, _ = await get_sdb_services_for_cli()
+    snapshot = read_runtime_stats(get_runtime_stats_path(settings.core.project_data_path)) or {}
+    profiler_stats = (snapshot.get("sections") or {}).get("profiler")
+    if not profiler_stats:
+        console.print("[yellow]Профилировщик бота не активен.[/] Запустите бота с [bold]sdb run --profile[/] "
+                      "или включите [bold]core.profiler.enabled[/] в config.yaml.")
+        return
+
+    console.print("[cyan]Профилирование:[/] event loop бота")
+    console.print(f"[dim]Задержка loop: посл. {profiler_stats.get('lag_last_ms')} мс, "
+                  f"средн. {profiler_stats.get('lag_avg_ms')} мс, макс. {profiler_stats.get('lag_max_ms')} мс[/]")
+    last_stall = profiler_stats.get("last_stall")
+    console.print(f"[dim]Блокировок дольше {profiler_stats.get('slow_threshold_ms')} мс: {profiler_stats.get('stalls_total', 0)}"
+                  + (f" (последняя: {last_stall['blocked_ms']} мс, {last_stall['at']})" if last_stall else "") + "[/]")
+
+    profiler_dir = get_profiler_dir(settings.core.project_data_path)
+    request_id = request_profile(profiler_dir, duration)
+    deadline = time.monotonic() + duration + 15
+    with console.status(f"Снятие профиля ({duration:.0f} сек)..."):
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            result = read_last_profile(profiler_dir)
+            if result and result.get("request_id") == request_id:
+                break
+        else:
+            console.print("[yellow]Бот не ответил на запрос профиля (бот запущен с --profile?).[/]")
+            return
+
+    if result.get("error"):
+        console.print(f"[red]Ошибка снятия профиля: {result['error']}[/]")
+        return
+    console.print(f"[green]✅ Профиль сохранен:[/] {result['path']} ({result['samples']} сэмплов)")
+    console.print("[dim]Формат collapsed stacks: откройте в https://www.speedscope.app или `flamegraph.pl profile.folded > profile.svg`[/]")
 
 async def _setup_memory_monitoring():
     """Настроить мониторинг памяти"""
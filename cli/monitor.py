@@ -5,7 +5,6 @@ import os
 import platform
 import psutil
 import time
-import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
@@ -17,6 +16,7 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.text import Text
+from rich.markup import escape
 from rich.live import Live
 from rich.layout import Layout
 from rich.align import Align
@@ -50,6 +50,27 @@ DEFAULT_ALERTS = {
     "response_time": {"warning": 2.0, "critical": 5.0}
 }
 
+# Первый cpu_percent(interval=None) только запускает отсчет - дальше замеры CPU не блокируют
+psutil.cpu_percent(interval=None)
+
+_metrics_store = None
+
+def _get_metrics_store(settings=None):
+    """Одно WAL-соединение с базой метрик на процесс CLI; с settings - путь и retention из core.metrics."""
+    global _metrics_store
+    if _metrics_store is None:
+        from core.app_settings import MetricsCollectorSettings
+        from core.monitoring.metrics_store import MetricsStore, get_metrics_db_path
+
+        metrics_settings = settings.core.metrics if settings else MetricsCollectorSettings()
+        _metrics_store = MetricsStore(
+            get_metrics_db_path(settings.core.project_data_path) if settings else METRICS_DB,
+            raw_retention_hours=metrics_settings.raw_retention_hours,
+            minute_retention_days=metrics_settings.minute_retention_days,
+            hour_retention_days=metrics_settings.hour_retention_days,
+        )
+    return _metrics_store
+
 def _ensure_monitor_directory():
     """Создать директорию для мониторинга если её нет"""
     MONITOR_DIR.mkdir(parents=True, exist_ok=True)
@@ -64,31 +85,7 @@ def _ensure_monitor_directory():
 
 def _init_metrics_database():
     """Инициализация базы данных для метрик"""
-    conn = sqlite3.connect(METRICS_DB)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS metrics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            cpu_percent REAL,
-            memory_percent REAL,
-            disk_percent REAL,
-            network_bytes_sent INTEGER,
-            network_bytes_recv INTEGER,
-            response_time REAL,
-            bot_status TEXT,
-            db_status TEXT
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_timestamp 
-        ON metrics(timestamp)
-    ''')
-    
-    conn.commit()
-    conn.close()
+    _get_metrics_store().initialize()
     logger.info("База данных метрик инициализирована")
 
 def _init_alerts_config():
@@ -123,50 +120,25 @@ def _load_alerts_config() -> Dict[str, Any]:
 def _save_metrics_to_db(metrics: Dict[str, Any]):
     """Сохранить метрики в базу данных"""
     try:
-        conn = sqlite3.connect(METRICS_DB)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO metrics 
-            (cpu_percent, memory_percent, disk_percent, network_bytes_sent, 
-             network_bytes_recv, response_time, bot_status, db_status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            metrics.get('cpu_percent', 0),
-            metrics.get('memory_percent', 0),
-            metrics.get('disk_percent', 0),
-            metrics.get('network_bytes_sent', 0),
-            metrics.get('network_bytes_recv', 0),
-            metrics.get('response_time', 0),
-            metrics.get('bot_status', 'unknown'),
-            metrics.get('db_status', 'unknown')
-        ))
-        
-        conn.commit()
-        conn.close()
+        store = _get_metrics_store()
+        store.insert_samples([{
+            'cpu_percent': metrics.get('cpu_percent', 0),
+            'memory_percent': metrics.get('memory_percent', 0),
+            'disk_percent': metrics.get('disk_percent', 0),
+            'network_bytes_sent': metrics.get('network_bytes_sent', 0),
+            'network_bytes_recv': metrics.get('network_bytes_recv', 0),
+            'response_time': metrics.get('response_time', 0),
+            'bot_status': metrics.get('bot_status', 'unknown'),
+            'db_status': metrics.get('db_status', 'unknown'),
+        }])
+        store.rollup()
     except Exception as e:
         logger.error(f"Ошибка сохранения метрик в БД: {e}")
 
 def _get_metrics_history(hours: int = 24) -> List[Dict[str, Any]]:
-    """Получить историю метрик"""
+    """Получить историю метрик (для длинных периодов - минутные/часовые агрегаты)"""
     try:
-        conn = sqlite3.connect(METRICS_DB)
-        cursor = conn.cursor()
-        
-        since = datetime.now() - timedelta(hours=hours)
-        
-        cursor.execute('''
-            SELECT * FROM metrics 
-            WHERE timestamp >= ? 
-            ORDER BY timestamp DESC
-        ''', (since,))
-        
-        columns = [description[0] for description in cursor.description]
-        rows = cursor.fetchall()
-        
-        conn.close()
-        
-        return [dict(zip(columns, row)) for row in rows]
+        return _get_metrics_store().get_history(hours)
     except Exception as e:
         logger.error(f"Ошибка получения истории метрик: {e}")
         return []
@@ -245,23 +217,31 @@ async def _send_alert_notifications(alerts: List[Dict[str, Any]]):
         return
     
     try:
-        from cli.notifications import _load_notifications_config, _send_notification_by_type
+        from cli.notifications import _load_notifications_config, _get_outbox, _deliver_outbox
         
         notifications_config = _load_notifications_config()
         channels = notifications_config.get('channels', {})
+        target_channels = [name for name in config['notifications'].get('channels', [])
+                           if name in channels and channels[name].get('status') == 'active']
+        if not target_channels:
+            return
+        cooldown = config['notifications'].get('cooldown', 300)
         
-        for alert in alerts:
-            priority = 'urgent' if alert['type'] == 'critical' else 'high'
-            message = f"🚨 АЛЕРТ: {alert['message']}\n\nМетрика: {alert['metric']}\nЗначение: {alert['value']:.1f}\nПорог: {alert['threshold']:.1f}"
-            
-            # Отправляем в настроенные каналы
-            for channel_name in config['notifications']['channels']:
-                if channel_name in channels and channels[channel_name].get('status') == 'active':
-                    await _send_notification_by_type(
-                        channels[channel_name], 
-                        message, 
-                        priority
+        # Алерты ставятся в outbox, повтор того же алерта в пределах cooldown подавляется;
+        # затем все накопившееся по каналу уходит одним дайджестом
+        outbox = _get_outbox()
+        try:
+            for alert in alerts:
+                priority = 'urgent' if alert['type'] == 'critical' else 'high'
+                message = f"🚨 АЛЕРТ: {alert['message']}\n\nМетрика: {alert['metric']}\nЗначение: {alert['value']:.1f}\nПорог: {alert['threshold']:.1f}"
+                for channel_name in target_channels:
+                    await asyncio.to_thread(
+                        outbox.enqueue, channel_name, message, priority, "Алерт мониторинга",
+                        f"alert:{alert['metric']}:{alert['type']}", cooldown,
                     )
+            await _deliver_outbox(outbox, channels)
+        finally:
+            outbox.close()
                     
     except ImportError:
         logger.warning("Модуль уведомлений не найден")
@@ -283,7 +263,7 @@ def _get_system_info() -> Dict[str, Any]:
 
 def _get_cpu_info() -> Dict[str, Any]:
     """Получает информацию о CPU."""
-    cpu_percent = psutil.cpu_percent(interval=1)
+    cpu_percent = psutil.cpu_percent(interval=None)
     cpu_count = psutil.cpu_count()
     cpu_freq = psutil.cpu_freq()
     
@@ -417,6 +397,27 @@ async def _get_bot_status() -> Dict[str, Any]:
             "uptime": "unknown"
         }
 
+def _get_db_pool_stats(settings, db_manager) -> Dict[str, Any]:
+    """
+    Статистика пула соединений. Если бот запущен, берется из его снимка runtime-статистики
+    (пул CLI-процесса мало о чем говорит), иначе - пул текущего процесса.
+    """
+    from core.monitoring.runtime_stats import read_runtime_stats, get_runtime_stats_path
+
+    snapshot = read_runtime_stats(get_runtime_stats_path(settings.core.project_data_path))
+    if snapshot and "db_pool" in snapshot.get("sections", {}):
+        return {**snapshot["sections"]["db_pool"], "source": "bot", "pid": snapshot.get("pid")}
+    return {**db_manager.get_pool_stats(), "source": "cli"}
+
+def _get_update_scheduler_stats(settings) -> Optional[Dict[str, Any]]:
+    """Метрики планировщика апдейтов (очередь, ожидание, время хендлеров) из снимка запущенного бота."""
+    from core.monitoring.runtime_stats import read_runtime_stats, get_runtime_stats_path
+
+    snapshot = read_runtime_stats(get_runtime_stats_path(settings.core.project_data_path))
+    if snapshot and "updates" in snapshot.get("sections", {}):
+        return {**snapshot["sections"]["updates"], "pid": snapshot.get("pid")}
+    return None
+
 async def _get_database_status() -> Dict[str, Any]:
     """Получает статус базы данных."""
     try:
@@ -478,12 +479,13 @@ async def _get_database_status() -> Dict[str, Any]:
                 result = await session.execute(text("SELECT 1"))
                 response_time = time.time() - start_time
                 
-                return {
-                    "status": "connected",
-                    "response_time": response_time,
-                    "type": settings.db.type,
-                    "url": str(db_manager.url) if hasattr(db_manager, 'url') else "unknown"
-                }
+            return {
+                "status": "connected",
+                "response_time": response_time,
+                "type": settings.db.type,
+                "url": str(db_manager.url) if hasattr(db_manager, 'url') else "unknown",
+                "pool": _get_db_pool_stats(settings, db_manager)
+            }
         except Exception as db_error:
             return {
                 "status": "error",
@@ -538,6 +540,11 @@ async def _monitor_status_async(detailed: bool, json_output: bool, health: bool,
     network_info = _get_network_info()
     bot_status = await _get_bot_status()
     db_status = await _get_database_status()
+    try:
+        settings, _, _ = await get_sdb_services_for_cli()
+        updates_stats = _get_update_scheduler_stats(settings)
+    except Exception:
+        updates_stats = None
     
     # Формируем общие метрики
     metrics = {
@@ -572,7 +579,8 @@ async def _monitor_status_async(detailed: bool, json_output: bool, health: bool,
         },
         "services": {
             "bot": bot_status,
-            "database": db_status
+            "database": db_status,
+            "updates": updates_stats
         },
         "alerts": alerts,
         "health": {
@@ -615,6 +623,31 @@ async def _monitor_status_async(detailed: bool, json_output: bool, health: bool,
     if db_status['status'] == 'connected':
         console.print(f"      📊 Response time: {db_status.get('response_time', 0):.3f}s")
         console.print(f"      🔧 Type: {db_status.get('type', 'unknown')}")
+        pool = db_status.get('pool') or {}
+        if 'checked_out' in pool:
+            source = f"бот PID {pool.get('pid')}" if pool.get('source') == 'bot' else "процесс CLI, бот не запущен"
+            console.print(f"      🏊 Pool ({pool.get('pool_class', 'unknown')}, {source}): "
+                          f"checked out {pool['checked_out']}/{pool.get('size', 0)}, "
+                          f"idle {pool.get('checked_in', 0)}, overflow {pool.get('overflow', 0)}")
+            if detailed:
+                console.print(f"         Пик занятых: {pool.get('peak_checked_out', 0)}, "
+                              f"выдач: {pool.get('checkouts_total', 0)}, новых соединений: {pool.get('connects_total', 0)}")
+
+    if updates_stats:
+        wait = updates_stats.get('wait') or {}
+        console.print(f"   📨 Updates (бот PID {updates_stats.get('pid')}): "
+                      f"в очереди {updates_stats.get('queue_depth', 0)} (пик {updates_stats.get('peak_queue_depth', 0)}), "
+                      f"в работе {updates_stats.get('in_progress', 0)}/{updates_stats.get('max_concurrency', 0)}, "
+                      f"ожидание p95 {wait.get('p95_ms') or 0:.1f} ms")
+        if detailed:
+            console.print(f"         Обработано: {updates_stats.get('processed_total', 0)}, "
+                          f"ошибок: {updates_stats.get('failed_total', 0)}, "
+                          f"отброшено: {updates_stats.get('dropped_total', 0)}, "
+                          f"задержано: {updates_stats.get('delayed_total', 0)}")
+            for router_name, latency in (updates_stats.get('handlers') or {}).items():
+                console.print(f"         {router_name}: {latency.get('count', 0)} вызовов, "
+                              f"avg {latency.get('avg_ms') or 0:.1f} ms, p95 {latency.get('p95_ms') or 0:.1f} ms, "
+                              f"max {latency.get('max_ms') or 0:.1f} ms")
     
     # Показываем алерты
     if alerts:
@@ -842,31 +875,40 @@ async def _display_metrics_history(hours: int):
     """Отображает историю метрик."""
     console.print(Panel.fit(f"📈 История метрик (последние {hours} часов)", style="bold cyan"))
     
-    history = _get_metrics_history(hours)
+    settings, _, _ = await get_sdb_services_for_cli()
+    store = _get_metrics_store(settings)
+    history = await asyncio.to_thread(_get_metrics_history, hours)
     
     if not history:
         console.print("[yellow]История метрик пуста[/]")
         return
     
+    resolution = store.resolution_for(hours)
+    resolution_titles = {"raw": "замеры", "1m": "по минутам", "1h": "по часам"}
+    
     # Создаем таблицу
-    table = Table(title=f"История метрик ({len(history)} записей)")
+    table = Table(title=f"История метрик ({len(history)} записей, {resolution_titles[resolution]})")
     table.add_column("Время", style="cyan")
     table.add_column("CPU %", style="yellow")
     table.add_column("Memory %", style="green")
     table.add_column("Disk %", style="blue")
     table.add_column("Network (MB)", style="magenta")
     
+    time_format = '%H:%M:%S' if hours <= 24 else '%d.%m %H:%M'
     for record in history[:50]:  # Показываем последние 50 записей
         timestamp = datetime.fromisoformat(record['timestamp'])
-        cpu = record.get('cpu_percent', 0)
-        memory = record.get('memory_percent', 0)
-        disk = record.get('disk_percent', 0)
-        network_sent = record.get('network_bytes_sent', 0) / (1024 * 1024)  # MB
-        network_recv = record.get('network_bytes_recv', 0) / (1024 * 1024)  # MB
+        cpu = record.get('cpu_percent') or 0
+        memory = record.get('memory_percent') or 0
+        disk = record.get('disk_percent') or 0
+        network_sent = (record.get('network_bytes_sent') or 0) / (1024 * 1024)  # MB
+        network_recv = (record.get('network_bytes_recv') or 0) / (1024 * 1024)  # MB
+        cpu_text = f"{cpu:.1f}"
+        if record.get('cpu_max') is not None:
+            cpu_text += f" (макс {record['cpu_max']:.1f})"
         
         table.add_row(
-            timestamp.strftime('%H:%M:%S'),
-            f"{cpu:.1f}",
+            timestamp.strftime(time_format),
+            cpu_text,
             f"{memory:.1f}",
             f"{disk:.1f}",
             f"{network_sent:.1f}↑/{network_recv:.1f}↓"
@@ -876,14 +918,52 @@ async def _display_metrics_history(hours: int):
     
     # Статистика
     if history:
-        cpu_values = [r.get('cpu_percent', 0) for r in history]
-        memory_values = [r.get('memory_percent', 0) for r in history]
-        disk_values = [r.get('disk_percent', 0) for r in history]
+        cpu_values = [r.get('cpu_percent') or 0 for r in history]
+        memory_values = [r.get('memory_percent') or 0 for r in history]
+        disk_values = [r.get('disk_percent') or 0 for r in history]
+        cpu_max = max((r.get('cpu_max') or r.get('cpu_percent') or 0) for r in history)
+        memory_max = max((r.get('memory_max') or r.get('memory_percent') or 0) for r in history)
+        disk_max = max((r.get('disk_max') or r.get('disk_percent') or 0) for r in history)
         
         console.print("\n📊 Статистика:")
-        console.print(f"   CPU: мин {min(cpu_values):.1f}%, макс {max(cpu_values):.1f}%, средн {sum(cpu_values)/len(cpu_values):.1f}%")
-        console.print(f"   Memory: мин {min(memory_values):.1f}%, макс {max(memory_values):.1f}%, средн {sum(memory_values)/len(memory_values):.1f}%")
-        console.print(f"   Disk: мин {min(disk_values):.1f}%, макс {max(disk_values):.1f}%, средн {sum(disk_values)/len(disk_values):.1f}%")
+        console.print(f"   CPU: мин {min(cpu_values):.1f}%, макс {cpu_max:.1f}%, средн {sum(cpu_values)/len(cpu_values):.1f}%")
+        console.print(f"   Memory: мин {min(memory_values):.1f}%, макс {memory_max:.1f}%, средн {sum(memory_values)/len(memory_values):.1f}%")
+        console.print(f"   Disk: мин {min(disk_values):.1f}%, макс {disk_max:.1f}%, средн {sum(disk_values)/len(disk_values):.1f}%")
+
+@monitor_app.command(name="collect", help="Собирать метрики в фоне без запущенного бота (до Ctrl+C).")
+def monitor_collect_cmd(
+    interval: Optional[float] = typer.Option(None, "--interval", help="Интервал между замерами, сек (по умолчанию core.metrics.sample_interval_seconds)"),
+    flush_interval: Optional[float] = typer.Option(None, "--flush-interval", help="Как часто писать замеры в БД, сек (по умолчанию core.metrics.flush_interval_seconds)")
+):
+    """Запускает сборщик метрик в текущем процессе."""
+    try:
+        asyncio.run(_monitor_collect_async(interval, flush_interval))
+    except KeyboardInterrupt:
+        pass
+
+async def _monitor_collect_async(interval: Optional[float], flush_interval: Optional[float]):
+    """Асинхронная функция сбора метрик."""
+    from core.monitoring.metrics_collector import MetricsCollector
+
+    settings, _, _ = await get_sdb_services_for_cli()
+    collector = MetricsCollector(
+        store=_get_metrics_store(settings),
+        sample_interval_seconds=interval or settings.core.metrics.sample_interval_seconds,
+        flush_interval_seconds=flush_interval or settings.core.metrics.flush_interval_seconds,
+    )
+    console.print(Panel.fit(f"📥 Сбор метрик в {collector.store.db_path}", style="bold cyan"))
+    console.print("Нажмите Ctrl+C для остановки")
+    collector.start()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            stats = collector.get_stats()
+            console.print(f"   записано замеров: {stats['samples_written']}, в буфере: {stats['buffered']}")
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await collector.stop()
+        console.print(f"\n⏹️ Сбор метрик остановлен (записано замеров: {collector.get_stats()['samples_written']})")
 
 @monitor_app.command(name="alerts", help="Управление системой оповещений.")
 def monitor_alerts_cmd(
@@ -998,6 +1078,40 @@ def monitor_logs_cmd(
     """Анализирует логи системы."""
     asyncio.run(_monitor_logs_async(analyze, errors, last_n, since, search))
 
+def _parse_since(value: str) -> datetime:
+    """'2024-01-15', '2024-01-15 14:00' или относительный период: '30m', '6h', '7d'."""
+    value = value.strip()
+    units = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+    if len(value) > 1 and value[-1].lower() in units and value[:-1].isdigit():
+        return datetime.now() - timedelta(**{units[value[-1].lower()]: int(value[:-1])})
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise typer.BadParameter(f"Не удалось разобрать --since '{value}'. Примеры: 2024-01-15, '2024-01-15 14:00', 6h, 7d.")
+
+def _get_log_index(settings):
+    from core.log_index import LogIndex, get_log_index_path
+
+    structured_logs_root = settings.core.project_data_path / settings.core.log_structured_dir
+    return LogIndex(
+        index_path=get_log_index_path(structured_logs_root),
+        structured_logs_root=structured_logs_root,
+        json_logs=settings.core.log_json_sink,
+    )
+
+def _print_log_entries(entries: List[Dict[str, Any]]) -> None:
+    if not entries:
+        console.print("   Записей не найдено")
+        return
+    level_styles = {"CRITICAL": "bold red", "ERROR": "red", "WARNING": "yellow", "SUCCESS": "green"}
+    # Индекс отдает от новых к старым, показываем в хронологическом порядке
+    for entry in reversed(entries):
+        ts = datetime.fromtimestamp(entry["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        style = level_styles.get(entry["level"], "dim")
+        service = f" \\[{escape(entry['service'])}]" if entry.get("service") else ""
+        console.print(f"   {ts} [{style}]{entry['level']: <8}[/] {escape(entry['logger'])}{service}: {escape(entry['message'])}",
+                      highlight=False)
+
 async def _monitor_logs_async(analyze: bool, errors: bool, last_n: Optional[int], since: Optional[str], search: Optional[str]):
     """Асинхронная функция для анализа логов."""
     
@@ -1006,43 +1120,65 @@ async def _monitor_logs_async(analyze: bool, errors: bool, last_n: Optional[int]
     
     console.print(Panel.fit("📋 Анализ логов системы", style="bold cyan"))
     
+    try:
+        settings, _, _ = await get_sdb_services_for_cli()
+        log_index = _get_log_index(settings)
+        since_dt = _parse_since(since) if since else None
+        # Бот обновляет индекс раз в час; догоняем закрытые файлы, которые он еще не успел добавить
+        index_update = await asyncio.to_thread(log_index.update)
+    except typer.BadParameter as e:
+        console.print(f"[bold red]❌ {e}[/]")
+        raise typer.Exit(code=1)
+    except Exception as e:
+        console.print(f"[bold red]❌ Не удалось открыть индекс логов: {e}[/]")
+        return
+    
+    if index_update["files_indexed"]:
+        console.print(f"[dim]Проиндексировано новых файлов: {index_update['files_indexed']} "
+                      f"(записей: {index_update['entries_indexed']})[/]")
+    
     if analyze:
-        console.print("📊 Статистика за 24 часа:")
-        console.print("   📝 Всего записей: 15,420")
-        console.print("   ❌ Ошибок: 12")
-        console.print("   ⚠️ Предупреждений: 45")
-        console.print("   🟢 Информационных: 15,363")
+        period_start = since_dt or datetime.now() - timedelta(hours=24)
+        summary = await asyncio.to_thread(log_index.summary, period_start)
+        by_level = summary["by_level"]
+        period_label = f"с {period_start.strftime('%Y-%m-%d %H:%M')}" if since_dt else "за 24 часа"
+        console.print(f"📊 Статистика {period_label} (проиндексированные файлы: {summary['files_indexed']}):")
+        console.print(f"   📝 Всего записей: {summary['total']:,}")
+        console.print(f"   ❌ Ошибок: {by_level.get('ERROR', 0) + by_level.get('CRITICAL', 0):,}")
+        console.print(f"   ⚠️ Предупреждений: {by_level.get('WARNING', 0):,}")
+        console.print(f"   🟢 Информационных: {by_level.get('INFO', 0) + by_level.get('SUCCESS', 0):,}")
+        console.print(f"   🔧 Отладочных: {by_level.get('DEBUG', 0) + by_level.get('TRACE', 0):,}")
         console.print()
         
         console.print("🔍 Топ ошибок:")
-        console.print("   ❌ Connection timeout: 5 раз")
-        console.print("   ❌ Database lock: 3 раза")
-        console.print("   ❌ Memory allocation failed: 2 раза")
-        console.print("   ❌ Invalid API key: 2 раза")
+        if summary["top_errors"]:
+            for top_error in summary["top_errors"]:
+                console.print(f"   ❌ {top_error['message'][:120]}: {top_error['count']} раз", highlight=False)
+        else:
+            console.print("   ✅ Ошибок не найдено")
         console.print()
         
-        console.print("📈 Паттерны активности:")
-        console.print("   📊 Пиковая нагрузка: 14:00-16:00")
-        console.print("   📊 Минимальная нагрузка: 02:00-06:00")
-        console.print("   📊 Средняя активность: 45 запросов/мин")
+        if summary["busiest_hours"]:
+            console.print("📈 Самые нагруженные часы:")
+            for busiest in summary["busiest_hours"]:
+                console.print(f"   📊 {busiest['hour']:02d}:00-{(busiest['hour'] + 1) % 24:02d}:00 - {busiest['count']:,} записей")
+            console.print()
     
     if errors:
         console.print("❌ Последние ошибки:")
-        console.print("   2024-01-15 15:30: Connection timeout to database")
-        console.print("   2024-01-15 15:25: Memory allocation failed")
-        console.print("   2024-01-15 15:20: Invalid API key provided")
-    
-    if last_n:
-        console.print(f"📋 Последние {last_n} записей:")
-        console.print("   (Функция в разработке)")
-    
-    if since:
-        console.print(f"📋 Логи с {since}:")
-        console.print("   (Функция в разработке)")
+        entries = await asyncio.to_thread(log_index.query, min_level="ERROR", since=since_dt, search=search, limit=last_n or 20)
+        _print_log_entries(entries)
+        console.print()
     
-    if search:
-        console.print(f"🔍 Поиск по паттерну '{search}':")
-        console.print("   (Функция в разработке)")
+    if not errors and (last_n or since or search):
+        title_parts = []
+        if search:
+            title_parts.append(f"по паттерну '{search}'")
+        if since_dt:
+            title_parts.append(f"с {since_dt.strftime('%Y-%m-%d %H:%M')}")
+        console.print(f"📋 Последние {last_n or 50} записей {' '.join(title_parts)}:".rstrip(" :") + ":")
+        entries = await asyncio.to_thread(log_index.query, since=since_dt, search=search, limit=last_n or 50)
+        _print_log_entries(entries)
 
 @monitor_app.command(name="performance", help="Анализ производительности системы.")
 def monitor_performance_cmd(
@@ -1155,8 +1291,7 @@ def monitor_integrate_cmd(
         prometheus = grafana = True  # По умолчанию Prometheus + Grafana
     
     if prometheus:
-        console.print("✅ Интеграция с Prometheus настроена")
-        console.print("📊 Метрики экспортируются на: localhost:9090")
+        asyncio.run(_monitor_integrate_async(prometheus, False, False, False))
     
     if grafana:
         console.print("🎨 Дашборд Grafana создан: http://localhost:3000")
@@ -1309,6 +1444,21 @@ async def _monitor_report_async(daily: bool, weekly: bool, monthly: bool, format
 
 async def _monitor_integrate_async(prometheus: bool, grafana: bool, datadog: bool, newrelic: bool):
     """Асинхронная функция для интеграции с системами мониторинга."""
+    if prometheus:
+        integration = await _setup_integration("prometheus")
+        status = integration.get("status")
+        endpoint = integration.get("endpoint")
+        if status == "active":
+            console.print(f"✅ Эндпоинт метрик Prometheus отвечает: {endpoint} "
+                          f"(метрик: {integration.get('metrics_exported', 0)})")
+        elif status == "unreachable":
+            console.print(f"[yellow]⚠️ Экспорт метрик включен, но {endpoint} не отвечает - бот запущен?[/]")
+        elif status == "disabled":
+            console.print("[yellow]⚠️ Экспорт метрик выключен. Включите в config.yaml:[/]")
+            console.print("   core:\n     prometheus:\n       enabled: true")
+        if integration.get("scrape_config"):
+            console.print("📄 Конфигурация для prometheus.yml:")
+            console.print(escape(integration["scrape_config"]))
     console.print("[green]✅ Интеграции настроены[/]")
 
 async def _get_alerts_data() -> List[Dict[str, Any]]:
@@ -1342,12 +1492,45 @@ async def _generate_report(period: str, format_type: str) -> Dict[str, Any]:
 
 async def _setup_integration(service: str) -> Dict[str, Any]:
     """Настраивает интеграцию с сервисом."""
+    if service == "prometheus":
+        return await _get_prometheus_integration()
     return {
         "service": service,
         "status": "configured",
         "endpoint": f"http://localhost:8080/{service}"
     }
 
+async def _get_prometheus_integration() -> Dict[str, Any]:
+    """Проверяет эндпоинт /metrics бота и готовит scrape-конфиг для Prometheus."""
+    settings, _, _ = await get_sdb_services_for_cli()
+    prometheus_settings = settings.core.prometheus
+    target = f"{prometheus_settings.host}:{prometheus_settings.port}"
+    endpoint = f"http://{target}{prometheus_settings.path}"
+    integration: Dict[str, Any] = {
+        "service": "prometheus",
+        "endpoint": endpoint,
+        "scrape_config": (
+            "scrape_configs:\n"
+            "  - job_name: swiftdevbot\n"
+            f"    metrics_path: {prometheus_settings.path}\n"
+            "    static_configs:\n"
+            f"      - targets: ['{target}']"
+        ),
+    }
+    if not prometheus_settings.enabled:
+        integration["status"] = "disabled"
+        return integration
+    try:
+        import aiohttp
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=3)) as session:
+            async with session.get(endpoint) as response:
+                body = await response.text()
+        integration["status"] = "active" if response.status == 200 else "unreachable"
+        integration["metrics_exported"] = sum(1 for line in body.splitlines() if line.startswith("# TYPE "))
+    except Exception:
+        integration["status"] = "unreachable"
+    return integration
+
 async def _start_dashboard_server(port: int, host: str):
     """Запускает сервер дашборда."""
     console.print(f"[green]✅ Сервер запущен на {host}:{port}[/]") 
\ No newline at end of file
@@ -8,10 +8,6 @@ from typing import Optional, List, Dict, Any
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import requests
 import subprocess
 import logging
 
@@ -26,6 +22,7 @@ logger = logging.getLogger(__name__)
 NOTIFICATIONS_DIR = Path("project_data/notifications")
 NOTIFICATIONS_CONFIG_FILE = NOTIFICATIONS_DIR / "notifications_config.json"
 NOTIFICATIONS_LOG_FILE = NOTIFICATIONS_DIR / "notifications.log"
+NOTIFICATIONS_OUTBOX_DB = NOTIFICATIONS_DIR / "outbox.db"
 
 def _ensure_notifications_directory():
     """Создать директорию для уведомлений если её нет"""
@@ -275,296 +272,47 @@ async def _notifications_send_async(channel: str, message: str, priority: str, t
     console.print(f"[cyan]Тема:[/] {final_subject}")
     console.print(f"[cyan]Сообщение:[/] {final_message}")
     
-    # Отправляем уведомление
-    success = False
+    if channel_type not in ("telegram", "email", "webhook", "slack"):
+        console.print(f"[yellow]Неподдерживаемый тип канала: {channel_type}[/]")
+        return
+    
+    # Уведомление сначала попадает в outbox: при сбое оно не теряется и будет отправлено повторно
     try:
-        if channel_type == "telegram":
-            success = await _send_telegram_notification(channel_info, final_message, priority)
-        elif channel_type == "email":
-            success = await _send_email_notification(channel_info, final_subject, final_message, priority)
-        elif channel_type == "webhook":
-            success = await _send_webhook_notification(channel_info, final_message, priority)
-        elif channel_type == "slack":
-            success = await _send_slack_notification(channel_info, final_message, priority)
-        else:
-            console.print(f"[yellow]Неподдерживаемый тип канала: {channel_type}[/]")
-            return
+        outbox = _get_outbox()
+        try:
+            await asyncio.to_thread(outbox.enqueue, channel, final_message, priority, final_subject)
+            stats = await _deliver_outbox(outbox, {channel: channel_info})
+        finally:
+            outbox.close()
     except Exception as e:
         console.print(f"[bold red]Ошибка при отправке уведомления: {e}[/]")
         _log_notification_event(channel, "send_failed", str(e))
         return
     
-    if success:
+    if stats["sent"]:
         console.print(f"[green]✅ Уведомление успешно отправлено через канал '{channel}'[/]")
         _log_notification_event(channel, "send_success", f"priority={priority}")
+    elif stats["retry"]:
+        console.print(f"[yellow]⏳ Канал '{channel}' сейчас недоступен - уведомление осталось в очереди и будет отправлено повторно[/]")
+        console.print("[dim]Повторить сейчас: sdb notifications outbox --deliver[/]")
+        _log_notification_event(channel, "send_deferred", f"priority={priority}")
     else:
         console.print(f"[red]❌ Не удалось отправить уведомление через канал '{channel}'[/]")
         _log_notification_event(channel, "send_failed", f"priority={priority}")
 
-async def _send_telegram_notification(channel_info: Dict[str, Any], message: str, priority: str) -> bool:
-    """Отправить уведомление в Telegram с реальной интеграцией"""
-    config = channel_info.get("config", {})
-    chat_id = config.get("chat_id")
-    bot_token = config.get("bot_token")
-    
-    if not chat_id or not bot_token:
-        console.print("[yellow]Telegram не настроен (отсутствует chat_id или bot_token)[/]")
-        logger.warning(f"Telegram notification failed: missing config - chat_id: {bool(chat_id)}, bot_token: {bool(bot_token)}")
-        return False
-    
-    try:
-        # Формируем сообщение с приоритетом и временной меткой
-        priority_emoji = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}
-        emoji = priority_emoji.get(priority, "⚪")
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        formatted_message = f"""
-{emoji} **{priority.upper()} УВЕДОМЛЕНИЕ**
-⏰ {timestamp}
-
-{message}
-
----
-🤖 SwiftDevBot-Lite
-        """.strip()
-        
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        data = {
-            "chat_id": chat_id,
-            "text": formatted_message,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True
-        }
-        
-        console.print(f"[cyan]Отправка уведомления в Telegram (chat_id: {chat_id})...[/]")
-        
-        response = requests.post(url, json=data, timeout=15)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("ok"):
-                console.print("[green]✅ Уведомление отправлено в Telegram[/]")
-                logger.info(f"Telegram notification sent successfully to chat_id: {chat_id}")
-                return True
-            else:
-                error_msg = result.get("description", "Unknown error")
-                console.print(f"[red]❌ Ошибка Telegram API: {error_msg}[/]")
-                logger.error(f"Telegram API error: {error_msg}")
-                return False
-        else:
-            console.print(f"[red]❌ HTTP ошибка: {response.status_code}[/]")
-            logger.error(f"Telegram HTTP error: {response.status_code}")
-            return False
-            
-    except requests.exceptions.Timeout:
-        console.print("[red]❌ Таймаут при отправке в Telegram[/]")
-        logger.error("Telegram notification timeout")
-        return False
-    except requests.exceptions.RequestException as e:
-        console.print(f"[red]❌ Ошибка сети: {e}[/]")
-        logger.error(f"Telegram network error: {e}")
-        return False
-    except Exception as e:
-        console.print(f"[red]❌ Неожиданная ошибка: {e}[/]")
-        logger.error(f"Telegram unexpected error: {e}")
-        return False
+def _get_outbox():
+    """Outbox уведомлений CLI (project_data/notifications/outbox.db)"""
+    from core.notifications import NotificationOutbox
+    return NotificationOutbox(NOTIFICATIONS_OUTBOX_DB)
 
-async def _send_email_notification(channel_info: Dict[str, Any], subject: str, message: str, priority: str) -> bool:
-    """Отправить уведомление по email с улучшенной обработкой ошибок"""
-    config = channel_info.get("config", {})
-    
-    smtp_server = config.get("smtp_server")
-    smtp_port = config.get("smtp_port", 587)
-    username = config.get("username")
-    password = config.get("password")
-    from_email = config.get("from_email")
-    to_email = config.get("to_email")
-    
-    if not all([smtp_server, username, password, from_email, to_email]):
-        console.print("[yellow]Email не настроен (отсутствуют необходимые параметры)[/]")
-        logger.warning("Email notification failed: missing configuration")
-        return False
+async def _deliver_outbox(outbox, channels: Optional[Dict[str, Any]] = None, limit: int = 100) -> Dict[str, int]:
+    """Отправить наступившие уведомления из outbox (несколько уведомлений одного канала - одним дайджестом)"""
+    from core.notifications import NotificationDispatcher
     
-    try:
-        # Формируем сообщение с улучшенным форматированием
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        priority_emoji = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}
-        emoji = priority_emoji.get(priority, "⚪")
-        
-        msg = MIMEMultipart()
-        msg['From'] = from_email
-        msg['To'] = to_email
-        msg['Subject'] = f"{emoji} [{priority.upper()}] {subject}"
-        
-        body = f"""
-🤖 SwiftDevBot-Lite - Уведомление
-
-Приоритет: {priority.upper()}
-Время: {timestamp}
-
-{message}
-
----
-Это автоматическое уведомление от системы SwiftDevBot-Lite.
-        """
-        
-        msg.attach(MIMEText(body, 'plain', 'utf-8'))
-        
-        console.print(f"[cyan]Отправка email уведомления на {to_email}...[/]")
-        
-        # Подключение к SMTP серверу
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(username, password)
-        server.send_message(msg)
-        server.quit()
-        
-        console.print("[green]✅ Email уведомление отправлено[/]")
-        logger.info(f"Email notification sent successfully to {to_email}")
-        return True
-        
-    except smtplib.SMTPAuthenticationError:
-        console.print("[red]❌ Ошибка аутентификации SMTP[/]")
-        logger.error("Email SMTP authentication error")
-        return False
-    except smtplib.SMTPRecipientsRefused:
-        console.print("[red]❌ Неверный адрес получателя[/]")
-        logger.error(f"Email recipient refused: {to_email}")
-        return False
-    except smtplib.SMTPServerDisconnected:
-        console.print("[red]❌ Соединение с SMTP сервером разорвано[/]")
-        logger.error("Email SMTP server disconnected")
-        return False
-    except Exception as e:
-        console.print(f"[red]❌ Ошибка отправки email: {e}[/]")
-        logger.error(f"Email sending error: {e}")
-        return False
-
-async def _send_webhook_notification(channel_info: Dict[str, Any], message: str, priority: str) -> bool:
-    """Отправить уведомление через webhook с улучшенной обработкой"""
-    config = channel_info.get("config", {})
-    url = config.get("url")
-    method = config.get("method", "POST")
-    headers = config.get("headers", {})
-    
-    if not url:
-        console.print("[yellow]Webhook не настроен (отсутствует URL)[/]")
-        logger.warning("Webhook notification failed: missing URL")
-        return False
-    
-    try:
-        timestamp = datetime.now().isoformat()
-        data = {
-            "message": message,
-            "priority": priority,
-            "timestamp": timestamp,
-            "source": "swiftdevbot",
-            "version": "1.0"
-        }
-        
-        console.print(f"[cyan]Отправка webhook уведомления на {url}...[/]")
-        
-        response = requests.request(method, url, json=data, headers=headers, timeout=15)
-        
-        if response.status_code in [200, 201, 202]:
-            console.print("[green]✅ Webhook уведомление отправлено[/]")
-            logger.info(f"Webhook notification sent successfully to {url}")
-            return True
-        else:
-            console.print(f"[red]❌ Webhook ошибка: HTTP {response.status_code}[/]")
-            logger.error(f"Webhook HTTP error: {response.status_code}")
-            return False
-            
-    except requests.exceptions.Timeout:
-        console.print("[red]❌ Таймаут при отправке webhook[/]")
-        logger.error("Webhook notification timeout")
-        return False
-    except requests.exceptions.RequestException as e:
-        console.print(f"[red]❌ Ошибка сети webhook: {e}[/]")
-        logger.error(f"Webhook network error: {e}")
-        return False
-    except Exception as e:
-        console.print(f"[red]❌ Неожиданная ошибка webhook: {e}[/]")
-        logger.error(f"Webhook unexpected error: {e}")
-        return False
-
-async def _send_slack_notification(channel_info: Dict[str, Any], message: str, priority: str) -> bool:
-    """Отправить уведомление в Slack с улучшенной интеграцией"""
-    config = channel_info.get("config", {})
-    webhook_url = config.get("webhook_url")
-    channel = config.get("channel", "#alerts")
-    
-    if not webhook_url:
-        console.print("[yellow]Slack не настроен (отсутствует webhook_url)[/]")
-        logger.warning("Slack notification failed: missing webhook_url")
-        return False
-    
-    try:
-        # Формируем Slack сообщение с приоритетом
-        priority_emoji = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}
-        emoji = priority_emoji.get(priority, "⚪")
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        slack_data = {
-            "channel": channel,
-            "text": f"{emoji} *{priority.upper()} УВЕДОМЛЕНИЕ*",
-            "attachments": [
-                {
-                    "color": {
-                        "low": "#3498db",
-                        "normal": "#95a5a6", 
-                        "high": "#f39c12",
-                        "urgent": "#e74c3c"
-                    }.get(priority, "#95a5a6"),
-                    "text": message,
-                    "fields": [
-                        {
-                            "title": "Приоритет",
-                            "value": priority.upper(),
-                            "short": True
-                        },
-                        {
-                            "title": "Время",
-                            "value": timestamp,
-                            "short": True
-                        },
-                        {
-                            "title": "Источник",
-                            "value": "SwiftDevBot-Lite",
-                            "short": True
-                        }
-                    ],
-                    "footer": "SwiftDevBot-Lite",
-                    "ts": int(datetime.now().timestamp())
-                }
-            ]
-        }
-        
-        console.print(f"[cyan]Отправка Slack уведомления в канал {channel}...[/]")
-        
-        response = requests.post(webhook_url, json=slack_data, timeout=15)
-        
-        if response.status_code == 200:
-            console.print("[green]✅ Slack уведомление отправлено[/]")
-            logger.info(f"Slack notification sent successfully to channel {channel}")
-            return True
-        else:
-            console.print(f"[red]❌ Slack ошибка: HTTP {response.status_code}[/]")
-            logger.error(f"Slack HTTP error: {response.status_code}")
-            return False
-            
-    except requests.exceptions.Timeout:
-        console.print("[red]❌ Таймаут при отправке в Slack[/]")
-        logger.error("Slack notification timeout")
-        return False
-    except requests.exceptions.RequestException as e:
-        console.print(f"[red]❌ Ошибка сети Slack: {e}[/]")
-        logger.error(f"Slack network error: {e}")
-        return False
-    except Exception as e:
-        console.print(f"[red]❌ Неожиданная ошибка Slack: {e}[/]")
-        logger.error(f"Slack unexpected error: {e}")
-        return False
+    if channels is None:
+        channels = _load_notifications_config().get("channels", {})
+    async with NotificationDispatcher(channels, outbox) as dispatcher:
+        return await dispatcher.deliver_due(limit=limit)
 
 @notifications_app.command(name="configure", help="Настроить канал уведомлений.")
 def notifications_configure_cmd(
@@ -692,22 +440,95 @@ async def _notifications_test_async(channel: str, message: Optional[str], priori
         logger.error(f"Notification test failed for channel: {channel}")
         raise typer.Exit(code=1)
 
-async def _send_notification_by_type(channel_info: Dict[str, Any], message: str, priority: str) -> bool:
-    """Отправить уведомление по типу канала"""
-    channel_type = channel_info.get("type")
+@notifications_app.command(name="outbox", help="Очередь уведомлений: статистика, повторная отправка, очистка.")
+def notifications_outbox_cmd(
+    deliver: bool = typer.Option(False, "--deliver", "-d", help="Отправить наступившие уведомления сейчас"),
+    requeue_dead: bool = typer.Option(False, "--requeue-dead", help="Вернуть неотправленные ('dead') уведомления в очередь"),
+    purge_days: Optional[float] = typer.Option(None, "--purge-days", help="Удалить отправленные и 'dead' старше N дней"),
+    limit: int = typer.Option(10, "--limit", "-l", help="Сколько последних записей показать")
+):
+    """Показать и обслужить outbox уведомлений"""
+    try:
+        asyncio.run(_notifications_outbox_async(deliver, requeue_dead, purge_days, limit))
+    except typer.Exit: raise
+    except Exception as e:
+        console.print(f"[bold red]Неожиданная ошибка в команде 'notifications outbox': {e}[/]")
+        raise typer.Exit(code=1)
+
+async def _notifications_outbox_async(deliver: bool, requeue_dead: bool, purge_days: Optional[float], limit: int):
+    """Outbox уведомлений"""
+    console.print(Panel("[bold blue]ОЧЕРЕДЬ УВЕДОМЛЕНИЙ[/]", expand=False, border_style="blue"))
     
-    if channel_type == "telegram":
-        return await _send_telegram_notification(channel_info, message, priority)
-    elif channel_type == "email":
+    outbox = _get_outbox()
+    try:
+        if requeue_dead:
+            requeued = await asyncio.to_thread(outbox.requeue_dead)
+            console.print(f"[cyan]Возвращено в очередь: {requeued}[/]")
+        if deliver:
+            stats = await _deliver_outbox(outbox, limit=500)
+            console.print(f"[green]Отправлено: {stats['sent']}[/], [yellow]отложено: {stats['retry']}[/], "
+                          f"[red]отброшено: {stats['dead']}[/]")
+        if purge_days is not None:
+            purged = await asyncio.to_thread(outbox.purge, purge_days * 86400)
+            console.print(f"[cyan]Удалено записей: {purged}[/]")
+        
+        stats = await asyncio.to_thread(outbox.get_stats)
+        recent = await asyncio.to_thread(outbox.list_recent, None, limit)
+    finally:
+        outbox.close()
+    
+    oldest = stats["oldest_pending_age_seconds"]
+    console.print(f"[cyan]В очереди:[/] {stats['pending']}"
+                  f"{f' (старейшее ждет {oldest:.0f} сек)' if oldest else ''}  "
+                  f"[cyan]Отправлено:[/] {stats['sent']}  [cyan]Dead:[/] {stats['dead']}")
+    
+    if recent:
+        table = Table(title="Последние уведомления")
+        table.add_column("ID", style="dim")
+        table.add_column("Канал", style="cyan")
+        table.add_column("Статус")
+        table.add_column("Попыток", justify="right")
+        table.add_column("Создано")
+        table.add_column("Сообщение / ошибка", style="dim")
+        status_styles = {"pending": "yellow", "sent": "green", "dead": "red"}
+        for item in recent:
+            style = status_styles.get(item["status"], "white")
+            details = item["last_error"] if item["status"] != "sent" and item["last_error"] else item["message"]
+            table.add_row(
+                str(item["id"]), item["channel"], f"[{style}]{item['status']}[/]", str(item["attempts"]),
+                datetime.fromtimestamp(item["created_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+                details.replace("\n", " ")[:80],
+            )
+        console.print(table)
+
+async def _send_notification_by_type(channel_info: Dict[str, Any], message: str, priority: str,
+                                     subject: Optional[str] = None) -> bool:
+    """Отправить уведомление по типу канала сразу, минуя outbox"""
+    from core.notifications import NotificationDispatcher
+    
+    channel_type = channel_info.get("type")
+    if channel_type == "email" and subject is None:
         subject = "Тестовое уведомление"
-        return await _send_email_notification(channel_info, subject, message, priority)
-    elif channel_type == "webhook":
-        return await _send_webhook_notification(channel_info, message, priority)
-    elif channel_type == "slack":
-        return await _send_slack_notification(channel_info, message, priority)
-    else:
-        console.print(f"[yellow]Неподдерживаемый тип канала: {channel_type}[/]")
+    
+    try:
+        async with NotificationDispatcher({}) as dispatcher:
+            result = await dispatcher.send(channel_info, message, priority, subject)
+    except asyncio.TimeoutError:
+        console.print(f"[red]❌ Таймаут при отправке ({channel_type})[/]")
+        logger.error(f"{channel_type} notification timeout")
+        return False
+    except Exception as e:
+        console.print(f"[red]❌ Ошибка отправки ({channel_type}): {e}[/]")
+        logger.error(f"{channel_type} notification error: {e}")
         return False
+    
+    if result.ok:
+        console.print(f"[green]✅ Уведомление отправлено ({channel_type})[/]")
+        logger.info(f"{channel_type} notification sent successfully")
+    else:
+        console.print(f"[red]❌ {result.error}[/]")
+        logger.error(f"{channel_type} notification failed: {result.error}")
+    return result.ok
 
 async def _configure_channel_interactive(channel: str, channel_info: Dict[str, Any], config: Dict[str, Any]):
     """Интерактивная настройка канала уведомлений"""
@@ -761,7 +582,7 @@ async def _configure_telegram_interactive(channel: str, channel_info: Dict[str,
         # Тестируем подключение
         if typer.confirm("Протестировать подключение?"):
             test_message = "Тестовое уведомление от SwiftDevBot-Lite"
-            success = await _send_telegram_notification(config["channels"][channel], test_message, "normal")
+            success = await _send_notification_by_type(config["channels"][channel], test_message, "normal")
             if success:
                 console.print("[green]✅ Тест подключения прошел успешно![/]")
             else:
@@ -807,7 +628,7 @@ async def _configure_email_interactive(channel: str, channel_info: Dict[str, Any
         # Тестируем подключение
         if typer.confirm("Протестировать подключение?"):
             test_message = "Тестовое уведомление от SwiftDevBot-Lite"
-            success = await _send_email_notification(config["channels"][channel], "Тест", test_message, "normal")
+            success = await _send_notification_by_type(config["channels"][channel], test_message, "normal", subject="Тест")
             if success:
                 console.print("[green]✅ Тест подключения прошел успешно![/]")
             else:
@@ -839,7 +660,7 @@ async def _configure_webhook_interactive(channel: str, channel_info: Dict[str, A
         # Тестируем подключение
         if typer.confirm("Протестировать подключение?"):
             test_message = "Тестовое уведомление от SwiftDevBot-Lite"
-            success = await _send_webhook_notification(config["channels"][channel], test_message, "normal")
+            success = await _send_notification_by_type(config["channels"][channel], test_message, "normal")
             if success:
                 console.print("[green]✅ Тест подключения прошел успешно![/]")
             else:
@@ -879,7 +700,7 @@ async def _configure_slack_interactive(channel: str, channel_info: Dict[str, Any
         # Тестируем подключение
         if typer.confirm("Протестировать подключение?"):
             test_message = "Тестовое уведомление от SwiftDevBot-Lite"
-            success = await _send_slack_notification(config["channels"][channel], test_message, "normal")
+            success = await _send_notification_by_type(config["channels"][channel], test_message, "normal")
             if success:
                 console.print("[green]✅ Тест подключения прошел успешно![/]")
             else:
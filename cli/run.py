@@ -22,6 +22,10 @@ def run_command(
     background: bool = typer.Option(
         False, "--background", "-b",
         help="Запустить бота в фоновом режиме (демонизировать)."
+    ),
+    profile: bool = typer.Option(
+        False, "--profile",
+        help="Режим профилирования: логировать блокировки event loop со стеком, разрешить `sdb dev debug --profiling`."
     )
 ):
     """
@@ -59,6 +63,11 @@ def run_command(
     else:
         os.environ["SDB_LAUNCH_DEBUG_MODE"] = "false"
 
+    if profile:
+        # Фоновый процесс прочитает переменную окружения, текущий - уже загруженные настройки
+        os.environ["SDB_CORE_PROFILER_ENABLED"] = "true"
+        settings.core.profiler.enabled = True
+
     if background:
         if sys.platform == "win32":
             sdb_console.print("[bold red]Фоновый режим (-b/--background) пока не поддерживается на Windows через эту команду.[/bold red]")
@@ -6,6 +6,7 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text # Для более гибкого форматирования текста
 import asyncio
+from pathlib import Path
 from typing import Optional, List, Any, Tuple
 
 from .utils import get_sdb_services_for_cli # Наша утилита
@@ -19,7 +20,7 @@ user_app = typer.Typer(
 
 # --- Асинхронная логика команд ---
 
-async def _list_users_cmd_async(limit: int, offset: int, sort_by: str, sort_desc: bool):
+async def _list_users_cmd_async(limit: int, offset: int, sort_by: str, sort_desc: bool, cursor: Optional[str] = None):
     panel_title = "[bold blue]Список пользователей SwiftDevBot[/]"
     settings, db_m, _ = None, None, None # rbac_s здесь не нужен для простого списка
     try:
@@ -30,43 +31,47 @@ async def _list_users_cmd_async(limit: int, offset: int, sort_by: str, sort_desc
 
         async with db_m.get_session() as session:
             from core.database.core_models import User
-            from sqlalchemy import select, func as sql_func, desc, asc
+            from core.database.pagination import estimate_row_count, fetch_keyset_page
+            from sqlalchemy import select, desc, asc
             from sqlalchemy.orm import selectinload
 
-            count_stmt = select(sql_func.count(User.id))
-            total_users_result = await session.execute(count_stmt)
-            total_users = total_users_result.scalar_one_or_none() or 0
+            # На PostgreSQL/MySQL большие таблицы не сканируются: берется оценка из статистики СУБД
+            total_users, total_is_estimate = await estimate_row_count(session, User.__table__)
+            total_str = f"~{total_users}" if total_is_estimate else str(total_users)
 
             if total_users == 0:
                 console.print(Panel("[yellow]В базе данных нет зарегистрированных пользователей.[/yellow]", title=panel_title))
                 return
 
-            # Логика сортировки
             order_column = getattr(User, sort_by, User.id) # Дефолт по id, если атрибут не найден
-            order_expression = desc(order_column) if sort_desc else asc(order_column)
-
-            stmt = (
-                select(User)
-                .options(selectinload(User.roles))
-                .order_by(order_expression)
-                .limit(limit)
-                .offset(offset)
-            )
-            result = await session.execute(stmt)
-            users: List[User] = list(result.scalars().all())
+            base_stmt = select(User).options(selectinload(User.roles))
+            next_cursor: Optional[str] = None
+            if offset > 0:
+                # Совместимость со старыми скриптами: OFFSET медленнее с каждой страницей
+                order_expression = desc(order_column) if sort_desc else asc(order_column)
+                stmt = base_stmt.order_by(order_expression, desc(User.id) if sort_desc else asc(User.id)).limit(limit).offset(offset)
+                result = await session.execute(stmt)
+                users: List[User] = list(result.scalars().all())
+            else:
+                try:
+                    page = await fetch_keyset_page(session, base_stmt, order_column, User.id, limit,
+                                                   descending=sort_desc, cursor=cursor)
+                except ValueError as e_cursor:
+                    console.print(f"[bold red]Ошибка: {e_cursor}[/]")
+                    raise typer.Exit(code=1)
+                users = page.items
+                next_cursor = page.next_cursor
 
             if not users and total_users > 0 : # Если есть пользователи, но не на этой странице
+                position = f"курсор {cursor}" if cursor else f"смещение {offset}"
                 console.print(Panel(
-                    f"[yellow]На этой странице (смещение {offset}, лимит {limit}) пользователей нет, но всего в БД: {total_users}.[/yellow]",
+                    f"[yellow]На этой странице ({position}, лимит {limit}) пользователей нет, но всего в БД: {total_str}.[/yellow]",
                     title=panel_title
                 ))
                 return
-            elif not users: # Это условие уже покрыто выше, но для ясности
-                console.print(Panel("[yellow]В базе данных нет зарегистрированных пользователей.[/yellow]", title=panel_title))
-                return
-
 
-            table_title = f"Пользователи SDB (Показано: {len(users)} из {total_users}, Лимит: {limit}, Смещение: {offset}, Сортировка: {sort_by} {'DESC' if sort_desc else 'ASC'})"
+            position_str = f"Смещение: {offset}" if offset > 0 else f"Курсор: {cursor or '-'}"
+            table_title = f"Пользователи SDB (Показано: {len(users)} из {total_str}, Лимит: {limit}, {position_str}, Сортировка: {sort_by} {'DESC' if sort_desc else 'ASC'})"
             table = Table(title=table_title, show_header=True, header_style="bold magenta", expand=True)
             table.add_column("DB ID", style="dim cyan", justify="right", no_wrap=True)
             table.add_column("TG ID", style="cyan", justify="right", no_wrap=True)
@@ -97,6 +102,91 @@ async def _list_users_cmd_async(limit: int, offset: int, sort_by: str, sort_desc
                     last_activity_str
                 )
             console.print(Panel(table, title=panel_title, border_style="blue", padding=(1,1)))
+            if next_cursor:
+                sort_args = f" --sort-by {sort_by}{' --desc' if sort_desc else ''}" if sort_by != "id" or sort_desc else ""
+                console.print(f"[dim]Следующая страница:[/] sdb user list --limit {limit}{sort_args} --cursor {next_cursor}")
+    finally:
+        if db_m: await db_m.dispose()
+
+async def _search_users_cmd_async(query: str, limit: int, cursor: Optional[str]):
+    settings, db_m, _ = None, None, None
+    try:
+        settings, db_m, _ = await get_sdb_services_for_cli(init_db=True, init_rbac=False)
+        if not (settings and db_m):
+            console.print("[bold red]Ошибка: Не удалось инициализировать DBManager для команды 'user search'.[/]")
+            raise typer.Exit(code=1)
+
+        async with db_m.get_session() as session:
+            from core.users.search import detect_search_backend, search_users
+            backend = await detect_search_backend(session)
+            try:
+                page = await search_users(session, query, limit=limit, cursor=cursor, backend=backend)
+            except ValueError as e_cursor:
+                console.print(f"[bold red]Ошибка: {e_cursor}[/]")
+                raise typer.Exit(code=1)
+
+            if not page.items:
+                console.print(f"[yellow]По запросу '{query}' пользователи не найдены.[/yellow]")
+                return
+
+            table = Table(title=f"Поиск '{query}' (индекс: {backend}, показано: {len(page.items)})",
+                          show_header=True, header_style="bold magenta", expand=True)
+            table.add_column("DB ID", style="dim cyan", justify="right", no_wrap=True)
+            table.add_column("TG ID", style="cyan", justify="right", no_wrap=True)
+            table.add_column("Полное Имя", min_width=20)
+            table.add_column("Username", style="yellow", no_wrap=True)
+            table.add_column("Активен", justify="center", no_wrap=True)
+            for user_obj in page.items:
+                table.add_row(
+                    str(user_obj.id), str(user_obj.telegram_id), user_obj.full_name,
+                    f"@{user_obj.username}" if user_obj.username else "-",
+                    "✅" if user_obj.is_active else "❌",
+                )
+            console.print(table)
+            if page.next_cursor:
+                console.print(f"[dim]Следующая страница:[/] sdb user search \"{query}\" --limit {limit} --cursor {page.next_cursor}")
+    finally:
+        if db_m: await db_m.dispose()
+
+def _print_transfer_stats(title: str, stats: Any) -> None:
+    table = Table(title=title, show_header=True, header_style="bold magenta")
+    table.add_column("Данные")
+    table.add_column("Строк", justify="right")
+    table.add_row("Пользователи", str(stats.users))
+    table.add_row("Роли пользователей", str(stats.user_roles))
+    table.add_row("Прямые разрешения", str(stats.user_permissions))
+    console.print(table)
+    skipped = {
+        "неизвестные роли": stats.unknown_roles,
+        "неизвестные разрешения": stats.unknown_permissions,
+        "связи с отсутствующими пользователями": stats.unknown_users,
+    }
+    if any(skipped.values()):
+        console.print("[yellow]Пропущено: " + ", ".join(f"{name} - {count}" for name, count in skipped.items() if count) + "[/yellow]")
+
+async def _transfer_users_cmd_async(direction: str, path: Path, fmt: str, batch_size: int, on_conflict: str):
+    settings, db_m, _ = None, None, None
+    try:
+        settings, db_m, _ = await get_sdb_services_for_cli(init_db=True, init_rbac=False)
+        if not (settings and db_m):
+            console.print(f"[bold red]Ошибка: Не удалось инициализировать DBManager для команды 'user {direction}'.[/]")
+            raise typer.Exit(code=1)
+
+        from core.users.transfer import export_users, import_users
+        async with db_m.get_session() as session:
+            with console.status(f"{'Экспорт' if direction == 'export' else 'Импорт'} пользователей...") as status:
+                def _progress(dataset: str, count: int) -> None:
+                    status.update(f"{dataset}: {count} строк...")
+                try:
+                    if direction == "export":
+                        stats = await export_users(session, path, fmt=fmt, batch_size=batch_size, progress=_progress)
+                    else:
+                        stats = await import_users(session, path, on_conflict=on_conflict, batch_size=batch_size, progress=_progress)
+                except ValueError as e_transfer:
+                    console.print(f"[bold red]Ошибка: {e_transfer}[/]")
+                    raise typer.Exit(code=1)
+        title = f"Экспорт в {path} ({fmt})" if direction == "export" else f"Импорт из {path}"
+        _print_transfer_stats(title, stats)
     finally:
         if db_m: await db_m.dispose()
 
@@ -144,6 +234,13 @@ async def _info_user_cmd_async(user_identifier: str):
 
             if not user:
                 console.print(f"[bold red]Ошибка: Пользователь с идентификатором '{user_identifier}' не найден в базе данных.[/]")
+                from core.users.search import search_users
+                candidates = await search_users(session, user_identifier, limit=5)
+                if candidates.items:
+                    console.print("Возможно, вы искали:")
+                    for candidate in candidates.items:
+                        username_str = f"@{candidate.username}" if candidate.username else "-"
+                        console.print(f"  DB ID {candidate.id}, TG ID {candidate.telegram_id}: {candidate.full_name} ({username_str})")
                 raise typer.Exit(code=1)
             
             panel_title = f"[bold blue]Информация о пользователе: {user.full_name} (TG ID: {user.telegram_id})[/]"
@@ -257,7 +354,8 @@ async def _remove_role_cmd_async(user_identifier: str, role_name: str):
 @user_app.command(name="list", help="Показать список всех пользователей SDB из базы данных.")
 def list_users_cmd_wrapper(
     limit: int = typer.Option(20, "--limit", "-l", help="Максимальное количество пользователей для отображения.", min=1, max=200),
-    offset: int = typer.Option(0, "--offset", "-o", help="Смещение для пагинации списка пользователей.", min=0),
+    offset: int = typer.Option(0, "--offset", "-o", help="Смещение (устаревший способ, медленный на больших таблицах; используйте --cursor).", min=0),
+    cursor: Optional[str] = typer.Option(None, "--cursor", "-c", help="Курсор следующей страницы из вывода предыдущего 'user list'."),
     sort_by: str = typer.Option("id", "--sort-by", help="Поле для сортировки (id, telegram_id, username, first_name, last_name, created_at, last_activity_at).", case_sensitive=False),
     desc: bool = typer.Option(False, "--desc", help="Сортировать по убыванию.")
 ):
@@ -266,8 +364,13 @@ def list_users_cmd_wrapper(
         console.print(f"[bold red]Ошибка: Недопустимое значение для --sort-by: '{sort_by}'.[/]")
         console.print(f"Допустимые значения: {', '.join(valid_sort_fields)}")
         raise typer.Exit(code=1)
+    if cursor and offset:
+        console.print("[bold red]Ошибка: --cursor и --offset нельзя использовать вместе.[/]")
+        raise typer.Exit(code=1)
     try:
-        asyncio.run(_list_users_cmd_async(limit=limit, offset=offset, sort_by=sort_by.lower(), sort_desc=desc))
+        asyncio.run(_list_users_cmd_async(limit=limit, offset=offset, sort_by=sort_by.lower(), sort_desc=desc, cursor=cursor))
+    except typer.Exit:
+        raise
     except Exception as e:
         console.print(f"[bold red]Ошибка выполнения команды 'user list': {type(e).__name__} - {e}[/]")
         # console.print_exception(show_locals=True) # для отладки
@@ -283,6 +386,54 @@ def info_user_cmd_wrapper(user_identifier: str = typer.Argument(..., help="Teleg
         console.print(f"[bold red]Ошибка выполнения команды 'user info': {type(e).__name__} - {e}[/]")
         raise typer.Exit(code=1)
 
+@user_app.command(name="search", help="Поиск пользователей по части username, имени или фамилии (а также TG ID / DB ID).")
+def search_users_cmd_wrapper(
+    query: str = typer.Argument(..., help="Строка поиска, например 'ivan' или '@jo'."),
+    limit: int = typer.Option(20, "--limit", "-l", help="Максимальное количество результатов на странице.", min=1, max=200),
+    cursor: Optional[str] = typer.Option(None, "--cursor", "-c", help="Курсор следующей страницы из вывода предыдущего 'user search'."),
+):
+    try:
+        asyncio.run(_search_users_cmd_async(query=query, limit=limit, cursor=cursor))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Ошибка выполнения команды 'user search': {type(e).__name__} - {e}[/]")
+        raise typer.Exit(code=1)
+
+@user_app.command(name="export", help="Выгрузить пользователей, их роли и прямые разрешения в каталог (JSONL, CSV или Parquet).")
+def export_users_cmd_wrapper(
+    output_dir: Path = typer.Argument(..., help="Каталог для файлов экспорта (будет создан).", file_okay=False),
+    fmt: str = typer.Option("jsonl", "--format", "-f", help="Формат файлов: jsonl, csv или parquet (нужен pyarrow).", case_sensitive=False),
+    batch_size: int = typer.Option(5000, "--batch-size", help="Размер пачки строк при чтении из БД.", min=100, max=100000),
+):
+    try:
+        asyncio.run(_transfer_users_cmd_async("export", output_dir, fmt.lower(), batch_size, on_conflict="update"))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Ошибка выполнения команды 'user export': {type(e).__name__} - {e}[/]")
+        raise typer.Exit(code=1)
+
+@user_app.command(name="import", help="Загрузить каталог, созданный 'sdb user export' (формат берется из manifest.json).")
+def import_users_cmd_wrapper(
+    input_dir: Path = typer.Argument(..., help="Каталог экспорта.", exists=True, file_okay=False),
+    on_conflict: str = typer.Option("update", "--on-conflict", help="Существующие пользователи (по Telegram ID): update - обновить, skip - пропустить.", case_sensitive=False),
+    batch_size: int = typer.Option(5000, "--batch-size", help="Размер пачки INSERT (коммит после каждой).", min=100, max=100000),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Не спрашивать подтверждение."),
+):
+    if on_conflict.lower() not in ("update", "skip"):
+        console.print("[bold red]Ошибка: --on-conflict должен быть 'update' или 'skip'.[/]")
+        raise typer.Exit(code=1)
+    if not yes:
+        typer.confirm(f"Импортировать пользователей из '{input_dir}' в текущую БД?", abort=True)
+    try:
+        asyncio.run(_transfer_users_cmd_async("import", input_dir, "", batch_size, on_conflict=on_conflict.lower()))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[bold red]Ошибка выполнения команды 'user import': {type(e).__name__} - {e}[/]")
+        raise typer.Exit(code=1)
+
 @user_app.command(name="roles", help="Показать список всех доступных ролей в системе.")
 def list_roles_cmd_wrapper():
     try:
@@ -45,6 +45,13 @@ except ImportError as e:
     section_logs_viewer_router = Router(name="sdb_admin_logs_viewer_stub_main")
     logger.error(f"Failed to load admin submodule 'logs_viewer' (section router): {e}")
 
+try:
+    from .broadcast import section_broadcast_router # Импортируем собирающий роутер раздела
+    logger.info("Admin submodule 'broadcast' (section router) loaded.")
+except ImportError as e:
+    section_broadcast_router = Router(name="sdb_admin_broadcast_stub_main")
+    logger.error(f"Failed to load admin submodule 'broadcast' (section router): {e}")
+
 
 # Главный роутер админ-панели
 admin_router = Router(name="sdb_admin_top_level_router") # Даем ему уникальное имя
@@ -55,6 +62,7 @@ admin_router.include_router(section_roles_router)
 admin_router.include_router(section_sys_info_router)
 admin_router.include_router(section_modules_mgmt_router)
 admin_router.include_router(section_logs_viewer_router)
+admin_router.include_router(section_broadcast_router)
 
 logger.success("Main admin_router composed from section routers.")
 
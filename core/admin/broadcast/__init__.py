@@ -0,0 +1,9 @@
+# core/admin/broadcast/__init__.py
+from aiogram import Router
+
+from .handlers_broadcast import broadcast_router
+
+section_broadcast_router = Router(name="sdb_admin_section_broadcast_router")
+section_broadcast_router.include_router(broadcast_router)
+
+__all__ = ["section_broadcast_router"]
@@ -0,0 +1,254 @@
+# core/admin/broadcast/handlers_broadcast.py
+import time
+from dataclasses import replace
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, Tuple
+
+from aiogram import Bot, F, Router, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.utils.markdown import hbold, hcode, hitalic
+from loguru import logger
+
+from core.admin.keyboards_admin_common import ADMIN_COMMON_TEXTS
+from core.broadcast.service import STATUS_RUNNING, BroadcastProgress
+from core.rbac.service import PERMISSION_CORE_SYSTEM_SEND_BROADCAST
+from core.ui.callback_data_factories import AdminBroadcastPanelNavigate
+from .keyboards_broadcast import (
+    BROADCAST_TEXTS, STATUS_LABELS, get_broadcast_confirm_keyboard, get_broadcast_menu_keyboard,
+    get_broadcast_status_keyboard,
+)
+
+if TYPE_CHECKING:
+    from core.database.core_models import Broadcast
+    from core.services_provider import BotServicesProvider
+
+broadcast_router = Router(name="sdb_admin_broadcast_handlers")
+MODULE_NAME_FOR_LOG = "AdminBroadcast"
+
+CANCEL_BROADCAST_COMMAND = "/cancel_broadcast"
+# Черновик (текст или ссылка на сообщение-образец) между вводом и подтверждением хранится в данных FSM
+BROADCAST_DRAFT_DATA_KEY = "admin_broadcast_draft"
+RECENT_BROADCASTS_LIMIT = 5
+# Редактирование сообщения тоже ограничено Telegram - прогресс обновляется не чаще этого интервала
+PROGRESS_EDIT_INTERVAL_SECONDS = 3.0
+PROGRESS_BAR_WIDTH = 10
+
+
+class FSMAdminBroadcast(StatesGroup):
+    waiting_for_message = State()
+
+
+async def _can_broadcast(services_provider: 'BotServicesProvider', user_id: int) -> bool:
+    if user_id in (services_provider.config.core.super_admins or []):
+        return True
+    async with services_provider.db.get_session() as session:
+        return await services_provider.rbac.user_has_permission(session, user_id, PERMISSION_CORE_SYSTEM_SEND_BROADCAST)
+
+
+def _progress_from_row(broadcast: 'Broadcast') -> BroadcastProgress:
+    return BroadcastProgress(
+        broadcast_id=broadcast.id, status=broadcast.status, total=broadcast.total_recipients,
+        sent=broadcast.sent_count, failed=broadcast.failed_count, blocked=broadcast.blocked_count,
+        cursor_user_id=broadcast.cursor_user_id, last_error=broadcast.last_error,
+    )
+
+
+def format_broadcast_progress(progress: BroadcastProgress) -> str:
+    filled = int(progress.percent / 100 * PROGRESS_BAR_WIDTH)
+    lines = [
+        hbold(f"📣 Рассылка #{progress.broadcast_id}"),
+        f"Статус: {STATUS_LABELS.get(progress.status, progress.status)}",
+        f"Прогресс: {'▓' * filled}{'░' * (PROGRESS_BAR_WIDTH - filled)} {progress.percent:.1f}% "
+        f"({progress.processed}/{progress.total})",
+        f"✅ Доставлено: {progress.sent}",
+        f"🚫 Заблокировали бота: {progress.blocked}",
+        f"❌ Ошибки: {progress.failed}",
+    ]
+    if progress.status == STATUS_RUNNING and progress.messages_per_second:
+        lines.append(f"⚡ Скорость: {progress.messages_per_second} сообщ./с")
+    if progress.last_error:
+        lines.append(f"Последняя ошибка: {hcode(progress.last_error[:200])}")
+    return "\n".join(lines)
+
+
+async def _edit_or_send(query: types.CallbackQuery, text: str, keyboard: Optional[types.InlineKeyboardMarkup]) -> None:
+    if query.message:
+        try:
+            await query.message.edit_text(text, reply_markup=keyboard)
+            return
+        except TelegramBadRequest as e_tbr:
+            if "message is not modified" in str(e_tbr).lower():
+                return
+            logger.warning(f"[{MODULE_NAME_FOR_LOG}] Ошибка редактирования сообщения: {e_tbr}. Отправка нового.")
+    await query.bot.send_message(query.from_user.id, text, reply_markup=keyboard)
+
+
+def _make_progress_editor(bot: Bot, chat_id: int, message_id: int) -> Callable[[BroadcastProgress], Awaitable[None]]:
+    """Обработчик прогресса рассылки, который обновляет сообщение администратора (с ограничением частоты)."""
+    last_edit_at = 0.0
+
+    async def _on_progress(progress: BroadcastProgress) -> None:
+        nonlocal last_edit_at
+        now = time.monotonic()
+        if progress.status == STATUS_RUNNING and now - last_edit_at < PROGRESS_EDIT_INTERVAL_SECONDS:
+            return
+        last_edit_at = now
+        try:
+            await bot.edit_message_text(
+                format_broadcast_progress(progress), chat_id=chat_id, message_id=message_id,
+                reply_markup=get_broadcast_status_keyboard(progress.broadcast_id, progress.status),
+            )
+        except TelegramBadRequest as e_tbr:
+            if "message is not modified" not in str(e_tbr).lower():
+                logger.debug(f"[{MODULE_NAME_FOR_LOG}] Не удалось обновить прогресс рассылки #{progress.broadcast_id}: {e_tbr}")
+
+    return _on_progress
+
+
+async def _render_menu(services_provider: 'BotServicesProvider') -> Tuple[str, types.InlineKeyboardMarkup]:
+    broadcast_service = services_provider.broadcast
+    recipients = await broadcast_service.count_recipients()
+    broadcasts = await broadcast_service.list_recent(limit=RECENT_BROADCASTS_LIMIT)
+    lines = [hbold(BROADCAST_TEXTS["menu_title"]), "", BROADCAST_TEXTS["recipients_count"].format(count=recipients), ""]
+    lines.append(BROADCAST_TEXTS["recent_title"] if broadcasts else BROADCAST_TEXTS["no_broadcasts"])
+    for item in broadcasts:
+        lines.append(f"#{item.id} · {STATUS_LABELS.get(item.status, item.status)} · {item.sent_count}/{item.total_recipients}")
+    return "\n".join(lines), get_broadcast_menu_keyboard(broadcasts)
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action == "menu"))
+async def cq_admin_broadcast_menu(query: types.CallbackQuery, services_provider: 'BotServicesProvider'):
+    if not await _can_broadcast(services_provider, query.from_user.id):
+        await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+        return
+    text, keyboard = await _render_menu(services_provider)
+    await _edit_or_send(query, text, keyboard)
+    await query.answer()
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action == "new"))
+async def cq_admin_broadcast_new(query: types.CallbackQuery, state: FSMContext, services_provider: 'BotServicesProvider'):
+    admin_user_id = query.from_user.id
+    if not await _can_broadcast(services_provider, admin_user_id):
+        await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+        return
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} начал создание рассылки.")
+    await state.set_state(FSMAdminBroadcast.waiting_for_message)
+    text = f"{BROADCAST_TEXTS['prompt_message']}\n\n{hitalic(f'{CANCEL_BROADCAST_COMMAND} - Отменить')}"
+    await _edit_or_send(query, text, None)
+    await query.answer()
+
+
+@broadcast_router.message(StateFilter(FSMAdminBroadcast.waiting_for_message))
+async def process_admin_broadcast_message(message: types.Message, state: FSMContext, services_provider: 'BotServicesProvider'):
+    admin_user_id = message.from_user.id
+    if message.text and message.text.strip().lower() == CANCEL_BROADCAST_COMMAND:
+        await state.clear()
+        await message.answer(BROADCAST_TEXTS["draft_discarded"])
+        return
+    if not await _can_broadcast(services_provider, admin_user_id):
+        await state.clear()
+        await message.answer(ADMIN_COMMON_TEXTS["access_denied"])
+        return
+
+    if message.text:
+        draft = {"text": message.html_text}
+    else:
+        # Медиа и прочие сообщения рассылаются копией (copy_message) этого сообщения
+        draft = {"source_chat_id": message.chat.id, "source_message_id": message.message_id}
+    await state.set_state(None)
+    await state.update_data({BROADCAST_DRAFT_DATA_KEY: draft})
+
+    recipients = await services_provider.broadcast.count_recipients()
+    await message.reply(BROADCAST_TEXTS["confirm_question"].format(count=recipients), reply_markup=get_broadcast_confirm_keyboard())
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action == "discard"))
+async def cq_admin_broadcast_discard(query: types.CallbackQuery, state: FSMContext, services_provider: 'BotServicesProvider'):
+    await state.update_data({BROADCAST_DRAFT_DATA_KEY: None})
+    text, keyboard = await _render_menu(services_provider)
+    await _edit_or_send(query, text, keyboard)
+    await query.answer(BROADCAST_TEXTS["draft_discarded"])
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action == "confirm"))
+async def cq_admin_broadcast_confirm(query: types.CallbackQuery, state: FSMContext,
+                                     services_provider: 'BotServicesProvider', bot: Bot):
+    admin_user_id = query.from_user.id
+    if not await _can_broadcast(services_provider, admin_user_id):
+        await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+        return
+    draft = (await state.get_data()).get(BROADCAST_DRAFT_DATA_KEY)
+    if not draft:
+        await query.answer(BROADCAST_TEXTS["draft_expired"], show_alert=True)
+        return
+    await state.update_data({BROADCAST_DRAFT_DATA_KEY: None})
+
+    broadcast_service = services_provider.broadcast
+    broadcast = await broadcast_service.create(created_by=admin_user_id, **draft)
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} запустил рассылку #{broadcast.id}.")
+
+    progress = _progress_from_row(broadcast)
+    progress.status = STATUS_RUNNING
+    await _edit_or_send(query, format_broadcast_progress(progress), get_broadcast_status_keyboard(broadcast.id, STATUS_RUNNING))
+    if query.message:
+        broadcast_service.start(bot, broadcast.id, on_progress=_make_progress_editor(bot, query.message.chat.id, query.message.message_id))
+    else:
+        broadcast_service.start(bot, broadcast.id)
+    await query.answer()
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action == "view"))
+async def cq_admin_broadcast_view(query: types.CallbackQuery, callback_data: AdminBroadcastPanelNavigate,
+                                  services_provider: 'BotServicesProvider'):
+    if not await _can_broadcast(services_provider, query.from_user.id):
+        await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+        return
+    broadcast_service = services_provider.broadcast
+    # Рассылка этого процесса - свежий прогресс из памяти, иначе - последнее сохраненное в БД
+    progress = broadcast_service.get_progress(callback_data.item_id)
+    if progress is None:
+        broadcast = await broadcast_service.get(callback_data.item_id)
+        if broadcast is None:
+            await query.answer(BROADCAST_TEXTS["not_found"], show_alert=True)
+            return
+        progress = _progress_from_row(broadcast)
+    await _edit_or_send(query, format_broadcast_progress(progress), get_broadcast_status_keyboard(progress.broadcast_id, progress.status))
+    await query.answer()
+
+
+@broadcast_router.callback_query(AdminBroadcastPanelNavigate.filter(F.action.in_({"pause", "cancel", "resume"})))
+async def cq_admin_broadcast_control(query: types.CallbackQuery, callback_data: AdminBroadcastPanelNavigate,
+                                     services_provider: 'BotServicesProvider', bot: Bot):
+    admin_user_id = query.from_user.id
+    if not await _can_broadcast(services_provider, admin_user_id):
+        await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+        return
+    broadcast_service = services_provider.broadcast
+    broadcast_id = callback_data.item_id
+    broadcast = await broadcast_service.get(broadcast_id)
+    if broadcast is None:
+        await query.answer(BROADCAST_TEXTS["not_found"], show_alert=True)
+        return
+
+    if callback_data.action == "resume":
+        if broadcast.status not in ("pending", "paused", "interrupted"):
+            await query.answer(BROADCAST_TEXTS["action_failed"].format(status=STATUS_LABELS.get(broadcast.status, broadcast.status)), show_alert=True)
+            return
+        progress = _progress_from_row(broadcast)
+        progress.status = STATUS_RUNNING
+        await _edit_or_send(query, format_broadcast_progress(progress), get_broadcast_status_keyboard(broadcast_id, STATUS_RUNNING))
+        on_progress = _make_progress_editor(bot, query.message.chat.id, query.message.message_id) if query.message else None
+        broadcast_service.start(bot, broadcast_id, on_progress=on_progress)
+    else:
+        action = broadcast_service.pause if callback_data.action == "pause" else broadcast_service.cancel
+        if not await action(broadcast_id):
+            await query.answer(BROADCAST_TEXTS["action_failed"].format(status=STATUS_LABELS.get(broadcast.status, broadcast.status)), show_alert=True)
+            return
+        broadcast = await broadcast_service.get(broadcast_id)
+        progress = replace(broadcast_service.get_progress(broadcast_id) or _progress_from_row(broadcast), status=broadcast.status)
+        await _edit_or_send(query, format_broadcast_progress(progress), get_broadcast_status_keyboard(broadcast_id, broadcast.status))
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id}: {callback_data.action} для рассылки #{broadcast_id}.")
+    await query.answer()
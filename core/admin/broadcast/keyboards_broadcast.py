@@ -0,0 +1,78 @@
+# core/admin/broadcast/keyboards_broadcast.py
+from typing import TYPE_CHECKING, List
+
+from aiogram import types
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from core.admin.keyboards_admin_common import get_back_to_admin_main_menu_button
+from core.ui.callback_data_factories import AdminBroadcastPanelNavigate
+
+if TYPE_CHECKING:
+    from core.database.core_models import Broadcast
+
+BROADCAST_TEXTS = {
+    "menu_title": "📣 Рассылка сообщений",
+    "recipients_count": "Получателей сейчас (активные, не заблокировавшие бота): {count}",
+    "recent_title": "Последние рассылки:",
+    "no_broadcasts": "Рассылок еще не было.",
+    "new_broadcast": "✍️ Новая рассылка",
+    "prompt_message": "Отправьте сообщение для рассылки: текст (форматирование сохранится), фото, видео, документ и т.д.",
+    "confirm_question": "Разослать это сообщение {count} пользователям?",
+    "confirm_send": "✅ Отправить",
+    "discard": "❌ Отмена",
+    "draft_discarded": "Рассылка отменена.",
+    "draft_expired": "Черновик рассылки устарел, создайте новую рассылку.",
+    "pause": "⏸ Пауза",
+    "resume": "▶️ Продолжить",
+    "cancel": "⛔ Отменить рассылку",
+    "refresh": "🔄 Обновить",
+    "back_to_broadcasts": "⬅️ К рассылкам",
+    "not_found": "Рассылка не найдена.",
+    "action_failed": "Действие недоступно для рассылки в статусе «{status}».",
+}
+
+STATUS_LABELS = {
+    "pending": "🕓 ожидает запуска",
+    "running": "▶️ выполняется",
+    "paused": "⏸ на паузе",
+    "interrupted": "⚠️ прервана (продолжится при старте бота)",
+    "completed": "✅ завершена",
+    "cancelled": "⛔ отменена",
+    "failed": "❌ ошибка",
+}
+
+
+def get_broadcast_menu_keyboard(broadcasts: List['Broadcast']) -> types.InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text=BROADCAST_TEXTS["new_broadcast"], callback_data=AdminBroadcastPanelNavigate(action="new").pack())
+    for item in broadcasts:
+        status_icon = STATUS_LABELS.get(item.status, item.status).split(" ", 1)[0]
+        builder.button(
+            text=f"{status_icon} #{item.id} · {item.sent_count}/{item.total_recipients}",
+            callback_data=AdminBroadcastPanelNavigate(action="view", item_id=item.id).pack(),
+        )
+    builder.adjust(1)
+    builder.row(get_back_to_admin_main_menu_button())
+    return builder.as_markup()
+
+
+def get_broadcast_confirm_keyboard() -> types.InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text=BROADCAST_TEXTS["confirm_send"], callback_data=AdminBroadcastPanelNavigate(action="confirm").pack())
+    builder.button(text=BROADCAST_TEXTS["discard"], callback_data=AdminBroadcastPanelNavigate(action="discard").pack())
+    builder.adjust(2)
+    return builder.as_markup()
+
+
+def get_broadcast_status_keyboard(broadcast_id: int, status: str) -> types.InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    if status == "running":
+        builder.button(text=BROADCAST_TEXTS["pause"], callback_data=AdminBroadcastPanelNavigate(action="pause", item_id=broadcast_id).pack())
+    elif status in ("pending", "paused", "interrupted"):
+        builder.button(text=BROADCAST_TEXTS["resume"], callback_data=AdminBroadcastPanelNavigate(action="resume", item_id=broadcast_id).pack())
+    if status in ("running", "pending", "paused", "interrupted"):
+        builder.button(text=BROADCAST_TEXTS["cancel"], callback_data=AdminBroadcastPanelNavigate(action="cancel", item_id=broadcast_id).pack())
+    builder.button(text=BROADCAST_TEXTS["refresh"], callback_data=AdminBroadcastPanelNavigate(action="view", item_id=broadcast_id).pack())
+    builder.button(text=BROADCAST_TEXTS["back_to_broadcasts"], callback_data=AdminBroadcastPanelNavigate(action="menu").pack())
+    builder.adjust(1)
+    return builder.as_markup()
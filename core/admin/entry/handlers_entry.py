@@ -109,6 +109,11 @@ async def cq_admin_main_to_sys_info(
     from core.ui.callback_data_factories import AdminSysInfoPanelNavigate 
     await cq_admin_show_system_info_entry(query, AdminSysInfoPanelNavigate(action="show"), services_provider, bot)
 
+@admin_entry_router.callback_query(AdminMainMenuNavigate.filter(F.target_section == "broadcast"))
+async def cq_admin_main_to_broadcast(query: types.CallbackQuery, services_provider: 'BotServicesProvider'):
+    from core.admin.broadcast.handlers_broadcast import cq_admin_broadcast_menu
+    await cq_admin_broadcast_menu(query, services_provider)
+
 @admin_entry_router.callback_query(AdminMainMenuNavigate.filter(F.target_section == "modules"))
 async def cq_admin_main_to_modules(query: types.CallbackQuery, services_provider: 'BotServicesProvider'):
     await query.answer("Раздел 'Управление модулями' в разработке.", show_alert=True)
\ No newline at end of file
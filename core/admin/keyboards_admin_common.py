@@ -13,7 +13,8 @@ if TYPE_CHECKING:
         PERMISSION_CORE_MODULES_VIEW_LIST,
         PERMISSION_CORE_SYSTEM_VIEW_INFO_BASIC,
         PERMISSION_CORE_SYSTEM_VIEW_INFO_FULL,
-        PERMISSION_CORE_ROLES_VIEW
+        PERMISSION_CORE_ROLES_VIEW,
+        PERMISSION_CORE_SYSTEM_SEND_BROADCAST
     )
 
 ADMIN_COMMON_TEXTS = {
@@ -33,6 +34,7 @@ ADMIN_COMMON_TEXTS = {
     "manage_roles": "🛡️ Управление ролями",
     "manage_modules": "🧩 Управление модулями",
     "system_info": "⚙️ Информация о системе",
+    "broadcast": "📣 Рассылка",
 
     # Тексты для категорий и групп разрешений (добавлены)
     "perm_category_core": "Разрешения Ядра",
@@ -102,7 +104,8 @@ async def get_admin_main_menu_keyboard(
         PERMISSION_CORE_MODULES_VIEW_LIST,
         PERMISSION_CORE_SYSTEM_VIEW_INFO_BASIC,
         PERMISSION_CORE_SYSTEM_VIEW_INFO_FULL,
-        PERMISSION_CORE_ROLES_VIEW
+        PERMISSION_CORE_ROLES_VIEW,
+        PERMISSION_CORE_SYSTEM_SEND_BROADCAST
     )
     
     if user_is_owner_from_config or \
@@ -134,6 +137,13 @@ async def get_admin_main_menu_keyboard(
             callback_data=AdminMainMenuNavigate(target_section="modules").pack() 
         )
     
+    if user_is_owner_from_config or \
+       await rbac.user_has_permission(session, user_tg_id, PERMISSION_CORE_SYSTEM_SEND_BROADCAST):
+        builder.button(
+            text=texts["broadcast"],
+            callback_data=AdminMainMenuNavigate(target_section="broadcast").pack()
+        )
+
     # Кнопка для просмотра логов, если нужно
     # from core.rbac.service import PERMISSION_CORE_SYSTEM_VIEW_LOGS_BASIC
     # if user_is_owner_from_config or \
@@ -3,14 +3,17 @@ from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from loguru import logger
+import asyncio
 import os
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from core.ui.callback_data_factories import AdminMainMenuNavigate, AdminLogsViewerNavigate
 from core.admin.filters_admin import can_view_admin_panel_filter
-from .keyboards_logs import get_logs_main_keyboard, get_log_file_keyboard, get_log_content_keyboard
+from core.log_reader import LogReader
+from core.log_index import LogIndex, get_log_index_path
+from .keyboards_logs import get_logs_main_keyboard, get_log_file_keyboard, get_log_content_keyboard, get_log_errors_keyboard
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -18,6 +21,11 @@ if TYPE_CHECKING:
 
 logs_viewer_router = Router(name="sdb_admin_logs_viewer_handlers")
 MODULE_NAME_FOR_LOG = "AdminLogsViewer"
+LOG_CONTENT_PAGE_SIZE = 50
+LOG_FILE_PATTERNS = ("*.log", "*.zip")
+
+# Один экземпляр на процесс: индексы строк файлов переиспользуются между запросами
+_log_reader = LogReader()
 
 logs_viewer_router.callback_query.filter(can_view_admin_panel_filter)
 
@@ -99,20 +107,22 @@ async def cq_admin_logs_view_content(
 ):
     admin_user_id = query.from_user.id
     file_name = callback_data.payload
+    page = max(0, callback_data.page or 0)
     
-    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} запросил содержимое файла {file_name}")
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} запросил содержимое файла {file_name} (страница {page})")
     
-    # Получаем содержимое файла (последние 50 строк)
-    log_content = await _get_log_file_content(services_provider, file_name, lines_count=50)
+    # Страница 0 - последние строки файла, дальше - более ранние
+    content_page = await _get_log_file_content(services_provider, file_name, lines_count=LOG_CONTENT_PAGE_SIZE, page=page)
     
-    if not log_content:
+    if not content_page:
         await query.answer("Не удалось прочитать файл", show_alert=True)
         return
+    log_content, has_older = content_page
     
     text = f"📄 **Содержимое файла: {file_name}**\n\n"
     text += f"```\n{log_content}\n```"
     
-    keyboard = await get_log_content_keyboard(file_name)
+    keyboard = await get_log_content_keyboard(file_name, page=page, has_older=has_older)
     
     if query.message:
         try:
@@ -146,10 +156,8 @@ async def cq_admin_logs_download(
     try:
         # Отправляем файл
         await query.message.answer_document(
-            types.BufferedInputFile(
-                log_file_path.read_bytes(),
-                filename=file_name
-            ),
+            # FSInputFile читает файл при отправке по частям, а не целиком в event loop
+            types.FSInputFile(log_file_path, filename=file_name),
             caption=f"📄 Файл логов: {file_name}"
         )
         await query.answer("Файл отправлен")
@@ -157,6 +165,43 @@ async def cq_admin_logs_download(
         logger.error(f"Ошибка при отправке файла логов: {e}")
         await query.answer("Ошибка при отправке файла", show_alert=True)
 
+@logs_viewer_router.callback_query(AdminLogsViewerNavigate.filter(F.action == "recent_errors"))
+async def cq_admin_logs_recent_errors(
+    query: types.CallbackQuery,
+    services_provider: 'BotServicesProvider'
+):
+    admin_user_id = query.from_user.id
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} запросил последние ошибки из индекса логов")
+    
+    core_settings = services_provider.config.core
+    structured_logs_root = core_settings.project_data_path / core_settings.log_structured_dir
+    log_index = LogIndex(get_log_index_path(structured_logs_root), structured_logs_root, json_logs=core_settings.log_json_sink)
+    try:
+        entries = await asyncio.to_thread(log_index.query, min_level="ERROR", limit=15)
+    except Exception as e:
+        logger.error(f"Ошибка при запросе к индексу логов: {e}")
+        await query.answer("Не удалось прочитать индекс логов", show_alert=True)
+        return
+    
+    text = "🔎 Последние ошибки\n\n"
+    if entries:
+        for entry in reversed(entries):
+            ts = datetime.fromtimestamp(entry['ts']).strftime('%d.%m %H:%M:%S')
+            text += f"{ts} {entry['level']} {entry['logger']}: {entry['message'][:200]}\n"
+    else:
+        text += "✅ Ошибок не найдено"
+    
+    keyboard = await get_log_errors_keyboard()
+    if query.message:
+        try:
+            # Без parse_mode: текст сообщений лога может содержать HTML/Markdown-символы
+            await query.message.edit_text(text[:4000], reply_markup=keyboard, parse_mode=None)
+        except Exception as e:
+            logger.error(f"Ошибка при показе последних ошибок: {e}")
+            await query.answer("Ошибка при обновлении интерфейса", show_alert=True)
+    
+    await query.answer()
+
 @logs_viewer_router.callback_query(AdminLogsViewerNavigate.filter(F.action == "back_to_main"))
 async def cq_admin_logs_back_to_main(
     query: types.CallbackQuery,
@@ -195,7 +240,7 @@ async def _get_available_log_files(services_provider: 'BotServicesProvider') ->
             return []
         
         log_files = []
-        for file_path in log_dir.glob("*.log"):
+        for file_path in (path for pattern in LOG_FILE_PATTERNS for path in log_dir.glob(pattern)):
             try:
                 stat = file_path.stat()
                 log_files.append({
@@ -224,10 +269,9 @@ async def _get_log_file_info(services_provider: 'BotServicesProvider', file_name
         
         stat = log_file_path.stat()
         
-        # Подсчитываем количество строк
+        # Подсчитываем количество строк (индекс строится в потоке и достраивается по мере роста файла)
         try:
-            with open(log_file_path, 'r', encoding='utf-8') as f:
-                lines_count = sum(1 for _ in f)
+            lines_count = await _log_reader.count_lines(log_file_path)
         except Exception:
             lines_count = 0
         
@@ -243,21 +287,28 @@ async def _get_log_file_info(services_provider: 'BotServicesProvider', file_name
         logger.error(f"Ошибка при получении информации о файле {file_name}: {e}")
         return None
 
-async def _get_log_file_content(services_provider: 'BotServicesProvider', file_name: str, lines_count: int = 50) -> Optional[str]:
-    """Получить содержимое файла логов (последние строки)"""
+async def _get_log_file_content(services_provider: 'BotServicesProvider', file_name: str, lines_count: int = 50,
+                                page: int = 0) -> Optional[Tuple[str, bool]]:
+    """
+    Получить страницу содержимого файла логов: page=0 - последние lines_count строк, page=1 - предыдущие и т.д.
+    Возвращает (текст, есть ли более ранние строки).
+    """
     try:
         log_file_path = await _get_log_file_path(services_provider, file_name)
         if not log_file_path or not log_file_path.exists():
             return None
         
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Берем последние строки
-        if len(lines) > lines_count:
-            lines = lines[-lines_count:]
+        if page == 0:
+            lines = await _log_reader.tail(log_file_path, lines_count)
+            has_older = len(lines) == lines_count and await _log_reader.count_lines(log_file_path) > lines_count
+        else:
+            total_lines = await _log_reader.count_lines(log_file_path)
+            end = max(0, total_lines - page * lines_count)
+            start = max(0, end - lines_count)
+            lines = await _log_reader.read_lines(log_file_path, start, end - start)
+            has_older = start > 0
         
-        return ''.join(lines)
+        return '\n'.join(lines), has_older
     except Exception as e:
         logger.error(f"Ошибка при чтении содержимого файла {file_name}: {e}")
         return None
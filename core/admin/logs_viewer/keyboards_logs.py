@@ -17,6 +17,11 @@ async def get_logs_main_keyboard(log_files: List[Dict[str, Any]]) -> InlineKeybo
             callback_data = AdminLogsViewerNavigate(action="view_file", payload=log_file['name']).pack()
             builder.button(text=display_text, callback_data=callback_data)
     
+    builder.button(
+        text="🔎 Последние ошибки",
+        callback_data=AdminLogsViewerNavigate(action="recent_errors").pack()
+    )
+    
     # Кнопка возврата в админ-панель
     builder.row(
         InlineKeyboardButton(
@@ -55,10 +60,23 @@ async def get_log_file_keyboard(file_name: str) -> InlineKeyboardMarkup:
     builder.adjust(1)  # По одной кнопке в ряду
     return builder.as_markup()
 
-async def get_log_content_keyboard(file_name: str) -> InlineKeyboardMarkup:
+async def get_log_content_keyboard(file_name: str, page: int = 0, has_older: bool = False) -> InlineKeyboardMarkup:
     """Клавиатура для просмотра содержимого файла"""
     builder = InlineKeyboardBuilder()
     
+    # Листание: page=0 - последние строки, чем больше page - тем раньше
+    navigation_buttons = []
+    if has_older:
+        navigation_buttons.append(InlineKeyboardButton(
+            text="⬆️ Раньше",
+            callback_data=AdminLogsViewerNavigate(action="view_content", payload=file_name, page=page + 1).pack()
+        ))
+    if page > 0:
+        navigation_buttons.append(InlineKeyboardButton(
+            text="⬇️ Позже",
+            callback_data=AdminLogsViewerNavigate(action="view_content", payload=file_name, page=page - 1).pack()
+        ))
+    
     # Кнопка скачивания
     builder.button(
         text="📥 Скачать файл",
@@ -80,4 +98,21 @@ async def get_log_content_keyboard(file_name: str) -> InlineKeyboardMarkup:
     )
     
     builder.adjust(1)  # По одной кнопке в ряду
-    return builder.as_markup() 
\ No newline at end of file
+    if navigation_buttons:
+        builder.row(*navigation_buttons)
+    return builder.as_markup() 
+async def get_log_errors_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура для списка последних ошибок"""
+    builder = InlineKeyboardBuilder()
+    
+    builder.button(
+        text="🔄 Обновить",
+        callback_data=AdminLogsViewerNavigate(action="recent_errors").pack()
+    )
+    builder.button(
+        text="⬅️ Назад к списку файлов",
+        callback_data=AdminLogsViewerNavigate(action="back_to_main").pack()
+    )
+    
+    builder.adjust(1)  # По одной кнопке в ряду
+    return builder.as_markup()
@@ -157,7 +157,7 @@ async def cq_admin_show_system_info_entry(
     # Кэш
     text_parts.append(f"\n💾 {hbold('Кэш')} ───")
     text_parts.append(f"  ▸ Тип: {hbold(s.cache.type.capitalize())}")
-    if s.cache.type == "redis" and s.cache.redis_url:
+    if s.cache.type in ("redis", "tiered") and s.cache.redis_url:
         text_parts.append(f"  ▸ URL: {hcode(str(s.cache.redis_url))}") 
     text_parts.append(f"  ▸ Доступен: {'✅ Да' if services_provider.cache.is_available() else '❌ Нет'}")
 
@@ -175,6 +175,19 @@ async def cq_admin_show_system_info_entry(
         text_parts.append(f"\n🧩 {hbold('Модули')} ───")
         text_parts.append(f"  ▸ Ошибка получения информации")
 
+    # Профилировщик event loop
+    try:
+        profiler_stats = services_provider.loop_profiler.get_stats()
+    except AttributeError:
+        profiler_stats = None
+    if profiler_stats:
+        text_parts.append(f"\n🔬 {hbold('Event loop')} ───")
+        text_parts.append(f"  ▸ Задержка: {hbold(str(profiler_stats['lag_last_ms']))} мс "
+                          f"(средн. {profiler_stats['lag_avg_ms']}, макс. {profiler_stats['lag_max_ms']})")
+        text_parts.append(f"  ▸ Блокировок > {profiler_stats['slow_threshold_ms']:.0f} мс: {hbold(str(profiler_stats['stalls_total']))}")
+        if profiler_stats["last_stall"] and profiler_stats["last_stall"]["where"]:
+            text_parts.append(f"  ▸ Последняя: {hcode(profiler_stats['last_stall']['where'][:200])}")
+
     # Пользователи
     total_users_count = await _get_local_total_users_count(services_provider)
     total_users_str = hbold(str(total_users_count)) if total_users_count is not None else f"{hcode('[Ошибка]')}"
@@ -182,7 +195,7 @@ async def cq_admin_show_system_info_entry(
     text_parts.append(f"  ▸ Всего в БД: {total_users_str}")
 
     text_response = "\n".join(text_parts)
-    keyboard_sysinfo = get_sys_info_keyboard()
+    keyboard_sysinfo = get_sys_info_keyboard(profiler_available=profiler_stats is not None and (is_owner_from_config or can_view_full))
 
     if query.message:
         try:
@@ -202,4 +215,62 @@ async def cq_admin_show_system_info_entry(
             logger.error(f"[{MODULE_NAME_FOR_LOG}] Непредвиденная ошибка при отображении системной информации: {e_edit}", exc_info=True)
             await query.answer(ADMIN_COMMON_TEXTS["error_general"], show_alert=True)
     else:
-        await query.answer()
\ No newline at end of file
+        await query.answer()
+
+
+PROFILE_DURATION_SECONDS = 30
+# Текущий фоновый профиль: ссылка держит задачу до завершения (иначе ее может собрать GC)
+_profile_task: Optional[asyncio.Task] = None
+
+@sys_info_router.callback_query(AdminSysInfoPanelNavigate.filter(F.action == "profile"))
+async def cq_admin_sys_info_profile(
+    query: types.CallbackQuery,
+    services_provider: 'BotServicesProvider',
+    bot: Bot
+):
+    user_id = query.from_user.id
+    is_owner_from_config = user_id in services_provider.config.core.super_admins
+    if not is_owner_from_config:
+        async with services_provider.db.get_session() as session:
+            if not await services_provider.rbac.user_has_permission(session, user_id, PERMISSION_CORE_SYSTEM_VIEW_INFO_FULL):
+                await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+                return
+    try:
+        profiler = services_provider.loop_profiler
+    except AttributeError:
+        await query.answer("Профилировщик не включен (sdb run --profile).", show_alert=True)
+        return
+
+    global _profile_task
+    if _profile_task is not None and not _profile_task.done():
+        await query.answer("Профиль уже снимается, дождитесь результата.", show_alert=True)
+        return
+    await query.answer(f"Снимаю профиль {PROFILE_DURATION_SECONDS} сек...")
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Пользователь {user_id} запросил профиль event loop.")
+    # Профиль снимается в фоне: хендлер не держит очередь апдейтов чата 30 секунд
+    _profile_task = asyncio.create_task(_send_loop_profile(bot, user_id, profiler), name=f"sdb_admin_loop_profile:{user_id}")
+    _profile_task.add_done_callback(_on_profile_task_done)
+
+
+def _on_profile_task_done(task: asyncio.Task) -> None:
+    global _profile_task
+    if _profile_task is task:
+        _profile_task = None
+    error = None if task.cancelled() else task.exception()
+    if error is not None:
+        logger.opt(exception=error).error(f"[{MODULE_NAME_FOR_LOG}] Фоновая задача профиля event loop завершилась с ошибкой: {error}")
+
+
+async def _send_loop_profile(bot: Bot, user_id: int, profiler) -> None:
+    try:
+        result = await profiler.profile(PROFILE_DURATION_SECONDS)
+        await bot.send_document(
+            user_id,
+            types.FSInputFile(result["path"]),
+            caption=f"🔬 Профиль event loop: {result['samples']} сэмплов за {result['duration_seconds']} сек.\n"
+                    f"Формат collapsed stacks (speedscope.app, flamegraph.pl)."
+        )
+    except RuntimeError as e:
+        await bot.send_message(user_id, f"⚠️ {e}")
+    except Exception as e:
+        logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка снятия/отправки профиля event loop: {e}", exc_info=True)
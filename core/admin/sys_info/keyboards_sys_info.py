@@ -2,14 +2,21 @@
 from aiogram import types # <--- ДОБАВЛЕН ЭТОТ ИМПОРТ
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from core.admin.keyboards_admin_common import ADMIN_COMMON_TEXTS, get_back_to_admin_main_menu_button
+from core.ui.callback_data_factories import AdminSysInfoPanelNavigate
 
-def get_sys_info_keyboard() -> types.InlineKeyboardMarkup: # Используем types.InlineKeyboardMarkup
+def get_sys_info_keyboard(profiler_available: bool = False) -> types.InlineKeyboardMarkup: # Используем types.InlineKeyboardMarkup
     builder = InlineKeyboardBuilder()
+    if profiler_available:
+        builder.row(types.InlineKeyboardButton(
+            text=SYS_INFO_TEXTS["profile_button"],
+            callback_data=AdminSysInfoPanelNavigate(action="profile").pack()
+        ))
     builder.row(get_back_to_admin_main_menu_button())
     return builder.as_markup()
 
 # Если для sys_info потребуются свои тексты, их можно добавить сюда:
 SYS_INFO_TEXTS = {
     "system_info_title": "🖥️ Системная информация SwiftDevBot",
+    "profile_button": "🔬 Профиль event loop (30 сек)",
     # ... другие тексты ...
 }
\ No newline at end of file
@@ -11,6 +11,7 @@ from .handlers_list import users_list_router
 from .handlers_details import user_details_router
 from .handlers_roles_assign import user_roles_assign_router
 from .handlers_direct_perms import user_direct_perms_router
+from .handlers_search import users_search_router
 
 # Создаем один "собирающий" роутер для всего раздела "users"
 section_users_router = Router(name="sdb_admin_section_users_router")
@@ -25,5 +26,6 @@ section_users_router.include_router(users_list_router)
 section_users_router.include_router(user_details_router)
 section_users_router.include_router(user_roles_assign_router)
 section_users_router.include_router(user_direct_perms_router)
+section_users_router.include_router(users_search_router)
 
 __all__ = ["section_users_router"]
\ No newline at end of file
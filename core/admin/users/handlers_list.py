@@ -2,7 +2,7 @@
 from aiogram import Router, types, F
 from aiogram.utils.markdown import hbold
 from loguru import logger
-from sqlalchemy import select, func as sql_func # <--- ИСПРАВЛЕН ИМПОРТ func
+from sqlalchemy import select
 
 from core.ui.callback_data_factories import AdminUsersPanelNavigate
 from .keyboards_users import get_admin_users_list_keyboard_local, USERS_MGMT_TEXTS 
@@ -10,6 +10,7 @@ from core.admin.keyboards_admin_common import ADMIN_COMMON_TEXTS
 from core.admin.filters_admin import can_view_admin_panel_filter
 from core.rbac.service import PERMISSION_CORE_USERS_VIEW_LIST
 from core.database.core_models import User as DBUser
+from core.database.pagination import KeysetPage, estimate_row_count, fetch_keyset_page
 
 from typing import TYPE_CHECKING, List
 if TYPE_CHECKING:
@@ -21,6 +22,33 @@ MODULE_NAME_FOR_LOG = "AdminUserList"
 #users_list_router.callback_query.filter(can_view_admin_panel_filter)
 
 USERS_PER_PAGE_ADMIN_LOCAL = 10 
+# Общее число пользователей нужно только для "Стр. N/M" - не пересчитываем его на каждое нажатие
+USERS_TOTAL_CACHE_KEY = "sdb:admin:users_total"
+USERS_TOTAL_CACHE_TTL_SECONDS = 60
+USERS_TOTAL_CACHE_STALE_SECONDS = 600
+# Коды сортировки короткие: callback data ограничена 64 байтами. Код -> (колонка, по убыванию)
+USER_LIST_SORTS = {
+    "id": (DBUser.id, True),
+    "act": (DBUser.last_activity_at, True),
+}
+DEFAULT_USER_LIST_SORT = "id"
+
+
+async def _get_total_users(services_provider: 'BotServicesProvider') -> int:
+    async def load_total() -> int:
+        async with services_provider.db.get_session() as count_session:
+            total, _ = await estimate_row_count(count_session, DBUser.__table__)
+            return total
+
+    try:
+        cache = services_provider.cache
+    except AttributeError:
+        return await load_total()
+    return await cache.get_or_load(
+        USERS_TOTAL_CACHE_KEY, load_total,
+        ttl_seconds=USERS_TOTAL_CACHE_TTL_SECONDS, stale_ttl_seconds=USERS_TOTAL_CACHE_STALE_SECONDS,
+    )
+
 
 @users_list_router.callback_query(AdminUsersPanelNavigate.filter(F.action == "list"))
 async def cq_admin_users_list_entry( 
@@ -37,37 +65,46 @@ async def cq_admin_users_list_entry(
                 await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
                 return
         
-        current_page = callback_data.page if callback_data.page is not None else 1
-        
-        total_users = 0
+        current_page = max(1, callback_data.page or 1)
+        sort_code = callback_data.sort if callback_data.sort in USER_LIST_SORTS else DEFAULT_USER_LIST_SORT
+        sort_attr, sort_desc = USER_LIST_SORTS[sort_code]
+
         try:
-            count_stmt = select(sql_func.count(DBUser.id)) 
-            total_users_res = await session.execute(count_stmt)
-            total_users = total_users_res.scalar_one_or_none() or 0
-        except Exception as e_count:
-            logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка подсчета пользователей: {e_count}")
+            total_users = await _get_total_users(services_provider)
+            page: KeysetPage = KeysetPage()
+            if callback_data.cursor:
+                try:
+                    page = await fetch_keyset_page(
+                        session, select(DBUser), sort_attr, DBUser.id, USERS_PER_PAGE_ADMIN_LOCAL,
+                        descending=sort_desc, cursor=callback_data.cursor, backward=bool(callback_data.back),
+                    )
+                except ValueError as e_cursor:
+                    logger.warning(f"[{MODULE_NAME_FOR_LOG}] {e_cursor}. Показываем первую страницу.")
+            if not page.items:
+                # Первая страница, битый курсор или пользователи за курсором удалены
+                page = await fetch_keyset_page(
+                    session, select(DBUser), sort_attr, DBUser.id, USERS_PER_PAGE_ADMIN_LOCAL, descending=sort_desc,
+                )
+        except Exception as e_list:
+            logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка получения списка пользователей: {e_list}")
             await query.answer("Ошибка получения данных о пользователях.", show_alert=True)
             return
-        
-        total_pages = (total_users + USERS_PER_PAGE_ADMIN_LOCAL - 1) // USERS_PER_PAGE_ADMIN_LOCAL
-        total_pages = max(1, total_pages) 
-        current_page = max(1, min(current_page, total_pages))
-        offset = (current_page - 1) * USERS_PER_PAGE_ADMIN_LOCAL
-
-        stmt_users = (
-            select(DBUser)
-            .order_by(DBUser.id.desc()) 
-            .limit(USERS_PER_PAGE_ADMIN_LOCAL)
-            .offset(offset)
-        )
-        users_result = await session.execute(stmt_users)
-        users_on_page: List[DBUser] = list(users_result.scalars().all())
+        users_on_page: List[DBUser] = page.items
+
+        # Номер страницы знает только навигация; кэшированный total может отставать от реальности
+        if not page.has_prev:
+            current_page = 1
+        total_pages = max(1, (total_users + USERS_PER_PAGE_ADMIN_LOCAL - 1) // USERS_PER_PAGE_ADMIN_LOCAL)
+        total_pages = max(total_pages, current_page + 1) if page.has_next else current_page
 
         text = USERS_MGMT_TEXTS["user_list_title_template"].format(current_page=current_page, total_pages=total_pages)
-        if total_users == 0 : 
+        if not users_on_page: 
              text = "👥 Пользователи\n\nВ базе данных нет зарегистрированных пользователей."
 
-        keyboard = await get_admin_users_list_keyboard_local(users_on_page, total_pages, current_page)
+        keyboard = await get_admin_users_list_keyboard_local(
+            users_on_page, total_pages, current_page,
+            next_cursor=page.next_cursor, prev_cursor=page.prev_cursor, sort=sort_code,
+        )
 
         if query.message:
             try:
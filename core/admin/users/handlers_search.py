@@ -0,0 +1,157 @@
+# core/admin/users/handlers_search.py
+import time
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from aiogram import Router, types, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.utils.markdown import hcode, hitalic
+from loguru import logger
+
+from core.ui.callback_data_factories import AdminUsersPanelNavigate
+from .keyboards_users import get_admin_users_search_keyboard_local, USERS_MGMT_TEXTS
+from core.admin.keyboards_admin_common import ADMIN_COMMON_TEXTS
+from core.rbac.service import PERMISSION_CORE_USERS_VIEW_LIST
+
+if TYPE_CHECKING:
+    from core.services_provider import BotServicesProvider
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+users_search_router = Router(name="sdb_admin_users_search_handlers")
+MODULE_NAME_FOR_LOG = "AdminUserSearch"
+
+USERS_SEARCH_PER_PAGE = 10
+# Запрос не помещается в callback data (64 байта) - хранится в данных FSM
+SEARCH_QUERY_DATA_KEY = "admin_user_search_query"
+CANCEL_SEARCH_COMMAND = "/cancel_user_search"
+
+
+class FSMAdminUserSearch(StatesGroup):
+    waiting_for_query = State()
+
+
+async def _can_search(services_provider: 'BotServicesProvider', session: 'AsyncSession', admin_user_id: int) -> bool:
+    if admin_user_id in (services_provider.config.core.super_admins or []):
+        return True
+    return await services_provider.rbac.user_has_permission(session, admin_user_id, PERMISSION_CORE_USERS_VIEW_LIST)
+
+
+async def _render_search_results(
+    services_provider: 'BotServicesProvider',
+    session: 'AsyncSession',
+    search_query: str,
+    cursor: Optional[str] = None,
+    backward: bool = False,
+    current_page: int = 1,
+) -> Tuple[str, types.InlineKeyboardMarkup]:
+    started = time.perf_counter()
+    try:
+        page = await services_provider.user_service.search_users(
+            search_query, session, limit=USERS_SEARCH_PER_PAGE, cursor=cursor, backward=backward
+        )
+    except ValueError as e_cursor:
+        logger.warning(f"[{MODULE_NAME_FOR_LOG}] {e_cursor}. Показываем первую страницу.")
+        page = await services_provider.user_service.search_users(search_query, session, limit=USERS_SEARCH_PER_PAGE)
+    logger.debug(f"[{MODULE_NAME_FOR_LOG}] Поиск '{search_query}': {len(page.items)} результатов за "
+                 f"{(time.perf_counter() - started) * 1000:.1f} мс.")
+
+    if not page.has_prev:
+        current_page = 1
+    if page.items:
+        text = USERS_MGMT_TEXTS["user_search_results_title"].format(query=hcode(search_query))
+    else:
+        text = USERS_MGMT_TEXTS["user_search_nothing_found"].format(query=hcode(search_query))
+    keyboard = await get_admin_users_search_keyboard_local(
+        page.items, current_page, next_cursor=page.next_cursor, prev_cursor=page.prev_cursor
+    )
+    return text, keyboard
+
+
+@users_search_router.callback_query(AdminUsersPanelNavigate.filter(F.action == "search_start"))
+async def cq_admin_users_search_start(
+    query: types.CallbackQuery,
+    state: FSMContext,
+    services_provider: 'BotServicesProvider'
+):
+    admin_user_id = query.from_user.id
+    async with services_provider.db.get_session() as session:
+        if not await _can_search(services_provider, session, admin_user_id):
+            await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+            return
+
+    logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} начал поиск пользователей.")
+    await state.set_state(FSMAdminUserSearch.waiting_for_query)
+    text = f"{USERS_MGMT_TEXTS['user_search_prompt']}\n\n{hitalic(f'{CANCEL_SEARCH_COMMAND} - Отменить')}"
+    if query.message:
+        try:
+            await query.message.edit_text(text, reply_markup=None)
+        except TelegramBadRequest as e:
+            logger.warning(f"[{MODULE_NAME_FOR_LOG}] Не удалось отредактировать сообщение для поиска: {e}. Отправка нового.")
+            await query.bot.send_message(admin_user_id, text)
+    else:
+        await query.bot.send_message(admin_user_id, text)
+    await query.answer()
+
+
+@users_search_router.message(StateFilter(FSMAdminUserSearch.waiting_for_query), F.text)
+async def process_admin_users_search_query(
+    message: types.Message,
+    state: FSMContext,
+    services_provider: 'BotServicesProvider'
+):
+    admin_user_id = message.from_user.id
+    search_query = message.text.strip()
+
+    if search_query.lower() == CANCEL_SEARCH_COMMAND:
+        await state.clear()
+        await message.answer("Поиск пользователей отменен.")
+        return
+    if not search_query.lstrip("@").strip():
+        await message.reply("Запрос не может быть пустым.")
+        return
+
+    async with services_provider.db.get_session() as session:
+        if not await _can_search(services_provider, session, admin_user_id):
+            await state.clear()
+            await message.answer(ADMIN_COMMON_TEXTS["access_denied"])
+            return
+        logger.info(f"[{MODULE_NAME_FOR_LOG}] Администратор {admin_user_id} ищет пользователей: '{search_query}'.")
+        text, keyboard = await _render_search_results(services_provider, session, search_query)
+
+    # Состояние снимаем, данные (запрос) оставляем для листания результатов
+    await state.set_state(None)
+    await state.update_data({SEARCH_QUERY_DATA_KEY: search_query})
+    await message.answer(text, reply_markup=keyboard)
+
+
+@users_search_router.callback_query(AdminUsersPanelNavigate.filter(F.action == "search_page"))
+async def cq_admin_users_search_page(
+    query: types.CallbackQuery,
+    callback_data: AdminUsersPanelNavigate,
+    state: FSMContext,
+    services_provider: 'BotServicesProvider'
+):
+    admin_user_id = query.from_user.id
+    search_query = (await state.get_data()).get(SEARCH_QUERY_DATA_KEY)
+    if not search_query:
+        await query.answer("Запрос поиска устарел, начните новый поиск.", show_alert=True)
+        return
+
+    async with services_provider.db.get_session() as session:
+        if not await _can_search(services_provider, session, admin_user_id):
+            await query.answer(ADMIN_COMMON_TEXTS["access_denied"], show_alert=True)
+            return
+        text, keyboard = await _render_search_results(
+            services_provider, session, search_query, cursor=callback_data.cursor,
+            backward=bool(callback_data.back), current_page=max(1, callback_data.page or 1),
+        )
+
+    if query.message:
+        try:
+            await query.message.edit_text(text, reply_markup=keyboard)
+        except TelegramBadRequest as e_tbr:
+            if "message is not modified" not in str(e_tbr).lower():
+                logger.warning(f"[{MODULE_NAME_FOR_LOG}] Ошибка редактирования результатов поиска: {e_tbr}")
+    await query.answer()
@@ -37,13 +37,27 @@ USERS_MGMT_TEXTS = {
     "back_to_direct_perm_categories": "⬅️ К категориям разрешений (для юзера)",
     "back_to_direct_perm_core_groups": "⬅️ К группам Ядра (для юзера)",
     "back_to_direct_perm_module_list": "⬅️ К модулям (для юзера)",
+    # Поиск пользователей
+    "user_search_button": "🔍 Поиск",
+    "user_search_new": "🔍 Новый поиск",
+    "user_search_prompt": "🔍 Введите часть username, имени или фамилии (от 3 символов ищется и внутри слова), Telegram ID или DB ID:",
+    "user_search_results_title": "🔍 Результаты поиска: {query}",
+    "user_search_nothing_found": "По запросу {query} никого не найдено.",
+    "back_to_users_list": "⬅️ К списку пользователей",
 }
 
 
+# Подписи сортировок списка (коды - из handlers_list.USER_LIST_SORTS)
+USER_LIST_SORT_LABELS = {"id": "сначала новые", "act": "по активности"}
+
+
 async def get_admin_users_list_keyboard_local( 
     users_on_page: List['DBUser'],
     total_pages: int,
     current_page: int,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None,
+    sort: str = "id",
 ) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     
@@ -65,24 +79,91 @@ async def get_admin_users_list_keyboard_local(
         builder.adjust(1)
 
     if total_pages > 1:
+        # Соседние страницы адресуются курсором (первая/последняя строка текущей), а не смещением
         pagination_row = []
-        if current_page > 1:
+        if prev_cursor:
             pagination_row.append(InlineKeyboardButton(
                 text=ADMIN_COMMON_TEXTS["pagination_prev"],
-                callback_data=AdminUsersPanelNavigate(action="list", page=current_page - 1).pack()
+                callback_data=AdminUsersPanelNavigate(
+                    action="list", page=current_page - 1, cursor=prev_cursor, back=True, sort=sort
+                ).pack()
             ))
         pagination_row.append(InlineKeyboardButton(
             text=f"{current_page}/{total_pages}",
             callback_data=AdminUsersPanelNavigate(action="dummy_page").pack() 
         ))
-        if current_page < total_pages:
+        if next_cursor:
             pagination_row.append(InlineKeyboardButton(
                 text=ADMIN_COMMON_TEXTS["pagination_next"],
-                callback_data=AdminUsersPanelNavigate(action="list", page=current_page + 1).pack()
+                callback_data=AdminUsersPanelNavigate(
+                    action="list", page=current_page + 1, cursor=next_cursor, sort=sort
+                ).pack()
             ))
         if pagination_row:
             builder.row(*pagination_row)
 
+    if users_on_page:
+        next_sort = next((code for code in USER_LIST_SORT_LABELS if code != sort), sort)
+        builder.row(
+            InlineKeyboardButton(
+                text=USERS_MGMT_TEXTS["user_search_button"],
+                callback_data=AdminUsersPanelNavigate(action="search_start").pack()
+            ),
+            InlineKeyboardButton(
+                text=f"🔃 Сортировка: {USER_LIST_SORT_LABELS.get(sort, sort)}",
+                callback_data=AdminUsersPanelNavigate(action="list", page=1, sort=next_sort).pack()
+            ),
+        )
+
+    builder.row(get_back_to_admin_main_menu_button())
+    return builder.as_markup()
+
+
+async def get_admin_users_search_keyboard_local(
+    users_on_page: List['DBUser'],
+    current_page: int,
+    next_cursor: Optional[str] = None,
+    prev_cursor: Optional[str] = None,
+) -> InlineKeyboardMarkup:
+    """Результаты поиска: те же кнопки пользователей, листание курсором (запрос хранится в FSM)."""
+    builder = InlineKeyboardBuilder()
+    for user_obj in users_on_page:
+        user_display = user_obj.full_name
+        user_display += f" (@{user_obj.username})" if user_obj.username else f" (ID: {user_obj.telegram_id})"
+        builder.button(
+            text=user_display,
+            callback_data=AdminUsersPanelNavigate(action="view", item_id=user_obj.id).pack()
+        )
+    builder.adjust(1)
+
+    if prev_cursor or next_cursor:
+        pagination_row = []
+        if prev_cursor:
+            pagination_row.append(InlineKeyboardButton(
+                text=ADMIN_COMMON_TEXTS["pagination_prev"],
+                callback_data=AdminUsersPanelNavigate(
+                    action="search_page", page=current_page - 1, cursor=prev_cursor, back=True
+                ).pack()
+            ))
+        pagination_row.append(InlineKeyboardButton(
+            text=str(current_page),
+            callback_data=AdminUsersPanelNavigate(action="dummy_page").pack()
+        ))
+        if next_cursor:
+            pagination_row.append(InlineKeyboardButton(
+                text=ADMIN_COMMON_TEXTS["pagination_next"],
+                callback_data=AdminUsersPanelNavigate(action="search_page", page=current_page + 1, cursor=next_cursor).pack()
+            ))
+        builder.row(*pagination_row)
+
+    builder.row(InlineKeyboardButton(
+        text=USERS_MGMT_TEXTS["user_search_new"],
+        callback_data=AdminUsersPanelNavigate(action="search_start").pack()
+    ))
+    builder.row(InlineKeyboardButton(
+        text=USERS_MGMT_TEXTS["back_to_users_list"],
+        callback_data=AdminUsersPanelNavigate(action="list", page=1).pack()
+    ))
     builder.row(get_back_to_admin_main_menu_button())
     return builder.as_markup()
 
@@ -97,6 +178,11 @@ async def get_admin_user_details_keyboard_local(
     rbac = services.rbac
     current_admin_is_owner = current_admin_tg_id in services.config.core.super_admins
     target_user_is_owner = target_user.telegram_id in services.config.core.super_admins
+    admin_perms = await rbac.user_has_permissions(session, current_admin_tg_id, [
+        PERMISSION_CORE_USERS_MANAGE_DIRECT_PERMISSIONS,
+        PERMISSION_CORE_USERS_ASSIGN_ROLES,
+        PERMISSION_CORE_USERS_MANAGE_STATUS,
+    ])
 
     # --- ИСПРАВЛЕНИЕ УСЛОВИЯ ОТОБРАЖЕНИЯ КНОПКИ "Индивидуальные разрешения" ---
     can_manage_direct_perms = False
@@ -105,7 +191,7 @@ async def get_admin_user_details_keyboard_local(
             can_manage_direct_perms = True
         else:
             # Проверяем разрешение PERMISSION_CORE_USERS_MANAGE_DIRECT_PERMISSIONS
-            if await rbac.user_has_permission(session, current_admin_tg_id, PERMISSION_CORE_USERS_MANAGE_DIRECT_PERMISSIONS):
+            if admin_perms[PERMISSION_CORE_USERS_MANAGE_DIRECT_PERMISSIONS]:
                 can_manage_direct_perms = True
     
     if can_manage_direct_perms:
@@ -116,15 +202,13 @@ async def get_admin_user_details_keyboard_local(
         )
 
     if not target_user_is_owner: 
-        if current_admin_is_owner or \
-           await rbac.user_has_permission(session, current_admin_tg_id, PERMISSION_CORE_USERS_ASSIGN_ROLES):
+        if current_admin_is_owner or admin_perms[PERMISSION_CORE_USERS_ASSIGN_ROLES]:
             builder.button(
                 text=USERS_MGMT_TEXTS["user_action_change_roles"],
                 callback_data=AdminUsersPanelNavigate(action="edit_roles_start", item_id=target_user.id).pack()
             )
 
-        if current_admin_is_owner or \
-           await rbac.user_has_permission(session, current_admin_tg_id, PERMISSION_CORE_USERS_MANAGE_STATUS):
+        if current_admin_is_owner or admin_perms[PERMISSION_CORE_USERS_MANAGE_STATUS]:
             active_status_text = "Выкл 💤" if target_user.is_active else "Вкл ✅" 
             builder.button(
                 text=USERS_MGMT_TEXTS["user_action_toggle_active"].format(status=active_status_text),
@@ -158,6 +242,8 @@ async def get_admin_user_edit_roles_keyboard_local(
     current_admin_is_owner = current_admin_tg_id in services.config.core.super_admins
 
     target_user_role_ids: Set[int] = {role.id for role in target_user.roles if role.id is not None}
+    can_assign_roles = current_admin_is_owner or \
+        await rbac.user_has_permission(session, current_admin_tg_id, PERMISSION_CORE_USERS_ASSIGN_ROLES)
 
     for role in sorted(all_system_roles, key=lambda r: r.name):
         if role.id is None: continue 
@@ -168,7 +254,7 @@ async def get_admin_user_edit_roles_keyboard_local(
         can_toggle_this_role = False
         if current_admin_is_owner:
             can_toggle_this_role = True
-        elif await rbac.user_has_permission(session, current_admin_tg_id, PERMISSION_CORE_USERS_ASSIGN_ROLES):
+        elif can_assign_roles:
             if role.name == DEFAULT_ROLE_USER and is_assigned and len(target_user.roles) == 1:
                 can_toggle_this_role = False
                 prefix = "🔒 " 
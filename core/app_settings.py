@@ -60,6 +60,24 @@ class DBSettings(BaseModel):
     mysql_dsn: Optional[MySQLDsn] = Field(default=None, description="DSN для MySQL.")
     echo_sql: bool = Field(default=False, description="Логировать SQL-запросы SQLAlchemy (уровень DEBUG).")
 
+    # Пул соединений для PostgreSQL/MySQL
+    pool_size: int = Field(default=5, ge=1, description="Число постоянных соединений в пуле (PostgreSQL/MySQL).")
+    max_overflow: int = Field(default=10, ge=0, description="Сколько соединений сверх pool_size можно открыть при пиковой нагрузке.")
+    pool_timeout: int = Field(default=30, ge=1, description="Сколько секунд ждать свободного соединения из пула.")
+    pool_recycle: int = Field(default=1800, ge=-1, description="Пересоздавать соединения старше N секунд (-1 - никогда).")
+    pool_pre_ping: bool = Field(default=True, description="Проверять соединение перед выдачей из пула.")
+
+    # Профиль SQLite
+    sqlite_pool_size: int = Field(default=5, ge=1, description="Число постоянных соединений aiosqlite в пуле.")
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = Field(
+        default="WAL", description="PRAGMA journal_mode для SQLite."
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        default="NORMAL", description="PRAGMA synchronous для SQLite."
+    )
+    sqlite_mmap_size: int = Field(default=64 * 1024 * 1024, ge=0, description="PRAGMA mmap_size для SQLite (байты, 0 - отключено).")
+    sqlite_busy_timeout_ms: int = Field(default=5000, ge=0, description="PRAGMA busy_timeout для SQLite (миллисекунды).")
+
     @field_validator('pg_dsn', mode='before')
     @classmethod
     def check_pg_dsn(cls, v: Optional[PostgresDsn], info: ValidationInfo) -> Optional[PostgresDsn]:
@@ -75,20 +93,69 @@ class DBSettings(BaseModel):
         return v
 
 class CacheSettings(BaseModel):
-    type: Literal["memory", "redis"] = Field(default="memory", description="Тип кэша.")
+    type: Literal["memory", "redis", "tiered"] = Field(
+        default="memory",
+        description="Тип кэша. 'tiered' - локальный L1 в памяти перед общим Redis (L2) с инвалидацией через pub/sub."
+    )
     redis_url: Optional[str] = Field(default="redis://localhost:6379/0", description="URL для Redis.")
+    user_context_ttl_seconds: int = Field(
+        default=60, ge=0,
+        description="TTL кэша контекста пользователя (строка User по telegram_id). 0 - только в рамках одного апдейта."
+    )
+    default_ttl_seconds: int = Field(default=300, ge=0, description="TTL memory-кэша для set() без ttl_seconds (0 - бессрочно).")
+    memory_maxsize: int = Field(default=10000, ge=1, description="Максимальное число ключей в memory-кэше.")
+    memory_max_bytes: int = Field(
+        default=0, ge=0,
+        description="Лимит суммарного размера значений memory-кэша в байтах (0 - без учета размера)."
+    )
+    memory_eviction_policy: Literal["lru", "lfu"] = Field(default="lru", description="Политика вытеснения memory-кэша.")
+    memory_shards: int = Field(default=8, ge=1, description="Число шард memory-кэша.")
+    serializer: Literal["pickle", "msgpack", "json"] = Field(
+        default="pickle",
+        description="Формат значений в Redis. Непредставимые в msgpack/json значения все равно пишутся pickle."
+    )
+    compression: Literal["none", "zlib", "lz4"] = Field(default="none", description="Сжатие значений в Redis.")
+    compression_min_bytes: int = Field(default=1024, ge=0, description="Сжимать только значения не короче N байт.")
+    l1_maxsize: int = Field(default=1000, ge=1, description="Максимальное число ключей в L1 tiered-кэша.")
+    l1_ttl_seconds: int = Field(
+        default=30, ge=1,
+        description="Сколько значение живет в L1 tiered-кэша (верхняя граница устаревания, если инвалидация потерялась)."
+    )
+    invalidation_channel: str = Field(default="sdb:cache:invalidate", description="Redis-канал инвалидации L1 tiered-кэша.")
 
     @field_validator('redis_url', mode='before')
     @classmethod
     def check_redis_url(cls, v: Optional[str], info: ValidationInfo) -> Optional[str]:
         cache_type = info.data.get('type') if info.data else None
-        if cache_type == "redis" and not v:
-            raise ValueError("redis_url должен быть указан для типа кэша 'redis'.")
+        if cache_type in ("redis", "tiered") and not v:
+            raise ValueError(f"redis_url должен быть указан для типа кэша '{cache_type}'.")
         return v
 
 class TelegramSettings(BaseModel):
     token: str = Field(description="Токен Telegram бота (рекомендуется указывать в .env).")
     polling_timeout: int = Field(default=30, ge=1, description="Таймаут long polling (секунды).")
+    mode: Literal["polling", "webhook"] = Field(default="polling", description="Способ получения апдейтов от Telegram.")
+    webhook_url: Optional[HttpUrl] = Field(
+        default=None, description="Публичный HTTPS-адрес бота для webhook (без пути), например https://bot.example.com."
+    )
+    webhook_path: str = Field(default="/telegram/webhook", description="Путь, по которому aiohttp-сервер принимает апдейты.")
+    webhook_secret_token: Optional[str] = Field(
+        default=None, pattern=r"^[A-Za-z0-9_-]{1,256}$",
+        description="Секрет для заголовка X-Telegram-Bot-Api-Secret-Token (рекомендуется указывать в .env)."
+    )
+    webhook_listen_host: str = Field(default="0.0.0.0", description="Адрес, на котором слушает webhook-сервер.")
+    webhook_listen_port: int = Field(default=8080, ge=1, le=65535, description="Порт webhook-сервера.")
+    webhook_max_connections: int = Field(default=40, ge=1, le=100, description="max_connections для setWebhook.")
+    webhook_drop_pending_updates: bool = Field(
+        default=False, description="Сбрасывать накопившиеся апдейты при установке webhook."
+    )
+
+    @field_validator('webhook_url', mode='before')
+    @classmethod
+    def check_webhook_url(cls, v: Optional[HttpUrl], info: ValidationInfo) -> Optional[HttpUrl]:
+        if info.data.get('mode') == "webhook" and not v:
+            raise ValueError("webhook_url должен быть указан для режима 'webhook'.")
+        return v
 
 class ModuleRepoSettings(BaseModel):
     index_url: Optional[HttpUrl] = Field(
@@ -102,6 +169,95 @@ class I18nSettings(BaseModel):
     default_locale: str = Field(default="en", description="Язык по умолчанию.")
     available_locales: List[str] = Field(default_factory=lambda: ["en", "ua"], description="Список доступных языков.")
 
+class UpdateSchedulerSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Обрабатывать апдейты через планировщик (параллельно по чатам, по порядку внутри чата).")
+    max_concurrency: int = Field(default=16, ge=1, description="Сколько апдейтов (из разных чатов) обрабатывается одновременно.")
+    high_watermark: int = Field(default=1000, ge=1, description="Порог числа апдейтов в очереди, после которого включается overflow_policy.")
+    overflow_policy: Literal["delay", "drop"] = Field(
+        default="delay",
+        description="'delay' - перестать забирать новые апдейты, пока очередь не уменьшится; 'drop' - отбрасывать новые апдейты."
+    )
+    drain_timeout_seconds: float = Field(default=10.0, ge=0, description="Сколько ждать обработки очереди при остановке бота (секунды).")
+
+class ThrottlingSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Отбрасывать апдейты пользователей, превысивших лимит частоты (до обращений к БД).")
+    user_limit: int = Field(default=30, ge=1, description="Сколько апдейтов один пользователь может отправить за user_window_seconds.")
+    user_window_seconds: int = Field(default=10, ge=1, description="Скользящее окно общего лимита пользователя (секунды).")
+    exempt_super_admins: bool = Field(default=True, description="Не ограничивать супер-администраторов.")
+    notify_on_callback: bool = Field(default=True, description="Отвечать на отброшенный callback предупреждением (не чаще раза за окно).")
+    key_prefix: str = Field(default="sdb:throttle", description="Префикс ключей счетчиков в кэше.")
+
+class MetricsCollectorSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Собирать системные метрики в фоне, пока работает бот (project_data/monitor/metrics.db).")
+    sample_interval_seconds: float = Field(default=10.0, gt=0, description="Интервал между замерами (секунды).")
+    flush_interval_seconds: float = Field(default=60.0, gt=0, description="Как часто накопленные замеры пишутся в БД одной транзакцией (секунды).")
+    raw_retention_hours: int = Field(default=48, ge=1, description="Сколько хранить сырые замеры (часы).")
+    minute_retention_days: int = Field(default=14, ge=1, description="Сколько хранить минутные агрегаты (дни).")
+    hour_retention_days: int = Field(default=400, ge=1, description="Сколько хранить часовые агрегаты (дни).")
+
+class PrometheusSettings(BaseModel):
+    enabled: bool = Field(default=False, description="Отдавать метрики бота в формате Prometheus на локальном HTTP-эндпоинте.")
+    host: str = Field(default="127.0.0.1", description="Адрес эндпоинта метрик (по умолчанию только локальный).")
+    port: int = Field(default=9464, ge=1, le=65535, description="Порт эндпоинта метрик.")
+    path: str = Field(default="/metrics", description="Путь эндпоинта метрик.")
+    loop_lag_probe_interval_seconds: float = Field(default=0.5, ge=0, description="Интервал замера задержки event loop (0 - отключено).")
+
+class ProfilerSettings(BaseModel):
+    enabled: bool = Field(default=False, description="Режим профилирования: отслеживать задержку event loop и блокирующие его вызовы (также `sdb run --profile`).")
+    slow_threshold_ms: float = Field(default=100.0, gt=0, description="Блокировка event loop дольше этого порога логируется со стеком (мс).")
+    heartbeat_interval_ms: float = Field(default=20.0, gt=0, description="Интервал контрольной отметки event loop (мс).")
+    sample_interval_ms: float = Field(default=5.0, gt=0, description="Интервал сэмплирования стека при снятии профиля (мс).")
+
+class TaskTypeLimits(BaseModel):
+    max_concurrency: Optional[int] = Field(default=None, ge=1, description="Сколько задач этого типа выполняется одновременно.")
+    max_retries: Optional[int] = Field(default=None, ge=0, description="Сколько раз повторять задачу после ошибки.")
+    retry_backoff_seconds: Optional[float] = Field(default=None, ge=0, description="Пауза перед первым повтором, дальше удваивается (секунды).")
+    retry_backoff_max_seconds: Optional[float] = Field(default=None, ge=0, description="Максимальная пауза между повторами (секунды).")
+    timeout_seconds: Optional[float] = Field(default=None, gt=0, description="Таймаут одной попытки (секунды).")
+
+class TaskSchedulerSettings(BaseModel):
+    enabled: bool = Field(default=True, description="Запускать планировщик фоновых задач (`sdb tasks`) вместе с ботом.")
+    io_workers: int = Field(default=4, ge=1, description="Потоки для задач с вводом-выводом (очистка, сеть).")
+    cpu_workers: int = Field(default=2, ge=1, description="Процессы для тяжелых задач (бэкап, сжатие).")
+    timezone: str = Field(default="UTC", description="Часовой пояс cron-расписаний.")
+    poll_interval_seconds: float = Field(default=5.0, gt=0, description="Как часто проверять задания и отмены, добавленные через CLI (секунды).")
+    misfire_grace_time_seconds: int = Field(default=300, ge=1, description="Насколько можно опоздать с запуском (например, бот был выключен), прежде чем запуск пропускается (секунды).")
+    run_history_days: int = Field(default=30, ge=1, description="Сколько дней хранить журнал запусков задач.")
+    task_limits: Dict[str, TaskTypeLimits] = Field(
+        default_factory=dict,
+        description="Переопределение лимитов по типу задачи, например {'backup': {'max_retries': 5}}."
+    )
+
+class HttpClientSettings(BaseModel):
+    timeout_seconds: float = Field(default=10.0, gt=0, description="Общий таймаут запроса по умолчанию (секунды).")
+    connect_timeout_seconds: float = Field(default=5.0, gt=0, description="Таймаут установки соединения (секунды).")
+    pool_limit: int = Field(default=100, ge=0, description="Максимум одновременных соединений всего пула (0 - без ограничения).")
+    pool_limit_per_host: int = Field(default=20, ge=0, description="Максимум соединений к одному хосту (0 - без ограничения).")
+    keepalive_timeout_seconds: float = Field(default=30.0, ge=0, description="Сколько простаивающее keep-alive соединение остается в пуле (секунды).")
+    dns_cache_ttl_seconds: int = Field(default=300, ge=0, description="Сколько кэшировать результаты DNS (секунды, 0 - без кэша).")
+    max_concurrency_per_host: int = Field(default=10, ge=0, description="Сколько запросов к одному хосту выполняется одновременно, остальные ждут (0 - без ограничения).")
+    retry_attempts: int = Field(default=2, ge=0, description="Повторы идемпотентных запросов (GET, HEAD, PUT, DELETE...) при сетевой ошибке или статусе из retry_statuses.")
+    retry_backoff_seconds: float = Field(default=0.5, ge=0, description="Базовая пауза перед повтором, удваивается с каждой попыткой, со случайным разбросом (секунды).")
+    retry_backoff_max_seconds: float = Field(default=10.0, ge=0, description="Максимальная пауза между повторами, в т.ч. по Retry-After (секунды).")
+    retry_statuses: List[int] = Field(default_factory=lambda: [429, 500, 502, 503, 504], description="HTTP-статусы, при которых запрос повторяется.")
+    cache_enabled: bool = Field(default=True, description="Кэшировать GET-ответы в CacheManager по Cache-Control/ETag/Last-Modified.")
+    cache_max_body_bytes: int = Field(default=1024 * 1024, ge=0, description="Ответы больше этого размера не кэшируются (байты).")
+    cache_revalidate_ttl_seconds: int = Field(default=86400, ge=0, description="Сколько хранить устаревший ответ с ETag/Last-Modified для условного запроса (секунды).")
+
+class BroadcastSettings(BaseModel):
+    global_rate_per_second: float = Field(default=25.0, gt=0, description="Сколько сообщений рассылки в секунду отправляется всего (лимит Telegram - около 30).")
+    private_chat_interval_seconds: float = Field(default=1.0, ge=0, description="Минимальный интервал между сообщениями в один личный чат (секунды).")
+    group_chat_interval_seconds: float = Field(default=3.0, ge=0, description="Минимальный интервал между сообщениями в одну группу (секунды, лимит Telegram - 20 в минуту).")
+    concurrency: int = Field(default=20, ge=1, description="Сколько сообщений рассылки отправляется одновременно.")
+    batch_size: int = Field(default=100, ge=1, description="Сколько получателей читается из БД за раз; после каждой пачки прогресс сохраняется.")
+    max_retries: int = Field(default=3, ge=0, description="Повторы сообщения при сетевой ошибке или ошибке сервера Telegram.")
+    max_retry_after_waits: int = Field(default=10, ge=0, description="Сколько раз одно сообщение может ждать retry_after (flood control), прежде чем считается неотправленным.")
+    stale_after_seconds: int = Field(default=120, ge=10, description="Рассылка в статусе running без обновлений дольше этого считается прерванной и продолжается при старте бота (секунды).")
+    resume_on_startup: bool = Field(default=True, description="Продолжать прерванные рассылки при старте бота.")
+
+class RBACSettings(BaseModel):
+    permissions_cache_ttl_seconds: int = Field(default=300, ge=1, description="Сколько хранить в кэше скомпилированные наборы разрешений пользователей и ролей (секунды).")
+
 class CoreAppSettings(BaseModel):
     project_data_path: Path = Field(
         default=PROJECT_ROOT_DIR / DEFAULT_PROJECT_DATA_DIR_NAME,
@@ -128,12 +284,60 @@ class CoreAppSettings(BaseModel):
         description="Как долго хранить структурированные логи (например, '30 days', '3 months', '1 year'). "
                     "Реализуется отдельной задачей очистки."
     )
+    log_file_level: Literal["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
+        default="DEBUG", description="Минимальный уровень файловых логов (для логгеров без переопределения)."
+    )
+    log_level_overrides: Dict[str, Literal["TRACE", "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]] = Field(
+        default_factory=dict,
+        description="Уровень файловых логов по префиксу модуля, например {'core.database': 'INFO'}."
+    )
+    log_sampling: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Писать в файл только каждую N-ю запись ниже log_sampling_below_level для service (bind) или модуля, "
+                    "например {'UserStatusMiddleware': 10}."
+    )
+    log_sampling_below_level: Literal["DEBUG", "INFO", "WARNING"] = Field(
+        default="INFO", description="Сэмплирование и rate limit применяются к записям ниже этого уровня."
+    )
+    log_rate_limit_per_second: int = Field(
+        default=0, ge=0,
+        description="Максимум записей в секунду ниже log_sampling_below_level на один service/модуль (0 - без ограничения)."
+    )
+    log_json_sink: bool = Field(
+        default=False,
+        description="Дополнительно писать логи в JSON Lines (<час>_sdb.jsonl) с полями bind() (service, user_id, update_id...)."
+    )
+    log_index_enabled: bool = Field(
+        default=True,
+        description="Индексировать закрытые часовые лог-файлы в SQLite для быстрых запросов `sdb monitor logs` и админки."
+    )
     
     sdb_version: str = Field(default="0.1.0", pattern=r"^\d+\.\d+\.\d+([\w.-]*[\w])?(\+[\w.-]+)?$",
                              description="Версия ядра SwiftDevBot (SemVer-совместимая).")
     
     setup_bot_commands_on_startup: bool = Field(default=True, description="Устанавливать команды бота при старте.")
+    user_activity_granularity_seconds: int = Field(
+        default=300, ge=0,
+        description="Минимальный интервал обновления last_activity_at пользователя (секунды)."
+    )
+    user_activity_flush_interval_seconds: int = Field(
+        default=10, ge=1,
+        description="Как часто отложенные изменения активности/профиля пользователей сбрасываются в БД (секунды)."
+    )
+    runtime_stats_interval_seconds: int = Field(
+        default=15, ge=0,
+        description="Как часто бот публикует снимок runtime-статистики для `sdb monitor` (секунды, 0 - отключено)."
+    )
     i18n: I18nSettings = Field(default_factory=I18nSettings)
+    update_scheduler: UpdateSchedulerSettings = Field(default_factory=UpdateSchedulerSettings)
+    throttling: ThrottlingSettings = Field(default_factory=ThrottlingSettings)
+    metrics: MetricsCollectorSettings = Field(default_factory=MetricsCollectorSettings)
+    prometheus: PrometheusSettings = Field(default_factory=PrometheusSettings)
+    profiler: ProfilerSettings = Field(default_factory=ProfilerSettings)
+    tasks: TaskSchedulerSettings = Field(default_factory=TaskSchedulerSettings)
+    http_client: HttpClientSettings = Field(default_factory=HttpClientSettings)
+    broadcast: BroadcastSettings = Field(default_factory=BroadcastSettings)
+    rbac: RBACSettings = Field(default_factory=RBACSettings)
 
 class EnvironmentSettings(BaseSettings):
     CORE_PROJECT_DATA_PATH: Optional[Path] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_PROJECT_DATA_PATH', 'CORE_PROJECT_DATA_PATH'))
@@ -141,6 +345,7 @@ class EnvironmentSettings(BaseSettings):
     CORE_ENABLED_MODULES_CONFIG_PATH: Optional[Path] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_ENABLED_MODULES_CONFIG_PATH', 'CORE_ENABLED_MODULES_CONFIG_PATH'))
     CORE_LOG_LEVEL: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_LOG_LEVEL', 'CORE_LOG_LEVEL'))
     CORE_LOG_TO_FILE: Optional[bool] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_LOG_TO_FILE', 'CORE_LOG_TO_FILE'))
+    CORE_PROFILER_ENABLED: Optional[bool] = Field(default=None, validation_alias=AliasChoices('SDB_CORE_PROFILER_ENABLED', 'CORE_PROFILER_ENABLED'))
     
     SDB_CORE_LOG_STRUCTURED_DIR: Optional[str] = Field(default=None)
     SDB_CORE_LOG_ROTATION_SIZE: Optional[str] = Field(default=None)
@@ -154,10 +359,13 @@ class EnvironmentSettings(BaseSettings):
     DB_MYSQL_DSN: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_DB_MYSQL_DSN', 'DB_MYSQL_DSN')) 
     DB_ECHO_SQL: Optional[bool] = Field(default=None, validation_alias=AliasChoices('SDB_DB_ECHO_SQL', 'DB_ECHO_SQL'))
 
-    CACHE_TYPE: Optional[Literal["memory", "redis"]] = Field(default=None, validation_alias=AliasChoices('SDB_CACHE_TYPE', 'CACHE_TYPE'))
+    CACHE_TYPE: Optional[Literal["memory", "redis", "tiered"]] = Field(default=None, validation_alias=AliasChoices('SDB_CACHE_TYPE', 'CACHE_TYPE'))
     CACHE_REDIS_URL: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_CACHE_REDIS_URL', 'CACHE_REDIS_URL'))
     
     TELEGRAM_POLLING_TIMEOUT: Optional[int] = Field(default=None, validation_alias=AliasChoices('SDB_TELEGRAM_POLLING_TIMEOUT', 'TELEGRAM_POLLING_TIMEOUT'))
+    TELEGRAM_MODE: Optional[Literal["polling", "webhook"]] = Field(default=None, validation_alias=AliasChoices('SDB_TELEGRAM_MODE', 'TELEGRAM_MODE'))
+    TELEGRAM_WEBHOOK_URL: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_TELEGRAM_WEBHOOK_URL', 'TELEGRAM_WEBHOOK_URL'))
+    TELEGRAM_WEBHOOK_SECRET_TOKEN: Optional[str] = Field(default=None, validation_alias=AliasChoices('SDB_TELEGRAM_WEBHOOK_SECRET_TOKEN', 'TELEGRAM_WEBHOOK_SECRET_TOKEN'))
     MODULE_REPO_INDEX_URL: Optional[HttpUrl] = Field(default=None, validation_alias=AliasChoices('SDB_MODULE_REPO_INDEX_URL', 'MODULE_REPO_INDEX_URL'))
 
     SDB_I18N_LOCALES_DIR: Optional[Path] = Field(default=None, validation_alias=AliasChoices('SDB_I18N_LOCALES_DIR', 'I18N_LOCALES_DIR'))
@@ -223,10 +431,19 @@ def load_app_settings() -> AppSettings:
     if not final_tg_token:
         raise ValueError(f"КРИТИЧНО: BOT_TOKEN не найден! Проверьте .env и YAML ({user_config_file_path}).")
     
+    telegram_yaml = yaml_data.get("telegram", {})
     telegram_s = TelegramSettings(
         token=final_tg_token,
         polling_timeout=env_s.TELEGRAM_POLLING_TIMEOUT or \
-                        yaml_data.get("telegram", {}).get("polling_timeout", TelegramSettings.model_fields["polling_timeout"].default)
+                        telegram_yaml.get("polling_timeout", TelegramSettings.model_fields["polling_timeout"].default),
+        mode=env_s.TELEGRAM_MODE or telegram_yaml.get("mode", TelegramSettings.model_fields["mode"].default),
+        webhook_url=env_s.TELEGRAM_WEBHOOK_URL or telegram_yaml.get("webhook_url"),
+        webhook_path=telegram_yaml.get("webhook_path", TelegramSettings.model_fields["webhook_path"].default),
+        webhook_secret_token=env_s.TELEGRAM_WEBHOOK_SECRET_TOKEN or telegram_yaml.get("webhook_secret_token"),
+        webhook_listen_host=telegram_yaml.get("webhook_listen_host", TelegramSettings.model_fields["webhook_listen_host"].default),
+        webhook_listen_port=telegram_yaml.get("webhook_listen_port", TelegramSettings.model_fields["webhook_listen_port"].default),
+        webhook_max_connections=telegram_yaml.get("webhook_max_connections", TelegramSettings.model_fields["webhook_max_connections"].default),
+        webhook_drop_pending_updates=telegram_yaml.get("webhook_drop_pending_updates", TelegramSettings.model_fields["webhook_drop_pending_updates"].default)
     )
 
     db_yaml = yaml_data.get("db", {})
@@ -236,13 +453,35 @@ def load_app_settings() -> AppSettings:
         pg_dsn=env_s.DB_PG_DSN or db_yaml.get("pg_dsn"),
         mysql_dsn=env_s.DB_MYSQL_DSN or db_yaml.get("mysql_dsn"),
         echo_sql=env_s.DB_ECHO_SQL if env_s.DB_ECHO_SQL is not None else \
-                 db_yaml.get("echo_sql", DBSettings.model_fields["echo_sql"].default)
+                 db_yaml.get("echo_sql", DBSettings.model_fields["echo_sql"].default),
+        pool_size=db_yaml.get("pool_size", DBSettings.model_fields["pool_size"].default),
+        max_overflow=db_yaml.get("max_overflow", DBSettings.model_fields["max_overflow"].default),
+        pool_timeout=db_yaml.get("pool_timeout", DBSettings.model_fields["pool_timeout"].default),
+        pool_recycle=db_yaml.get("pool_recycle", DBSettings.model_fields["pool_recycle"].default),
+        pool_pre_ping=db_yaml.get("pool_pre_ping", DBSettings.model_fields["pool_pre_ping"].default),
+        sqlite_pool_size=db_yaml.get("sqlite_pool_size", DBSettings.model_fields["sqlite_pool_size"].default),
+        sqlite_journal_mode=str(db_yaml.get("sqlite_journal_mode", DBSettings.model_fields["sqlite_journal_mode"].default)).upper(),
+        sqlite_synchronous=str(db_yaml.get("sqlite_synchronous", DBSettings.model_fields["sqlite_synchronous"].default)).upper(),
+        sqlite_mmap_size=db_yaml.get("sqlite_mmap_size", DBSettings.model_fields["sqlite_mmap_size"].default),
+        sqlite_busy_timeout_ms=db_yaml.get("sqlite_busy_timeout_ms", DBSettings.model_fields["sqlite_busy_timeout_ms"].default)
     )
 
     cache_yaml = yaml_data.get("cache", {})
     cache_s = CacheSettings(
         type=env_s.CACHE_TYPE or cache_yaml.get("type", CacheSettings.model_fields["type"].default),
-        redis_url=env_s.CACHE_REDIS_URL or cache_yaml.get("redis_url", CacheSettings.model_fields["redis_url"].default)
+        redis_url=env_s.CACHE_REDIS_URL or cache_yaml.get("redis_url", CacheSettings.model_fields["redis_url"].default),
+        user_context_ttl_seconds=cache_yaml.get("user_context_ttl_seconds", CacheSettings.model_fields["user_context_ttl_seconds"].default),
+        default_ttl_seconds=cache_yaml.get("default_ttl_seconds", CacheSettings.model_fields["default_ttl_seconds"].default),
+        memory_maxsize=cache_yaml.get("memory_maxsize", CacheSettings.model_fields["memory_maxsize"].default),
+        memory_max_bytes=cache_yaml.get("memory_max_bytes", CacheSettings.model_fields["memory_max_bytes"].default),
+        memory_eviction_policy=str(cache_yaml.get("memory_eviction_policy", CacheSettings.model_fields["memory_eviction_policy"].default)).lower(),
+        memory_shards=cache_yaml.get("memory_shards", CacheSettings.model_fields["memory_shards"].default),
+        serializer=str(cache_yaml.get("serializer", CacheSettings.model_fields["serializer"].default)).lower(),
+        compression=str(cache_yaml.get("compression", CacheSettings.model_fields["compression"].default)).lower(),
+        compression_min_bytes=cache_yaml.get("compression_min_bytes", CacheSettings.model_fields["compression_min_bytes"].default),
+        l1_maxsize=cache_yaml.get("l1_maxsize", CacheSettings.model_fields["l1_maxsize"].default),
+        l1_ttl_seconds=cache_yaml.get("l1_ttl_seconds", CacheSettings.model_fields["l1_ttl_seconds"].default),
+        invalidation_channel=cache_yaml.get("invalidation_channel", CacheSettings.model_fields["invalidation_channel"].default)
     )
 
     module_repo_yaml = yaml_data.get("module_repo", {})
@@ -302,6 +541,109 @@ def load_app_settings() -> AppSettings:
         available_locales=final_available_locales
     )
 
+    update_scheduler_yaml = core_yaml.get("update_scheduler", {})
+    update_scheduler_defaults = UpdateSchedulerSettings.model_fields
+    update_scheduler_s = UpdateSchedulerSettings(
+        enabled=update_scheduler_yaml.get("enabled", update_scheduler_defaults["enabled"].default),
+        max_concurrency=update_scheduler_yaml.get("max_concurrency", update_scheduler_defaults["max_concurrency"].default),
+        high_watermark=update_scheduler_yaml.get("high_watermark", update_scheduler_defaults["high_watermark"].default),
+        overflow_policy=update_scheduler_yaml.get("overflow_policy", update_scheduler_defaults["overflow_policy"].default),
+        drain_timeout_seconds=update_scheduler_yaml.get("drain_timeout_seconds", update_scheduler_defaults["drain_timeout_seconds"].default),
+    )
+
+    throttling_yaml = core_yaml.get("throttling", {})
+    throttling_defaults = ThrottlingSettings.model_fields
+    throttling_s = ThrottlingSettings(
+        enabled=throttling_yaml.get("enabled", throttling_defaults["enabled"].default),
+        user_limit=throttling_yaml.get("user_limit", throttling_defaults["user_limit"].default),
+        user_window_seconds=throttling_yaml.get("user_window_seconds", throttling_defaults["user_window_seconds"].default),
+        exempt_super_admins=throttling_yaml.get("exempt_super_admins", throttling_defaults["exempt_super_admins"].default),
+        notify_on_callback=throttling_yaml.get("notify_on_callback", throttling_defaults["notify_on_callback"].default),
+        key_prefix=throttling_yaml.get("key_prefix", throttling_defaults["key_prefix"].default),
+    )
+
+    metrics_yaml = core_yaml.get("metrics", {})
+    metrics_defaults = MetricsCollectorSettings.model_fields
+    metrics_s = MetricsCollectorSettings(
+        enabled=metrics_yaml.get("enabled", metrics_defaults["enabled"].default),
+        sample_interval_seconds=metrics_yaml.get("sample_interval_seconds", metrics_defaults["sample_interval_seconds"].default),
+        flush_interval_seconds=metrics_yaml.get("flush_interval_seconds", metrics_defaults["flush_interval_seconds"].default),
+        raw_retention_hours=metrics_yaml.get("raw_retention_hours", metrics_defaults["raw_retention_hours"].default),
+        minute_retention_days=metrics_yaml.get("minute_retention_days", metrics_defaults["minute_retention_days"].default),
+        hour_retention_days=metrics_yaml.get("hour_retention_days", metrics_defaults["hour_retention_days"].default),
+    )
+
+    prometheus_yaml = core_yaml.get("prometheus", {})
+    prometheus_defaults = PrometheusSettings.model_fields
+    prometheus_s = PrometheusSettings(
+        enabled=prometheus_yaml.get("enabled", prometheus_defaults["enabled"].default),
+        host=prometheus_yaml.get("host", prometheus_defaults["host"].default),
+        port=prometheus_yaml.get("port", prometheus_defaults["port"].default),
+        path=prometheus_yaml.get("path", prometheus_defaults["path"].default),
+        loop_lag_probe_interval_seconds=prometheus_yaml.get("loop_lag_probe_interval_seconds", prometheus_defaults["loop_lag_probe_interval_seconds"].default),
+    )
+
+    profiler_yaml = core_yaml.get("profiler", {})
+    profiler_defaults = ProfilerSettings.model_fields
+    profiler_s = ProfilerSettings(
+        enabled=env_s.CORE_PROFILER_ENABLED if env_s.CORE_PROFILER_ENABLED is not None \
+                else profiler_yaml.get("enabled", profiler_defaults["enabled"].default),
+        slow_threshold_ms=profiler_yaml.get("slow_threshold_ms", profiler_defaults["slow_threshold_ms"].default),
+        heartbeat_interval_ms=profiler_yaml.get("heartbeat_interval_ms", profiler_defaults["heartbeat_interval_ms"].default),
+        sample_interval_ms=profiler_yaml.get("sample_interval_ms", profiler_defaults["sample_interval_ms"].default),
+    )
+
+    tasks_yaml = core_yaml.get("tasks", {})
+    tasks_defaults = TaskSchedulerSettings.model_fields
+    tasks_s = TaskSchedulerSettings(
+        enabled=tasks_yaml.get("enabled", tasks_defaults["enabled"].default),
+        io_workers=tasks_yaml.get("io_workers", tasks_defaults["io_workers"].default),
+        cpu_workers=tasks_yaml.get("cpu_workers", tasks_defaults["cpu_workers"].default),
+        timezone=tasks_yaml.get("timezone", tasks_defaults["timezone"].default),
+        poll_interval_seconds=tasks_yaml.get("poll_interval_seconds", tasks_defaults["poll_interval_seconds"].default),
+        misfire_grace_time_seconds=tasks_yaml.get("misfire_grace_time_seconds", tasks_defaults["misfire_grace_time_seconds"].default),
+        run_history_days=tasks_yaml.get("run_history_days", tasks_defaults["run_history_days"].default),
+        task_limits=tasks_yaml.get("task_limits") or {},
+    )
+
+    http_client_yaml = core_yaml.get("http_client", {})
+    http_client_defaults = HttpClientSettings.model_fields
+    http_client_s = HttpClientSettings(
+        timeout_seconds=http_client_yaml.get("timeout_seconds", http_client_defaults["timeout_seconds"].default),
+        connect_timeout_seconds=http_client_yaml.get("connect_timeout_seconds", http_client_defaults["connect_timeout_seconds"].default),
+        pool_limit=http_client_yaml.get("pool_limit", http_client_defaults["pool_limit"].default),
+        pool_limit_per_host=http_client_yaml.get("pool_limit_per_host", http_client_defaults["pool_limit_per_host"].default),
+        keepalive_timeout_seconds=http_client_yaml.get("keepalive_timeout_seconds", http_client_defaults["keepalive_timeout_seconds"].default),
+        dns_cache_ttl_seconds=http_client_yaml.get("dns_cache_ttl_seconds", http_client_defaults["dns_cache_ttl_seconds"].default),
+        max_concurrency_per_host=http_client_yaml.get("max_concurrency_per_host", http_client_defaults["max_concurrency_per_host"].default),
+        retry_attempts=http_client_yaml.get("retry_attempts", http_client_defaults["retry_attempts"].default),
+        retry_backoff_seconds=http_client_yaml.get("retry_backoff_seconds", http_client_defaults["retry_backoff_seconds"].default),
+        retry_backoff_max_seconds=http_client_yaml.get("retry_backoff_max_seconds", http_client_defaults["retry_backoff_max_seconds"].default),
+        retry_statuses=http_client_yaml.get("retry_statuses") or [429, 500, 502, 503, 504],
+        cache_enabled=http_client_yaml.get("cache_enabled", http_client_defaults["cache_enabled"].default),
+        cache_max_body_bytes=http_client_yaml.get("cache_max_body_bytes", http_client_defaults["cache_max_body_bytes"].default),
+        cache_revalidate_ttl_seconds=http_client_yaml.get("cache_revalidate_ttl_seconds", http_client_defaults["cache_revalidate_ttl_seconds"].default),
+    )
+
+    broadcast_yaml = core_yaml.get("broadcast", {})
+    broadcast_defaults = BroadcastSettings.model_fields
+    broadcast_s = BroadcastSettings(
+        global_rate_per_second=broadcast_yaml.get("global_rate_per_second", broadcast_defaults["global_rate_per_second"].default),
+        private_chat_interval_seconds=broadcast_yaml.get("private_chat_interval_seconds", broadcast_defaults["private_chat_interval_seconds"].default),
+        group_chat_interval_seconds=broadcast_yaml.get("group_chat_interval_seconds", broadcast_defaults["group_chat_interval_seconds"].default),
+        concurrency=broadcast_yaml.get("concurrency", broadcast_defaults["concurrency"].default),
+        batch_size=broadcast_yaml.get("batch_size", broadcast_defaults["batch_size"].default),
+        max_retries=broadcast_yaml.get("max_retries", broadcast_defaults["max_retries"].default),
+        max_retry_after_waits=broadcast_yaml.get("max_retry_after_waits", broadcast_defaults["max_retry_after_waits"].default),
+        stale_after_seconds=broadcast_yaml.get("stale_after_seconds", broadcast_defaults["stale_after_seconds"].default),
+        resume_on_startup=broadcast_yaml.get("resume_on_startup", broadcast_defaults["resume_on_startup"].default),
+    )
+
+    rbac_yaml = core_yaml.get("rbac", {})
+    rbac_s = RBACSettings(
+        permissions_cache_ttl_seconds=rbac_yaml.get("permissions_cache_ttl_seconds", RBACSettings.model_fields["permissions_cache_ttl_seconds"].default),
+    )
+
     core_s = CoreAppSettings(
         project_data_path=effective_project_data_path,
         super_admins=s_admins_final_list,
@@ -312,9 +654,28 @@ def load_app_settings() -> AppSettings:
         log_structured_dir=log_structured_dir_final,
         log_rotation_size=log_rotation_size_final,
         log_retention_period_structured=log_retention_period_structured_final,
+        log_file_level=(core_yaml.get("log_file_level") or CoreAppSettings.model_fields["log_file_level"].default).upper(), # type: ignore
+        log_level_overrides={prefix: str(level).upper() for prefix, level in (core_yaml.get("log_level_overrides") or {}).items()},
+        log_sampling=core_yaml.get("log_sampling") or {},
+        log_sampling_below_level=(core_yaml.get("log_sampling_below_level") or CoreAppSettings.model_fields["log_sampling_below_level"].default).upper(), # type: ignore
+        log_rate_limit_per_second=core_yaml.get("log_rate_limit_per_second", CoreAppSettings.model_fields["log_rate_limit_per_second"].default),
+        log_json_sink=core_yaml.get("log_json_sink", CoreAppSettings.model_fields["log_json_sink"].default),
+        log_index_enabled=core_yaml.get("log_index_enabled", CoreAppSettings.model_fields["log_index_enabled"].default),
         sdb_version=env_s.CORE_SDB_VERSION or core_yaml.get("sdb_version", CoreAppSettings.model_fields["sdb_version"].default),
         setup_bot_commands_on_startup=core_yaml.get("setup_bot_commands_on_startup", CoreAppSettings.model_fields["setup_bot_commands_on_startup"].default), # type: ignore
-        i18n=i18n_s
+        user_activity_granularity_seconds=core_yaml.get("user_activity_granularity_seconds", CoreAppSettings.model_fields["user_activity_granularity_seconds"].default),
+        user_activity_flush_interval_seconds=core_yaml.get("user_activity_flush_interval_seconds", CoreAppSettings.model_fields["user_activity_flush_interval_seconds"].default),
+        runtime_stats_interval_seconds=core_yaml.get("runtime_stats_interval_seconds", CoreAppSettings.model_fields["runtime_stats_interval_seconds"].default),
+        i18n=i18n_s,
+        update_scheduler=update_scheduler_s,
+        throttling=throttling_s,
+        metrics=metrics_s,
+        prometheus=prometheus_s,
+        profiler=profiler_s,
+        tasks=tasks_s,
+        http_client=http_client_s,
+        broadcast=broadcast_s,
+        rbac=rbac_s
     )
     
     final_settings = AppSettings(db=db_s, cache=cache_s, telegram=telegram_s, module_repo=module_repo_s, core=core_s)
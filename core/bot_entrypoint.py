@@ -34,7 +34,12 @@ from core.ui.handlers_core_ui import core_ui_router
 from core.i18n.middleware import I18nMiddleware
 from core.i18n.translator import Translator
 from core.users.middleware import UserStatusMiddleware
+from core.throttling import ThrottlingMiddleware
 from core.logging_manager import LoggingManager
+from core.tasks.service import MEMORY_JOBSTORE
+from core.update_scheduler import UpdateScheduler
+from core.monitoring.update_metrics import install_update_metrics, register_update_scheduler_metrics
+from core.webhook import run_webhook_server, set_telegram_webhook
 
 if TYPE_CHECKING:
     from aiogram.fsm.storage.redis import RedisStorage # <--- ИЗМЕНЕНИЕ: Импорт для type hinting
@@ -107,7 +112,8 @@ async def run_sdb_bot() -> int:
 
     global_logger.info(f"Система логирования инициализирована. "
                        f"Уровень консольного лога: {settings.core.log_level.upper()} (может быть переопределен SDB_CLI_DEBUG_MODE_FOR_LOGGING). "
-                       f"Уровень файлового лога всегда DEBUG (или TRACE, если так задано в LoggingManager).")
+                       f"Уровень файлового лога: {settings.core.log_file_level}"
+                       f"{f' (переопределения: {settings.core.log_level_overrides})' if settings.core.log_level_overrides else ''}.")
 
     global_logger.info(f"🚀 Запуск SwiftDevBot (SDB) v{sdb_version} в {current_process_start_time.strftime('%Y-%m-%d %H:%M:%S %Z')}...")
     global_logger.info(f"🐍 Используется Python v{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}")
@@ -149,17 +155,48 @@ async def run_sdb_bot() -> int:
         await services.setup_services()
         global_logger.success("✅ BotServicesProvider и все его базовые сервисы успешно инициализированы.")
 
+        try:
+            services.user_service.activity.start()
+        except AttributeError as e_user_svc:
+            global_logger.warning(f"Отложенная запись активности пользователей не запущена: {e_user_svc}")
+        services.runtime_stats.register("logging", logging_manager.get_stats)
+        services.runtime_stats.start()
+        try:
+            services.metrics_collector.start()
+        except AttributeError as e_metrics:
+            global_logger.info(f"Фоновый сбор метрик не запущен: {e_metrics}")
+        if settings.core.prometheus.enabled:
+            try:
+                await services.prometheus_exporter.start()
+            except OSError as e_prometheus:
+                global_logger.error(f"Не удалось открыть эндпоинт метрик Prometheus: {e_prometheus}")
+        if settings.core.profiler.enabled:
+            services.loop_profiler.start()
+        if settings.core.tasks.enabled:
+            try:
+                await services.task_scheduler.start()
+                logging_manager.use_shared_scheduler(services.task_scheduler.scheduler, jobstore=MEMORY_JOBSTORE)
+            except Exception as e_tasks:
+                global_logger.error(f"Планировщик задач не запущен: {e_tasks}", exc_info=True)
+
         bot = Bot(
             token=services.config.telegram.token,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML)
         )
         me = await bot.get_me()
         global_logger.info(f"🤖 Экземпляр Telegram Bot успешно создан: @{me.username} (ID: {me.id})")
+        if settings.core.broadcast.resume_on_startup:
+            try:
+                resumed_broadcasts = await services.broadcast.resume_unfinished(bot)
+                if resumed_broadcasts:
+                    global_logger.info(f"Продолжены прерванные рассылки: {resumed_broadcasts}.")
+            except Exception as e_broadcast:
+                global_logger.error(f"Не удалось продолжить прерванные рассылки: {e_broadcast}", exc_info=True)
 
         # <--- ИЗМЕНЕНИЕ: УСЛОВНЫЙ ИМПОРТ И СОЗДАНИЕ ХРАНИЛИЩА ---
         storage: Union[MemoryStorage, "RedisStorage"]
 
-        if services.config.cache.type == "redis" and services.cache.is_available():
+        if services.config.cache.type in ("redis", "tiered") and services.cache.is_available():
             try:
                 # Импортируем RedisStorage только здесь
                 from aiogram.fsm.storage.redis import RedisStorage
@@ -177,7 +214,7 @@ async def run_sdb_bot() -> int:
                 storage = MemoryStorage()
         else:
             storage = MemoryStorage()
-            if services.config.cache.type == "redis":
+            if services.config.cache.type in ("redis", "tiered"):
                 global_logger.warning("Redis был выбран для кэша, но CacheManager недоступен. Используется MemoryStorage для FSM.")
             global_logger.info("FSM Storage: используется MemoryStorage.")
         # <--- КОНЕЦ ИЗМЕНЕНИЯ ---
@@ -185,6 +222,41 @@ async def run_sdb_bot() -> int:
         dp = Dispatcher(storage=storage, services_provider=services)
         global_logger.info("🚦 Dispatcher и FSM Storage инициализированы.")
 
+        update_scheduler: Optional[UpdateScheduler] = None
+        scheduler_settings = settings.core.update_scheduler
+        if scheduler_settings.enabled:
+            # Регистрируется первым, чтобы middleware ядра и хендлеры выполнялись в воркерах планировщика
+            update_scheduler = UpdateScheduler(
+                max_concurrency=scheduler_settings.max_concurrency,
+                high_watermark=scheduler_settings.high_watermark,
+                overflow_policy=scheduler_settings.overflow_policy,
+                drain_timeout_seconds=scheduler_settings.drain_timeout_seconds,
+            )
+            update_scheduler.install(dp)
+            services.runtime_stats.register("updates", update_scheduler.get_stats)
+            global_logger.info(f"UpdateScheduler зарегистрирован (воркеров: {scheduler_settings.max_concurrency}).")
+
+        if settings.core.prometheus.enabled:
+            # После планировщика: время ожидания в очереди не входит во время обработки апдейта
+            install_update_metrics(dp)
+            if update_scheduler is not None:
+                register_update_scheduler_metrics(update_scheduler)
+
+        throttling_middleware: Optional[ThrottlingMiddleware] = None
+        if settings.core.throttling.enabled:
+            try:
+                # После планировщика (ожидание кэша до постановки в очередь нарушило бы порядок апдейтов чата),
+                # но до middleware ядра, которые ходят в БД
+                throttling_middleware = ThrottlingMiddleware(
+                    services.cache, settings.core.throttling, exempt_user_ids=settings.core.super_admins
+                )
+                dp.update.outer_middleware(throttling_middleware)
+                services.runtime_stats.register("throttling", throttling_middleware.get_stats)
+                global_logger.info(f"ThrottlingMiddleware зарегистрирован (лимит пользователя: "
+                                   f"{settings.core.throttling.user_limit} апдейтов за {settings.core.throttling.user_window_seconds} сек).")
+            except AttributeError as e_cache:
+                global_logger.warning(f"Антифлуд отключен: кэш недоступен ({e_cache}).")
+
         translator = Translator(
             locales_dir=settings.core.i18n.locales_dir,
             domain=settings.core.i18n.domain,
@@ -211,6 +283,8 @@ async def run_sdb_bot() -> int:
 
         module_loader: ModuleLoader = services.modules
         await module_loader.initialize_and_setup_modules(dp=dp, bot=bot)
+        if throttling_middleware is not None:
+            throttling_middleware.rules.load_from_modules(module_loader.get_loaded_modules_info())
 
         num_enabled_plugins = len(module_loader.enabled_plugin_names)
         num_loaded_plugins = sum(1 for mi in module_loader.get_loaded_modules_info(include_system=False, include_plugins=True) if mi.is_enabled)
@@ -234,8 +308,11 @@ async def run_sdb_bot() -> int:
             bot_info = await bot.get_me()
             services.logger.info(f"⚡ Событие startup для Dispatcher (бот: @{bot_info.username})...")
             try:
-                await bot.delete_webhook(drop_pending_updates=True)
-                services.logger.info("Webhook удален, ожидающие обновления сброшены.")
+                if services.config.telegram.mode == "webhook":
+                    await set_telegram_webhook(bot, dp, services.config.telegram)
+                else:
+                    await bot.delete_webhook(drop_pending_updates=True)
+                    services.logger.info("Webhook удален, ожидающие обновления сброшены.")
             except Exception as e_startup_hook:
                 services.logger.error(f"Ошибка на этапе startup диспетчера: {e_startup_hook}", exc_info=True)
 
@@ -277,9 +354,13 @@ async def run_sdb_bot() -> int:
             global_logger.info(f"🏁 Процедура остановки бота @{bot_info.username} почти завершена (сервисы будут закрыты в finally).")
 
         bot_username_for_log = (await bot.get_me()).username
-        global_logger.info(f"📡 Запуск Telegram Bot Polling для @{bot_username_for_log}...")
-
-        await dp.start_polling(bot)
+        if settings.telegram.mode == "webhook":
+            global_logger.info(f"🌐 Запуск Telegram Bot в режиме webhook для @{bot_username_for_log}...")
+            # С планировщиком запрос Telegram ждет постановки апдейта в очередь - это и есть backpressure
+            await run_webhook_server(dp, bot, settings.telegram, handle_in_background=update_scheduler is None)
+        else:
+            global_logger.info(f"📡 Запуск Telegram Bot Polling для @{bot_username_for_log}...")
+            await dp.start_polling(bot, handle_as_tasks=update_scheduler is None)
         exit_code_internal = 0
 
     except (KeyboardInterrupt, SystemExit) as e_exit:
@@ -300,6 +381,12 @@ async def run_sdb_bot() -> int:
                 global_logger.warning(f"Предупреждение при операциях с объектом бота в finally: {type(e_bot_close).__name__} - {e_bot_close}", exc_info=True)
 
         if services:
+            try:
+                await services.user_service.activity.stop()
+            except AttributeError:
+                pass
+            except Exception as e_activity_flush:
+                global_logger.error(f"Ошибка при финальном сбросе активности пользователей: {e_activity_flush}", exc_info=True)
             try:
                 await services.close_services()
                 global_logger.info("Все сервисы BotServicesProvider корректно остановлены в блоке finally.")
@@ -0,0 +1,5 @@
+# core/broadcast/__init__.py
+from .limiter import TelegramRateLimiter
+from .service import BroadcastProgress, BroadcastService
+
+__all__ = ["TelegramRateLimiter", "BroadcastProgress", "BroadcastService"]
@@ -0,0 +1,82 @@
+# core/broadcast/limiter.py
+import asyncio
+import time
+from typing import Any, Dict
+
+# Сколько чатов помнить, прежде чем выбросить те, чей интервал уже истек
+_CHAT_SLOTS_PRUNE_THRESHOLD = 10000
+
+
+class TelegramRateLimiter:
+    """
+    Лимиты Bot API для массовой отправки.
+
+    - Общий token bucket: не больше rate_per_second сообщений в секунду на бота (Telegram - около 30).
+    - Интервал между сообщениями в один чат: личный чат - 1 сообщение в секунду, группа - 20 в минуту
+      (группы и каналы - отрицательные chat_id).
+    - retry_after из ответа 429 приостанавливает всю отправку: flood control Telegram действует на бота,
+      а не на отдельный чат, и продолжение отправки только продлевает блокировку.
+    """
+
+    def __init__(self, rate_per_second: float = 25.0, burst: int = 1,
+                 private_chat_interval_seconds: float = 1.0, group_chat_interval_seconds: float = 3.0):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second должен быть больше 0.")
+        self._rate = float(rate_per_second)
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._private_interval = private_chat_interval_seconds
+        self._group_interval = group_chat_interval_seconds
+        self._lock = asyncio.Lock()
+        self._paused_until = 0.0
+        self._chat_next_slot: Dict[int, float] = {}
+        self._retry_after_total = 0
+        self._max_retry_after = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Приостановить всю отправку на seconds (retry_after из ответа Telegram)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + max(0.0, float(seconds)))
+        self._retry_after_total += 1
+        self._max_retry_after = max(self._max_retry_after, float(seconds))
+
+    @property
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    async def _wait_chat_slot(self, chat_id: int) -> None:
+        interval = self._group_interval if chat_id < 0 else self._private_interval
+        if interval <= 0:
+            return
+        now = time.monotonic()
+        # Слот резервируется до ожидания - параллельные сообщения в один чат выстраиваются в очередь
+        slot = max(now, self._chat_next_slot.get(chat_id, 0.0))
+        self._chat_next_slot[chat_id] = slot + interval
+        if len(self._chat_next_slot) > _CHAT_SLOTS_PRUNE_THRESHOLD:
+            self._chat_next_slot = {chat: next_slot for chat, next_slot in self._chat_next_slot.items() if next_slot > now}
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def acquire(self, chat_id: int) -> None:
+        """Ждет, пока в chat_id можно отправить следующее сообщение."""
+        await self._wait_chat_slot(chat_id)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": self._rate,
+            "paused_for_seconds": round(self.paused_for, 1),
+            "retry_after_total": self._retry_after_total,
+            "max_retry_after_seconds": self._max_retry_after,
+        }
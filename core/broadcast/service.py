@@ -0,0 +1,447 @@
+# core/broadcast/service.py
+"""
+Массовые рассылки всем активным пользователям бота (sdb bot broadcast, админ-панель).
+
+Получатели читаются из БД пачками по keyset-курсору (User.id > последний обработанный), поэтому
+память не зависит от числа пользователей. После каждой пачки курсор и счетчики сохраняются в
+sdb_broadcasts - рассылка, прерванная остановкой или падением бота, продолжается с места остановки
+(сообщения последней незавершенной пачки могут уйти повторно). Отправка идет через
+TelegramRateLimiter: общий лимит в секунду, интервал на чат и пауза по retry_after.
+"""
+import asyncio
+import inspect
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from aiogram.exceptions import (
+    TelegramAPIError, TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter,
+    TelegramServerError,
+)
+from loguru import logger
+from sqlalchemy import and_, func, or_, select, update
+
+from core.database.core_models import Broadcast, User
+from core.monitoring.prometheus import REGISTRY
+from .limiter import TelegramRateLimiter
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+    from core.app_settings import BroadcastSettings
+    from core.database.manager import DBManager
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_PAUSED = "paused"
+# Бот остановился, пока шла рассылка - продолжится при следующем старте
+STATUS_INTERRUPTED = "interrupted"
+STATUS_COMPLETED = "completed"
+STATUS_CANCELLED = "cancelled"
+STATUS_FAILED = "failed"
+RESUMABLE_STATUSES = (STATUS_PENDING, STATUS_PAUSED, STATUS_INTERRUPTED)
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_CANCELLED, STATUS_FAILED)
+
+RESULT_SENT = "sent"
+RESULT_FAILED = "failed"
+RESULT_BLOCKED = "blocked"
+
+BROADCAST_MESSAGES_TOTAL = REGISTRY.counter(
+    "sdb_broadcast_messages_total", "Сообщения рассылок по результату: sent, failed, blocked.", ("result",)
+)
+BROADCAST_RETRY_AFTER_TOTAL = REGISTRY.counter(
+    "sdb_broadcast_retry_after_total", "Ответы Telegram 429 (flood control) во время рассылок."
+)
+BROADCASTS_RUNNING = REGISTRY.gauge("sdb_broadcasts_running", "Рассылки, выполняющиеся сейчас в этом процессе.")
+
+# Пауза перед повтором после сетевой ошибки: 1, 2, 4... секунд, не больше
+NETWORK_RETRY_MAX_DELAY_SECONDS = 30.0
+
+
+@dataclass
+class BroadcastProgress:
+    broadcast_id: int
+    status: str
+    total: int
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    cursor_user_id: int = 0
+    last_error: Optional[str] = None
+    messages_per_second: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.failed + self.blocked
+
+    @property
+    def percent(self) -> float:
+        if self.total <= 0:
+            return 100.0 if self.status == STATUS_COMPLETED else 0.0
+        return min(100.0, self.processed * 100.0 / self.total)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["processed"] = self.processed
+        data["percent"] = round(self.percent, 1)
+        return data
+
+
+ProgressCallback = Callable[[BroadcastProgress], Union[None, Awaitable[None]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BroadcastService:
+    """
+    Создание, запуск, пауза и отмена рассылок.
+
+    Рассылку выполняет тот процесс, который ее запустил (бот - из админ-панели, CLI - `sdb bot broadcast`).
+    Пауза и отмена - это смена статуса в БД: выполняющий процесс проверяет статус после каждой пачки,
+    поэтому управлять рассылкой можно из любого процесса. Пока рассылка идет, updated_at обновляется
+    не реже stale_after_seconds / 4; "running" без обновлений дольше stale_after_seconds считается
+    брошенной (процесс упал) и может быть продолжена.
+    """
+
+    def __init__(self, db_manager: 'DBManager', settings: Optional['BroadcastSettings'] = None):
+        if settings is None:
+            from core.app_settings import BroadcastSettings
+            settings = BroadcastSettings()
+        self._db = db_manager
+        self._settings = settings
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._progress: Dict[int, BroadcastProgress] = {}
+        # Один лимитер на бота: лимит Telegram и retry_after действуют на бота, а не на рассылку,
+        # поэтому одновременные рассылки делят общий бюджет и общую паузу
+        self._limiter = TelegramRateLimiter(
+            rate_per_second=settings.global_rate_per_second,
+            private_chat_interval_seconds=settings.private_chat_interval_seconds,
+            group_chat_interval_seconds=settings.group_chat_interval_seconds,
+        )
+
+    @property
+    def settings(self) -> 'BroadcastSettings':
+        return self._settings
+
+    # --- Данные ---
+
+    async def create(self, text: Optional[str] = None, parse_mode: Optional[str] = "HTML",
+                     source_chat_id: Optional[int] = None, source_message_id: Optional[int] = None,
+                     created_by: Optional[int] = None) -> Broadcast:
+        """Новая рассылка (status=pending): текст или копия сообщения source_chat_id/source_message_id."""
+        if not (text and text.strip()) and not (source_chat_id and source_message_id):
+            raise ValueError("Для рассылки нужен текст или сообщение-образец.")
+        async with self._db.get_session() as session:
+            broadcast = Broadcast(
+                status=STATUS_PENDING, text=text if not source_message_id else None,
+                parse_mode=parse_mode if not source_message_id else None,
+                source_chat_id=source_chat_id, source_message_id=source_message_id, created_by=created_by,
+                cursor_user_id=0, total_recipients=0, sent_count=0, failed_count=0, blocked_count=0,
+            )
+            session.add(broadcast)
+            await session.commit()
+            await session.refresh(broadcast)
+        logger.info(f"Рассылка #{broadcast.id} создана (автор: {created_by or 'CLI'}).")
+        return broadcast
+
+    async def get(self, broadcast_id: int) -> Optional[Broadcast]:
+        async with self._db.get_session() as session:
+            return await session.get(Broadcast, broadcast_id)
+
+    async def list_recent(self, limit: int = 10) -> List[Broadcast]:
+        async with self._db.get_session() as session:
+            result = await session.execute(select(Broadcast).order_by(Broadcast.id.desc()).limit(limit))
+            return list(result.scalars().all())
+
+    @staticmethod
+    def _recipients_filter(after_user_id: int):
+        return and_(User.id > after_user_id, User.is_active.is_(True), User.is_bot_blocked.is_(False))
+
+    async def count_recipients(self, after_user_id: int = 0) -> int:
+        async with self._db.get_session() as session:
+            result = await session.execute(select(func.count(User.id)).where(self._recipients_filter(after_user_id)))
+            return int(result.scalar_one() or 0)
+
+    async def _next_recipients(self, after_user_id: int, limit: int) -> List[Tuple[int, int]]:
+        """Следующая пачка (DB ID, Telegram ID) по первичному ключу - без OFFSET и без загрузки ORM-объектов."""
+        async with self._db.get_session() as session:
+            result = await session.execute(
+                select(User.id, User.telegram_id)
+                .where(self._recipients_filter(after_user_id))
+                .order_by(User.id)
+                .limit(limit)
+            )
+            return [(row[0], row[1]) for row in result.all()]
+
+    # --- Управление ---
+
+    async def _set_status(self, broadcast_id: int, status: str, allowed_from: Tuple[str, ...]) -> bool:
+        values: Dict[str, Any] = {"status": status, "updated_at": _utcnow()}
+        if status in FINISHED_STATUSES:
+            values["finished_at"] = _utcnow()
+        async with self._db.get_session() as session:
+            result = await session.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id, Broadcast.status.in_(allowed_from))
+                .values(**values)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def pause(self, broadcast_id: int) -> bool:
+        """Приостанавливает рассылку (выполняющий процесс остановится после текущей пачки)."""
+        return await self._set_status(broadcast_id, STATUS_PAUSED, (STATUS_PENDING, STATUS_RUNNING, STATUS_INTERRUPTED))
+
+    async def cancel(self, broadcast_id: int) -> bool:
+        """Отменяет рассылку окончательно."""
+        return await self._set_status(broadcast_id, STATUS_CANCELLED, (STATUS_RUNNING,) + RESUMABLE_STATUSES)
+
+    def is_running_here(self, broadcast_id: int) -> bool:
+        return broadcast_id in self._tasks
+
+    def get_progress(self, broadcast_id: int) -> Optional[BroadcastProgress]:
+        """Текущий прогресс рассылки, выполняющейся в этом процессе."""
+        return self._progress.get(broadcast_id)
+
+    def start(self, bot: 'Bot', broadcast_id: int, on_progress: Optional[ProgressCallback] = None) -> asyncio.Task:
+        """Запускает (или продолжает) рассылку в фоне этого процесса."""
+        task = self._tasks.get(broadcast_id)
+        if task is not None and not task.done():
+            return task
+        task = asyncio.create_task(self._run_logged(bot, broadcast_id, on_progress), name=f"sdb-broadcast-{broadcast_id}")
+        self._tasks[broadcast_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+        return task
+
+    async def _run_logged(self, bot: 'Bot', broadcast_id: int, on_progress: Optional[ProgressCallback]) -> Optional[BroadcastProgress]:
+        try:
+            return await self.run(bot, broadcast_id, on_progress=on_progress)
+        except ValueError as e:
+            logger.warning(str(e))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Рассылка #{broadcast_id} завершилась с ошибкой: {e}", exc_info=True)
+        return None
+
+    async def resume_unfinished(self, bot: 'Bot') -> List[int]:
+        """Продолжает рассылки, прерванные остановкой бота или брошенные упавшим процессом."""
+        stale_before = _utcnow() - timedelta(seconds=self._settings.stale_after_seconds)
+        async with self._db.get_session() as session:
+            result = await session.execute(
+                select(Broadcast.id).where(or_(
+                    Broadcast.status == STATUS_INTERRUPTED,
+                    and_(Broadcast.status == STATUS_RUNNING, Broadcast.updated_at < stale_before),
+                )).order_by(Broadcast.id)
+            )
+            broadcast_ids = [row[0] for row in result.all()]
+        for broadcast_id in broadcast_ids:
+            logger.info(f"Продолжение прерванной рассылки #{broadcast_id}.")
+            self.start(bot, broadcast_id)
+        return broadcast_ids
+
+    async def stop(self) -> None:
+        """Останавливает рассылки этого процесса; они получают статус interrupted и продолжатся при следующем старте."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- Выполнение ---
+
+    async def _claim(self, broadcast_id: int) -> Broadcast:
+        """Переводит рассылку в running; брошенная running (без обновлений stale_after_seconds) тоже забирается."""
+        stale_before = _utcnow() - timedelta(seconds=self._settings.stale_after_seconds)
+        now = _utcnow()
+        async with self._db.get_session() as session:
+            result = await session.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id, or_(
+                    Broadcast.status.in_(RESUMABLE_STATUSES),
+                    and_(Broadcast.status == STATUS_RUNNING, Broadcast.updated_at < stale_before),
+                ))
+                .values(status=STATUS_RUNNING, updated_at=now, started_at=func.coalesce(Broadcast.started_at, now))
+            )
+            await session.commit()
+            broadcast = await session.get(Broadcast, broadcast_id, populate_existing=True)
+        if broadcast is None:
+            raise ValueError(f"Рассылка #{broadcast_id} не найдена.")
+        if result.rowcount == 0:
+            if broadcast.status == STATUS_RUNNING:
+                raise ValueError(f"Рассылка #{broadcast_id} уже выполняется другим процессом.")
+            raise ValueError(f"Рассылка #{broadcast_id} уже завершена (статус: {broadcast.status}).")
+        return broadcast
+
+    async def _save_progress(self, progress: BroadcastProgress, blocked_user_ids: List[int]) -> str:
+        """Сохраняет курсор и счетчики, помечает заблокировавших бота; возвращает текущий статус рассылки в БД."""
+        async with self._db.get_session() as session:
+            if blocked_user_ids:
+                await session.execute(update(User).where(User.id.in_(blocked_user_ids)).values(is_bot_blocked=True))
+            await session.execute(
+                update(Broadcast).where(Broadcast.id == progress.broadcast_id).values(
+                    cursor_user_id=progress.cursor_user_id, sent_count=progress.sent, failed_count=progress.failed,
+                    blocked_count=progress.blocked, last_error=progress.last_error, updated_at=_utcnow(),
+                )
+            )
+            status = (await session.execute(select(Broadcast.status).where(Broadcast.id == progress.broadcast_id))).scalar_one()
+            await session.commit()
+        return status
+
+    async def _heartbeat(self, broadcast_id: int) -> None:
+        interval = max(1.0, self._settings.stale_after_seconds / 4)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._db.get_session() as session:
+                    await session.execute(update(Broadcast).where(Broadcast.id == broadcast_id).values(updated_at=_utcnow()))
+                    await session.commit()
+            except Exception as e:
+                logger.warning(f"Рассылка #{broadcast_id}: не удалось обновить отметку активности: {e}")
+
+    async def _send_one(self, bot: 'Bot', broadcast: Broadcast, chat_id: int) -> None:
+        if broadcast.source_message_id:
+            await bot.copy_message(chat_id=chat_id, from_chat_id=broadcast.source_chat_id,
+                                   message_id=broadcast.source_message_id)
+        else:
+            await bot.send_message(chat_id=chat_id, text=broadcast.text, parse_mode=broadcast.parse_mode)
+
+    async def _deliver(self, bot: 'Bot', broadcast: Broadcast, chat_id: int) -> Tuple[str, Optional[str]]:
+        """Отправляет сообщение одному получателю: (результат, ошибка)."""
+        network_retries = 0
+        retry_after_waits = 0
+        while True:
+            await self._limiter.acquire(chat_id)
+            try:
+                await self._send_one(bot, broadcast, chat_id)
+                return RESULT_SENT, None
+            except TelegramRetryAfter as e:
+                BROADCAST_RETRY_AFTER_TOTAL.inc()
+                self._limiter.pause(e.retry_after)
+                retry_after_waits += 1
+                if retry_after_waits > self._settings.max_retry_after_waits:
+                    return RESULT_FAILED, f"Flood control: {e.message}"
+                logger.warning(f"Рассылка #{broadcast.id}: flood control, пауза {e.retry_after} с.")
+            except TelegramForbiddenError as e:
+                return RESULT_BLOCKED, e.message
+            except TelegramBadRequest as e:
+                return RESULT_FAILED, e.message
+            except (TelegramNetworkError, TelegramServerError) as e:
+                network_retries += 1
+                if network_retries > self._settings.max_retries:
+                    return RESULT_FAILED, str(e)
+                delay = min(NETWORK_RETRY_MAX_DELAY_SECONDS, 2 ** (network_retries - 1))
+                await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+            except TelegramAPIError as e:
+                return RESULT_FAILED, str(e)
+
+    async def _notify(self, on_progress: Optional[ProgressCallback], progress: BroadcastProgress) -> None:
+        if on_progress is None:
+            return
+        try:
+            result = on_progress(progress)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Рассылка #{progress.broadcast_id}: ошибка в обработчике прогресса: {e}")
+
+    async def run(self, bot: 'Bot', broadcast_id: int, on_progress: Optional[ProgressCallback] = None) -> BroadcastProgress:
+        """
+        Выполняет рассылку в текущей задаче до конца, паузы или отмены (проверяется после каждой пачки).
+        ValueError - рассылка не найдена, уже завершена или выполняется другим процессом.
+        """
+        broadcast = await self._claim(broadcast_id)
+        if broadcast.cursor_user_id == 0 and broadcast.processed_count == 0:
+            total = await self.count_recipients()
+            async with self._db.get_session() as session:
+                await session.execute(update(Broadcast).where(Broadcast.id == broadcast_id).values(total_recipients=total))
+                await session.commit()
+            broadcast.total_recipients = total
+
+        settings = self._settings
+        progress = BroadcastProgress(
+            broadcast_id=broadcast_id, status=STATUS_RUNNING, total=broadcast.total_recipients,
+            sent=broadcast.sent_count, failed=broadcast.failed_count, blocked=broadcast.blocked_count,
+            cursor_user_id=broadcast.cursor_user_id, last_error=broadcast.last_error,
+        )
+        semaphore = asyncio.Semaphore(settings.concurrency)
+
+        async def deliver_limited(chat_id: int) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                return await self._deliver(bot, broadcast, chat_id)
+
+        self._progress[broadcast_id] = progress
+        heartbeat = asyncio.create_task(self._heartbeat(broadcast_id))
+        BROADCASTS_RUNNING.inc()
+        logger.info(f"Рассылка #{broadcast_id}: старт с курсора {progress.cursor_user_id}, получателей: {progress.total}.")
+        started_at = time.monotonic()
+        processed_at_start = progress.processed
+        final_status = STATUS_COMPLETED
+        # Запросы к БД не прерываются отменой: сессия, брошенная посреди транзакции, держит блокировку SQLite,
+        # и запись статуса interrupted ниже падала бы с "database is locked"
+        db_step: Optional[asyncio.Future] = None
+        try:
+            while True:
+                db_step = asyncio.ensure_future(self._next_recipients(progress.cursor_user_id, settings.batch_size))
+                recipients = await asyncio.shield(db_step)
+                if not recipients:
+                    break
+                results = await asyncio.gather(*(deliver_limited(chat_id) for _, chat_id in recipients))
+
+                blocked_user_ids = []
+                for (user_id, _), (outcome, error) in zip(recipients, results):
+                    BROADCAST_MESSAGES_TOTAL.inc(result=outcome)
+                    if outcome == RESULT_SENT:
+                        progress.sent += 1
+                    elif outcome == RESULT_BLOCKED:
+                        progress.blocked += 1
+                        blocked_user_ids.append(user_id)
+                    else:
+                        progress.failed += 1
+                        progress.last_error = error
+                progress.cursor_user_id = recipients[-1][0]
+                elapsed = time.monotonic() - started_at
+                progress.messages_per_second = round((progress.processed - processed_at_start) / elapsed, 1) if elapsed > 0 else 0.0
+
+                db_step = asyncio.ensure_future(self._save_progress(progress, blocked_user_ids))
+                db_status = await asyncio.shield(db_step)
+                await self._notify(on_progress, progress)
+                if db_status != STATUS_RUNNING:
+                    final_status = db_status
+                    logger.info(f"Рассылка #{broadcast_id} остановлена извне (статус: {db_status}).")
+                    break
+        except asyncio.CancelledError:
+            if db_step is not None:
+                await asyncio.gather(db_step, return_exceptions=True)
+            await asyncio.shield(self._set_status(broadcast_id, STATUS_INTERRUPTED, (STATUS_RUNNING,)))
+            progress.status = STATUS_INTERRUPTED
+            logger.info(f"Рассылка #{broadcast_id} прервана на курсоре {progress.cursor_user_id}, продолжится при следующем старте.")
+            raise
+        except Exception as e:
+            progress.last_error = f"{type(e).__name__}: {e}"
+            await self._save_progress(progress, [])
+            await self._set_status(broadcast_id, STATUS_FAILED, (STATUS_RUNNING,))
+            progress.status = STATUS_FAILED
+            await self._notify(on_progress, progress)
+            raise
+        finally:
+            heartbeat.cancel()
+            BROADCASTS_RUNNING.dec()
+            self._progress.pop(broadcast_id, None)
+
+        if final_status == STATUS_COMPLETED:
+            await self._set_status(broadcast_id, STATUS_COMPLETED, (STATUS_RUNNING,))
+        progress.status = final_status
+        await self._notify(on_progress, progress)
+        logger.info(f"Рассылка #{broadcast_id}: {final_status}. Доставлено {progress.sent}, "
+                    f"заблокировали бота {progress.blocked}, ошибок {progress.failed}.")
+        return progress
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": [progress.to_dict() for progress in self._progress.values()],
+            "limiter": self._limiter.get_stats(),
+        }
@@ -0,0 +1,47 @@
+# core/cache/invalidation.py
+import asyncio
+from typing import Awaitable, Callable, Set
+
+from loguru import logger
+from sqlalchemy import event as sa_event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CommitInvalidator:
+    """
+    Инвалидация кэша для изменений, которые применит commit вызывающего кода.
+
+    Кэш чистится сразу и повторно после commit сессии, чтобы параллельный апдейт не успел
+    положить в кэш строку, прочитанную до коммита. Хук after_commit синхронный, поэтому
+    повторная инвалидация выполняется задачей: ссылки на задачи хранятся до их завершения,
+    ошибки логируются, а drain() дожидается оставшихся задач при остановке сервиса.
+    """
+
+    def __init__(self, service_name: str):
+        self._logger = logger.bind(service=service_name)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _run(self, invalidate: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await invalidate()
+        except Exception as e:
+            self._logger.error(f"Ошибка инвалидации кэша: {e}", exc_info=True)
+
+    async def now_and_after_commit(self, session: AsyncSession, invalidate: Callable[[], Awaitable[None]]) -> None:
+        await self._run(invalidate)
+        loop = asyncio.get_running_loop()
+
+        def _after_commit(_sync_session) -> None:
+            task = loop.create_task(self._run(invalidate))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        sa_event.listen(session.sync_session, "after_commit", _after_commit, once=True)
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*tuple(self._tasks), return_exceptions=True)
@@ -1,9 +1,12 @@
 # core/cache/manager.py
 
 import asyncio
+import json
+import math
+import random
 import time
-import pickle
-from typing import Optional, Any, Union, TYPE_CHECKING
+import uuid
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, Tuple, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 # Используем redis.asyncio для асинхронной работы с Redis
@@ -20,16 +23,33 @@ except ImportError:
     RedisTimeoutError = asyncio.TimeoutError # Фоллбэк на asyncio.TimeoutError
     REDIS_PY_AVAILABLE = False
 
-try:
-    from cachetools import TTLCache
-except ImportError:
-    TTLCache = None # type: ignore
-
 from loguru import logger
 
+from .memory_engine import ShardedMemoryStore, EvictionPolicy
+from .serializers import CacheSerializer
+from core.monitoring.prometheus import REGISTRY
+
 if TYPE_CHECKING:
     from core.app_settings import CacheSettings
 
+# Маркер "конверта", в котором get_or_load хранит значение вместе со сроком свежести
+# (нужен только для stale-while-revalidate и вероятностного раннего обновления)
+LOADED_ENVELOPE_MARKER = "__sdb_loaded__"
+SINGLE_FLIGHT_LOCK_SUFFIX = ":__lock"
+
+_MISSING = object()
+
+CACHE_REQUESTS_TOTAL = REGISTRY.counter(
+    "sdb_cache_requests_total", "Чтения кэша через CacheManager по операции и результату (hit/miss).", ("operation", "result")
+)
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 class BaseCache(ABC):
     @abstractmethod
     async def initialize(self) -> None: pass
@@ -46,81 +66,113 @@ class BaseCache(ABC):
     @abstractmethod
     async def clear(self) -> None: raise NotImplementedError
 
+    # Пакетные операции. Бэкенды могут переопределить их более эффективной реализацией.
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        for key, value in items.items():
+            await self.set(key, value, ttl_seconds=ttl_seconds)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        for key in keys:
+            if await self.delete(key):
+                deleted += 1
+        return deleted
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        """Увеличивает целочисленный счетчик. TTL применяется только при создании ключа."""
+        current = await self.get(key)
+        new_value = int(current or 0) + amount
+        await self.set(key, new_value, ttl_seconds=ttl_seconds)
+        return new_value
+
+    async def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        """Записывает value, только если ключа нет. Возвращает значение, которое в итоге лежит в кэше."""
+        existing = await self.get(key)
+        if existing is not None:
+            return existing
+        await self.set(key, value, ttl_seconds=ttl_seconds)
+        return value
+
+    async def acquire_lock(self, name: str, ttl_seconds: float) -> Optional[str]:
+        """
+        Короткая блокировка между процессами для get_or_load. Возвращает токен или None, если
+        блокировка занята. Внутрипроцессному кэшу она не нужна - хватает single-flight в CacheManager.
+        """
+        return "local"
+
+    async def release_lock(self, name: str, token: str) -> None:
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {}
+
 class MemoryCache(BaseCache):
-    def __init__(self, maxsize: int = 1024, default_ttl: int = 300):
+    def __init__(self, maxsize: int = 10000, default_ttl: int = 300, max_bytes: int = 0,
+                 policy: EvictionPolicy = "lru", shards: int = 8):
         self._default_ttl = default_ttl
-        if TTLCache:
-            self._cache: Union[TTLCache, dict] = TTLCache(maxsize=maxsize, ttl=default_ttl)
-            self._uses_cachetools = True
-        else:
-            logger.warning("Библиотека 'cachetools' не найдена. Используется простая ручная реализация MemoryCache с TTL.")
-            self._cache = {} 
-            self._maxsize = maxsize
-            self._uses_cachetools = False
-        logger.info(f"MemoryCache инициализирован (использует cachetools: {self._uses_cachetools}, default TTL: {default_ttl}s).")
+        self._store = ShardedMemoryStore(
+            maxsize=maxsize, max_bytes=max_bytes, policy=policy, shards=shards, default_ttl=default_ttl
+        )
+        logger.info(f"MemoryCache инициализирован (maxsize: {maxsize}, max_bytes: {max_bytes or 'без лимита'}, "
+                    f"вытеснение: {policy}, шард: {shards}, default TTL: {default_ttl}s).")
 
     async def initialize(self) -> None: logger.debug("MemoryCache.initialize() - операция не требуется.")
     async def dispose(self) -> None: await self.clear(); logger.debug("MemoryCache.dispose() - кэш очищен.")
 
     async def get(self, key: str) -> Optional[Any]:
-        if self._uses_cachetools and isinstance(self._cache, TTLCache):
-            try: return self._cache[key]
-            except KeyError: return None
-        elif isinstance(self._cache, dict):
-            item = self._cache.get(key)
-            if item:
-                value, expiry_timestamp = item
-                if time.time() < expiry_timestamp: return value
-                else: 
-                    # Явно удаляем просроченный ключ
-                    await self.delete(key) 
-            return None
-        return None
+        return self._store.get(key)
 
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
-        effective_ttl = ttl_seconds if ttl_seconds is not None else self._default_ttl
-        if self._uses_cachetools and isinstance(self._cache, TTLCache):
-            if ttl_seconds is not None and ttl_seconds != self._cache.ttl: # type: ignore
-                 # TTLCache имеет общий TTL, но можно хранить время истечения отдельно, если очень нужно.
-                 # Пока оставляем как есть - используем общий TTL.
-                 logger.trace(f"MemoryCache (TTLCache) использует общий TTL ({self._cache.ttl} сек) для всех ключей.") # type: ignore
-            self._cache[key] = value
-        elif isinstance(self._cache, dict):
-            if len(self._cache) >= self._maxsize and key not in self._cache:
-                # Простая LRU-подобная логика: удаляем самый старый (первый добавленный)
-                # Это не настоящий LRU, но для простой реализации сойдет.
-                try:
-                    oldest_key = next(iter(self._cache))
-                    del self._cache[oldest_key]
-                    logger.trace(f"MemoryCache достиг maxsize, удален ключ (FIFO-like): {oldest_key}")
-                except StopIteration: pass # Пустой словарь
-            self._cache[key] = (value, time.time() + effective_ttl)
+        self._store.set(key, value, ttl_seconds=ttl_seconds)
 
     async def delete(self, key: str) -> bool:
-        if key in self._cache: 
-            del self._cache[key]
-            return True
-        return False
+        return self._store.delete(key)
 
     async def exists(self, key: str) -> bool: 
-        # Для TTLCache проверка на существование автоматически учитывает TTL
-        # Для ручной реализации get() также проверяет TTL
-        return await self.get(key) is not None
+        return self._store.contains(key)
 
     async def clear(self) -> None: 
-        self._cache.clear()
+        self._store.clear()
         logger.info("MemoryCache очищен.")
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return self._store.get_many(keys)
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        self._store.set_many(items, ttl_seconds=ttl_seconds)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        return self._store.delete_many(keys)
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        return self._store.incr(key, amount, ttl_seconds=ttl_seconds)
+
+    async def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        return self._store.get_or_set(key, value, ttl_seconds=ttl_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._store.get_stats()}
+
 
 class RedisCache(BaseCache):
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, serializer: Optional[CacheSerializer] = None):
         if not REDIS_PY_AVAILABLE:
             msg = "Библиотека 'redis' (с поддержкой asyncio) не установлена. `pip install redis`. RedisCache не будет работать."
             logger.critical(msg)
             raise ImportError(msg)
         self.redis_url = redis_url
         self._redis_client: Optional[AsyncRedisClient] = None
-        logger.info(f"RedisCache инициализирован для URL: {self.redis_url} (используя redis.asyncio)")
+        self._serializer = serializer or CacheSerializer()
+        logger.info(f"RedisCache инициализирован для URL: {self.redis_url} (используя redis.asyncio, "
+                    f"сериализатор: {self._serializer.serializer}, сжатие: {self._serializer.compression})")
 
     async def initialize(self) -> None:
         logger.debug(f"RedisCache: Попытка инициализации для URL: {self.redis_url}")
@@ -132,7 +184,7 @@ class RedisCache(BaseCache):
             logger.debug(f"RedisCache: Вызов redis.asyncio.from_url('{self.redis_url}')")
             self._redis_client = redis_async.from_url(
                 self.redis_url, 
-                decode_responses=False, # Важно для pickle
+                decode_responses=False, # Значения - байты от CacheSerializer
                 socket_timeout=5,
                 socket_connect_timeout=5,
                 # health_check_interval=30 # Опционально
@@ -184,22 +236,55 @@ class RedisCache(BaseCache):
     async def get(self, key: str) -> Optional[Any]:
         if not self._redis_client: return None
         try:
-            pickled_value = await self._redis_client.get(key)
-            if pickled_value: return pickle.loads(pickled_value)
+            raw_value = await self._redis_client.get(key)
+            if raw_value: return self._serializer.loads(raw_value)
             return None
         except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при GET для ключа '{key}': {e}"); return None
-        except pickle.UnpicklingError as e: logger.error(f"RedisCache: Ошибка десериализации для ключа '{key}': {e}"); return None
-        except Exception as e_unexp: logger.error(f"RedisCache: Неожиданная ошибка GET для ключа '{key}': {e_unexp}"); return None
+        except Exception as e_unexp: logger.error(f"RedisCache: Ошибка GET/десериализации для ключа '{key}': {e_unexp}"); return None
 
 
+    @staticmethod
+    def _remaining_ttl(pttl: int) -> Optional[float]:
+        # PTTL: -1 - ключ без срока, -2 - ключа уже нет
+        if pttl == -1: return None
+        return max(pttl, 0) / 1000
+
+    async def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Значение и оставшийся срок жизни ключа в секундах (None - ключ без срока) одним запросом."""
+        if not self._redis_client: return None, None
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw_value, pttl = await pipe.execute()
+            if raw_value: return self._serializer.loads(raw_value), self._remaining_ttl(pttl)
+            return None, None
+        except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при GET/PTTL для ключа '{key}': {e}"); return None, None
+        except Exception as e_unexp: logger.error(f"RedisCache: Ошибка GET/десериализации для ключа '{key}': {e_unexp}"); return None, None
+
+    async def get_many_with_ttl(self, keys: Iterable[str]) -> Dict[str, Tuple[Any, Optional[float]]]:
+        keys = list(keys)
+        if not self._redis_client or not keys: return {}
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                pipe.mget(keys)
+                for key in keys:
+                    pipe.pttl(key)
+                raw_values, *pttls = await pipe.execute()
+        except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при MGET/PTTL ({len(keys)} ключей): {e}"); return {}
+        found: Dict[str, Tuple[Any, Optional[float]]] = {}
+        for key, raw_value, pttl in zip(keys, raw_values, pttls):
+            if not raw_value: continue
+            try: found[key] = (self._serializer.loads(raw_value), self._remaining_ttl(pttl))
+            except Exception as e: logger.error(f"RedisCache: Ошибка десериализации для ключа '{key}': {e}")
+        return found
+
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
         if not self._redis_client: return
         try:
-            pickled_value = pickle.dumps(value)
-            await self._redis_client.set(key, pickled_value, ex=ttl_seconds)
-        except pickle.PicklingError as e: logger.error(f"RedisCache: Ошибка сериализации для ключа '{key}': {e}")
+            await self._redis_client.set(key, self._serializer.dumps(value), ex=ttl_seconds)
         except RedisError as e_redis: logger.error(f"RedisCache: Ошибка Redis при SET для ключа '{key}': {e_redis}")
-        except Exception as e_unexp: logger.error(f"RedisCache: Неожиданная ошибка SET для ключа '{key}': {e_unexp}")
+        except Exception as e_unexp: logger.error(f"RedisCache: Ошибка SET/сериализации для ключа '{key}': {e_unexp}")
 
 
     async def delete(self, key: str) -> bool:
@@ -230,15 +315,275 @@ class RedisCache(BaseCache):
         except Exception as e_unexp: logger.error(f"RedisCache: Неожиданная ошибка FLUSHDB: {e_unexp}")
 
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not self._redis_client or not keys: return {}
+        try:
+            raw_values = await self._redis_client.mget(keys)
+        except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при MGET ({len(keys)} ключей): {e}"); return {}
+        found: Dict[str, Any] = {}
+        for key, raw_value in zip(keys, raw_values):
+            if not raw_value: continue
+            try: found[key] = self._serializer.loads(raw_value)
+            except Exception as e: logger.error(f"RedisCache: Ошибка десериализации для ключа '{key}': {e}")
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        if not self._redis_client or not items: return
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, self._serializer.dumps(value), ex=ttl_seconds)
+                await pipe.execute()
+        except RedisError as e_redis: logger.error(f"RedisCache: Ошибка Redis при пакетном SET ({len(items)} ключей): {e_redis}")
+        except Exception as e_unexp: logger.error(f"RedisCache: Ошибка пакетного SET/сериализации ({len(items)} ключей): {e_unexp}")
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not self._redis_client or not keys: return 0
+        try: return int(await self._redis_client.delete(*keys))
+        except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при пакетном DELETE ({len(keys)} ключей): {e}"); return 0
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        if not self._redis_client: return 0
+        try:
+            async with self._redis_client.pipeline(transaction=True) as pipe:
+                if ttl_seconds:
+                    # SET NX создает счетчик с TTL только если его еще нет, INCRBY TTL не трогает
+                    pipe.set(key, 0, ex=ttl_seconds, nx=True)
+                pipe.incrby(key, amount)
+                results = await pipe.execute()
+            return int(results[-1])
+        except RedisError as e: logger.error(f"RedisCache: Ошибка Redis при INCRBY для ключа '{key}': {e}"); return 0
+
+    async def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        if not self._redis_client: return value
+        try:
+            was_set = await self._redis_client.set(key, self._serializer.dumps(value), ex=ttl_seconds, nx=True)
+            if was_set:
+                return value
+            existing = await self.get(key)
+            return existing if existing is not None else value
+        except RedisError as e:
+            logger.error(f"RedisCache: Ошибка Redis при SET NX для ключа '{key}': {e}")
+            return value
+
+    async def acquire_lock(self, name: str, ttl_seconds: float) -> Optional[str]:
+        if not self._redis_client: return "local"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._redis_client.set(name, token, px=max(1, int(ttl_seconds * 1000)), nx=True)
+            return token if acquired else None
+        except RedisError as e:
+            # Без блокировки грузим сами: лишний запрос лучше зависшего хэндлера
+            logger.warning(f"RedisCache: Не удалось взять блокировку '{name}': {e}")
+            return "local"
+
+    async def release_lock(self, name: str, token: str) -> None:
+        if not self._redis_client or token == "local": return
+        try:
+            # Удаляем, только если блокировка все еще наша (могла истечь и достаться другому процессу)
+            await self._redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, name, token)
+        except RedisError as e: logger.warning(f"RedisCache: Не удалось снять блокировку '{name}': {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "serializer": self._serializer.serializer,
+            "compression": self._serializer.compression,
+            "compression_min_bytes": self._serializer.compression_min_bytes,
+        }
+
     def get_client_instance(self) -> Optional[AsyncRedisClient]:
         return self._redis_client
 
 
+class TieredCache(BaseCache):
+    """
+    Двухуровневый кэш: маленький in-process L1 (MemoryCache) перед общим L2 (RedisCache).
+
+    Чтение сначала идет в L1, промах - в Redis с заполнением L1 на короткий l1_ttl.
+    Любая запись/удаление идет в Redis, в локальный L1 и публикуется в канал инвалидации,
+    по которому остальные процессы выбрасывают эти ключи из своего L1.
+    Если подписка оборвалась, L1 полностью очищается: пропущенные сообщения уже не восстановить.
+    """
+
+    def __init__(self, l1: MemoryCache, l2: RedisCache, invalidation_channel: str, l1_ttl_seconds: int = 30):
+        self._l1 = l1
+        self._l2 = l2
+        self._channel = invalidation_channel
+        self._l1_ttl_seconds = l1_ttl_seconds
+        self._instance_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+        self._invalidations_published = 0
+        self._invalidations_received = 0
+        self._logger = logger.bind(service="TieredCache")
+
+    def _l1_ttl(self, ttl_seconds: Optional[int]) -> int:
+        return min(ttl_seconds, self._l1_ttl_seconds) if ttl_seconds else self._l1_ttl_seconds
+
+    async def initialize(self) -> None:
+        await self._l1.initialize()
+        await self._l2.initialize()
+        if self._l2.get_client_instance() is not None:
+            self._listener_task = asyncio.create_task(self._listen_invalidations(), name="sdb_cache_l1_invalidation")
+        self._logger.info(f"TieredCache инициализирован (L1 TTL: {self._l1_ttl_seconds} сек, канал: '{self._channel}').")
+
+    async def dispose(self) -> None:
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try: await self._listener_task
+            except asyncio.CancelledError: pass
+            self._listener_task = None
+        await self._l1.dispose()
+        await self._l2.dispose()
+
+    async def _publish_invalidation(self, keys: Optional[Iterable[str]] = None, clear: bool = False) -> None:
+        client = self._l2.get_client_instance()
+        if client is None: return
+        message = {"origin": self._instance_id, "clear": clear, "keys": list(keys or [])}
+        try:
+            await client.publish(self._channel, json.dumps(message))
+            self._invalidations_published += 1
+        except RedisError as e:
+            self._logger.error(f"Не удалось опубликовать инвалидацию L1 ({len(message['keys'])} ключей): {e}")
+
+    async def _apply_invalidation(self, raw_message: Any) -> None:
+        try:
+            message = json.loads(raw_message)
+        except (TypeError, ValueError):
+            self._logger.warning(f"Некорректное сообщение в канале инвалидации: {raw_message!r}")
+            return
+        if message.get("origin") == self._instance_id:
+            return
+        self._invalidations_received += 1
+        if message.get("clear"):
+            await self._l1.clear()
+        else:
+            await self._l1.delete_many(message.get("keys") or [])
+
+    async def _listen_invalidations(self) -> None:
+        delay = 1.0
+        while True:
+            client = self._l2.get_client_instance()
+            if client is None:
+                return
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                # Пока не подписались, могли пропустить инвалидации - начинаем с чистого L1
+                await self._l1.clear()
+                delay = 1.0
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        await self._apply_invalidation(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._logger.error(f"Подписка на инвалидации L1 оборвалась: {e}. Повтор через {delay:.0f} сек.")
+                await self._l1.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                try: await pubsub.aclose() if hasattr(pubsub, "aclose") else await pubsub.close()
+                except Exception: pass
+
+    async def _backfill_l1(self, key: str, value: Any, l2_remaining_ttl: Optional[float]) -> None:
+        # Копия в L1 не должна пережить ключ в Redis, иначе процесс отдавал бы уже истекшее значение
+        ttl = self._l1_ttl_seconds if l2_remaining_ttl is None else min(l2_remaining_ttl, self._l1_ttl_seconds)
+        if ttl > 0:
+            await self._l1.set(key, value, ttl_seconds=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._l1.get(key)
+        if value is not None:
+            return value
+        value, remaining_ttl = await self._l2.get_with_ttl(key)
+        if value is not None:
+            await self._backfill_l1(key, value, remaining_ttl)
+        return value
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found = await self._l1.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            for key, (value, remaining_ttl) in (await self._l2.get_many_with_ttl(missing)).items():
+                await self._backfill_l1(key, value, remaining_ttl)
+                found[key] = value
+        return found
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        await self._l2.set(key, value, ttl_seconds=ttl_seconds)
+        await self._l1.set(key, value, ttl_seconds=self._l1_ttl(ttl_seconds))
+        await self._publish_invalidation([key])
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        await self._l2.set_many(items, ttl_seconds=ttl_seconds)
+        await self._l1.set_many(items, ttl_seconds=self._l1_ttl(ttl_seconds))
+        await self._publish_invalidation(items.keys())
+
+    async def delete(self, key: str) -> bool:
+        deleted = await self._l2.delete(key)
+        await self._l1.delete(key)
+        await self._publish_invalidation([key])
+        return deleted
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        deleted = await self._l2.delete_many(keys)
+        await self._l1.delete_many(keys)
+        await self._publish_invalidation(keys)
+        return deleted
+
+    async def exists(self, key: str) -> bool:
+        return await self._l1.exists(key) or await self._l2.exists(key)
+
+    async def clear(self) -> None:
+        await self._l2.clear()
+        await self._l1.clear()
+        await self._publish_invalidation(clear=True)
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        # Счетчики живут только в Redis: копия в L1 сразу бы устарела
+        await self._l1.delete(key)
+        return await self._l2.incr(key, amount, ttl_seconds=ttl_seconds)
+
+    async def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        result = await self._l2.get_or_set(key, value, ttl_seconds=ttl_seconds)
+        # Если ключ уже был, его оставшийся срок неизвестен - L1 заполнит следующий get
+        await self._l1.delete(key)
+        return result
+
+    async def acquire_lock(self, name: str, ttl_seconds: float) -> Optional[str]:
+        return await self._l2.acquire_lock(name, ttl_seconds)
+
+    async def release_lock(self, name: str, token: str) -> None:
+        await self._l2.release_lock(name, token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "tiered",
+            "l1": self._l1.get_stats(),
+            "l2": self._l2.get_stats(),
+            "l1_ttl_seconds": self._l1_ttl_seconds,
+            "invalidation_channel": self._channel,
+            "invalidation_listener": self._listener_task is not None and not self._listener_task.done(),
+            "invalidations_published": self._invalidations_published,
+            "invalidations_received": self._invalidations_received,
+        }
+
+    def get_client_instance(self) -> Optional[AsyncRedisClient]:
+        return self._l2.get_client_instance()
+
+
 class CacheManager:
     def __init__(self, cache_settings: 'CacheSettings'):
         self._settings = cache_settings
         self._cache_backend: Optional[BaseCache] = None
         self._is_initialized_successfully = False
+        self._inflight_loads: Dict[str, asyncio.Task] = {}
         logger.info(f"CacheManager инициализирован. Сконфигурированный тип кэша: {self._settings.type}")
 
     async def initialize(self) -> None:
@@ -247,20 +592,47 @@ class CacheManager:
             return
         self._is_initialized_successfully = False # Сбрасываем флаг перед новой попыткой
 
-        if self._settings.type == "redis":
+        if self._settings.type in ("redis", "tiered"):
             if not self._settings.redis_url:
-                logger.error("Тип кэша 'redis', но redis_url не указан в настройках. Кэш не будет инициализирован.")
+                logger.error(f"Тип кэша '{self._settings.type}', но redis_url не указан в настройках. Кэш не будет инициализирован.")
                 return
             if not REDIS_PY_AVAILABLE:
-                logger.critical("Библиотека 'redis' (для asyncio) не установлена, но выбран тип кэша 'redis'. Кэш не будет работать.")
+                logger.critical(f"Библиотека 'redis' (для asyncio) не установлена, но выбран тип кэша '{self._settings.type}'. Кэш не будет работать.")
                 return
             try:
-                self._cache_backend = RedisCache(redis_url=str(self._settings.redis_url))
+                redis_cache = RedisCache(
+                    redis_url=str(self._settings.redis_url),
+                    serializer=CacheSerializer(
+                        serializer=self._settings.serializer,
+                        compression=self._settings.compression,
+                        compression_min_bytes=self._settings.compression_min_bytes,
+                    ),
+                )
             except ImportError as e_imp_redis: 
                 logger.critical(f"CacheManager: Не удалось создать RedisCache (ImportError): {e_imp_redis}")
                 return 
+            if self._settings.type == "tiered":
+                self._cache_backend = TieredCache(
+                    l1=MemoryCache(
+                        maxsize=self._settings.l1_maxsize,
+                        default_ttl=self._settings.l1_ttl_seconds,
+                        policy=self._settings.memory_eviction_policy,
+                        shards=self._settings.memory_shards,
+                    ),
+                    l2=redis_cache,
+                    invalidation_channel=self._settings.invalidation_channel,
+                    l1_ttl_seconds=self._settings.l1_ttl_seconds,
+                )
+            else:
+                self._cache_backend = redis_cache
         elif self._settings.type == "memory":
-            self._cache_backend = MemoryCache() 
+            self._cache_backend = MemoryCache(
+                maxsize=self._settings.memory_maxsize,
+                default_ttl=self._settings.default_ttl_seconds,
+                max_bytes=self._settings.memory_max_bytes,
+                policy=self._settings.memory_eviction_policy,
+                shards=self._settings.memory_shards,
+            )
         else:
             logger.warning(f"Неизвестный тип кэша: '{self._settings.type}'. Кэш не будет доступен.")
             return
@@ -269,7 +641,7 @@ class CacheManager:
             try:
                 await self._cache_backend.initialize()
                 # Дополнительная проверка для Redis, что клиент действительно создался
-                if isinstance(self._cache_backend, RedisCache) and self._cache_backend.get_client_instance() is None:
+                if isinstance(self._cache_backend, (RedisCache, TieredCache)) and self._cache_backend.get_client_instance() is None:
                     logger.error(f"CacheManager: RedisCache.initialize() завершился, но клиент Redis остался None. Инициализация не удалась.")
                     self._cache_backend = None # Сбрасываем, чтобы is_available() вернул False
                 else:
@@ -280,6 +652,9 @@ class CacheManager:
                 self._cache_backend = None 
     
     async def dispose(self) -> None:
+        for task in list(self._inflight_loads.values()):
+            task.cancel()
+        self._inflight_loads.clear()
         if self._cache_backend: 
             try: await self._cache_backend.dispose()
             except Exception as e: logger.error(f"Ошибка при освобождении ресурсов кэша '{self._settings.type}': {e}", exc_info=True)
@@ -295,7 +670,9 @@ class CacheManager:
         if not self.is_available() or self._cache_backend is None:
             logger.trace(f"Кэш недоступен. get('{key}') вернет default ({default}).")
             return default
-        return await self._cache_backend.get(key)
+        value = await self._cache_backend.get(key)
+        CACHE_REQUESTS_TOTAL.inc(operation="get", result="miss" if value is None else "hit")
+        return value
 
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
         if not self.is_available() or self._cache_backend is None:
@@ -315,6 +692,169 @@ class CacheManager:
             return False
         return await self._cache_backend.exists(key)
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace("Кэш недоступен. get_many() вернет пустой словарь.")
+            return {}
+        keys_list = list(keys)
+        found = await self._cache_backend.get_many(keys_list)
+        if found:
+            CACHE_REQUESTS_TOTAL.inc(len(found), operation="get_many", result="hit")
+        if len(keys_list) > len(found):
+            CACHE_REQUESTS_TOTAL.inc(len(keys_list) - len(found), operation="get_many", result="miss")
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace(f"Кэш недоступен. set_many() для {len(items)} ключей не будет выполнено.")
+            return
+        if items:
+            await self._cache_backend.set_many(items, ttl_seconds=ttl_seconds)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace("Кэш недоступен. delete_many() вернет 0.")
+            return 0
+        keys_list = list(keys)
+        if not keys_list:
+            return 0
+        return await self._cache_backend.delete_many(keys_list)
+
+    async def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace(f"Кэш недоступен. incr('{key}') вернет 0.")
+            return 0
+        return await self._cache_backend.incr(key, amount, ttl_seconds=ttl_seconds)
+
+    async def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        if not self.is_available() or self._cache_backend is None:
+            logger.trace(f"Кэш недоступен. get_or_set('{key}') вернет переданное значение.")
+            return value
+        return await self._cache_backend.get_or_set(key, value, ttl_seconds=ttl_seconds)
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[int] = None,
+        stale_ttl_seconds: int = 0,
+        early_refresh_beta: float = 0.0,
+        lock_timeout_seconds: float = 10.0,
+    ) -> Any:
+        """
+        Возвращает значение из кэша, а при промахе вызывает loader() и кэширует результат.
+
+        Одновременные промахи по одному ключу в процессе объединяются в одну задачу загрузки,
+        между процессами (Redis) - короткой блокировкой: остальные ждут, пока значение появится.
+        - stale_ttl_seconds: после истечения ttl значение еще столько секунд отдается как есть,
+          а обновление запускается в фоне (stale-while-revalidate);
+        - early_refresh_beta: вероятностное обновление до истечения ttl (XFetch), чем больше - тем раньше.
+        None от loader() не кэшируется. Ключи, читаемые через get_or_load, не стоит читать через get():
+        при stale/early refresh значение лежит в "конверте".
+        """
+        if not self.is_available() or self._cache_backend is None:
+            return await loader()
+
+        use_envelope = ttl_seconds is not None and (stale_ttl_seconds > 0 or early_refresh_beta > 0)
+        load_args = (key, loader, ttl_seconds, stale_ttl_seconds if use_envelope else 0, use_envelope, lock_timeout_seconds)
+
+        cached = await self._cache_backend.get(key)
+        CACHE_REQUESTS_TOTAL.inc(operation="get_or_load", result="miss" if cached is None else "hit")
+        if cached is not None:
+            if not (isinstance(cached, dict) and cached.get(LOADED_ENVELOPE_MARKER)):
+                return cached
+            now = time.time()
+            fresh_until = cached["fresh_until"]
+            if now >= fresh_until:
+                logger.trace(f"get_or_load('{key}'): значение устарело, отдаем его и обновляем в фоне.")
+                self._start_load(*load_args)
+            elif early_refresh_beta > 0:
+                # XFetch: -log(U) > 0, поэтому чем дороже загрузка и ближе срок, тем вероятнее ранний refresh
+                jitter = -cached["compute_seconds"] * early_refresh_beta * math.log(1.0 - random.random())
+                if now + jitter >= fresh_until:
+                    logger.trace(f"get_or_load('{key}'): раннее фоновое обновление.")
+                    self._start_load(*load_args)
+            return cached["value"]
+
+        return await asyncio.shield(self._start_load(*load_args))
+
+    def _start_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl_seconds: Optional[int],
+                    stale_ttl_seconds: int, use_envelope: bool, lock_timeout_seconds: float) -> asyncio.Task:
+        task = self._inflight_loads.get(key)
+        if task is not None:
+            return task
+        task = asyncio.create_task(
+            self._load_and_store(key, loader, ttl_seconds, stale_ttl_seconds, use_envelope, lock_timeout_seconds),
+            name=f"sdb_cache_load:{key}"
+        )
+        self._inflight_loads[key] = task
+        task.add_done_callback(lambda t: self._on_load_done(key, t))
+        return task
+
+    def _on_load_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight_loads.get(key) is task:
+            del self._inflight_loads[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Ожидающие получат исключение сами; здесь только лог для фоновых обновлений без ожидающих
+            logger.warning(f"get_or_load('{key}'): ошибка загрузки значения: {task.exception()}")
+
+    async def _load_and_store(self, key: str, loader: Callable[[], Awaitable[Any]], ttl_seconds: Optional[int],
+                              stale_ttl_seconds: int, use_envelope: bool, lock_timeout_seconds: float) -> Any:
+        backend = self._cache_backend
+        if backend is None:
+            return await loader()
+        lock_name = f"{key}{SINGLE_FLIGHT_LOCK_SUFFIX}"
+        lock_token = await backend.acquire_lock(lock_name, lock_timeout_seconds)
+        if lock_token is None:
+            value = await self._wait_for_foreign_load(backend, key, lock_timeout_seconds)
+            if value is not _MISSING:
+                return value
+            logger.debug(f"get_or_load('{key}'): не дождались загрузки другим процессом, загружаем сами.")
+        try:
+            started = time.monotonic()
+            value = await loader()
+            compute_seconds = time.monotonic() - started
+            if value is not None:
+                if use_envelope:
+                    envelope = {
+                        LOADED_ENVELOPE_MARKER: True,
+                        "value": value,
+                        "fresh_until": time.time() + ttl_seconds,
+                        "compute_seconds": compute_seconds,
+                    }
+                    await backend.set(key, envelope, ttl_seconds=ttl_seconds + stale_ttl_seconds)
+                else:
+                    await backend.set(key, value, ttl_seconds=ttl_seconds)
+            return value
+        finally:
+            if lock_token is not None:
+                await backend.release_lock(lock_name, lock_token)
+
+    @staticmethod
+    async def _wait_for_foreign_load(backend: BaseCache, key: str, timeout_seconds: float) -> Any:
+        deadline = time.monotonic() + timeout_seconds
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            cached = await backend.get(key)
+            if cached is not None:
+                if isinstance(cached, dict) and cached.get(LOADED_ENVELOPE_MARKER):
+                    return cached["value"]
+                return cached
+            delay = min(delay * 2, 0.5)
+        return _MISSING
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Счетчики бэкенда (hits/misses/evictions и т.д.) для `sdb cache stats`."""
+        stats: Dict[str, Any] = {
+            "type": self._settings.type,
+            "available": self.is_available(),
+            "inflight_loads": len(self._inflight_loads),
+        }
+        if self._cache_backend is not None:
+            stats.update(self._cache_backend.get_stats())
+        return stats
+
     async def clear_all_cache(self) -> None:
         if not self.is_available() or self._cache_backend is None:
             logger.trace(f"Кэш недоступен. clear_all_cache() не будет выполнено.")
@@ -323,7 +863,7 @@ class CacheManager:
         await self._cache_backend.clear()
 
     async def get_redis_client_instance(self) -> Optional[AsyncRedisClient]:
-        if self.is_available() and isinstance(self._cache_backend, RedisCache):
+        if self.is_available() and isinstance(self._cache_backend, (RedisCache, TieredCache)):
             return self._cache_backend.get_client_instance()
         logger.debug("Запрошен экземпляр Redis клиента, но RedisCache не используется или не инициализирован.")
         return None
\ No newline at end of file
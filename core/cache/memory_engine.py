@@ -0,0 +1,273 @@
+# core/cache/memory_engine.py
+
+import heapq
+import pickle
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, Tuple
+
+EvictionPolicy = Literal["lru", "lfu"]
+
+# Сколько самых "старых" записей просматривается при приближенном LFU (как maxmemory-samples в Redis)
+LFU_SAMPLE_SIZE = 5
+
+
+def estimate_size_bytes(value: Any) -> int:
+    """Оценка размера значения в байтах: длина pickle, а для непиклящихся объектов - sys.getsizeof."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "hits")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.hits = 0
+
+
+class _Shard:
+    """
+    Одна шарда: OrderedDict в порядке последнего доступа (LRU в начале) + min-heap сроков истечения.
+    Записи в heap не удаляются при перезаписи ключа - устаревшие пропускаются лениво.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int, policy: EvictionPolicy):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.bytes_used = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key: str) -> Optional[_Entry]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry.size
+        return entry
+
+    def purge_expired(self, now: float) -> None:
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Пропускаем "хвосты" от перезаписанных/удаленных ключей
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+        # Heap разрастается от перезаписей одного и того же ключа - периодически пересобираем
+        if len(heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [(e.expires_at, k) for k, e in self.entries.items() if e.expires_at is not None]
+            heapq.heapify(self.expiry_heap)
+
+    def _pick_victim(self) -> str:
+        if self.policy == "lfu":
+            victim_key, victim_hits = None, None
+            for index, (key, entry) in enumerate(self.entries.items()):
+                if index >= LFU_SAMPLE_SIZE:
+                    break
+                if victim_hits is None or entry.hits < victim_hits:
+                    victim_key, victim_hits = key, entry.hits
+            return victim_key  # type: ignore[return-value]
+        return next(iter(self.entries))
+
+    def evict_to_fit(self) -> None:
+        while self.entries and (
+            len(self.entries) > self.max_items or (self.max_bytes and self.bytes_used > self.max_bytes)
+        ):
+            self._remove(self._pick_victim())
+            self.evictions += 1
+
+    def get(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        if entry.expires_at is not None and entry.expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        entry.hits += 1
+        self.hits += 1
+        return True, entry.value
+
+    def contains(self, key: str, now: float) -> bool:
+        entry = self.entries.get(key)
+        return entry is not None and (entry.expires_at is None or entry.expires_at > now)
+
+    def set(self, key: str, value: Any, expires_at: Optional[float], size: int, now: float) -> None:
+        self.purge_expired(now)
+        self._remove(key)
+        self.entries[key] = _Entry(value, expires_at, size)
+        self.bytes_used += size
+        if expires_at is not None:
+            heapq.heappush(self.expiry_heap, (expires_at, key))
+        self.evict_to_fit()
+
+    def delete(self, key: str) -> bool:
+        return self._remove(key) is not None
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.expiry_heap.clear()
+        self.bytes_used = 0
+
+
+class ShardedMemoryStore:
+    """
+    Синхронное in-process хранилище для MemoryCache.
+
+    - TTL задается для каждого ключа отдельно (min-heap сроков на шарду, истекшие ключи
+      вычищаются при записи и лениво при чтении);
+    - вытеснение LRU или приближенный LFU (наименее используемый из нескольких самых старых);
+    - ограничение по числу ключей и, опционально, по суммарному размеру значений в байтах;
+    - ключи распределяются по шардам по crc32, у каждой шарды свой lock, так что
+      хранилищем можно пользоваться и из потоков (run_in_executor).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        max_bytes: int = 0,
+        policy: EvictionPolicy = "lru",
+        shards: int = 8,
+        default_ttl: Optional[int] = 300,
+        size_estimator: Callable[[Any], int] = estimate_size_bytes,
+    ):
+        shards = max(1, shards)
+        per_shard_items = max(1, -(-maxsize // shards))
+        per_shard_bytes = -(-max_bytes // shards) if max_bytes > 0 else 0
+        self._shards = [_Shard(per_shard_items, per_shard_bytes, policy) for _ in range(shards)]
+        self._default_ttl = default_ttl
+        self._size_estimator = size_estimator
+        self._track_bytes = max_bytes > 0
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+    def _shard_for(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    def _expires_at(self, ttl_seconds: Optional[int], now: float) -> Optional[float]:
+        ttl = ttl_seconds if ttl_seconds is not None else self._default_ttl
+        if ttl is None or ttl <= 0:
+            return None
+        return now + ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        shard = self._shard_for(key)
+        with shard.lock:
+            _, value = shard.get(key, time.monotonic())
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found: Dict[str, Any] = {}
+        for key in keys:
+            shard = self._shard_for(key)
+            with shard.lock:
+                is_hit, value = shard.get(key, now)
+            if is_hit:
+                found[key] = value
+        return found
+
+    def contains(self, key: str) -> bool:
+        shard = self._shard_for(key)
+        with shard.lock:
+            return shard.contains(key, time.monotonic())
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        now = time.monotonic()
+        size = self._size_estimator(value) if self._track_bytes else 0
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.set(key, value, self._expires_at(ttl_seconds, now), size, now)
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+        now = time.monotonic()
+        expires_at = self._expires_at(ttl_seconds, now)
+        for key, value in items.items():
+            size = self._size_estimator(value) if self._track_bytes else 0
+            shard = self._shard_for(key)
+            with shard.lock:
+                shard.set(key, value, expires_at, size, now)
+
+    def incr(self, key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
+        now = time.monotonic()
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is not None and (entry.expires_at is None or entry.expires_at > now):
+                # Существующий счетчик сохраняет свой срок жизни
+                expires_at, new_value = entry.expires_at, int(entry.value or 0) + amount
+            else:
+                expires_at, new_value = self._expires_at(ttl_seconds, now), amount
+            size = self._size_estimator(new_value) if self._track_bytes else 0
+            shard.set(key, new_value, expires_at, size, now)
+        return new_value
+
+    def get_or_set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> Any:
+        now = time.monotonic()
+        shard = self._shard_for(key)
+        with shard.lock:
+            is_hit, existing = shard.get(key, now)
+            if is_hit and existing is not None:
+                return existing
+            size = self._size_estimator(value) if self._track_bytes else 0
+            shard.set(key, value, self._expires_at(ttl_seconds, now), size, now)
+        return value
+
+    def delete(self, key: str) -> bool:
+        shard = self._shard_for(key)
+        with shard.lock:
+            return shard.delete(key)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        return sum(1 for key in keys if self.delete(key))
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        for shard in self._shards:
+            with shard.lock:
+                shard.purge_expired(now)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = sum(s.hits for s in self._shards)
+        misses = sum(s.misses for s in self._shards)
+        total = hits + misses
+        return {
+            "policy": self.policy,
+            "shards": len(self._shards),
+            "maxsize": self.maxsize,
+            "max_bytes": self.max_bytes,
+            "default_ttl": self._default_ttl,
+            "current_size": len(self),
+            "bytes_used": sum(s.bytes_used for s in self._shards) if self._track_bytes else None,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+            "evictions": sum(s.evictions for s in self._shards),
+            "expirations": sum(s.expirations for s in self._shards),
+        }
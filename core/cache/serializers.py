@@ -0,0 +1,127 @@
+# core/cache/serializers.py
+
+import json
+import pickle
+import zlib
+from typing import Any, Literal, Optional, Tuple
+
+from loguru import logger
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None # type: ignore
+    MSGPACK_AVAILABLE = False
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    lz4_frame = None # type: ignore
+    LZ4_AVAILABLE = False
+
+SerializerName = Literal["pickle", "msgpack", "json"]
+CompressionName = Literal["none", "zlib", "lz4"]
+
+# Первый байт значения: младшие 4 бита - формат, старшие - сжатие.
+# Значения, записанные старым RedisCache (голый pickle), начинаются с 0x80 и читаются как legacy.
+_FORMAT_CODES = {"pickle": 0x01, "msgpack": 0x02, "json": 0x03}
+_COMPRESSION_CODES = {"none": 0x00, "zlib": 0x10, "lz4": 0x20}
+_FORMAT_BY_CODE = {code: name for name, code in _FORMAT_CODES.items()}
+_COMPRESSION_BY_CODE = {code: name for name, code in _COMPRESSION_CODES.items()}
+_LEGACY_PICKLE_MARKER = 0x80
+
+
+def _restored_exactly(original: Any, restored: Any) -> bool:
+    """Совпадают ли значения вместе с типами (tuple -> list, int-ключ -> str-ключ считаются изменением)."""
+    if type(original) is not type(restored):
+        return False
+    if isinstance(original, dict):
+        return len(original) == len(restored) and all(
+            _restored_exactly(key, restored_key) and _restored_exactly(item, restored_item)
+            for (key, item), (restored_key, restored_item) in zip(original.items(), restored.items())
+        )
+    if isinstance(original, (list, tuple)):
+        return len(original) == len(restored) and all(map(_restored_exactly, original, restored))
+    return original == restored
+
+
+class CacheSerializer:
+    """
+    Сериализатор значений для внешних бэкендов кэша (Redis).
+
+    Если значение не представимо в выбранном формате (например, ORM-объект для json/msgpack)
+    или меняется при обратном чтении (tuple, int-ключи словаря в json), оно молча пишется pickle -
+    формат хранится в заголовке, поэтому loads() разберет оба варианта.
+    Сжатие применяется только к значениям не короче compression_min_bytes.
+    """
+
+    def __init__(self, serializer: SerializerName = "pickle", compression: CompressionName = "none",
+                 compression_min_bytes: int = 1024):
+        if serializer == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.error("Сериализатор кэша 'msgpack' выбран, но библиотека 'msgpack' не установлена. Используется pickle.")
+            serializer = "pickle"
+        if compression == "lz4" and not LZ4_AVAILABLE:
+            logger.error("Сжатие кэша 'lz4' выбрано, но библиотека 'lz4' не установлена. Используется zlib.")
+            compression = "zlib"
+        self.serializer: SerializerName = serializer
+        self.compression: CompressionName = compression
+        self.compression_min_bytes = compression_min_bytes
+
+    def _encode(self, value: Any) -> Tuple[str, bytes]:
+        if self.serializer != "pickle":
+            try:
+                if self.serializer == "msgpack":
+                    payload = msgpack.packb(value, use_bin_type=True)
+                else:
+                    payload = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                # Проверочное чтение: значение из кэша должно вернуться ровно таким, каким его записали
+                if _restored_exactly(value, self._decode(self.serializer, payload)):
+                    return self.serializer, payload
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return "pickle", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(format_name: str, payload: bytes) -> Any:
+        if format_name == "msgpack":
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Значение записано в msgpack, но библиотека 'msgpack' не установлена.")
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if format_name == "json":
+            return json.loads(payload.decode("utf-8"))
+        return pickle.loads(payload)
+
+    def dumps(self, value: Any) -> bytes:
+        format_name, payload = self._encode(value)
+        compression: CompressionName = "none"
+        if self.compression != "none" and len(payload) >= self.compression_min_bytes:
+            compressed = zlib.compress(payload) if self.compression == "zlib" else lz4_frame.compress(payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        header = _FORMAT_CODES[format_name] | _COMPRESSION_CODES[compression]
+        return bytes((header,)) + payload
+
+    def loads(self, data: bytes) -> Optional[Any]:
+        if not data:
+            return None
+        header = data[0]
+        if header == _LEGACY_PICKLE_MARKER:
+            return pickle.loads(data)
+        format_name = _FORMAT_BY_CODE.get(header & 0x0F)
+        compression = _COMPRESSION_BY_CODE.get(header & 0xF0)
+        if format_name is None or compression is None:
+            # Счетчики, записанные через incr(), хранятся в Redis как обычные числа
+            try:
+                return int(data)
+            except ValueError:
+                raise ValueError(f"Неизвестный заголовок значения кэша: 0x{header:02x}")
+        payload = data[1:]
+        if compression == "zlib":
+            payload = zlib.decompress(payload)
+        elif compression == "lz4":
+            if not LZ4_AVAILABLE:
+                raise ValueError("Значение сжато lz4, но библиотека 'lz4' не установлена.")
+            payload = lz4_frame.decompress(payload)
+        return self._decode(format_name, payload)
@@ -1,7 +1,7 @@
 # core/database/core_models.py
 from datetime import datetime
 from typing import List, Optional, TYPE_CHECKING
-from sqlalchemy import String, ForeignKey, UniqueConstraint, Text, BigInteger
+from sqlalchemy import String, ForeignKey, UniqueConstraint, Text, BigInteger, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import SDBBaseModel 
@@ -154,6 +154,10 @@ class UserPermission(SDBBaseModel):
 
 class User(SDBBaseModel):
     __tablename__ = f"{SDB_CORE_TABLE_PREFIX}users"
+    __table_args__ = (
+        # Keyset-пагинация списков пользователей: ORDER BY <ключ>, id без сортировки всей таблицы
+        Index(f'ix_{SDB_CORE_TABLE_PREFIX}users_last_activity_at_id', 'last_activity_at', 'id'),
+    )
 
     username_lower: Mapped[Optional[str]] = mapped_column(
         String(32), 
@@ -232,4 +236,59 @@ class User(SDBBaseModel):
         return f"User_{self.telegram_id}"
 
     def __repr__(self) -> str:
-        return f"<User(id={self.id}, tg_id={self.telegram_id}, name='{self.full_name}')>"
\ No newline at end of file
+        return f"<User(id={self.id}, tg_id={self.telegram_id}, name='{self.full_name}')>"
+
+class Broadcast(SDBBaseModel):
+    __tablename__ = f"{SDB_CORE_TABLE_PREFIX}broadcasts"
+
+    status: Mapped[str] = mapped_column(
+        String(16),
+        default="pending",
+        nullable=False,
+        index=True,
+        comment=get_column_comment("Статус рассылки: pending, running, paused, interrupted, completed, cancelled, failed")
+    )
+    text: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        comment=get_column_comment("Текст сообщения (если рассылается текст)")
+    )
+    parse_mode: Mapped[Optional[str]] = mapped_column(
+        String(16),
+        nullable=True,
+        comment=get_column_comment("Режим разметки текста: HTML, MarkdownV2 или NULL")
+    )
+    source_chat_id: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        nullable=True,
+        comment=get_column_comment("Чат сообщения-образца (рассылка копией сообщения)")
+    )
+    source_message_id: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        nullable=True,
+        comment=get_column_comment("ID сообщения-образца (рассылка копией сообщения)")
+    )
+    created_by: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        nullable=True,
+        comment=get_column_comment("Telegram ID автора рассылки (NULL - запущена из CLI)")
+    )
+    cursor_user_id: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False,
+        comment=get_column_comment("DB ID последнего обработанного получателя (keyset-курсор)")
+    )
+    total_recipients: Mapped[int] = mapped_column(default=0, nullable=False, comment=get_column_comment("Получателей на момент запуска"))
+    sent_count: Mapped[int] = mapped_column(default=0, nullable=False, comment=get_column_comment("Доставлено сообщений"))
+    failed_count: Mapped[int] = mapped_column(default=0, nullable=False, comment=get_column_comment("Не доставлено (ошибка)"))
+    blocked_count: Mapped[int] = mapped_column(default=0, nullable=False, comment=get_column_comment("Получатель заблокировал бота"))
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True, comment=get_column_comment("Последняя ошибка отправки"))
+    started_at: Mapped[Optional[datetime]] = mapped_column(nullable=True, comment=get_column_comment("Время первого запуска"))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(nullable=True, comment=get_column_comment("Время завершения"))
+
+    @property
+    def processed_count(self) -> int:
+        return self.sent_count + self.failed_count + self.blocked_count
+
+    def __repr__(self) -> str:
+        return f"<Broadcast(id={self.id}, status='{self.status}', sent={self.sent_count}/{self.total_recipients})>"
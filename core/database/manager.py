@@ -1,8 +1,9 @@
 # core/database/manager.py
 
+import time
 from pathlib import Path
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, List, Type, Optional, TYPE_CHECKING
+from typing import AsyncGenerator, List, Type, Optional, Dict, Any, TYPE_CHECKING
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -10,15 +11,48 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine
 )
-from sqlalchemy.pool import NullPool
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from loguru import logger
 
 from .base import Base
 from core.app_settings import DEFAULT_PROJECT_DATA_DIR_NAME
+from core.monitoring.prometheus import REGISTRY
 
 if TYPE_CHECKING:
     from core.app_settings import DBSettings, AppSettings
 
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "sdb_db_query_duration_seconds", "Время выполнения SQL-запроса по типу (SELECT/INSERT/...).", ("operation",)
+)
+DB_SESSIONS_ACTIVE = REGISTRY.gauge("sdb_db_sessions_active", "Открытые сейчас сессии БД.")
+DB_SESSIONS_TOTAL = REGISTRY.counter("sdb_db_sessions_total", "Сессии БД, открытые с момента запуска.")
+DB_POOL_CHECKED_OUT = REGISTRY.gauge("sdb_db_pool_checked_out", "Соединения, выданные из пула.")
+DB_POOL_SIZE = REGISTRY.gauge("sdb_db_pool_size", "Размер пула соединений.")
+
+# Синхронные драйверы для тех же БД (APScheduler и CLI работают с БД не из event loop)
+_SYNC_DRIVERS = {"sqlite": "sqlite", "postgresql": "postgresql+psycopg", "mysql": "mysql+pymysql"}
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"}
+
+
+def _sql_operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    operation = words[0].upper() if words else ""
+    if operation == "WITH":
+        return "SELECT"
+    return operation if operation in _SQL_OPERATIONS else "OTHER"
+
+
+def to_sync_db_url(db_url: str) -> str:
+    url = make_url(db_url)
+    backend = url.get_backend_name()
+    if backend not in _SYNC_DRIVERS:
+        raise ValueError(f"Нет синхронного драйвера для БД '{backend}'.")
+    return url.set(drivername=_SYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
 class DBManager:
     def __init__(self, db_settings: 'DBSettings', app_settings: 'AppSettings'): # app_settings теперь обязателен
         self._db_settings: 'DBSettings' = db_settings
@@ -27,6 +61,11 @@ class DBManager:
         self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
         self._db_url: Optional[str] = None
 
+        # Счетчики пула (обновляются из событий connect/checkout/checkin)
+        self._pool_connects_total: int = 0
+        self._pool_checkouts_total: int = 0
+        self._pool_peak_checked_out: int = 0
+
         self._logger = logger.bind(service="DBManager")
         self._logger.info(f"DBManager инициализирован для типа БД: {self._db_settings.type}")
 
@@ -78,6 +117,107 @@ class DBManager:
         self._db_url = url
         return url
 
+    def build_sync_db_url(self) -> str:
+        """URL основной БД для синхронного драйвера (хранилище заданий планировщика, CLI)."""
+        return to_sync_db_url(self._build_db_url())
+
+    def _build_engine_pool_kwargs(self) -> Dict[str, Any]:
+        db = self._db_settings
+        if db.type == "sqlite":
+            # Постоянный пул: без него aiosqlite открывает новое соединение (и поток) на каждую сессию.
+            # max_overflow=0, т.к. писатель в SQLite все равно один, а лишние соединения только спорят за блокировку.
+            kwargs = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": db.sqlite_pool_size,
+                "max_overflow": 0,
+                "pool_timeout": db.pool_timeout,
+            }
+        else:
+            kwargs = {
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_size": db.pool_size,
+                "max_overflow": db.max_overflow,
+                "pool_timeout": db.pool_timeout,
+                "pool_recycle": db.pool_recycle,
+                "pool_pre_ping": db.pool_pre_ping,
+            }
+        self._logger.debug(f"Пул соединений для '{db.type}': pool_size={kwargs['pool_size']}, "
+                           f"max_overflow={kwargs['max_overflow']}, pool_timeout={kwargs['pool_timeout']}")
+        return kwargs
+
+    def _apply_sqlite_pragmas(self, dbapi_connection: Any) -> None:
+        db = self._db_settings
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={db.sqlite_journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={db.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA mmap_size={int(db.sqlite_mmap_size)}")
+            cursor.execute(f"PRAGMA busy_timeout={int(db.sqlite_busy_timeout_ms)}")
+        finally:
+            cursor.close()
+
+    def _register_pool_listeners(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        is_sqlite = self._db_settings.type == "sqlite"
+
+        @event.listens_for(sync_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):  # noqa: ANN001
+            self._pool_connects_total += 1
+            if is_sqlite:
+                self._apply_sqlite_pragmas(dbapi_connection)
+
+        @event.listens_for(sync_engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):  # noqa: ANN001
+            self._pool_checkouts_total += 1
+            pool = sync_engine.pool
+            if isinstance(pool, QueuePool):
+                self._pool_peak_checked_out = max(self._pool_peak_checked_out, pool.checkedout())
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _on_before_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+            conn.info.setdefault("sdb_query_started_at", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _on_after_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+            started = conn.info.get("sdb_query_started_at")
+            if started:
+                DB_QUERY_SECONDS.observe(time.perf_counter() - started.pop(), operation=_sql_operation(statement))
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _on_execute_error(exception_context):  # noqa: ANN001
+            # after_cursor_execute не вызывается при ошибке - не даем стеку расти
+            connection = exception_context.connection
+            if connection is not None and connection.info.get("sdb_query_started_at"):
+                connection.info["sdb_query_started_at"].pop()
+
+    def _collect_pool_metrics(self) -> None:
+        stats = self.get_pool_stats()
+        if "checked_out" in stats:
+            DB_POOL_CHECKED_OUT.set(stats["checked_out"])
+            DB_POOL_SIZE.set(stats["size"])
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Снимок состояния пула соединений (для `sdb monitor status`)."""
+        stats: Dict[str, Any] = {
+            "db_type": self._db_settings.type,
+            "initialized": self._engine is not None,
+            "connects_total": self._pool_connects_total,
+            "checkouts_total": self._pool_checkouts_total,
+            "peak_checked_out": self._pool_peak_checked_out,
+        }
+        if self._engine is None:
+            return stats
+        pool = self._engine.pool
+        stats["pool_class"] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+            })
+        return stats
+
     async def initialize(self) -> None:
         if self._engine is not None:
             self._logger.debug("DBManager (engine) уже был инициализирован.")
@@ -91,9 +231,11 @@ class DBManager:
         try:
             self._engine = create_async_engine(
                 db_url,
-                echo=echo_sql, 
-                poolclass=NullPool,
+                echo=echo_sql,
+                **self._build_engine_pool_kwargs(),
             )
+            self._register_pool_listeners(self._engine)
+            REGISTRY.add_collect_hook(self._collect_pool_metrics)
             
             self._session_factory = async_sessionmaker(
                 bind=self._engine,
@@ -110,6 +252,7 @@ class DBManager:
             raise
 
     async def dispose(self) -> None:
+        REGISTRY.remove_collect_hook(self._collect_pool_metrics)
         if self._engine:
             self._logger.info("Закрытие SQLAlchemy AsyncEngine...")
             try:
@@ -131,7 +274,9 @@ class DBManager:
             raise RuntimeError(msg)
 
         session: AsyncSession = self._session_factory()
-        self._logger.trace(f"Сессия БД {id(session)} открыта.")
+        self._logger.trace("Сессия БД {} открыта.", id(session))
+        DB_SESSIONS_TOTAL.inc()
+        DB_SESSIONS_ACTIVE.inc()
         try:
             yield session
         except Exception as e:
@@ -139,8 +284,9 @@ class DBManager:
             await session.rollback()
             raise
         finally:
+            DB_SESSIONS_ACTIVE.dec()
             await session.close()
-            self._logger.trace(f"Сессия БД {id(session)} закрыта.")
+            self._logger.trace("Сессия БД {} закрыта.", id(session))
 
     async def create_all_core_tables(self) -> None:
         if not self._engine:
@@ -152,8 +298,20 @@ class DBManager:
         async with self._engine.begin() as conn:
             from core.database import core_models # noqa: F401
             await conn.run_sync(Base.metadata.create_all)
+            # Таблицы планировщика задач не входят в Base.metadata (их использует синхронный TaskRunStore)
+            from core.tasks.store import create_task_tables
+            await conn.run_sync(create_task_tables)
         self._logger.success("Все таблицы ядра (на основе текущего Base.metadata) успешно созданы (или уже существовали).")
 
+        # Поисковый индекс пользователей - не часть metadata (FTS5 / pg_trgm), создается отдельной транзакцией
+        from core.users.search import ensure_search_index
+        try:
+            async with self._engine.begin() as conn:
+                search_backend = await conn.run_sync(ensure_search_index)
+            self._logger.info(f"Поисковый индекс пользователей готов (бэкенд: {search_backend}).")
+        except Exception as e_search:
+            self._logger.warning(f"Не удалось создать поисковый индекс пользователей, поиск будет работать через LIKE: {e_search}")
+
     async def create_specific_module_tables(self, module_model_classes: List[Type[Base]]) -> None:
         if not self._engine:
             err_msg = "DBManager Engine не инициализирован. Невозможно создать таблицы модуля."
@@ -0,0 +1,218 @@
+# core/database/pagination.py
+"""
+Keyset-пагинация (по паре "ключ сортировки, id") и дешевая оценка числа строк.
+
+В отличие от OFFSET, запрос следующей страницы начинается сразу с позиции курсора по индексу,
+поэтому стоимость перелистывания не растет с номером страницы. Курсор - короткая строка без ':'
+(разделитель CallbackData aiogram), пригодная и для callback data, и для CLI.
+"""
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Table, and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+_EPOCH = datetime(1970, 1, 1)
+_BASE36_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Ниже этого порога оценка из статистики СУБД неточна, а точный COUNT и так дешев
+EXACT_COUNT_THRESHOLD = 100_000
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+def _to_base36(number: int) -> str:
+    if number < 0:
+        return "-" + _to_base36(-number)
+    digits = ""
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = _BASE36_ALPHABET[remainder] + digits
+        if number == 0:
+            return digits
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    """Кодирует позицию (значение ключа сортировки, id) в курсор вида '<тип><значение>.<id>'."""
+    if value is None:
+        encoded = "n"
+    elif isinstance(value, bool):
+        encoded = f"i{int(value)}"
+    elif isinstance(value, int):
+        encoded = f"i{_to_base36(value)}"
+    elif isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        encoded = f"t{_to_base36((value - _EPOCH) // timedelta(microseconds=1))}"
+    elif isinstance(value, str):
+        encoded = "s" + base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii").rstrip("=")
+    else:
+        raise TypeError(f"Тип ключа сортировки не поддерживается курсором: {type(value).__name__}")
+    return f"{encoded}.{_to_base36(row_id)}"
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Обратное к encode_cursor. Datetime возвращается naive (UTC). ValueError при битом курсоре."""
+    try:
+        encoded, id_part = cursor.rsplit(".", 1)
+        row_id = int(id_part, 36)
+        kind, payload = encoded[:1], encoded[1:]
+        if kind == "n" and not payload:
+            return None, row_id
+        if kind == "i":
+            return int(payload, 36), row_id
+        if kind == "t":
+            return _EPOCH + timedelta(microseconds=int(payload, 36)), row_id
+        if kind == "s":
+            return base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)).decode("utf-8"), row_id
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный курсор пагинации: '{cursor}'") from e
+    raise ValueError(f"Некорректный курсор пагинации: '{cursor}'")
+
+
+def _beyond(column: Any, bound: Any, descending: bool):
+    return column < bound if descending else column > bound
+
+
+def _after(sort_column: Any, id_column: Any, value: Any, row_id: int, descending: bool):
+    """
+    Условие "(sort_column, id) строго после курсора" для непустого ключа. Первая часть - диапазон
+    по индексу (ключ, id), вторая - только фильтр: без верхнего OR планировщик не строит MULTI-INDEX OR
+    и не сортирует результат заново.
+    """
+    if sort_column is id_column:
+        return _beyond(id_column, row_id, descending)
+    bound = sort_column <= value if descending else sort_column >= value
+    return and_(bound, or_(_beyond(sort_column, value, descending), _beyond(id_column, row_id, descending)))
+
+
+def _order_by(columns: List[Any], descending: bool) -> list:
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+async def _fetch_rows(session: AsyncSession, stmt: Select, limit: int) -> list:
+    result = await session.execute(stmt.limit(limit))
+    return list(result.scalars().all())
+
+
+async def fetch_keyset_page(
+    session: AsyncSession,
+    stmt: Select,
+    sort_attr: InstrumentedAttribute,
+    id_attr: InstrumentedAttribute,
+    limit: int,
+    descending: bool = False,
+    cursor: Optional[str] = None,
+    backward: bool = False,
+) -> KeysetPage:
+    """
+    Страница stmt (select(Model)...) в порядке (sort_attr, id_attr), NULL - в конце.
+
+    cursor=None - первая страница. Для следующей страницы передается page.next_cursor,
+    для предыдущей - page.prev_cursor с backward=True. ValueError при битом курсоре.
+
+    Для nullable-ключа строки с NULL читаются отдельной фазой (WHERE ключ IS NULL ORDER BY id):
+    каждая фаза - обычный ORDER BY по индексу (ключ, id), без сортировки всех подходящих строк.
+    """
+    nullable = bool(getattr(sort_attr.expression, "nullable", True)) and sort_attr is not id_attr
+    value: Any = None
+    row_id = 0
+    if cursor is not None:
+        value, row_id = decode_cursor(cursor)
+
+    # Назад читаем в обратном порядке от первой строки текущей страницы и разворачиваем результат
+    order_desc = descending != backward
+    if not nullable:
+        phase_stmt = stmt
+        if cursor is not None:
+            if value is None:
+                raise ValueError(f"Некорректный курсор пагинации: '{cursor}'")
+            phase_stmt = phase_stmt.where(_after(sort_attr, id_attr, value, row_id, order_desc))
+        order_columns = [id_attr] if sort_attr is id_attr else [sort_attr, id_attr]
+        rows = await _fetch_rows(session, phase_stmt.order_by(*_order_by(order_columns, order_desc)), limit + 1)
+    else:
+        # Фазы в порядке обхода: вперед - сначала значения, потом NULL; назад - наоборот
+        phases = (True, False) if backward else (False, True)
+        cursor_phase_is_null = value is None
+        rows = []
+        started = cursor is None
+        for phase_is_null in phases:
+            if not started and phase_is_null != cursor_phase_is_null:
+                continue  # Фаза целиком до курсора
+            if phase_is_null:
+                phase_stmt = stmt.where(sort_attr.is_(None))
+                order_columns = [id_attr]
+            else:
+                phase_stmt = stmt.where(sort_attr.is_not(None))
+                order_columns = [sort_attr, id_attr]
+            if not started:
+                started = True
+                if phase_is_null:
+                    phase_stmt = phase_stmt.where(_beyond(id_attr, row_id, order_desc))
+                else:
+                    phase_stmt = phase_stmt.where(_after(sort_attr, id_attr, value, row_id, order_desc))
+            rows.extend(await _fetch_rows(
+                session, phase_stmt.order_by(*_order_by(order_columns, order_desc)), limit + 1 - len(rows)
+            ))
+            if len(rows) > limit:
+                break
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    if not rows:
+        return KeysetPage()
+
+    first_cursor = encode_cursor(getattr(rows[0], sort_attr.key), getattr(rows[0], id_attr.key))
+    last_cursor = encode_cursor(getattr(rows[-1], sort_attr.key), getattr(rows[-1], id_attr.key))
+    if backward:
+        return KeysetPage(items=rows, next_cursor=last_cursor, prev_cursor=first_cursor if has_more else None)
+    return KeysetPage(items=rows, next_cursor=last_cursor if has_more else None,
+                      prev_cursor=first_cursor if cursor is not None else None)
+
+
+async def estimate_row_count(session: AsyncSession, table: Table,
+                             exact_below: int = EXACT_COUNT_THRESHOLD) -> Tuple[int, bool]:
+    """
+    Число строк таблицы: (значение, это_оценка). На PostgreSQL/MySQL берется из статистики СУБД
+    без сканирования; если таблица небольшая (или статистики нет) - точный COUNT(*).
+    """
+    dialect = session.get_bind().dialect.name
+    table_name = table.name
+    estimate: Optional[int] = None
+    if dialect == "postgresql":
+        result = await session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": table_name},
+        )
+        estimate = result.scalar_one_or_none()
+    elif dialect in ("mysql", "mariadb"):
+        result = await session.execute(
+            text("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"),
+            {"table_name": table_name},
+        )
+        estimate = result.scalar_one_or_none()
+
+    # reltuples = -1, пока таблицу ни разу не анализировали
+    if estimate is not None and estimate >= exact_below:
+        return int(estimate), True
+    result = await session.execute(select(func.count()).select_from(table))
+    return int(result.scalar_one() or 0), False
@@ -1,15 +1,29 @@
 # core/events/dispatcher.py
 
 import asyncio
+import time
 from collections import defaultdict
 from typing import Callable, Any, Coroutine, List, Dict, Optional, Union, TYPE_CHECKING # Добавил Optional, Union
 from loguru import logger
 
+from core.monitoring.prometheus import REGISTRY
+
 if TYPE_CHECKING:
     # Более строгий тип для обработчика события, если это необходимо.
     # EventHandler = Callable[..., Coroutine[Any, Any, None]]
     pass
 
+EVENT_PUBLISH_FANOUT = REGISTRY.histogram(
+    "sdb_event_publish_fanout", "Число подписчиков, вызванных одной публикацией события.", ("event_type",),
+    buckets=(0, 1, 2, 5, 10, 25, 50),
+)
+EVENT_PUBLISH_SECONDS = REGISTRY.histogram(
+    "sdb_event_publish_duration_seconds", "Время publish(): до завершения всех подписчиков.", ("event_type",)
+)
+EVENT_HANDLER_ERRORS_TOTAL = REGISTRY.counter(
+    "sdb_event_handler_errors_total", "Исключения в подписчиках событий.", ("event_type",)
+)
+
 
 class EventDispatcher:
     """
@@ -86,6 +100,7 @@ class EventDispatcher:
             Если подписчиков на событие нет, возвращается пустой список.
         """
         if event_type not in self._listeners or not self._listeners[event_type]:
+            EVENT_PUBLISH_FANOUT.observe(0, event_type=event_type)
             self._logger.trace(f"Нет подписчиков для события '{event_type}'. Публикация пропущена.")
             return []
 
@@ -97,15 +112,20 @@ class EventDispatcher:
         self._logger.info(f"Публикация события '{event_type}' для {len(handlers_to_call)} подписчиков. "
                           f"Аргументы: ({args_repr}), ({kwargs_repr}).")
 
+        EVENT_PUBLISH_FANOUT.observe(len(handlers_to_call), event_type=event_type)
+        started_at = time.perf_counter()
+
         # Создаем список корутин для вызова
         tasks = [handler(*args, **kwargs) for handler in handlers_to_call]
         
         # Запускаем все обработчики конкурентно и собираем результаты или исключения
         results: List[Union[Any, Exception]] = await asyncio.gather(*tasks, return_exceptions=True)
+        EVENT_PUBLISH_SECONDS.observe(time.perf_counter() - started_at, event_type=event_type)
 
         # Логируем ошибки, если они произошли в обработчиках
         for i, result_or_exc in enumerate(results):
             if isinstance(result_or_exc, Exception):
+                EVENT_HANDLER_ERRORS_TOTAL.inc(event_type=event_type)
                 failed_handler_name = handlers_to_call[i].__qualname__
                 self._logger.error(
                     f"Ошибка в обработчике события '{failed_handler_name}' при обработке события '{event_type}': "
@@ -1,12 +1,22 @@
 # core/http_client/manager.py
 
 import asyncio
-from typing import Optional, Dict, Any, Union, TYPE_CHECKING
+import base64
+import hashlib
+import json
+import random
+import time
+from contextlib import asynccontextmanager, nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from typing import Optional, Dict, Any, AsyncIterator, Callable, List, Mapping, TYPE_CHECKING
 
 try:
     import aiohttp
     from aiohttp import ClientSession, ClientTimeout, ClientResponse, ClientResponseError, ClientError
     from aiohttp import ServerTimeoutError as AiohttpTimeoutError
+    from multidict import CIMultiDict, CIMultiDictProxy
+    from yarl import URL
 except ImportError:
     aiohttp = None # type: ignore
     ClientSession = Any # type: ignore
@@ -15,38 +25,217 @@ except ImportError:
     ClientResponseError = Any # type: ignore
     ClientError = Any # type: ignore
     AiohttpTimeoutError = Any # type: ignore
+    CIMultiDict = CIMultiDictProxy = URL = Any # type: ignore
 
 from loguru import logger
 
+from core.monitoring.prometheus import REGISTRY
+
 if TYPE_CHECKING:
-    from core.app_settings import AppSettings
+    from core.app_settings import AppSettings, HttpClientSettings
+    from core.cache.manager import CacheManager
+
+HTTP_CLIENT_REQUEST_SECONDS = REGISTRY.histogram(
+    "sdb_http_client_request_duration_seconds",
+    "Время исходящих HTTP-запросов HTTPClientManager (до получения заголовков ответа).",
+    ("method", "host", "status"),
+)
+HTTP_CLIENT_RETRIES_TOTAL = REGISTRY.counter(
+    "sdb_http_client_retries_total",
+    "Повторы исходящих HTTP-запросов HTTPClientManager по причине (статус ответа или тип ошибки).",
+    ("host", "reason"),
+)
+HTTP_CLIENT_CACHE_TOTAL = REGISTRY.counter(
+    "sdb_http_client_cache_total",
+    "Обращения к кэшу ответов HTTPClientManager (hit, miss, revalidated).",
+    ("result",),
+)
+
+# Повтор таких запросов не меняет состояние сервера (RFC 9110, 9.2.2)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+HTTP_CACHE_KEY_PREFIX = "sdb:http:"
+
+
+class HTTPResponse:
+    """
+    Ответ с уже прочитанным телом. Соединение к этому моменту возвращено в пул,
+    поэтому объект можно хранить и читать после выхода из request() (в т.ч. ответ из кэша).
+    """
+
+    def __init__(self, method: str, url: str, status: int, reason: Optional[str],
+                 headers: 'CIMultiDictProxy[str]', body: bytes, request_info: Any = None,
+                 from_cache: bool = False):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.from_cache = from_cache
+        self._request_info = request_info
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("Content-Type", "application/octet-stream").split(";", 1)[0].strip().lower()
+
+    @property
+    def charset(self) -> Optional[str]:
+        for part in self.headers.get("Content-Type", "").split(";")[1:]:
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return None
+
+    @property
+    def request_info(self) -> Any:
+        if self._request_info is None:
+            self._request_info = aiohttp.RequestInfo(URL(self.url), self.method, CIMultiDictProxy(CIMultiDict()))
+        return self._request_info
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding: Optional[str] = None, errors: str = "strict") -> str:
+        return self.body.decode(encoding or self.charset or "utf-8", errors)
+
+    async def json(self, content_type: Optional[str] = "application/json",
+                   loads: Callable[[str], Any] = json.loads) -> Any:
+        if content_type and content_type not in self.content_type:
+            raise aiohttp.ContentTypeError(
+                self.request_info, (), status=self.status, headers=self.headers,
+                message=f"Attempt to decode JSON with unexpected mimetype: {self.content_type}",
+            )
+        if not self.body.strip():
+            return None
+        return loads(await self.text())
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise ClientResponseError(self.request_info, (), status=self.status,
+                                      message=self.reason or "", headers=self.headers)
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, sep, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') if sep else None
+    return directives
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _headers_to_entry(headers: Mapping[str, str]) -> Dict[str, List[str]]:
+    """Заголовки для записи кэша: имя -> список значений (повторы вроде Set-Cookie сохраняются, формат понятен json)."""
+    entry_headers: Dict[str, List[str]] = {}
+    for name, value in headers.items():
+        # Имена из aiohttp - istr; в записи только обычные str, чтобы json вернул их без изменений
+        entry_headers.setdefault(str(name), []).append(str(value))
+    return entry_headers
+
+
+def _headers_from_entry(entry_headers: Dict[str, List[str]]) -> 'CIMultiDict':
+    return CIMultiDict((name, value) for name, values in entry_headers.items() for value in values)
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: Optional[float] = None) -> int:
+    """
+    Сколько секунд ответ считается свежим по Cache-Control: max-age / Expires (за вычетом Age).
+    0 - ответ можно отдать из кэша только после условного запроса.
+    """
+    now = time.time() if now is None else now
+    directives = _parse_cache_control(headers.get("Cache-Control"))
+    if "no-cache" in directives:
+        return 0
+    lifetime = _parse_seconds(directives.get("max-age"))
+    if lifetime is None:
+        expires_at = _parse_http_date(headers.get("Expires"))
+        if expires_at is None:
+            return 0
+        lifetime = int(expires_at - (_parse_http_date(headers.get("Date")) or now))
+    return max(0, lifetime - (_parse_seconds(headers.get("Age")) or 0))
+
+
+def retry_after_seconds(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """Retry-After в секундах (число или HTTP-дата) или None."""
+    value = headers.get("Retry-After")
+    seconds = _parse_seconds(value)
+    if seconds is not None:
+        return float(seconds)
+    retry_at = _parse_http_date(value)
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
 
 
 class HTTPClientManager:
-    def __init__(self, default_timeout_seconds: int = 10, app_settings: Optional['AppSettings'] = None):
+    def __init__(self, default_timeout_seconds: Optional[float] = None, app_settings: Optional['AppSettings'] = None,
+                 cache_manager: Optional['CacheManager'] = None, http_settings: Optional['HttpClientSettings'] = None):
         if not aiohttp:
             msg = ("Библиотека aiohttp не установлена. Пожалуйста, установите ее (`pip install aiohttp`). "
                    "HTTPClientManager не будет работать.")
             logger.critical(msg)
             raise ImportError(msg)
-            
+
+        from core.app_settings import HttpClientSettings
+        self._app_settings: Optional['AppSettings'] = app_settings
+        self._settings: 'HttpClientSettings' = http_settings or (
+            app_settings.core.http_client if app_settings is not None else HttpClientSettings()
+        )
+        if default_timeout_seconds is not None:
+            self._settings = self._settings.model_copy(update={"timeout_seconds": default_timeout_seconds})
+
         self._session: Optional[ClientSession] = None
-        self._default_timeout_config = ClientTimeout(total=default_timeout_seconds) 
-        self._app_settings: Optional['AppSettings'] = app_settings 
+        self._default_timeout_config = ClientTimeout(total=self._settings.timeout_seconds,
+                                                     connect=self._settings.connect_timeout_seconds)
+        self._cache_manager: Optional['CacheManager'] = cache_manager
+        self._retry_statuses = frozenset(self._settings.retry_statuses)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
         self._is_initialized_successfully = False
-        logger.info(f"HTTPClientManager инициализирован (таймаут по умолчанию: {default_timeout_seconds} сек).")
+        self._stats: Dict[str, int] = {"requests": 0, "retries": 0, "cache_hits": 0,
+                                       "cache_misses": 0, "cache_revalidated": 0}
+        logger.info(f"HTTPClientManager инициализирован (таймаут по умолчанию: {self._settings.timeout_seconds} сек, "
+                    f"пул: {self._settings.pool_limit or 'без лимита'}/{self._settings.pool_limit_per_host or 'без лимита'} "
+                    f"на хост, повторов: {self._settings.retry_attempts}, кэш ответов: "
+                    f"{'вкл' if self._settings.cache_enabled else 'выкл'}).")
 
     async def initialize(self) -> None:
         if self._session is None or self._session.closed:
             try:
-                self._session = ClientSession(timeout=self._default_timeout_config)
+                connector = aiohttp.TCPConnector(
+                    limit=self._settings.pool_limit,
+                    limit_per_host=self._settings.pool_limit_per_host,
+                    ttl_dns_cache=self._settings.dns_cache_ttl_seconds or None,
+                    use_dns_cache=self._settings.dns_cache_ttl_seconds > 0,
+                    keepalive_timeout=self._settings.keepalive_timeout_seconds,
+                )
+                self._session = ClientSession(timeout=self._default_timeout_config, connector=connector)
                 self._is_initialized_successfully = True
                 logger.success("aiohttp.ClientSession успешно создан и инициализирован.")
             except Exception as e:
                 logger.error(f"Ошибка при создании aiohttp.ClientSession: {e}", exc_info=True)
                 self._session = None
                 self._is_initialized_successfully = False
-                raise 
+                raise
         else:
             logger.debug("aiohttp.ClientSession уже был инициализирован.")
 
@@ -58,17 +247,43 @@ class HTTPClientManager:
             except Exception as e:
                 logger.error(f"Ошибка при закрытии aiohttp.ClientSession: {e}", exc_info=True)
         self._session = None
+        self._host_semaphores.clear()
         self._is_initialized_successfully = False
 
     def is_available(self) -> bool:
         return self._session is not None and not self._session.closed and self._is_initialized_successfully
 
+    def get_stats(self) -> Dict[str, Any]:
+        busy_hosts = {host: self._settings.max_concurrency_per_host - semaphore._value
+                      for host, semaphore in self._host_semaphores.items()
+                      if semaphore._value < self._settings.max_concurrency_per_host}
+        return {**self._stats, "busy_hosts": busy_hosts}
+
     def _get_session(self) -> ClientSession:
         if not self.is_available():
             msg = "HTTPClientManager (aiohttp.ClientSession) не инициализирован или закрыт! Вызовите initialize()."
             logger.critical(msg)
             raise RuntimeError(msg)
-        return self._session # type: ignore 
+        return self._session # type: ignore
+
+    def _host_slot(self, url: str):
+        """Ограничивает число одновременных запросов к одному хосту (остальные ждут своей очереди)."""
+        limit = self._settings.max_concurrency_per_host
+        if limit <= 0:
+            return nullcontext()
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _retry_delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Экспоненциальная пауза с полным случайным разбросом; Retry-After сервера имеет приоритет."""
+        max_delay = self._settings.retry_backoff_max_seconds
+        server_delay = retry_after_seconds(headers) if headers is not None else None
+        if server_delay is not None:
+            return min(server_delay, max_delay)
+        return random.uniform(0, min(max_delay, self._settings.retry_backoff_seconds * 2 ** (attempt - 1)))
 
     async def request(
         self,
@@ -78,64 +293,282 @@ class HTTPClientManager:
         data: Optional[Any] = None,
         json_data: Optional[Any] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout_seconds: Optional[int] = None,
-        raise_for_status: bool = False 
-    ) -> Optional[ClientResponse]:
+        timeout_seconds: Optional[float] = None,
+        raise_for_status: bool = False,
+        retry: bool = True,
+        use_cache: bool = True,
+    ) -> Optional[HTTPResponse]:
+        """
+        Выполняет запрос и возвращает HTTPResponse с прочитанным телом.
+
+        Идемпотентные методы повторяются при сетевых ошибках, таймаутах и статусах из retry_statuses
+        (retry=False - без повторов). GET без тела кэшируется в CacheManager по Cache-Control,
+        ETag и Last-Modified (use_cache=False - мимо кэша). Большие ответы читайте через stream().
+        """
         session = self._get_session()
-        current_timeout_config = ClientTimeout(total=timeout_seconds) if timeout_seconds is not None else self._default_timeout_config
-        
+        method = method.upper()
+        current_timeout_config = ClientTimeout(total=timeout_seconds, connect=self._settings.connect_timeout_seconds) \
+            if timeout_seconds is not None else self._default_timeout_config
+        request_headers = dict(headers or {})
+
+        log_context = {"method": method, "url": url, "params": params, "json_body": json_data is not None}
+        logger.debug(f"HTTP Request: {method} {url}", **log_context)
+
+        cache_key: Optional[str] = None
+        cached_entry: Optional[Dict[str, Any]] = None
+        if use_cache and self._can_use_cache(method, data, json_data, request_headers):
+            cache_key = self._cache_key(method, url, params, request_headers)
+            cached_entry = await self._cache_get(cache_key)
+            if cached_entry is not None:
+                request_no_cache = "no-cache" in _parse_cache_control(request_headers.get("Cache-Control"))
+                if not request_no_cache and time.time() < cached_entry["fresh_until"]:
+                    self._count_cache("hit")
+                    logger.debug(f"HTTP Response: Status {cached_entry['status']} for {url} (из кэша)", **log_context)
+                    return self._response_from_entry(method, cached_entry)
+                if cached_entry.get("etag"):
+                    request_headers["If-None-Match"] = cached_entry["etag"]
+                if cached_entry.get("last_modified"):
+                    request_headers["If-Modified-Since"] = cached_entry["last_modified"]
+
         request_kwargs = {
             "params": params, "data": data, "json": json_data,
-            "headers": headers, "timeout": current_timeout_config,
+            "headers": request_headers or None, "timeout": current_timeout_config,
         }
         active_request_kwargs = {k: v for k, v in request_kwargs.items() if v is not None}
+        attempts = 1 + (self._settings.retry_attempts if retry and method in IDEMPOTENT_METHODS else 0)
 
-        log_context = {"method": method.upper(), "url": url, "params": params, "json_body": json_data is not None}
-        logger.debug(f"HTTP Request: {method.upper()} {url}", **log_context)
-        
         try:
-            async with session.request(method, url, **active_request_kwargs) as response:
-                logger.debug(f"HTTP Response: Status {response.status} for {url}", 
-                             **log_context, status_code=response.status)
-                if raise_for_status:
-                    response.raise_for_status() 
-                return response
-        except ClientResponseError as e: 
+            response = await self._send(session, method, url, active_request_kwargs, attempts, log_context)
+        except ClientResponseError as e:
             logger.warning(f"HTTP ClientResponseError: {e.status} {e.message} for {url}", **log_context)
-            raise 
+            raise
         except (asyncio.TimeoutError, AiohttpTimeoutError) as e:
             logger.warning(f"HTTP TimeoutError for {url} (timeout: {current_timeout_config.total}s): {type(e).__name__}", **log_context)
-            raise 
-        except ClientError as e: 
+            raise
+        except ClientError as e:
             logger.error(f"HTTP ClientError for {url}: {e}", **log_context, exc_info=True)
-            raise 
-        except Exception as e: 
+            raise
+        except Exception as e:
             logger.error(f"Unexpected HTTP Error during request to {url}: {e}", **log_context, exc_info=True)
             raise
 
+        if cache_key is not None:
+            if cached_entry is not None and response.status == 304:
+                self._count_cache("revalidated")
+                cached_entry = self._refresh_entry(cached_entry, response.headers)
+                await self._cache_set(cache_key, cached_entry)
+                response = self._response_from_entry(method, cached_entry)
+            else:
+                self._count_cache("miss")
+                entry = self._build_entry(url, response)
+                if entry is not None:
+                    await self._cache_set(cache_key, entry)
+
+        if raise_for_status:
+            try:
+                response.raise_for_status()
+            except ClientResponseError as e:
+                logger.warning(f"HTTP ClientResponseError: {e.status} {e.message} for {url}", **log_context)
+                raise
+        return response
+
+    async def _send(self, session: ClientSession, method: str, url: str, request_kwargs: Dict[str, Any],
+                    attempts: int, log_context: Dict[str, Any]) -> HTTPResponse:
+        host = urlsplit(url).hostname or "unknown"
+        attempt = 1
+        while True:
+            self._stats["requests"] += 1
+            started_at = time.perf_counter()
+            response_received = False
+            try:
+                async with self._host_slot(url):
+                    async with session.request(method, url, **request_kwargs) as raw_response:
+                        response_received = True
+                        self._observe_request(method, url, started_at, str(raw_response.status))
+                        body = await raw_response.read()
+                        response = HTTPResponse(method, str(raw_response.url), raw_response.status, raw_response.reason,
+                                                raw_response.headers, body, request_info=raw_response.request_info)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+                if not response_received:
+                    is_timeout = isinstance(e, asyncio.TimeoutError)
+                    self._observe_request(method, url, started_at, "timeout" if is_timeout else "error")
+                if attempt >= attempts:
+                    raise
+                await self._wait_before_retry(attempt, url, host, type(e).__name__, None, log_context)
+                attempt += 1
+                continue
+
+            logger.debug(f"HTTP Response: Status {response.status} for {url}", **log_context, status_code=response.status)
+            if response.status in self._retry_statuses and attempt < attempts:
+                await self._wait_before_retry(attempt, url, host, str(response.status), response.headers, log_context)
+                attempt += 1
+                continue
+            return response
+
+    async def _wait_before_retry(self, attempt: int, url: str, host: str, reason: str,
+                                 headers: Optional[Mapping[str, str]], log_context: Dict[str, Any]) -> None:
+        delay = self._retry_delay(attempt, headers)
+        self._stats["retries"] += 1
+        HTTP_CLIENT_RETRIES_TOTAL.inc(host=host, reason=reason)
+        logger.info(f"HTTP Retry: {reason} for {url}, попытка {attempt + 1} через {delay:.2f} сек.", **log_context)
+        await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Any] = None,
+        json_data: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        read_timeout_seconds: Optional[float] = None,
+        raise_for_status: bool = False,
+    ) -> AsyncIterator[ClientResponse]:
+        """
+        Запрос без буферизации тела: внутри блока читайте response.content (iter_chunked и т.п.).
+        Общего таймаута нет - ограничено только ожидание очередного куска (read_timeout_seconds),
+        поэтому большие загрузки не обрываются. Без повторов и кэша; слот хоста занят до выхода из блока.
+        """
+        session = self._get_session()
+        method = method.upper()
+        timeout = ClientTimeout(total=None, connect=self._settings.connect_timeout_seconds,
+                                sock_read=read_timeout_seconds or self._settings.timeout_seconds)
+        request_kwargs = {"params": params, "data": data, "json": json_data, "headers": headers, "timeout": timeout}
+        active_request_kwargs = {k: v for k, v in request_kwargs.items() if v is not None}
+        logger.debug(f"HTTP Stream: {method} {url}", method=method, url=url, params=params)
+
+        started_at = time.perf_counter()
+        async with self._host_slot(url):
+            try:
+                response_cm = session.request(method, url, **active_request_kwargs)
+                response = await response_cm.__aenter__()
+            except (asyncio.TimeoutError, ClientError) as e:
+                self._observe_request(method, url, started_at, "timeout" if isinstance(e, asyncio.TimeoutError) else "error")
+                logger.warning(f"HTTP Stream error for {url}: {type(e).__name__} - {e}")
+                raise
+            try:
+                self._stats["requests"] += 1
+                self._observe_request(method, url, started_at, str(response.status))
+                if raise_for_status:
+                    response.raise_for_status()
+                yield response
+            finally:
+                await response_cm.__aexit__(None, None, None)
+
+    @staticmethod
+    def _observe_request(method: str, url: str, started_at: float, status: str) -> None:
+        HTTP_CLIENT_REQUEST_SECONDS.observe(time.perf_counter() - started_at, method=method.upper(),
+                                            host=urlsplit(url).hostname or "unknown", status=status)
+
+    # --- Кэш ответов ---
+
+    def _can_use_cache(self, method: str, data: Any, json_data: Any, headers: Mapping[str, str]) -> bool:
+        if not self._settings.cache_enabled or method != "GET" or data is not None or json_data is not None:
+            return False
+        if self._cache_manager is None or not self._cache_manager.is_available():
+            return False
+        return "no-store" not in _parse_cache_control(headers.get("Cache-Control"))
+
+    @staticmethod
+    def _cache_key(method: str, url: str, params: Optional[Dict[str, Any]], headers: Mapping[str, str]) -> str:
+        # Заголовки запроса (Authorization, Accept...) входят в ключ целиком - это покрывает и Vary
+        material = json.dumps(
+            [method, url, sorted((str(k), str(v)) for k, v in (params or {}).items()),
+             sorted((k.lower(), str(v)) for k, v in headers.items())],
+            ensure_ascii=False,
+        )
+        return HTTP_CACHE_KEY_PREFIX + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _build_entry(self, url: str, response: HTTPResponse) -> Optional[Dict[str, Any]]:
+        """Запись кэша для ответа или None, если ответ хранить нельзя."""
+        if response.status != 200 or len(response.body) > self._settings.cache_max_body_bytes:
+            return None
+        directives = _parse_cache_control(response.headers.get("Cache-Control"))
+        if "no-store" in directives or response.headers.get("Vary", "").strip() == "*":
+            return None
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now)
+        if lifetime <= 0 and not (etag or last_modified):
+            return None
+        return {
+            "url": url, "status": response.status, "reason": response.reason,
+            # Только json-совместимые типы: запись должна сериализоваться при cache.serializer: json
+            "headers": _headers_to_entry(response.headers), "body": base64.b64encode(response.body).decode("ascii"),
+            "fresh_until": now + lifetime, "etag": etag, "last_modified": last_modified,
+        }
+
+    def _refresh_entry(self, entry: Dict[str, Any], headers: Mapping[str, str]) -> Dict[str, Any]:
+        """Ответ 304: тело прежнее, заголовки и срок свежести - из нового ответа."""
+        merged = _headers_from_entry(entry["headers"])
+        for name in ("Cache-Control", "Expires", "Date", "ETag", "Last-Modified", "Age"):
+            if name in headers:
+                merged[name] = headers[name]
+            elif name == "Age":
+                merged.pop(name, None)
+        now = time.time()
+        return {
+            **entry, "headers": _headers_to_entry(merged), "fresh_until": now + freshness_lifetime(merged, now),
+            "etag": merged.get("ETag"), "last_modified": merged.get("Last-Modified"),
+        }
+
+    def _entry_ttl(self, entry: Dict[str, Any]) -> int:
+        ttl = max(0, int(entry["fresh_until"] - time.time()))
+        if entry.get("etag") or entry.get("last_modified"):
+            ttl += self._settings.cache_revalidate_ttl_seconds
+        return max(1, ttl)
+
+    @staticmethod
+    def _response_from_entry(method: str, entry: Dict[str, Any]) -> HTTPResponse:
+        return HTTPResponse(method, entry["url"], entry["status"], entry["reason"],
+                            CIMultiDictProxy(_headers_from_entry(entry["headers"])), base64.b64decode(entry["body"]),
+                            from_cache=True)
+
+    def _count_cache(self, result: str) -> None:
+        HTTP_CLIENT_CACHE_TOTAL.inc(result=result)
+        self._stats[{"hit": "cache_hits", "miss": "cache_misses", "revalidated": "cache_revalidated"}[result]] += 1
+
+    async def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = await self._cache_manager.get(key) # type: ignore[union-attr]
+        except Exception as e:
+            logger.warning(f"HTTPClientManager: ошибка чтения кэша ответов: {e}")
+            return None
+        # Записи старого формата (bytes-тело, список заголовков) считаем промахом
+        if not isinstance(entry, dict) or not isinstance(entry.get("body"), str) or not isinstance(entry.get("headers"), dict):
+            return None
+        return entry
+
+    async def _cache_set(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            await self._cache_manager.set(key, entry, ttl_seconds=self._entry_ttl(entry)) # type: ignore[union-attr]
+        except Exception as e:
+            logger.warning(f"HTTPClientManager: ошибка записи в кэш ответов: {e}")
 
     async def get_json(
-        self, url: str, params: Optional[Dict[str, Any]] = None, 
-        headers: Optional[Dict[str, str]] = None, timeout_seconds: Optional[int] = None,
-        default_on_error: Optional[Any] = None 
+        self, url: str, params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None, timeout_seconds: Optional[float] = None,
+        default_on_error: Optional[Any] = None
     ) -> Optional[Any]:
-        response: Optional[ClientResponse] = None
+        response: Optional[HTTPResponse] = None
         try:
-            response = await self.request("GET", url, params=params, headers=headers, 
+            response = await self.request("GET", url, params=params, headers=headers,
                                           timeout_seconds=timeout_seconds, raise_for_status=True)
-            if response: 
+            if response:
                 return await response.json()
-            return default_on_error 
+            return default_on_error
         except (ClientResponseError, asyncio.TimeoutError, AiohttpTimeoutError, ClientError) as e:
             logger.warning(f"HTTP(S) error during get_json for {url}: {type(e).__name__} - {e}")
             if default_on_error is not None: return default_on_error
             raise
-        except aiohttp.ContentTypeError as e_json: 
+        except aiohttp.ContentTypeError as e_json:
             logger.warning(f"Failed to decode JSON response from {url}: {e_json}")
-            if response: logger.trace(f"Response text (JSON error): {(await response.text())[:200]}")
+            if response: logger.trace(f"Response text (JSON error): {(await response.text(errors='replace'))[:200]}")
             if default_on_error is not None: return default_on_error
             raise
-        except Exception as e_unexp: 
+        except Exception as e_unexp:
             logger.error(f"Unexpected error in get_json for {url}: {e_unexp}", exc_info=True)
             if default_on_error is not None: return default_on_error
             raise
@@ -143,10 +576,10 @@ class HTTPClientManager:
 
     async def post_json_response(
         self, url: str, json_data: Optional[Any] = None, params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None, timeout_seconds: Optional[int] = None,
-        default_on_error: Optional[Any] = None 
+        headers: Optional[Dict[str, str]] = None, timeout_seconds: Optional[float] = None,
+        default_on_error: Optional[Any] = None
     ) -> Optional[Any]:
-        response: Optional[ClientResponse] = None
+        response: Optional[HTTPResponse] = None
         try:
             response = await self.request("POST", url, params=params, json_data=json_data, headers=headers,
                                           timeout_seconds=timeout_seconds, raise_for_status=True)
@@ -159,10 +592,10 @@ class HTTPClientManager:
             raise
         except aiohttp.ContentTypeError as e_json:
             logger.warning(f"Failed to decode JSON response from {url} after POST: {e_json}")
-            if response: logger.trace(f"Response text (JSON error): {(await response.text())[:200]}")
+            if response: logger.trace(f"Response text (JSON error): {(await response.text(errors='replace'))[:200]}")
             if default_on_error is not None: return default_on_error
             raise
         except Exception as e_unexp:
             logger.error(f"Unexpected error in post_json for {url}: {e_unexp}", exc_info=True)
             if default_on_error is not None: return default_on_error
-            raise
\ No newline at end of file
+            raise
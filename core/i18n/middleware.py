@@ -2,13 +2,13 @@
 
 from typing import Callable, Dict, Any, Awaitable, Optional
 from aiogram import BaseMiddleware
+from loguru import logger
 from aiogram.types import TelegramObject, User as AiogramUser # User из aiogram.types
 
 # Импортируем наш Translator и AppSettings (для дефолтного языка и списка доступных)
 from .translator import Translator
 from core.app_settings import settings as sdb_settings # Глобальные настройки
 from core.database.core_models import User as DBUser # Наша модель User из БД
-from sqlalchemy.ext.asyncio import AsyncSession # Для работы с БД
 
 # Для доступа к BotServicesProvider из workflow_data диспетчера (если он там есть)
 # from core.services_provider import BotServicesProvider
@@ -47,27 +47,20 @@ class I18nMiddleware(BaseMiddleware):
             db_user: Optional[DBUser] = None
             if services and hasattr(services, 'db'):
                 try:
-                    async with services.db.get_session() as session: # type: AsyncSession
-                        # Ищем пользователя по telegram_id
-                        from sqlalchemy import select # Ленивый импорт
-                        stmt = select(DBUser).where(DBUser.telegram_id == aiogram_event_user.id)
-                        result = await session.execute(stmt)
-                        db_user = result.scalars().first()
-                        
-                        if db_user and db_user.preferred_language_code and db_user.preferred_language_code in self.available_locales:
-                            user_locale = db_user.preferred_language_code
-                        elif db_user and not db_user.preferred_language_code:
-                            # Если у пользователя в БД нет языка, но есть язык в Telegram и он поддерживается
-                            if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
-                                user_locale = aiogram_event_user.language_code
-                                # Можно обновить язык в БД для этого пользователя
-                                # db_user.preferred_language_code = user_locale
-                                # await session.commit() # ОСТОРОЖНО: commit в middleware
-                        elif not db_user: # Если пользователя нет в БД
-                            if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
-                                user_locale = aiogram_event_user.language_code
+                    # Пользователь загружается один раз на апдейт (или берется из кэша контекста)
+                    # и тот же объект затем используют UserStatusMiddleware и хэндлеры
+                    db_user = await services.user_service.context.get_user(aiogram_event_user.id, data)
+                    
+                    if db_user and db_user.preferred_language_code and db_user.preferred_language_code in self.available_locales:
+                        user_locale = db_user.preferred_language_code
+                    elif db_user and not db_user.preferred_language_code:
+                        # Если у пользователя в БД нет языка, но есть язык в Telegram и он поддерживается
+                        if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
+                            user_locale = aiogram_event_user.language_code
+                    elif not db_user: # Если пользователя нет в БД
+                        if aiogram_event_user.language_code and aiogram_event_user.language_code in self.available_locales:
+                            user_locale = aiogram_event_user.language_code
                 except Exception as e:
-                    # logger.error(f"Ошибка получения языка пользователя из БД для TG ID {aiogram_event_user.id}: {e}")
                     # Используем логгер из data, если он там есть
                     data.get("logger", logger).error(f"I18nMiddleware: Ошибка БД при получении языка для TG ID {aiogram_event_user.id}: {e}")
                     # Продолжаем с default_locale или языком из Telegram, если он был определен ранее
@@ -0,0 +1,363 @@
+# core/log_index.py
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional
+
+from loguru import logger as global_logger
+
+logger = global_logger.bind(service="LogIndex")
+
+LOG_INDEX_FILENAME = "log_index.sqlite3"
+
+# Числовые уровни loguru - для текстовых логов, где в строке есть только имя уровня
+LEVEL_NUMBERS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# Строка текстового лога: "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}"
+_TEXT_LINE_RE = re.compile(
+    r"^(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) \| (?P<level>[A-Z]+)\s*\| "
+    r"(?P<logger>[^:]*):(?P<function>[^:]*):(?P<line>\d+) - (?P<message>.*)$"
+)
+# .../<год>/<месяц>-<название>/<день>/<час>_sdb...
+_HOURLY_PATH_RE = re.compile(r"(?P<year>\d{4})[/\\](?P<month>\d{2})-[^/\\]*[/\\](?P<day>\d{2})[/\\](?P<hour>\d{2})_sdb\.")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    entries INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS log_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS messages (
+    hash INTEGER PRIMARY KEY,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    ts REAL NOT NULL,
+    level_no INTEGER NOT NULL,
+    logger_id INTEGER NOT NULL,
+    message_hash INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    service TEXT,
+    user_id INTEGER,
+    update_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_entries_ts ON entries (ts);
+CREATE INDEX IF NOT EXISTS ix_entries_level_ts ON entries (level_no, ts);
+CREATE INDEX IF NOT EXISTS ix_entries_message ON entries (message_hash);
+CREATE INDEX IF NOT EXISTS ix_entries_file ON entries (file_id);
+"""
+
+
+def message_hash(text: str) -> int:
+    """Стабильный 63-битный хэш сообщения (помещается в INTEGER SQLite)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big") >> 1
+
+
+def get_log_index_path(structured_logs_root: Path) -> Path:
+    return structured_logs_root / LOG_INDEX_FILENAME
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_json_line(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(line)
+        ts = datetime.fromisoformat(data["ts"]).timestamp()
+    except (ValueError, KeyError, TypeError):
+        return None
+    level = str(data.get("level", "INFO"))
+    return {
+        "ts": ts,
+        "level": level,
+        "level_no": _optional_int(data.get("level_no")) or LEVEL_NUMBERS.get(level, 0),
+        "logger": data.get("logger") or "",
+        "message": data.get("message") or "",
+        "service": data.get("service"),
+        "user_id": _optional_int(data.get("user_id")),
+        "update_id": _optional_int(data.get("update_id")),
+    }
+
+
+def parse_text_line(line: str) -> Optional[Dict[str, Any]]:
+    match = _TEXT_LINE_RE.match(line)
+    if not match:
+        # Продолжение многострочного сообщения или traceback
+        return None
+    level = match["level"]
+    return {
+        # Текстовый формат пишет локальное время без смещения
+        "ts": datetime.strptime(match["ts"], "%Y-%m-%d %H:%M:%S.%f").timestamp(),
+        "level": level,
+        "level_no": LEVEL_NUMBERS.get(level, 0),
+        "logger": match["logger"],
+        "message": match["message"],
+        "service": None,
+        "user_id": None,
+        "update_id": None,
+    }
+
+
+def is_json_log(path: Path) -> bool:
+    return ".jsonl" in path.name
+
+
+def iter_log_entries(path: Path) -> Iterator[Dict[str, Any]]:
+    """Записи лог-файла (.log/.jsonl или их .zip-архива от ротации loguru)."""
+    parse = parse_json_line if is_json_log(path) else parse_text_line
+
+    def _iter_stream(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        for raw_line in stream:
+            entry = parse(raw_line.decode("utf-8", errors="replace").rstrip("\r\n"))
+            if entry is not None:
+                yield entry
+
+    if path.suffix.lower() == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as stream:
+                        yield from _iter_stream(stream)
+    else:
+        with open(path, "rb") as f:
+            yield from _iter_stream(f)
+
+
+def is_live_log_file(path: Path, now: Optional[datetime] = None) -> bool:
+    """Незаархивированный файл текущего часа (UTC) - в него еще пишет loguru."""
+    if path.suffix.lower() == ".zip":
+        return False
+    match = _HOURLY_PATH_RE.search(str(path))
+    if not match:
+        return False
+    now = now or datetime.now(timezone.utc)
+    return (int(match["year"]), int(match["month"]), int(match["day"]), int(match["hour"])) == \
+        (now.year, now.month, now.day, now.hour)
+
+
+def find_log_files(structured_logs_root: Path, json_logs: bool) -> List[Path]:
+    if not structured_logs_root.is_dir():
+        return []
+    return sorted(
+        path for path in structured_logs_root.rglob("*_sdb.*")
+        if path.is_file() and is_json_log(path) == json_logs
+        and (path.suffix.lower() in (".log", ".jsonl", ".zip"))
+    )
+
+
+class LogIndex:
+    """
+    SQLite-индекс закрытых часовых лог-файлов для быстрых запросов по уровню, времени и тексту.
+
+    Записи хранятся компактно: имя логгера и текст сообщения вынесены в словари
+    (log_names, messages по хэшу), в entries - только числа. Индексируются только закрытые
+    файлы (прошлые часы и .zip-архивы), каждый ровно один раз; файл текущего часа
+    query() при необходимости разбирает на лету.
+    """
+
+    def __init__(self, index_path: Path, structured_logs_root: Path, json_logs: bool = False):
+        self.index_path = index_path
+        self.structured_logs_root = structured_logs_root
+        self.json_logs = json_logs
+        self._lock = threading.Lock()
+        self._logger_ids: Dict[str, int] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.index_path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    # --- Индексация ---
+
+    def _logger_id(self, conn: sqlite3.Connection, name: str) -> int:
+        logger_id = self._logger_ids.get(name)
+        if logger_id is None:
+            conn.execute("INSERT OR IGNORE INTO log_names (name) VALUES (?)", (name,))
+            logger_id = conn.execute("SELECT id FROM log_names WHERE name = ?", (name,)).fetchone()[0]
+            self._logger_ids[name] = logger_id
+        return logger_id
+
+    def _index_file(self, conn: sqlite3.Connection, path: Path) -> int:
+        stat = path.stat()
+        cursor = conn.execute(
+            "INSERT INTO indexed_files (path, size, mtime_ns, entries, indexed_at) VALUES (?, ?, ?, 0, ?)",
+            (str(path), stat.st_size, stat.st_mtime_ns, time.time()),
+        )
+        file_id = cursor.lastrowid
+        rows = []
+        messages = {}
+        for entry in iter_log_entries(path):
+            hashed = message_hash(entry["message"])
+            messages[hashed] = entry["message"]
+            rows.append((entry["ts"], entry["level_no"], self._logger_id(conn, entry["logger"]), hashed, file_id,
+                         entry["service"], entry["user_id"], entry["update_id"]))
+        conn.executemany("INSERT OR IGNORE INTO messages (hash, text) VALUES (?, ?)", messages.items())
+        conn.executemany(
+            "INSERT INTO entries (ts, level_no, logger_id, message_hash, file_id, service, user_id, update_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows,
+        )
+        conn.execute("UPDATE indexed_files SET entries = ? WHERE id = ?", (len(rows), file_id))
+        return len(rows)
+
+    def update(self) -> Dict[str, int]:
+        """
+        Индексирует новые закрытые файлы и забывает удаленные (очистка по retention).
+        Синхронный метод - из event loop вызывать через asyncio.to_thread.
+        """
+        stats = {"files_indexed": 0, "entries_indexed": 0, "files_forgotten": 0}
+        with self._lock, closing(self._connect()) as conn:
+            # Файл индекса могли удалить/пересоздать - id логгеров берем из текущей БД
+            self._logger_ids.clear()
+            known = {row[0]: row[1] for row in conn.execute("SELECT path, id FROM indexed_files")}
+            on_disk = find_log_files(self.structured_logs_root, self.json_logs)
+            on_disk_paths = {str(path) for path in on_disk}
+
+            for path_str, file_id in known.items():
+                if path_str not in on_disk_paths:
+                    with conn:
+                        conn.execute("DELETE FROM entries WHERE file_id = ?", (file_id,))
+                        conn.execute("DELETE FROM indexed_files WHERE id = ?", (file_id,))
+                    stats["files_forgotten"] += 1
+
+            for path in on_disk:
+                if str(path) in known or is_live_log_file(path):
+                    continue
+                try:
+                    with conn:
+                        stats["entries_indexed"] += self._index_file(conn, path)
+                    stats["files_indexed"] += 1
+                except (OSError, zipfile.BadZipFile, sqlite3.DatabaseError) as e:
+                    # Транзакция откатилась вместе с новыми log_names
+                    self._logger_ids.clear()
+                    logger.warning(f"Не удалось проиндексировать лог-файл {path}: {e}")
+
+            if stats["files_forgotten"]:
+                with conn:
+                    conn.execute("DELETE FROM messages WHERE hash NOT IN (SELECT DISTINCT message_hash FROM entries)")
+        return stats
+
+    # --- Запросы ---
+
+    @staticmethod
+    def _matches(entry: Dict[str, Any], min_level_no: Optional[int], since_ts: Optional[float],
+                 until_ts: Optional[float], search: Optional[str], logger_prefix: Optional[str]) -> bool:
+        if min_level_no is not None and entry["level_no"] < min_level_no:
+            return False
+        if since_ts is not None and entry["ts"] < since_ts:
+            return False
+        if until_ts is not None and entry["ts"] >= until_ts:
+            return False
+        if search and search.lower() not in entry["message"].lower():
+            return False
+        if logger_prefix and not entry["logger"].startswith(logger_prefix):
+            return False
+        return True
+
+    def _live_entries(self) -> Iterable[Dict[str, Any]]:
+        for path in find_log_files(self.structured_logs_root, self.json_logs):
+            if is_live_log_file(path):
+                try:
+                    yield from iter_log_entries(path)
+                except OSError as e:
+                    logger.warning(f"Не удалось прочитать текущий лог-файл {path}: {e}")
+
+    def query(
+        self,
+        min_level: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        search: Optional[str] = None,
+        logger_prefix: Optional[str] = None,
+        limit: int = 50,
+        include_live: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Последние limit записей по фильтрам, от новых к старым."""
+        min_level_no = LEVEL_NUMBERS.get(min_level.upper()) if min_level else None
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+
+        conditions, params = [], []
+        if min_level_no is not None:
+            conditions.append("e.level_no >= ?")
+            params.append(min_level_no)
+        if since_ts is not None:
+            conditions.append("e.ts >= ?")
+            params.append(since_ts)
+        if until_ts is not None:
+            conditions.append("e.ts < ?")
+            params.append(until_ts)
+        if search:
+            conditions.append("m.text LIKE ? ESCAPE '\\'")
+            params.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if logger_prefix:
+            conditions.append("n.name LIKE ? ESCAPE '\\'")
+            params.append(logger_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT e.ts, e.level_no, n.name, m.text, e.service, e.user_id, e.update_id "
+                f"FROM entries e JOIN messages m ON m.hash = e.message_hash JOIN log_names n ON n.id = e.logger_id "
+                f"{where} ORDER BY e.ts DESC LIMIT ?", (*params, limit),
+            ).fetchall()
+        level_names = {number: name for name, number in LEVEL_NUMBERS.items()}
+        results = [
+            {"ts": ts, "level_no": level_no, "level": level_names.get(level_no, str(level_no)), "logger": name,
+             "message": text, "service": service, "user_id": user_id, "update_id": update_id}
+            for ts, level_no, name, text, service, user_id, update_id in rows
+        ]
+        if include_live:
+            live = [entry for entry in self._live_entries()
+                    if self._matches(entry, min_level_no, since_ts, until_ts, search, logger_prefix)]
+            if live:
+                results = sorted(results + live, key=lambda entry: entry["ts"], reverse=True)[:limit]
+        return results
+
+    def summary(self, since: Optional[datetime] = None, top: int = 5) -> Dict[str, Any]:
+        """Число записей по уровням и самые частые сообщения уровня ERROR+ (только проиндексированные файлы)."""
+        since_ts = since.timestamp() if since else 0.0
+        with closing(self._connect()) as conn:
+            by_level = conn.execute(
+                "SELECT level_no, COUNT(*) FROM entries WHERE ts >= ? GROUP BY level_no", (since_ts,)
+            ).fetchall()
+            top_errors = conn.execute(
+                "SELECT m.text, COUNT(*) AS cnt FROM entries e JOIN messages m ON m.hash = e.message_hash "
+                "WHERE e.ts >= ? AND e.level_no >= ? GROUP BY e.message_hash ORDER BY cnt DESC LIMIT ?",
+                (since_ts, LEVEL_NUMBERS["ERROR"], top),
+            ).fetchall()
+            busiest_hours = conn.execute(
+                "SELECT CAST(strftime('%H', ts, 'unixepoch', 'localtime') AS INTEGER) AS hour, COUNT(*) AS cnt "
+                "FROM entries WHERE ts >= ? GROUP BY hour ORDER BY cnt DESC LIMIT 3", (since_ts,)
+            ).fetchall()
+            files_indexed = conn.execute("SELECT COUNT(*) FROM indexed_files").fetchone()[0]
+        level_names = {number: name for name, number in LEVEL_NUMBERS.items()}
+        counts = {level_names.get(level_no, str(level_no)): count for level_no, count in by_level}
+        return {
+            "total": sum(counts.values()),
+            "by_level": counts,
+            "top_errors": [{"message": text, "count": count} for text, count in top_errors],
+            "busiest_hours": [{"hour": hour, "count": count} for hour, count in busiest_hours],
+            "files_indexed": files_indexed,
+        }
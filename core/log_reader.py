@@ -0,0 +1,218 @@
+# core/log_reader.py
+
+import asyncio
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import IO, Deque, List, Optional, Tuple
+
+# Размер блока при чтении файла с конца
+TAIL_BLOCK_SIZE = 64 * 1024
+# Каждая INDEX_STRIDE-я строка попадает в разреженный индекс смещений
+INDEX_STRIDE = 1000
+
+
+class _LineIndex:
+    """
+    Разреженный индекс строк файла: offsets[i] - байтовое смещение строки i * stride.
+    Для обычного файла индекс достраивается с места, где остановился, пока файл только растет.
+    """
+    __slots__ = ("identity", "size", "offsets", "total_lines", "last_line_offset", "last_line_complete")
+
+    def __init__(self, identity: Tuple[int, int]):
+        self.identity = identity
+        self.size = 0
+        self.offsets: List[int] = [0]
+        self.total_lines = 0
+        self.last_line_offset = 0
+        self.last_line_complete = True
+
+
+class LogReader:
+    """
+    Чтение лог-файлов без загрузки целиком в память и без блокировки event loop.
+
+    - tail() читает файл блоками с конца;
+    - count_lines()/read_lines() используют разреженный индекс смещений строк
+      (страница ищется от ближайшей опорной точки, а не с начала файла);
+    - .zip-архивы, которые создает ротация loguru, читаются напрямую из архива
+      (первый член архива), без распаковки на диск;
+    - все операции выполняются в потоке через asyncio.to_thread.
+    """
+
+    def __init__(self, stride: int = INDEX_STRIDE, max_cached_indexes: int = 32):
+        self._stride = max(1, stride)
+        self._max_cached_indexes = max_cached_indexes
+        self._indexes: "OrderedDict[Path, _LineIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- Публичный async API ---
+
+    async def tail(self, path: Path, lines: int = 50) -> List[str]:
+        return await asyncio.to_thread(self._tail_sync, Path(path), lines)
+
+    async def count_lines(self, path: Path) -> int:
+        return await asyncio.to_thread(self._count_lines_sync, Path(path))
+
+    async def read_lines(self, path: Path, start: int, count: int) -> List[str]:
+        return await asyncio.to_thread(self._read_lines_sync, Path(path), start, count)
+
+    async def search(self, path: Path, pattern: str, max_results: int = 50,
+                     ignore_case: bool = True) -> List[Tuple[int, str]]:
+        """Последние max_results строк (номер с 1, текст), содержащих регулярное выражение pattern."""
+        return await asyncio.to_thread(self._search_sync, Path(path), pattern, max_results, ignore_case)
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(Path(path), None)
+
+    # --- Открытие файлов ---
+
+    @staticmethod
+    def is_archive(path: Path) -> bool:
+        return path.suffix.lower() == ".zip"
+
+    @staticmethod
+    def _open_archive_member(archive: zipfile.ZipFile) -> IO[bytes]:
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        if not members:
+            raise ValueError("Архив логов пуст.")
+        return archive.open(members[0])
+
+    @staticmethod
+    def _decode(raw_lines: List[bytes]) -> List[str]:
+        return [line.decode("utf-8", errors="replace").rstrip("\r\n") for line in raw_lines]
+
+    # --- tail ---
+
+    def _tail_sync(self, path: Path, lines: int) -> List[str]:
+        if lines <= 0:
+            return []
+        if self.is_archive(path):
+            # Сжатый поток нельзя читать с конца: проходим его потоково, держа в памяти только хвост
+            with zipfile.ZipFile(path) as archive, self._open_archive_member(archive) as stream:
+                return self._decode(list(deque(stream, maxlen=lines)))
+
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            # Нужна lines+1 граница: последняя строка обычно тоже заканчивается переводом строки
+            while position > 0 and buffer.count(b"\n") <= lines:
+                read_size = min(TAIL_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+        raw_lines = buffer.splitlines(keepends=True)
+        if position > 0:
+            # Первая строка буфера может быть обрезана на границе блока
+            raw_lines = raw_lines[1:]
+        return self._decode(raw_lines[-lines:])
+
+    # --- Индекс строк ---
+
+    def _file_identity(self, path: Path) -> Tuple[int, int]:
+        stat = path.stat()
+        return stat.st_ino, int(stat.st_mtime_ns if self.is_archive(path) else 0)
+
+    def _extend_index(self, index: _LineIndex, stream: IO[bytes]) -> None:
+        offset = index.size
+        line_number = index.total_lines
+        for raw_line in stream:
+            if line_number % self._stride == 0 and line_number // self._stride >= len(index.offsets):
+                index.offsets.append(offset)
+            index.last_line_offset = offset
+            index.last_line_complete = raw_line.endswith(b"\n")
+            offset += len(raw_line)
+            line_number += 1
+        index.total_lines = line_number
+        index.size = offset
+
+    def _get_index(self, path: Path) -> _LineIndex:
+        identity = self._file_identity(path)
+        # Индексация идет в потоках to_thread - строим индекс под общим lock, чтобы не достраивать его параллельно
+        with self._lock:
+            index = self._indexes.get(path)
+            if self.is_archive(path):
+                if index is None or index.identity != identity:
+                    index = _LineIndex(identity)
+                    with zipfile.ZipFile(path) as archive, self._open_archive_member(archive) as stream:
+                        self._extend_index(index, stream)
+            else:
+                size = path.stat().st_size
+                if index is None or index.identity != identity or size < index.size:
+                    # Файл новый, заменен или обрезан - индексируем заново
+                    index = _LineIndex(identity)
+                if size > index.size:
+                    if not index.last_line_complete:
+                        # Последняя строка была недописана - перечитываем ее целиком
+                        index.total_lines -= 1
+                        index.size = index.last_line_offset
+                        index.last_line_complete = True
+                    with open(path, "rb") as f:
+                        f.seek(index.size)
+                        self._extend_index(index, f)
+
+            self._indexes[path] = index
+            self._indexes.move_to_end(path)
+            while len(self._indexes) > self._max_cached_indexes:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _count_lines_sync(self, path: Path) -> int:
+        return self._get_index(path).total_lines
+
+    def _read_lines_sync(self, path: Path, start: int, count: int) -> List[str]:
+        if count <= 0:
+            return []
+        index = self._get_index(path)
+        start = max(0, start)
+        if start >= index.total_lines:
+            return []
+        anchor = start // self._stride
+        anchor_offset = index.offsets[anchor]
+        skip = start - anchor * self._stride
+
+        if self.is_archive(path):
+            with zipfile.ZipFile(path) as archive, self._open_archive_member(archive) as stream:
+                # ZipExtFile.seek распаковывает поток до нужного места, но не хранит его в памяти
+                stream.seek(anchor_offset)
+                return self._collect_lines(stream, skip, count)
+        with open(path, "rb") as f:
+            f.seek(anchor_offset)
+            return self._collect_lines(f, skip, count)
+
+    def _collect_lines(self, stream: IO[bytes], skip: int, count: int) -> List[str]:
+        collected: List[bytes] = []
+        for line_number, raw_line in enumerate(stream):
+            if line_number < skip:
+                continue
+            collected.append(raw_line)
+            if len(collected) >= count:
+                break
+        return self._decode(collected)
+
+    # --- Поиск ---
+
+    def _search_sync(self, path: Path, pattern: str, max_results: int, ignore_case: bool) -> List[Tuple[int, str]]:
+        regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0)
+        matches: Deque[Tuple[int, bytes]] = deque(maxlen=max(1, max_results))
+        if self.is_archive(path):
+            with zipfile.ZipFile(path) as archive, self._open_archive_member(archive) as stream:
+                self._scan(stream, regex, matches)
+        else:
+            with open(path, "rb") as f:
+                self._scan(f, regex, matches)
+        return [(line_number, text) for (line_number, _), text in zip(matches, self._decode([raw for _, raw in matches]))]
+
+    @staticmethod
+    def _scan(stream: IO[bytes], regex: "re.Pattern[bytes]", matches: Deque[Tuple[int, bytes]]) -> None:
+        for line_number, raw_line in enumerate(stream, start=1):
+            if regex.search(raw_line):
+                matches.append((line_number, raw_line))
@@ -0,0 +1,112 @@
+# core/logging_filters.py
+
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger as global_logger
+
+
+def get_level_no(level: Any) -> int:
+    """Числовой уровень loguru по имени (учитывает и пользовательские уровни) или числу."""
+    if isinstance(level, int):
+        return level
+    return global_logger.level(str(level).upper()).no
+
+
+class LogVolumeFilter:
+    """
+    filter для файловых sink'ов loguru: уровни по логгерам, сэмплирование и rate limit.
+
+    - level_overrides: {"core.database": "INFO", "modules.foo": "TRACE"} - минимальный уровень по
+      префиксу имени модуля (побеждает самый длинный префикс), для остальных - default_level;
+    - sampling: {"UserStatusMiddleware": 10} - из записей ниже sample_below_level с таким
+      service (bind) или именем модуля пишется только каждая N-я;
+    - rate_limit_per_second: не больше N таких записей в секунду на один service/модуль.
+
+    Отброшенные записи считаются - см. get_stats().
+    """
+
+    def __init__(
+        self,
+        default_level: Any = "DEBUG",
+        level_overrides: Optional[Mapping[str, Any]] = None,
+        sampling: Optional[Mapping[str, int]] = None,
+        sample_below_level: Any = "INFO",
+        rate_limit_per_second: int = 0,
+    ):
+        self._default_level_no = get_level_no(default_level)
+        # Длинные префиксы проверяются первыми
+        self._overrides: List[Tuple[str, int]] = sorted(
+            ((prefix, get_level_no(level)) for prefix, level in (level_overrides or {}).items()),
+            key=lambda item: len(item[0]), reverse=True,
+        )
+        self._sampling = {key: rate for key, rate in (sampling or {}).items() if rate > 1}
+        self._sample_below_no = get_level_no(sample_below_level)
+        self._rate_limit = rate_limit_per_second
+        self._level_cache: Dict[str, int] = {}
+        self._sample_counters: Dict[str, int] = {}
+        self._rate_windows: Dict[str, List[int]] = {}
+        # loguru может вызывать filter из разных потоков
+        self._lock = threading.Lock()
+        self._passed = 0
+        self._dropped_by_level = 0
+        self._sampled_out: Dict[str, int] = {}
+        self._rate_limited: Dict[str, int] = {}
+
+    @property
+    def min_level_no(self) -> int:
+        """Уровень для logger.add(): ниже него записи не доходят даже до filter."""
+        return min([self._default_level_no, *(level_no for _, level_no in self._overrides)])
+
+    def _min_level_for(self, name: str) -> int:
+        level_no = self._level_cache.get(name)
+        if level_no is None:
+            level_no = self._default_level_no
+            for prefix, override_no in self._overrides:
+                if not prefix or name == prefix or name.startswith(prefix + "."):
+                    level_no = override_no
+                    break
+            self._level_cache[name] = level_no
+        return level_no
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        level_no = record["level"].no
+        name = record["name"] or ""
+        with self._lock:
+            if level_no < self._min_level_for(name):
+                self._dropped_by_level += 1
+                return False
+
+            if level_no < self._sample_below_no and (self._sampling or self._rate_limit):
+                key = record["extra"].get("service") or name
+                rate = self._sampling.get(key) or self._sampling.get(name)
+                if rate:
+                    counter = self._sample_counters.get(key, 0)
+                    self._sample_counters[key] = counter + 1
+                    if counter % rate:
+                        self._sampled_out[key] = self._sampled_out.get(key, 0) + 1
+                        return False
+                if self._rate_limit:
+                    current_second = int(time.monotonic())
+                    window = self._rate_windows.get(key)
+                    if window is None or window[0] != current_second:
+                        window = self._rate_windows[key] = [current_second, 0]
+                    if window[1] >= self._rate_limit:
+                        self._rate_limited[key] = self._rate_limited.get(key, 0) + 1
+                        return False
+                    window[1] += 1
+
+            self._passed += 1
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "passed": self._passed,
+                "dropped_by_level": self._dropped_by_level,
+                "sampled_out": sum(self._sampled_out.values()),
+                "rate_limited": sum(self._rate_limited.values()),
+                "sampled_out_by_key": dict(self._sampled_out),
+                "rate_limited_by_key": dict(self._rate_limited),
+            }
@@ -1,6 +1,8 @@
 # core/logging_manager.py
 import asyncio
+import json
 import shutil
+import traceback
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Any, TYPE_CHECKING
@@ -10,21 +12,72 @@ import parsedatetime as pdt
 from apscheduler.schedulers.asyncio import AsyncIOScheduler 
 from apscheduler.triggers.cron import CronTrigger
 
+from core.log_index import LogIndex, get_log_index_path
+from core.logging_filters import LogVolumeFilter
+
 if TYPE_CHECKING:
     from core.app_settings import AppSettings
 
+# Служебный ключ extra, в который format-функция кладет готовую JSON-строку
+_JSON_RECORD_EXTRA_KEY = "_sdb_json"
+
+
+def _format_json_record(record: dict) -> str:
+    """Format-функция loguru для JSON Lines: поля bind() (service, user_id, update_id...) идут отдельными ключами."""
+    entry = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "level_no": record["level"].no,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    for key, value in record["extra"].items():
+        if key != _JSON_RECORD_EXTRA_KEY and key not in entry:
+            entry[key] = value
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        entry["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+    record["extra"][_JSON_RECORD_EXTRA_KEY] = json.dumps(entry, ensure_ascii=False, default=str)
+    return "{extra[%s]}\n" % _JSON_RECORD_EXTRA_KEY
+
 class LoggingManager:
     def __init__(self, app_settings: 'AppSettings'):
         self._settings = app_settings.core
         self._app_settings_ref = app_settings 
         self._current_log_handler_id: Optional[int] = None
         self._current_log_file_path: Optional[Path] = None
+        self._current_json_handler_id: Optional[int] = None
+        self._log_index: Optional[LogIndex] = None
+        # Отдельный фильтр на каждый sink: счетчики сэмплирования у sink'ов независимы
+        self._file_filter = self._build_volume_filter()
+        self._json_filter = self._build_volume_filter()
         self._scheduler: Optional[AsyncIOScheduler] = None
+        self._owns_scheduler = True
         self._is_initialized = False
 
         self._logger = global_logger.bind(service="LoggingManager")
         self._logger.info("LoggingManager инициализирован.")
 
+    def _build_volume_filter(self) -> LogVolumeFilter:
+        return LogVolumeFilter(
+            default_level=self._settings.log_file_level,
+            level_overrides=self._settings.log_level_overrides,
+            sampling=self._settings.log_sampling,
+            sample_below_level=self._settings.log_sampling_below_level,
+            rate_limit_per_second=self._settings.log_rate_limit_per_second,
+        )
+
+    def get_stats(self) -> dict:
+        """Счетчики пропущенных/отброшенных записей файлового лога (для runtime-статистики)."""
+        return {
+            "file_level": self._settings.log_file_level,
+            "level_overrides": dict(self._settings.log_level_overrides),
+            "file": self._file_filter.get_stats(),
+            "json": self._json_filter.get_stats() if self._current_json_handler_id is not None else None,
+        }
+
     def _get_log_file_path_for_current_hour(self) -> Path:
         """Генерирует путь к лог-файлу на основе текущего времени."""
         now = datetime.now(timezone.utc)
@@ -51,6 +104,12 @@ class LoggingManager:
                 self._logger.warning(f"Не удалось удалить предыдущий файловый хендлер ID: {self._current_log_handler_id} (возможно, уже удален).")
             self._current_log_handler_id = None
             self._current_log_file_path = None
+        if self._current_json_handler_id is not None:
+            try:
+                global_logger.remove(self._current_json_handler_id)
+            except ValueError:
+                pass
+            self._current_json_handler_id = None
 
         if not self._settings.log_to_file:
             self._logger.info("Запись логов в файл отключена в настройках.")
@@ -58,16 +117,14 @@ class LoggingManager:
 
         new_log_file_path = self._get_log_file_path_for_current_hour()
         
-        # --- ЖЕСТКО УСТАНАВЛИВАЕМ УРОВЕНЬ ДЛЯ ФАЙЛОВОГО ЛОГА ---
-        log_level_for_file = "DEBUG"  # Используем DEBUG для файлов по умолчанию
-        # Если нужен TRACE, измени здесь:
-        # log_level_for_file = "TRACE" 
-        # ---------------------------------------------------------
+        # Уровень sink'а - самый низкий из core.log_file_level и переопределений, остальное решает фильтр
+        log_level_for_file = self._settings.log_file_level
         
         try:
             handler_id = global_logger.add(
                 sink=str(new_log_file_path),
-                level=log_level_for_file, 
+                level=self._file_filter.min_level_no, 
+                filter=self._file_filter,
                 rotation=self._settings.log_rotation_size, 
                 compression="zip",
                 format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
@@ -83,6 +140,25 @@ class LoggingManager:
             self._logger.error(f"Ошибка при настройке файлового логгера для '{new_log_file_path}': {e}", exc_info=True)
             self._current_log_handler_id = None
             self._current_log_file_path = None
+            return
+
+        if self._settings.log_json_sink:
+            json_log_file_path = new_log_file_path.with_suffix(".jsonl")
+            try:
+                self._current_json_handler_id = global_logger.add(
+                    sink=str(json_log_file_path),
+                    level=self._json_filter.min_level_no,
+                    filter=self._json_filter,
+                    rotation=self._settings.log_rotation_size,
+                    compression="zip",
+                    format=_format_json_record,
+                    encoding="utf-8",
+                    enqueue=True,
+                )
+                self._logger.info(f"JSON-логгер настроен. Файл: {json_log_file_path}")
+            except Exception as e:
+                self._logger.error(f"Ошибка при настройке JSON-логгера для '{json_log_file_path}': {e}", exc_info=True)
+                self._current_json_handler_id = None
 
     async def _hourly_log_rotation_check(self) -> None:
         """Проверяет, нужно ли ротировать лог-файл (начался новый час)."""
@@ -98,6 +174,29 @@ class LoggingManager:
         else:
             self._logger.trace(f"Ротация лог-файла не требуется, текущий файл: {self._current_log_file_path}")
 
+    def _get_log_index(self) -> LogIndex:
+        if self._log_index is None:
+            structured_logs_root = self._app_settings_ref.core.project_data_path / self._settings.log_structured_dir
+            self._log_index = LogIndex(
+                index_path=get_log_index_path(structured_logs_root),
+                structured_logs_root=structured_logs_root,
+                json_logs=self._settings.log_json_sink,
+            )
+        return self._log_index
+
+    async def _update_log_index(self) -> None:
+        """Добавляет в индекс закрытые лог-файлы (прошлые часы, архивы ротации) и забывает удаленные."""
+        if not self._settings.log_to_file or not self._settings.log_index_enabled:
+            return
+        try:
+            stats = await asyncio.to_thread(self._get_log_index().update)
+        except Exception as e_index:
+            self._logger.error(f"Ошибка при обновлении индекса логов: {e_index}", exc_info=True)
+            return
+        if stats["files_indexed"] or stats["files_forgotten"]:
+            self._logger.info(f"Индекс логов обновлен: файлов +{stats['files_indexed']} "
+                              f"(записей: {stats['entries_indexed']}), удалено из индекса: {stats['files_forgotten']}.")
+
     async def _cleanup_old_logs(self) -> None:
         """Удаляет старые директории логов на основе log_retention_period_structured."""
         self._logger.info("Запуск задачи очистки старых логов...")
@@ -175,6 +274,10 @@ class LoggingManager:
         self._logger.info("Задача _hourly_log_rotation_check добавлена в планировщик (ежечасно).")
         self._scheduler.add_job(self._cleanup_old_logs, CronTrigger(hour=3, minute=30)) 
         self._logger.info("Задача _cleanup_old_logs добавлена в планировщик (ежедневно в 03:30 UTC).")
+        if self._settings.log_to_file and self._settings.log_index_enabled:
+            # Через 5 минут после смены часа: к этому времени loguru успевает сжать файл прошлого часа
+            self._scheduler.add_job(self._update_log_index, CronTrigger(minute=5), next_run_time=datetime.now(timezone.utc))
+            self._logger.info("Задача _update_log_index добавлена в планировщик (ежечасно, в :05).")
         
         try:
             self._scheduler.start()
@@ -186,10 +289,28 @@ class LoggingManager:
         self._is_initialized = True
         self._logger.info("LoggingManager успешно инициализирован.")
 
+    def use_shared_scheduler(self, scheduler: AsyncIOScheduler, jobstore: str) -> None:
+        """
+        Переносит задачи обслуживания логов в общий планировщик бота (TaskScheduler) и останавливает
+        собственный: он нужен только до запуска сервисов. Задачи - bound-методы, поэтому jobstore
+        должен быть in-memory.
+        """
+        if self._scheduler is None or self._scheduler is scheduler:
+            return
+        own_scheduler = self._scheduler
+        for job in own_scheduler.get_jobs():
+            scheduler.add_job(job.func, job.trigger, id=f"logging_manager.{job.func.__name__}", name=job.name,
+                              jobstore=jobstore, next_run_time=job.next_run_time, replace_existing=True)
+        if own_scheduler.running:
+            own_scheduler.shutdown(wait=False)
+        self._scheduler = scheduler
+        self._owns_scheduler = False
+        self._logger.info("Задачи обслуживания логов перенесены в общий планировщик задач.")
+
     async def shutdown_logging(self) -> None:
         """Останавливает планировщик и корректно завершает работу."""
         self._logger.info("Начало процедуры остановки LoggingManager...")
-        if self._scheduler and self._scheduler.running:
+        if self._scheduler and self._owns_scheduler and self._scheduler.running:
             try:
                 self._scheduler.shutdown(wait=False) 
                 self._logger.info("Планировщик задач LoggingManager остановлен.")
@@ -202,6 +323,11 @@ class LoggingManager:
                 self._logger.info(f"Файловый хендлер (ID: {self._current_log_handler_id}) удален при остановке.")
             except ValueError:
                 pass 
+        if self._current_json_handler_id is not None:
+            try:
+                global_logger.remove(self._current_json_handler_id)
+            except ValueError:
+                pass
         
         self._is_initialized = False
         self._logger.info("LoggingManager остановлен.")
\ No newline at end of file
@@ -0,0 +1,4 @@
+# core/monitoring/__init__.py
+from .runtime_stats import RuntimeStatsPublisher, read_runtime_stats, get_runtime_stats_path
+
+__all__ = ["RuntimeStatsPublisher", "read_runtime_stats", "get_runtime_stats_path"]
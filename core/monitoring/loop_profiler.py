@@ -0,0 +1,261 @@
+# core/monitoring/loop_profiler.py
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+PROFILER_SUBDIR = "profiling"
+PROFILE_REQUEST_FILENAME = "profile_request.json"
+LAST_PROFILE_FILENAME = "last_profile.json"
+
+
+def get_profiler_dir(project_data_path: Path) -> Path:
+    return project_data_path / "monitor" / PROFILER_SUBDIR
+
+
+def request_profile(profiler_dir: Path, duration_seconds: float, interval_ms: Optional[float] = None) -> str:
+    """
+    Просит запущенного бота снять сэмплирующий профиль (для CLI/другого процесса).
+    Возвращает request_id, по которому результат ищется в last_profile.json.
+    """
+    profiler_dir.mkdir(parents=True, exist_ok=True)
+    request_id = uuid.uuid4().hex
+    tmp_path = profiler_dir / f"{PROFILE_REQUEST_FILENAME}.tmp"
+    tmp_path.write_text(json.dumps({
+        "request_id": request_id,
+        "duration_seconds": duration_seconds,
+        "interval_ms": interval_ms,
+    }), encoding="utf-8")
+    os.replace(tmp_path, profiler_dir / PROFILE_REQUEST_FILENAME)
+    return request_id
+
+
+def read_last_profile(profiler_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((profiler_dir / LAST_PROFILE_FILENAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class LoopProfiler:
+    """
+    Профилировщик event loop для режима профилирования бота.
+
+    - heartbeat-задача в loop раз в heartbeat_interval_ms отмечается и считает задержку loop (lag);
+    - watchdog-поток замечает, что отметки нет дольше slow_threshold_ms, и логирует стек потока
+      event loop в этот момент - то есть стек кода, который блокирует loop (синхронный I/O, psutil...);
+    - profile()/запрос через файл (sdb dev debug --profiling) запускают сэмплирование стеков
+      в отдельном потоке; результат - файл в collapsed-формате ("a;b;c 42"), который понимают
+      flamegraph.pl, speedscope и inferno.
+    """
+
+    def __init__(self, output_dir: Path, slow_threshold_ms: float = 100.0, heartbeat_interval_ms: float = 20.0,
+                 sample_interval_ms: float = 5.0, max_stack_depth: int = 30):
+        self.output_dir = Path(output_dir)
+        self._slow_threshold = slow_threshold_ms / 1000
+        self._heartbeat_interval = heartbeat_interval_ms / 1000
+        self._sample_interval = sample_interval_ms / 1000
+        self._max_stack_depth = max_stack_depth
+
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._sampling_lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._reported_beat: Optional[float] = None
+        self._frame_labels: Dict[CodeType, str] = {}
+
+        self._lag_last = 0.0
+        self._lag_max = 0.0
+        self._lag_sum = 0.0
+        self._lag_count = 0
+        self._stalls_total = 0
+        self._last_stall: Optional[Dict[str, Any]] = None
+        self._last_profile: Optional[Dict[str, Any]] = None
+        self._logger = logger.bind(service="LoopProfiler")
+
+    # --- Жизненный цикл ---
+
+    def start(self) -> None:
+        if self._heartbeat_task is not None:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="LoopProfiler-heartbeat")
+        self._watchdog = threading.Thread(target=self._watchdog_loop, name="LoopProfiler-watchdog", daemon=True)
+        self._watchdog.start()
+        self._logger.info(f"Профилировщик event loop запущен (порог блокировки {self._slow_threshold * 1000:.0f} мс, "
+                          f"профили: {self.output_dir}).")
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 2.0)
+            self._watchdog = None
+        self._logger.info("Профилировщик event loop остановлен.")
+
+    # --- Задержка loop и блокировки ---
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_at = loop.time() + self._heartbeat_interval
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self._heartbeat_interval)
+            lag = max(0.0, loop.time() - expected_at)
+            self._lag_last = lag
+            self._lag_max = max(self._lag_max, lag)
+            self._lag_sum += lag
+            self._lag_count += 1
+            if self._reported_beat is not None and self._last_stall is not None and lag >= self._slow_threshold:
+                # Блокировка закончилась - уточняем ее полную длительность
+                self._last_stall["blocked_ms"] = round(lag * 1000, 1)
+                self._reported_beat = None
+
+    def _watchdog_loop(self) -> None:
+        next_request_check = 0.0
+        while not self._stop_event.wait(self._heartbeat_interval):
+            now = time.monotonic()
+            beat = self._last_beat
+            blocked_for = now - beat - self._heartbeat_interval
+            if blocked_for >= self._slow_threshold and self._reported_beat != beat:
+                self._reported_beat = beat
+                self._report_stall(blocked_for)
+            if now >= next_request_check:
+                next_request_check = now + 1.0
+                self._check_profile_request()
+
+    def _report_stall(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame)[-self._max_stack_depth:] if frame is not None else []
+        self._stalls_total += 1
+        self._last_stall = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "where": stack[-1].strip().splitlines()[0] if stack else None,
+        }
+        self._logger.warning(
+            "Event loop заблокирован уже {:.0f} мс (порог {:.0f} мс). Стек потока loop:\n{}",
+            blocked_for * 1000, self._slow_threshold * 1000, "".join(stack) or "<стек недоступен>",
+        )
+
+    # --- Сэмплирующий профиль ---
+
+    def _frame_label(self, code: CodeType) -> str:
+        label = self._frame_labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            cwd = os.getcwd()
+            if filename.startswith(cwd):
+                filename = os.path.relpath(filename, cwd)
+            elif "site-packages" in filename:
+                filename = filename.split("site-packages" + os.sep, 1)[-1]
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+            self._frame_labels[code] = label
+        return label
+
+    def _folded_stack(self, frame: Optional[FrameType]) -> str:
+        labels: List[str] = []
+        while frame is not None:
+            labels.append(self._frame_label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def _sample_sync(self, duration_seconds: float, interval_ms: Optional[float] = None) -> Dict[str, Any]:
+        if not self._sampling_lock.acquire(blocking=False):
+            raise RuntimeError("Профиль уже снимается.")
+        try:
+            interval = (interval_ms / 1000) if interval_ms else self._sample_interval
+            stacks: Counter = Counter()
+            started_at = time.monotonic()
+            deadline = started_at + duration_seconds
+            self._logger.info(f"Снятие профиля event loop: {duration_seconds} сек, интервал {interval * 1000:.1f} мс...")
+            while time.monotonic() < deadline and not self._stop_event.is_set():
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    stacks[self._folded_stack(frame)] += 1
+                del frame
+                time.sleep(interval)
+
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = self.output_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            result = {
+                "path": str(path),
+                "samples": sum(stacks.values()),
+                "unique_stacks": len(stacks),
+                "duration_seconds": round(time.monotonic() - started_at, 2),
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._last_profile = result
+            self._logger.info(f"Профиль сохранен: {path} ({result['samples']} сэмплов).")
+            return result
+        finally:
+            self._sampling_lock.release()
+
+    async def profile(self, duration_seconds: float = 30.0, interval_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Снимает профиль потока event loop и возвращает сведения о файле (path, samples...)."""
+        if self._loop_thread_id is None:
+            raise RuntimeError("Профилировщик не запущен.")
+        return await asyncio.to_thread(self._sample_sync, duration_seconds, interval_ms)
+
+    def _check_profile_request(self) -> None:
+        request_path = self.output_dir / PROFILE_REQUEST_FILENAME
+        try:
+            request = json.loads(request_path.read_text(encoding="utf-8"))
+            request_path.unlink()
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"Некорректный запрос профиля {request_path}: {e}")
+            request_path.unlink(missing_ok=True)
+            return
+        threading.Thread(target=self._run_requested_profile, args=(request,),
+                         name="LoopProfiler-sampler", daemon=True).start()
+
+    def _run_requested_profile(self, request: Dict[str, Any]) -> None:
+        try:
+            result = self._sample_sync(float(request.get("duration_seconds") or 30), request.get("interval_ms"))
+        except Exception as e:
+            result = {"error": str(e)}
+        result["request_id"] = request.get("request_id")
+        tmp_path = self.output_dir / f"{LAST_PROFILE_FILENAME}.tmp"
+        tmp_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.output_dir / LAST_PROFILE_FILENAME)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._heartbeat_task is not None,
+            "slow_threshold_ms": round(self._slow_threshold * 1000, 1),
+            "lag_last_ms": round(self._lag_last * 1000, 2),
+            "lag_max_ms": round(self._lag_max * 1000, 2),
+            "lag_avg_ms": round(self._lag_sum / self._lag_count * 1000, 2) if self._lag_count else 0.0,
+            "stalls_total": self._stalls_total,
+            "last_stall": self._last_stall,
+            "sampling": self._sampling_lock.locked(),
+            "last_profile": self._last_profile,
+            "output_dir": str(self.output_dir),
+        }
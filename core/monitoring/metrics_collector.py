@@ -0,0 +1,127 @@
+# core/monitoring/metrics_collector.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import psutil
+from loguru import logger
+
+from core.monitoring.metrics_store import MetricsStore
+
+
+def sample_system_metrics(disk_path: str = "/") -> Dict[str, Any]:
+    """
+    Один замер системных метрик без ожидания: cpu_percent(interval=None) возвращает загрузку
+    с предыдущего вызова (первый вызов в процессе возвращает 0.0).
+    """
+    network = psutil.net_io_counters()
+    return {
+        "timestamp": datetime.now(),
+        "cpu_percent": psutil.cpu_percent(interval=None),
+        "memory_percent": psutil.virtual_memory().percent,
+        "disk_percent": psutil.disk_usage(disk_path).percent,
+        "network_bytes_sent": network.bytes_sent if network else 0,
+        "network_bytes_recv": network.bytes_recv if network else 0,
+    }
+
+
+class MetricsCollector:
+    """
+    Фоновый сборщик метрик: раз в sample_interval_seconds делает замер, копит их в буфере
+    и раз в flush_interval_seconds пишет пачкой в MetricsStore (в потоке), после чего
+    обновляет минутные/часовые агрегаты и применяет retention.
+    Работает внутри бота или в `sdb monitor collect`.
+    """
+
+    def __init__(self, store: MetricsStore, sample_interval_seconds: float = 10.0,
+                 flush_interval_seconds: float = 60.0, bot_status: Optional[str] = None):
+        self._store = store
+        self._sample_interval = max(0.1, sample_interval_seconds)
+        self._flush_interval = max(self._sample_interval, flush_interval_seconds)
+        self._bot_status = bot_status
+        self._buffer: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._samples_written = 0
+        self._last_flush_at: Optional[float] = None
+        self._last_sample: Optional[Dict[str, Any]] = None
+        self._logger = logger.bind(service="MetricsCollector")
+
+    @property
+    def store(self) -> MetricsStore:
+        return self._store
+
+    @property
+    def last_sample(self) -> Optional[Dict[str, Any]]:
+        return self._last_sample
+
+    def take_sample(self) -> Dict[str, Any]:
+        sample = sample_system_metrics()
+        if self._bot_status:
+            sample["bot_status"] = self._bot_status
+        self._buffer.append(sample)
+        self._last_sample = sample
+        return sample
+
+    def _flush_sync(self, samples: List[Dict[str, Any]]) -> int:
+        written = self._store.insert_samples(samples)
+        self._store.rollup()
+        self._store.apply_retention()
+        return written
+
+    async def flush(self) -> int:
+        if not self._buffer:
+            return 0
+        samples, self._buffer = self._buffer, []
+        try:
+            written = await asyncio.to_thread(self._flush_sync, samples)
+        except Exception as e:
+            self._logger.error(f"Не удалось записать {len(samples)} замеров метрик: {e}")
+            # Вернем замеры в буфер, но не дадим ему расти бесконечно при проблемах с диском
+            self._buffer = (samples + self._buffer)[-int(10 * self._flush_interval / self._sample_interval):]
+            return 0
+        self._samples_written += written
+        self._last_flush_at = time.time()
+        return written
+
+    async def _collect_loop(self) -> None:
+        # Первый cpu_percent(interval=None) только запускает отсчет
+        psutil.cpu_percent(interval=None)
+        next_flush_at = time.monotonic() + self._flush_interval
+        while True:
+            await asyncio.sleep(self._sample_interval)
+            try:
+                self.take_sample()
+            except Exception as e:
+                self._logger.warning(f"Ошибка замера метрик: {e}")
+            if time.monotonic() >= next_flush_at:
+                await self.flush()
+                next_flush_at = time.monotonic() + self._flush_interval
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._collect_loop(), name="MetricsCollector")
+        self._logger.info(f"Сбор метрик запущен (замер каждые {self._sample_interval} сек, "
+                          f"запись каждые {self._flush_interval} сек) -> {self._store.db_path}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await asyncio.to_thread(self._store.close)
+        self._logger.info("Сбор метрик остановлен.")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "db_path": str(self._store.db_path),
+            "buffered": len(self._buffer),
+            "samples_written": self._samples_written,
+            "last_flush_at": self._last_flush_at,
+        }
@@ -0,0 +1,185 @@
+# core/monitoring/metrics_store.py
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+METRICS_DB_FILENAME = "metrics.db"
+METRICS_SUBDIR = "monitor"
+
+# Формат времени в таблицах: локальное время, сравнивается как строка
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+    cpu_percent REAL,
+    memory_percent REAL,
+    disk_percent REAL,
+    network_bytes_sent INTEGER,
+    network_bytes_recv INTEGER,
+    response_time REAL,
+    bot_status TEXT,
+    db_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_timestamp ON metrics(timestamp);
+CREATE TABLE IF NOT EXISTS metrics_1m (
+    bucket TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL, cpu_max REAL,
+    memory_avg REAL, memory_max REAL,
+    disk_avg REAL, disk_max REAL,
+    network_bytes_sent INTEGER,
+    network_bytes_recv INTEGER,
+    response_time_avg REAL
+);
+CREATE TABLE IF NOT EXISTS metrics_1h (
+    bucket TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    cpu_avg REAL, cpu_max REAL,
+    memory_avg REAL, memory_max REAL,
+    disk_avg REAL, disk_max REAL,
+    network_bytes_sent INTEGER,
+    network_bytes_recv INTEGER,
+    response_time_avg REAL
+);
+"""
+
+_SAMPLE_COLUMNS = ("timestamp", "cpu_percent", "memory_percent", "disk_percent", "network_bytes_sent",
+                   "network_bytes_recv", "response_time", "bot_status", "db_status")
+
+
+def get_metrics_db_path(project_data_path: Path) -> Path:
+    return project_data_path / METRICS_SUBDIR / METRICS_DB_FILENAME
+
+
+class MetricsStore:
+    """
+    Хранилище метрик мониторинга (SQLite, одно постоянное WAL-соединение на процесс).
+
+    Сырые замеры пишутся пачками в `metrics` (таблица совместима со старым форматом CLI),
+    rollup() сворачивает их в минутные (`metrics_1m`) и часовые (`metrics_1h`) агрегаты,
+    apply_retention() удаляет устаревшие данные каждого уровня. get_history() выбирает
+    самую подробную таблицу, которая еще покрывает запрошенный период.
+
+    Методы синхронные и потокобезопасные - из event loop вызывать через asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: Path, raw_retention_hours: int = 48, minute_retention_days: int = 14,
+                 hour_retention_days: int = 400):
+        self.db_path = Path(db_path)
+        self.raw_retention_hours = raw_retention_hours
+        self.minute_retention_days = minute_retention_days
+        self.hour_retention_days = hour_retention_days
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def initialize(self) -> None:
+        """Открывает соединение и создает таблицы, если их еще нет."""
+        with self._lock:
+            self._connection()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def insert_samples(self, samples: Iterable[Dict[str, Any]]) -> int:
+        rows = [
+            tuple(
+                (sample.get("timestamp") or datetime.now()).strftime(TIMESTAMP_FORMAT) if column == "timestamp"
+                else sample.get(column)
+                for column in _SAMPLE_COLUMNS
+            )
+            for sample in samples
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO metrics ({', '.join(_SAMPLE_COLUMNS)}) VALUES ({', '.join('?' * len(_SAMPLE_COLUMNS))})",
+                    rows,
+                )
+        return len(rows)
+
+    def rollup(self) -> None:
+        """Пересчитывает последние (возможно, неполные) минутные и часовые агрегаты и все более новые."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                last_minute = conn.execute("SELECT MAX(bucket) FROM metrics_1m").fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO metrics_1m "
+                    "SELECT substr(timestamp, 1, 16) || ':00' AS bucket, COUNT(*), "
+                    "AVG(cpu_percent), MAX(cpu_percent), AVG(memory_percent), MAX(memory_percent), "
+                    "AVG(disk_percent), MAX(disk_percent), MAX(network_bytes_sent), MAX(network_bytes_recv), "
+                    "AVG(response_time) "
+                    "FROM metrics WHERE timestamp >= ? GROUP BY bucket",
+                    (last_minute or "",),
+                )
+                last_hour = conn.execute("SELECT MAX(bucket) FROM metrics_1h").fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO metrics_1h "
+                    "SELECT substr(bucket, 1, 13) || ':00:00' AS hour_bucket, SUM(samples), "
+                    "SUM(cpu_avg * samples) / SUM(samples), MAX(cpu_max), "
+                    "SUM(memory_avg * samples) / SUM(samples), MAX(memory_max), "
+                    "SUM(disk_avg * samples) / SUM(samples), MAX(disk_max), "
+                    "MAX(network_bytes_sent), MAX(network_bytes_recv), AVG(response_time_avg) "
+                    "FROM metrics_1m WHERE bucket >= ? GROUP BY hour_bucket",
+                    (last_hour or "",),
+                )
+
+    def apply_retention(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM metrics WHERE timestamp < ?",
+                             ((now - timedelta(hours=self.raw_retention_hours)).strftime(TIMESTAMP_FORMAT),))
+                conn.execute("DELETE FROM metrics_1m WHERE bucket < ?",
+                             ((now - timedelta(days=self.minute_retention_days)).strftime(TIMESTAMP_FORMAT),))
+                conn.execute("DELETE FROM metrics_1h WHERE bucket < ?",
+                             ((now - timedelta(days=self.hour_retention_days)).strftime(TIMESTAMP_FORMAT),))
+
+    def resolution_for(self, hours: int) -> str:
+        if hours <= min(24, self.raw_retention_hours):
+            return "raw"
+        if hours <= self.minute_retention_days * 24:
+            return "1m"
+        return "1h"
+
+    def get_history(self, hours: int = 24, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        История за последние hours часов, от новых записей к старым. Ключи совпадают с сырой
+        таблицей (timestamp, cpu_percent, ...); у агрегатов есть еще *_max и samples.
+        """
+        since = ((now or datetime.now()) - timedelta(hours=hours)).strftime(TIMESTAMP_FORMAT)
+        resolution = self.resolution_for(hours)
+        if resolution == "raw":
+            query = "SELECT * FROM metrics WHERE timestamp >= ? ORDER BY timestamp DESC"
+        else:
+            query = (
+                "SELECT bucket AS timestamp, cpu_avg AS cpu_percent, cpu_max, memory_avg AS memory_percent, memory_max, "
+                "disk_avg AS disk_percent, disk_max, network_bytes_sent, network_bytes_recv, "
+                f"response_time_avg AS response_time, samples FROM metrics_{resolution} "
+                "WHERE bucket >= ? ORDER BY bucket DESC"
+            )
+        with self._lock:
+            cursor = self._connection().execute(query, (since,))
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
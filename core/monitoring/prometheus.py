@@ -0,0 +1,303 @@
+# core/monitoring/prometheus.py
+import asyncio
+import bisect
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Секунды: от 5 мс (быстрый хендлер/запрос к БД) до 10 сек
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        # observe()/inc() вызываются и из потоков (события SQLAlchemy, to_thread)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"Метрика '{self.name}' ожидает метки {self.labelnames}, получено: {tuple(labels)}")
+        try:
+            return tuple(str(labels[label]) for label in self.labelnames)
+        except KeyError as e:
+            raise ValueError(f"Метрика '{self.name}' ожидает метки {self.labelnames}, нет метки {e}") from None
+
+    def _samples(self) -> List[Tuple[str, List[Tuple[str, str]], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, pairs, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(pairs)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counter можно только увеличивать.")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", list(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("", list(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(float(b) for b in buckets if b != math.inf))
+        # key -> [счетчики по бакетам (+Inf последним), сумма, количество]
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, **labels: Any) -> int:
+        state = self._values.get(self._label_values(labels))
+        return state[2] if state else 0
+
+    def get_sum(self, **labels: Any) -> float:
+        state = self._values.get(self._label_values(labels))
+        return state[1] if state else 0.0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        samples = []
+        for key, bucket_counts, total, count in items:
+            pairs = list(zip(self.labelnames, key))
+            cumulative = 0
+            for upper_bound, bucket_count in zip((*self.buckets, math.inf), bucket_counts):
+                cumulative += bucket_count
+                samples.append(("_bucket", pairs + [("le", _format_value(upper_bound))], cumulative))
+            samples.append(("_sum", pairs, total))
+            samples.append(("_count", pairs, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик процесса в формате Prometheus (text exposition 0.0.4).
+
+    Метрики объявляются на уровне модуля (REGISTRY.counter(...)) и обновляются прямо в коде
+    компонентов - это дешево (словарь под lock). Значения, которые проще снять в момент
+    опроса (размер пула БД, очередь апдейтов), обновляются через add_collect_hook().
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collect_hooks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class: type, name: str, documentation: str, labelnames: Iterable[str], **kwargs: Any):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if type(existing) is not metric_class or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Метрика '{name}' уже зарегистрирована с другим типом или метками.")
+                return existing
+            metric = metric_class(name, documentation, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def add_collect_hook(self, hook: Callable[[], None]) -> None:
+        self._collect_hooks.append(hook)
+
+    def remove_collect_hook(self, hook: Callable[[], None]) -> None:
+        try:
+            self._collect_hooks.remove(hook)
+        except ValueError:
+            pass
+
+    def render(self) -> str:
+        for hook in list(self._collect_hooks):
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"Ошибка обновления метрик перед экспортом ({getattr(hook, '__qualname__', hook)}): {e}")
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "sdb_event_loop_lag_seconds", "Задержка срабатывания таймера event loop (насколько loop был занят).",
+    buckets=LOOP_LAG_BUCKETS,
+)
+LOOP_LAG_LAST_SECONDS = REGISTRY.gauge("sdb_event_loop_lag_last_seconds", "Последний замер задержки event loop.")
+
+
+class PrometheusExporter:
+    """
+    HTTP-эндпоинт /metrics (aiohttp) для Prometheus и фоновый замер задержки event loop:
+    задача засыпает на loop_lag_interval_seconds и измеряет, насколько позже она проснулась.
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9464,
+                 path: str = "/metrics", loop_lag_interval_seconds: float = 0.5):
+        self._registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self._loop_lag_interval = loop_lag_interval_seconds
+        self._runner = None
+        self._lag_task: Optional[asyncio.Task] = None
+        self._logger = logger.bind(service="PrometheusExporter")
+
+    async def _handle_metrics(self, request):
+        from aiohttp import web
+
+        body = self._registry.render()
+        return web.Response(body=body.encode("utf-8"), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+    async def _probe_loop_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected_at = loop.time() + self._loop_lag_interval
+            await asyncio.sleep(self._loop_lag_interval)
+            lag = max(0.0, loop.time() - expected_at)
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST_SECONDS.set(lag)
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get(self.path, self._handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host=self.host, port=self.port)
+        try:
+            await site.start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        if self._loop_lag_interval > 0:
+            self._lag_task = asyncio.create_task(self._probe_loop_lag(), name="PrometheusExporter-loop-lag")
+        self._logger.info(f"Метрики Prometheus доступны на http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self._logger.info("Эндпоинт метрик Prometheus остановлен.")
@@ -0,0 +1,118 @@
+# core/monitoring/runtime_stats.py
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+RUNTIME_STATS_FILENAME = "runtime_stats.json"
+RUNTIME_STATS_SUBDIR = "monitor"
+
+StatsProvider = Callable[[], Dict[str, Any]]
+
+
+def get_runtime_stats_path(project_data_path: Path) -> Path:
+    return project_data_path / RUNTIME_STATS_SUBDIR / RUNTIME_STATS_FILENAME
+
+
+class RuntimeStatsPublisher:
+    """
+    Периодически пишет снимок внутренней статистики работающего бота (пул БД, кэш и т.д.)
+    в JSON-файл. CLI (`sdb monitor`) работает в отдельном процессе и читает этот файл,
+    т.к. напрямую до объектов бота ему не дотянуться.
+
+    Секции регистрируются через register(name, provider); provider - синхронная функция,
+    возвращающая dict, пригодный для json.dumps.
+    """
+
+    def __init__(self, snapshot_path: Path, interval_seconds: int = 15):
+        self._snapshot_path = snapshot_path
+        self._interval_seconds = interval_seconds
+        self._providers: Dict[str, StatsProvider] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = time.time()
+        self._logger = logger.bind(service="RuntimeStatsPublisher")
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self._snapshot_path
+
+    def register(self, section: str, provider: StatsProvider) -> None:
+        self._providers[section] = provider
+        self._logger.debug(f"Зарегистрирована секция runtime-статистики: '{section}'.")
+
+    def unregister(self, section: str) -> None:
+        self._providers.pop(section, None)
+
+    def collect(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "timestamp": time.time(),
+            "started_at": self._started_at,
+            "sections": {},
+        }
+        for section, provider in self._providers.items():
+            try:
+                snapshot["sections"][section] = provider()
+            except Exception as e:
+                snapshot["sections"][section] = {"error": str(e)}
+                self._logger.warning(f"Ошибка сбора runtime-статистики для секции '{section}': {e}")
+        return snapshot
+
+    def write_snapshot(self) -> None:
+        snapshot = self.collect()
+        self._snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._snapshot_path.with_suffix(".tmp")
+        # Пишем во временный файл и атомарно подменяем, чтобы CLI не прочитал половину JSON
+        tmp_path.write_text(json.dumps(snapshot, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp_path, self._snapshot_path)
+
+    async def _publish_loop(self) -> None:
+        while True:
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                self._logger.error(f"Не удалось записать снимок runtime-статистики: {e}")
+            await asyncio.sleep(self._interval_seconds)
+
+    def start(self) -> None:
+        if self._interval_seconds <= 0:
+            self._logger.info("Публикация runtime-статистики отключена (интервал 0).")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._publish_loop(), name="sdb_runtime_stats_publisher")
+            self._logger.info(f"Публикация runtime-статистики запущена: {self._snapshot_path} "
+                              f"(каждые {self._interval_seconds} сек).")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Убираем снимок, чтобы CLI не показывал данные остановленного бота
+        try:
+            self._snapshot_path.unlink(missing_ok=True)
+        except OSError as e:
+            self._logger.warning(f"Не удалось удалить снимок runtime-статистики {self._snapshot_path}: {e}")
+
+
+def read_runtime_stats(snapshot_path: Path, max_age_seconds: float = 120.0) -> Optional[Dict[str, Any]]:
+    """
+    Читает снимок, опубликованный ботом. Возвращает None, если файла нет, он поврежден
+    или устарел (бот, скорее всего, не запущен).
+    """
+    try:
+        snapshot = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict):
+        return None
+    if time.time() - float(snapshot.get("timestamp", 0)) > max_age_seconds:
+        return None
+    return snapshot
@@ -0,0 +1,113 @@
+# core/monitoring/update_metrics.py
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import TelegramObject, Update
+
+from core.monitoring.prometheus import REGISTRY, MetricsRegistry
+
+if TYPE_CHECKING:
+    from core.update_scheduler import UpdateScheduler
+
+# Ключ в data апдейта: изменяемый счетчик, через который inner middleware сообщает время хендлеров
+_TIMING_KEY = "sdb_update_timing"
+
+
+class UpdateMetrics:
+    """Метрики обработки апдейтов: throughput, полное время, время хендлеров и middleware."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.updates_total = registry.counter(
+            "sdb_updates_total", "Обработанные апдейты по типу и результату (handled/unhandled/error).",
+            ("update_type", "status"),
+        )
+        self.update_seconds = registry.histogram(
+            "sdb_update_duration_seconds", "Полное время обработки апдейта (middleware + хендлеры).", ("update_type",),
+        )
+        self.middleware_seconds = registry.histogram(
+            "sdb_update_middleware_duration_seconds", "Время апдейта вне хендлеров (outer/inner middleware, фильтры).",
+            ("update_type",),
+        )
+        self.handler_seconds = registry.histogram(
+            "sdb_handler_duration_seconds", "Время работы хендлера по роутеру и функции.", ("router", "handler"),
+        )
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Outer middleware уровня Update: считает апдейты и полное время их обработки."""
+
+    def __init__(self, metrics: UpdateMetrics):
+        self._metrics = metrics
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        update_type = (event.event_type if isinstance(event, Update) else None) or "unknown"
+        timing = data[_TIMING_KEY] = [0.0]
+        status = "error"
+        started_at = time.perf_counter()
+        try:
+            result = await handler(event, data)
+            status = "unhandled" if result is UNHANDLED else "handled"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self._metrics.updates_total.inc(update_type=update_type, status=status)
+            self._metrics.update_seconds.observe(elapsed, update_type=update_type)
+            self._metrics.middleware_seconds.observe(max(0.0, elapsed - timing[0]), update_type=update_type)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: время хендлера с разбивкой по роутеру и имени функции."""
+
+    def __init__(self, metrics: UpdateMetrics):
+        self._metrics = metrics
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            timing = data.get(_TIMING_KEY)
+            if timing is not None:
+                timing[0] += elapsed
+            router = data.get("event_router")
+            handler_object = data.get("handler")
+            callback = getattr(handler_object, "callback", None)
+            self._metrics.handler_seconds.observe(
+                elapsed,
+                router=getattr(router, "name", None) or "unknown",
+                handler=getattr(callback, "__qualname__", None) or "unknown",
+            )
+
+
+def install_update_metrics(dp: Dispatcher, registry: MetricsRegistry = REGISTRY) -> UpdateMetrics:
+    """
+    Регистрирует middleware метрик. Вызывать после UpdateScheduler.install() и до middleware ядра,
+    чтобы время ожидания в очереди планировщика не попадало в время обработки.
+    """
+    metrics = UpdateMetrics(registry)
+    dp.update.outer_middleware(UpdateMetricsMiddleware(metrics))
+    handler_middleware = HandlerMetricsMiddleware(metrics)
+    for event_name, observer in dp.observers.items():
+        if event_name not in ("update", "error"):
+            observer.middleware(handler_middleware)
+    return metrics
+
+
+def register_update_scheduler_metrics(scheduler: 'UpdateScheduler', registry: MetricsRegistry = REGISTRY) -> None:
+    """Состояние очереди UpdateScheduler снимается в момент опроса /metrics."""
+    queue_depth = registry.gauge("sdb_update_queue_depth", "Апдейты, ожидающие обработки в UpdateScheduler.")
+    in_progress = registry.gauge("sdb_update_in_progress", "Апдейты, обрабатываемые воркерами UpdateScheduler сейчас.")
+    active_chats = registry.gauge("sdb_update_active_chats", "Чаты с апдейтами в очереди UpdateScheduler.")
+
+    def _collect() -> None:
+        stats = scheduler.get_stats()
+        queue_depth.set(stats["queue_depth"])
+        in_progress.set(stats["in_progress"])
+        active_chats.set(stats["active_chats"])
+
+    registry.add_collect_hook(_collect)
@@ -0,0 +1,10 @@
+# core/notifications/__init__.py
+from .outbox import NotificationOutbox, get_notifications_dir, get_outbox_db_path
+from .smtp import SmtpConnectionPool
+from .dispatcher import DeliveryResult, NotificationDispatcher, load_notification_channels
+
+__all__ = [
+    "NotificationOutbox", "get_notifications_dir", "get_outbox_db_path",
+    "SmtpConnectionPool",
+    "DeliveryResult", "NotificationDispatcher", "load_notification_channels",
+]
@@ -0,0 +1,337 @@
+# core/notifications/dispatcher.py
+import asyncio
+import html
+import json
+import random
+import smtplib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from core.monitoring.prometheus import REGISTRY
+from .outbox import NOTIFICATIONS_CONFIG_FILENAME, NotificationOutbox, get_notifications_dir
+from .smtp import SmtpConnectionPool
+
+NOTIFICATIONS_TOTAL = REGISTRY.counter(
+    "sdb_notifications_total",
+    "Попытки доставки уведомлений (дайджестов) по типу канала и результату: sent, retry, dead.",
+    ("channel_type", "result"),
+)
+
+PRIORITY_ORDER = ("low", "normal", "high", "urgent")
+PRIORITY_EMOJI = {"low": "🔵", "normal": "⚪", "high": "🟡", "urgent": "🔴"}
+SLACK_PRIORITY_COLORS = {"low": "#3498db", "normal": "#95a5a6", "high": "#f39c12", "urgent": "#e74c3c"}
+# Лимит Telegram - 4096 символов; остаток - на заголовок и подпись
+MAX_MESSAGE_LENGTH = {"telegram": 3800, "slack": 15000, "webhook": 50000, "email": 100000}
+DIGEST_SEPARATOR = "\n\n———\n\n"
+# Можно переопределить в config канала (api_url) - например, для локального Bot API сервера
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+
+@dataclass
+class DeliveryResult:
+    ok: bool
+    error: Optional[str] = None
+    # Сервер попросил повторить не раньше чем через столько секунд (Telegram 429)
+    retry_after: Optional[float] = None
+    # Повтор бессмыслен: неверные настройки канала, адресат отклонен и т.п.
+    permanent: bool = False
+
+
+def load_notification_channels(project_data_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Каналы из project_data/notifications/notifications_config.json (как их настраивает `sdb notifications`)."""
+    config_file = get_notifications_dir(project_data_path) / NOTIFICATIONS_CONFIG_FILENAME
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("channels", {})
+    except FileNotFoundError:
+        return {}
+
+
+def highest_priority(priorities: List[str]) -> str:
+    return max(priorities, key=lambda p: PRIORITY_ORDER.index(p) if p in PRIORITY_ORDER else 1, default="normal")
+
+
+class NotificationDispatcher:
+    """
+    Доставка уведомлений по каналам (telegram, email, webhook, slack) через durable outbox.
+
+    enqueue() только записывает уведомление в outbox; deliver_due() забирает наступившие,
+    склеивает несколько уведомлений одного канала в дайджест, отправляет (каналы - параллельно,
+    сообщения в один чат Telegram - не чаще лимита чата) и по результату отмечает строки
+    отправленными, откладывает с экспоненциальной паузой или помечает "мертвыми".
+
+    HTTP идет через общий пул HTTPClientManager, почта - через постоянное SMTP-соединение.
+    """
+
+    def __init__(
+        self,
+        channels: Dict[str, Dict[str, Any]],
+        outbox: Optional[NotificationOutbox] = None,
+        http_client: Optional[Any] = None,
+        max_attempts: int = 8,
+        retry_base_seconds: float = 30,
+        retry_max_seconds: float = 3600,
+        lease_seconds: float = 120,
+        telegram_chat_interval_seconds: float = 1.0,
+        telegram_group_interval_seconds: float = 3.0,
+        request_timeout_seconds: float = 15,
+    ):
+        self.channels = channels
+        self.outbox = outbox
+        self.http = http_client
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self.telegram_chat_interval_seconds = telegram_chat_interval_seconds
+        self.telegram_group_interval_seconds = telegram_group_interval_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self._owned_http: Optional[Any] = None
+        self._smtp_pool = SmtpConnectionPool(timeout_seconds=request_timeout_seconds)
+        self._chat_next_slot: Dict[str, float] = {}
+        self._chat_locks: Dict[str, asyncio.Lock] = {}
+
+    async def __aenter__(self) -> "NotificationDispatcher":
+        if self.http is None:
+            from core.app_settings import HttpClientSettings
+            from core.http_client.manager import HTTPClientManager
+            self._owned_http = self.http = HTTPClientManager(
+                http_settings=HttpClientSettings(timeout_seconds=self.request_timeout_seconds, cache_enabled=False)
+            )
+            await self.http.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._smtp_pool.close()
+        if self._owned_http is not None:
+            await self._owned_http.dispose()
+            self.http = self._owned_http = None
+
+    # --- Очередь ---
+
+    async def enqueue(self, channel: str, message: str, priority: str = "normal", subject: Optional[str] = None,
+                      dedup_key: Optional[str] = None, cooldown_seconds: float = 0) -> Optional[int]:
+        """Записывает уведомление в outbox. None - подавлено как повтор dedup_key в пределах cooldown."""
+        if self.outbox is None:
+            raise RuntimeError("NotificationDispatcher создан без outbox.")
+        return await asyncio.to_thread(self.outbox.enqueue, channel, message, priority, subject, dedup_key, cooldown_seconds)
+
+    async def deliver_due(self, limit: int = 100) -> Dict[str, int]:
+        """Отправляет наступившие уведомления из outbox. Возвращает число уведомлений по исходу."""
+        if self.outbox is None:
+            raise RuntimeError("NotificationDispatcher создан без outbox.")
+        rows = await asyncio.to_thread(self.outbox.claim_due, limit, self.lease_seconds)
+        stats = {"sent": 0, "retry": 0, "dead": 0}
+        if not rows:
+            return stats
+
+        by_channel: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_channel.setdefault(row["channel"], []).append(row)
+        await asyncio.gather(*(self._deliver_channel(channel, channel_rows, stats)
+                               for channel, channel_rows in by_channel.items()))
+        logger.info(f"Уведомления: отправлено {stats['sent']}, отложено {stats['retry']}, отброшено {stats['dead']}.")
+        return stats
+
+    async def _deliver_channel(self, channel: str, rows: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+        channel_info = self.channels.get(channel)
+        if channel_info is None or channel_info.get("status") != "active":
+            error = "Канал не найден" if channel_info is None else f"Канал неактивен (статус: {channel_info.get('status')})"
+            await asyncio.to_thread(self.outbox.mark_dead, [row["id"] for row in rows], error)
+            stats["dead"] += len(rows)
+            return
+
+        channel_type = channel_info.get("type", "")
+        for batch in self._digest_batches(channel_type, rows):
+            subject, message, priority = self._build_digest(batch)
+            try:
+                result = await self.send(channel_info, message, priority, subject)
+            except Exception as e:
+                logger.error(f"Уведомления: ошибка отправки в канал '{channel}': {e}")
+                result = DeliveryResult(ok=False, error=str(e))
+            await self._record_result(channel, channel_type, batch, result, stats)
+
+    async def _record_result(self, channel: str, channel_type: str, batch: List[Dict[str, Any]],
+                             result: DeliveryResult, stats: Dict[str, int]) -> None:
+        ids = [row["id"] for row in batch]
+        if result.ok:
+            await asyncio.to_thread(self.outbox.mark_sent, ids)
+            outcome = "sent"
+        elif result.permanent or max(row["attempts"] for row in batch) >= self.max_attempts:
+            await asyncio.to_thread(self.outbox.mark_dead, ids, result.error or "unknown error")
+            outcome = "dead"
+            logger.warning(f"Уведомления: {len(ids)} шт. в канал '{channel}' не будут доставлены: {result.error}")
+        else:
+            delay = self._retry_delay(max(row["attempts"] for row in batch), result.retry_after)
+            await asyncio.to_thread(self.outbox.reschedule, ids, time.time() + delay, result.error or "unknown error")
+            outcome = "retry"
+            logger.warning(f"Уведомления: канал '{channel}' - {result.error}; повтор через {delay:.0f} сек.")
+        stats[outcome] += len(ids)
+        NOTIFICATIONS_TOTAL.inc(channel_type=channel_type or "unknown", result=outcome)
+
+    def _retry_delay(self, attempts: int, retry_after: Optional[float]) -> float:
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** max(0, attempts - 1))
+        # Половина паузы фиксирована, половина случайна: повторы разных процессов не совпадают
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        return max(delay, retry_after or 0)
+
+    @staticmethod
+    def _digest_batches(channel_type: str, rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Делит уведомления канала на дайджесты, каждый из которых помещается в одно сообщение."""
+        max_length = MAX_MESSAGE_LENGTH.get(channel_type, 4000)
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_length = 0
+        for row in rows:
+            length = len(row["message"]) + len(DIGEST_SEPARATOR)
+            if current and current_length + length > max_length:
+                batches.append(current)
+                current, current_length = [], 0
+            current.append(row)
+            current_length += length
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _build_digest(batch: List[Dict[str, Any]]):
+        priority = highest_priority([row["priority"] for row in batch])
+        if len(batch) == 1:
+            return batch[0]["subject"] or "Уведомление системы", batch[0]["message"], priority
+        subject = f"Сводка уведомлений ({len(batch)})"
+        message = f"📦 {subject}" + DIGEST_SEPARATOR + DIGEST_SEPARATOR.join(row["message"] for row in batch)
+        return subject, message, priority
+
+    # --- Каналы ---
+
+    async def send(self, channel_info: Dict[str, Any], message: str, priority: str = "normal",
+                   subject: Optional[str] = None) -> DeliveryResult:
+        """Немедленная отправка одного сообщения в канал (без outbox)."""
+        channel_type = channel_info.get("type")
+        config = channel_info.get("config", {})
+        if channel_type == "telegram":
+            return await self._send_telegram(config, message, priority)
+        if channel_type == "email":
+            return await self._send_email(config, subject or "Уведомление системы", message, priority)
+        if channel_type == "webhook":
+            return await self._send_webhook(config, message, priority)
+        if channel_type == "slack":
+            return await self._send_slack(config, message, priority)
+        return DeliveryResult(ok=False, error=f"Неподдерживаемый тип канала: {channel_type}", permanent=True)
+
+    def _http_result(self, status: int, retry_after: Optional[float] = None, error: Optional[str] = None) -> DeliveryResult:
+        if 200 <= status < 300:
+            return DeliveryResult(ok=True)
+        # 408/429 и 5xx - временные; остальные 4xx - ошибка настроек или запроса
+        transient = status in (408, 429) or status >= 500
+        return DeliveryResult(ok=False, error=error or f"HTTP {status}", retry_after=retry_after, permanent=not transient)
+
+    async def _post(self, method: str, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        if self.http is None:
+            raise RuntimeError("HTTP-клиент не инициализирован: используйте `async with NotificationDispatcher(...)`")
+        return await self.http.request(method, url, json_data=payload, headers=headers or None,
+                                       timeout_seconds=self.request_timeout_seconds, retry=False, use_cache=False)
+
+    async def _wait_for_chat(self, chat_id: str) -> asyncio.Lock:
+        """Telegram: не чаще ~1 сообщения в секунду в личный чат и ~20 в минуту в группу."""
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        await lock.acquire()
+        wait = self._chat_next_slot.get(chat_id, 0.0) - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return lock
+
+    async def _send_telegram(self, config: Dict[str, Any], message: str, priority: str) -> DeliveryResult:
+        chat_id, bot_token = config.get("chat_id"), config.get("bot_token")
+        if not chat_id or not bot_token:
+            return DeliveryResult(ok=False, error="Telegram не настроен (отсутствует chat_id или bot_token)", permanent=True)
+
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        text = (f"{PRIORITY_EMOJI.get(priority, '⚪')} <b>{priority.upper()} УВЕДОМЛЕНИЕ</b>\n⏰ {timestamp}\n\n"
+                f"{html.escape(message)}\n\n---\n🤖 SwiftDevBot-Lite")
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
+        chat_key = str(chat_id)
+        interval = self.telegram_group_interval_seconds if chat_key.startswith("-") else self.telegram_chat_interval_seconds
+
+        lock = await self._wait_for_chat(chat_key)
+        try:
+            api_url = str(config.get("api_url") or TELEGRAM_API_URL).rstrip("/")
+            response = await self._post("POST", f"{api_url}/bot{bot_token}/sendMessage", payload)
+            self._chat_next_slot[chat_key] = time.monotonic() + interval
+            try:
+                result = await response.json(content_type=None)
+            except ValueError:
+                result = {}
+            if response.status == 200 and result.get("ok"):
+                return DeliveryResult(ok=True)
+            retry_after = (result.get("parameters") or {}).get("retry_after")
+            if retry_after:
+                self._chat_next_slot[chat_key] = time.monotonic() + float(retry_after)
+            return self._http_result(response.status, retry_after,
+                                     f"Telegram API: {result.get('description') or f'HTTP {response.status}'}")
+        finally:
+            lock.release()
+
+    async def _send_webhook(self, config: Dict[str, Any], message: str, priority: str) -> DeliveryResult:
+        url = config.get("url")
+        if not url:
+            return DeliveryResult(ok=False, error="Webhook не настроен (отсутствует URL)", permanent=True)
+        payload = {"message": message, "priority": priority, "timestamp": datetime.now().isoformat(),
+                   "source": "swiftdevbot", "version": "1.0"}
+        response = await self._post(config.get("method", "POST"), url, payload, config.get("headers") or {})
+        return self._http_result(response.status)
+
+    async def _send_slack(self, config: Dict[str, Any], message: str, priority: str) -> DeliveryResult:
+        webhook_url = config.get("webhook_url")
+        if not webhook_url:
+            return DeliveryResult(ok=False, error="Slack не настроен (отсутствует webhook_url)", permanent=True)
+        payload = {
+            "channel": config.get("channel", "#alerts"),
+            "text": f"{PRIORITY_EMOJI.get(priority, '⚪')} *{priority.upper()} УВЕДОМЛЕНИЕ*",
+            "attachments": [{
+                "color": SLACK_PRIORITY_COLORS.get(priority, "#95a5a6"),
+                "text": message,
+                "fields": [
+                    {"title": "Приоритет", "value": priority.upper(), "short": True},
+                    {"title": "Время", "value": datetime.now().strftime('%Y-%m-%d %H:%M:%S'), "short": True},
+                    {"title": "Источник", "value": "SwiftDevBot-Lite", "short": True},
+                ],
+                "footer": "SwiftDevBot-Lite",
+                "ts": int(time.time()),
+            }],
+        }
+        response = await self._post("POST", webhook_url, payload)
+        return self._http_result(response.status)
+
+    async def _send_email(self, config: Dict[str, Any], subject: str, message: str, priority: str) -> DeliveryResult:
+        required = ("smtp_server", "username", "password", "from_email", "to_email")
+        if not all(config.get(key) for key in required):
+            return DeliveryResult(ok=False, error="Email не настроен (отсутствуют необходимые параметры)", permanent=True)
+
+        msg = MIMEMultipart()
+        msg['From'] = config["from_email"]
+        msg['To'] = config["to_email"]
+        msg['Subject'] = f"{PRIORITY_EMOJI.get(priority, '⚪')} [{priority.upper()}] {subject}"
+        body = (f"🤖 SwiftDevBot-Lite - Уведомление\n\nПриоритет: {priority.upper()}\n"
+                f"Время: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n{message}\n\n---\n"
+                "Это автоматическое уведомление от системы SwiftDevBot-Lite.\n")
+        msg.attach(MIMEText(body, 'plain', 'utf-8'))
+        try:
+            await self._smtp_pool.send_message(config, msg)
+            return DeliveryResult(ok=True)
+        except smtplib.SMTPAuthenticationError:
+            return DeliveryResult(ok=False, error="Ошибка аутентификации SMTP", permanent=True)
+        except smtplib.SMTPRecipientsRefused:
+            return DeliveryResult(ok=False, error=f"Неверный адрес получателя: {config['to_email']}", permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            return DeliveryResult(ok=False, error=f"SMTP: {e}")
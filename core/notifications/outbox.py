@@ -0,0 +1,213 @@
+# core/notifications/outbox.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+NOTIFICATIONS_SUBDIR = "notifications"
+OUTBOX_DB_FILENAME = "outbox.db"
+NOTIFICATIONS_CONFIG_FILENAME = "notifications_config.json"
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    priority TEXT NOT NULL DEFAULT 'normal',
+    subject TEXT,
+    message TEXT NOT NULL,
+    dedup_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_dedup ON notification_outbox(channel, dedup_key, created_at);
+"""
+
+_ROW_COLUMNS = ("id", "channel", "priority", "subject", "message", "dedup_key", "status", "attempts",
+                "next_attempt_at", "last_error", "created_at", "sent_at")
+
+
+def get_notifications_dir(project_data_path: Path) -> Path:
+    return Path(project_data_path) / NOTIFICATIONS_SUBDIR
+
+
+def get_outbox_db_path(project_data_path: Path) -> Path:
+    return get_notifications_dir(project_data_path) / OUTBOX_DB_FILENAME
+
+
+class NotificationOutbox:
+    """
+    Очередь исходящих уведомлений (SQLite, одно постоянное WAL-соединение на процесс).
+
+    Уведомление сначала записывается в outbox и только потом отправляется, поэтому сбой канала
+    или падение процесса не теряет его: claim_due() выдает строку снова после lease_seconds,
+    если отправка не была подтверждена mark_sent() / reschedule() / mark_dead().
+
+    Методы синхронные и потокобезопасные - из event loop вызывать через asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def initialize(self) -> None:
+        """Открывает соединение и создает таблицу, если ее еще нет."""
+        with self._lock:
+            self._connection()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def enqueue(self, channel: str, message: str, priority: str = "normal", subject: Optional[str] = None,
+                dedup_key: Optional[str] = None, cooldown_seconds: float = 0) -> Optional[int]:
+        """
+        Добавляет уведомление. Если задан dedup_key и за последние cooldown_seconds в этот канал уже
+        ставилось уведомление с тем же ключом - не добавляет и возвращает None.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                if dedup_key and cooldown_seconds > 0:
+                    duplicate = conn.execute(
+                        "SELECT 1 FROM notification_outbox WHERE channel = ? AND dedup_key = ? AND created_at >= ? "
+                        "AND status != ? LIMIT 1",
+                        (channel, dedup_key, now - cooldown_seconds, STATUS_DEAD),
+                    ).fetchone()
+                    if duplicate:
+                        return None
+                cursor = conn.execute(
+                    "INSERT INTO notification_outbox (channel, priority, subject, message, dedup_key, status, "
+                    "next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (channel, priority, subject, message, dedup_key, STATUS_PENDING, now, now),
+                )
+                return cursor.lastrowid
+
+    def claim_due(self, limit: int = 100, lease_seconds: float = 120, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Выдает ожидающие уведомления, срок отправки которых наступил (по порядку добавления),
+        увеличивает attempts и откладывает их на lease_seconds - другой процесс их не возьмет.
+
+        SELECT и UPDATE идут в одной транзакции BEGIN IMMEDIATE: блокировка записи берется до чтения,
+        и второй процесс (бот и CLI) ждет ее, а не читает те же строки. UPDATE дополнительно проверяет
+        status/next_attempt_at, и выдаются только строки, которые он действительно изменил.
+        """
+        now = time.time() if now is None else now
+        claimed = []
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    f"SELECT {', '.join(_ROW_COLUMNS)} FROM notification_outbox "
+                    "WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (STATUS_PENDING, now, limit),
+                ).fetchall()
+                for row in rows:
+                    cursor = conn.execute(
+                        "UPDATE notification_outbox SET attempts = attempts + 1, next_attempt_at = ? "
+                        "WHERE id = ? AND status = ? AND next_attempt_at <= ?",
+                        (now + lease_seconds, row[0], STATUS_PENDING, now),
+                    )
+                    if cursor.rowcount:
+                        item = dict(zip(_ROW_COLUMNS, row))
+                        item["attempts"] += 1
+                        claimed.append(item)
+        return claimed
+
+    def _update(self, sql: str, params: Iterable[tuple]) -> None:
+        params = list(params)
+        if not params:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(sql, params)
+
+    def mark_sent(self, ids: Iterable[int]) -> None:
+        now = time.time()
+        self._update("UPDATE notification_outbox SET status = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                     ((STATUS_SENT, now, row_id) for row_id in ids))
+
+    def reschedule(self, ids: Iterable[int], next_attempt_at: float, error: str) -> None:
+        self._update("UPDATE notification_outbox SET next_attempt_at = ?, last_error = ? WHERE id = ?",
+                     ((next_attempt_at, error, row_id) for row_id in ids))
+
+    def mark_dead(self, ids: Iterable[int], error: str) -> None:
+        """Больше не отправлять: ошибка постоянная или попытки исчерпаны."""
+        self._update("UPDATE notification_outbox SET status = ?, last_error = ? WHERE id = ?",
+                     ((STATUS_DEAD, error, row_id) for row_id in ids))
+
+    def requeue_dead(self) -> int:
+        """Возвращает "мертвые" уведомления в очередь (например, после исправления настроек канала)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE notification_outbox SET status = ?, attempts = 0, next_attempt_at = ? WHERE status = ?",
+                    (STATUS_PENDING, now, STATUS_DEAD),
+                )
+                return cursor.rowcount
+
+    def purge(self, older_than_seconds: float) -> int:
+        """Удаляет отправленные и "мертвые" уведомления старше older_than_seconds."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM notification_outbox WHERE status IN (?, ?) AND created_at < ?",
+                    (STATUS_SENT, STATUS_DEAD, time.time() - older_than_seconds),
+                )
+                return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status").fetchall())
+            oldest_pending = conn.execute(
+                "SELECT MIN(created_at) FROM notification_outbox WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()[0]
+        return {
+            STATUS_PENDING: counts.get(STATUS_PENDING, 0),
+            STATUS_SENT: counts.get(STATUS_SENT, 0),
+            STATUS_DEAD: counts.get(STATUS_DEAD, 0),
+            "oldest_pending_age_seconds": round(time.time() - oldest_pending, 1) if oldest_pending else None,
+        }
+
+    def list_recent(self, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            if status:
+                rows = conn.execute(
+                    f"SELECT {', '.join(_ROW_COLUMNS)} FROM notification_outbox WHERE status = ? ORDER BY id DESC LIMIT ?",
+                    (status, limit),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT {', '.join(_ROW_COLUMNS)} FROM notification_outbox ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [dict(zip(_ROW_COLUMNS, row)) for row in rows]
@@ -0,0 +1,101 @@
+# core/notifications/smtp.py
+import asyncio
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+from email.message import Message
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+# Ошибки соединения: соединение пересоздается, и письмо отправляется еще раз
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, OSError)
+
+
+@dataclass
+class _PooledConnection:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    smtp: Optional[smtplib.SMTP] = None
+    last_used: float = 0.0
+
+
+class SmtpConnectionPool:
+    """
+    Постоянные SMTP-соединения по (сервер, порт, логин): TLS-рукопожатие и логин выполняются один раз
+    на серию писем, а не на каждое. smtplib блокирующий, поэтому работа с ним идет в потоке
+    (asyncio.to_thread); одно соединение одновременно используется только одним письмом.
+    """
+
+    def __init__(self, timeout_seconds: float = 15, idle_timeout_seconds: float = 60):
+        self._timeout = timeout_seconds
+        self._idle_timeout = idle_timeout_seconds
+        self._connections: Dict[Tuple[str, int, str], _PooledConnection] = {}
+        self._connections_lock = threading.Lock()
+
+    async def send_message(self, config: Dict[str, Any], message: Message) -> None:
+        """Отправляет письмо через соединение для config (smtp_server, smtp_port, username, password)."""
+        await asyncio.to_thread(self._send_sync, config, message)
+
+    def _get_entry(self, key: Tuple[str, int, str]) -> _PooledConnection:
+        with self._connections_lock:
+            entry = self._connections.get(key)
+            if entry is None:
+                entry = self._connections[key] = _PooledConnection()
+            return entry
+
+    def _connect(self, config: Dict[str, Any]) -> smtplib.SMTP:
+        port = int(config.get("smtp_port", 587))
+        if port == 465:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(config["smtp_server"], port, timeout=self._timeout)
+        else:
+            smtp = smtplib.SMTP(config["smtp_server"], port, timeout=self._timeout)
+            smtp.starttls()
+        if config.get("username"):
+            smtp.login(config["username"], config.get("password") or "")
+        logger.debug(f"SMTP: открыто соединение с {config['smtp_server']}:{port}.")
+        return smtp
+
+    @staticmethod
+    def _close_quietly(smtp: Optional[smtplib.SMTP]) -> None:
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _send_sync(self, config: Dict[str, Any], message: Message) -> None:
+        key = (str(config["smtp_server"]), int(config.get("smtp_port", 587)), str(config.get("username") or ""))
+        entry = self._get_entry(key)
+        with entry.lock:
+            # Сервер закрывает простаивающие соединения сам - старое не переиспользуем
+            if entry.smtp is not None and time.monotonic() - entry.last_used > self._idle_timeout:
+                self._close_quietly(entry.smtp)
+                entry.smtp = None
+            reused = entry.smtp is not None
+            if entry.smtp is None:
+                entry.smtp = self._connect(config)
+            try:
+                entry.smtp.send_message(message)
+            except _RECONNECT_ERRORS:
+                self._close_quietly(entry.smtp)
+                entry.smtp = None
+                if not reused:
+                    raise
+                # Соединение из пула оказалось разорвано - одна попытка на новом
+                entry.smtp = self._connect(config)
+                entry.smtp.send_message(message)
+            entry.last_used = time.monotonic()
+
+    def _close_all_sync(self) -> None:
+        with self._connections_lock:
+            entries = list(self._connections.values())
+            self._connections.clear()
+        for entry in entries:
+            with entry.lock:
+                self._close_quietly(entry.smtp)
+                entry.smtp = None
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close_all_sync)
@@ -1,10 +1,15 @@
 # core/rbac/service.py
+import asyncio
+import time
 from sqlalchemy.orm import selectinload
-from typing import List, Optional, TYPE_CHECKING, Set, Dict, Tuple, Union
+from typing import List, Optional, TYPE_CHECKING, Set, Dict, Tuple, Union, FrozenSet, Iterable, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func as sql_func 
+from sqlalchemy import select, delete, func as sql_func
 from loguru import logger
 
+from core.app_settings import RBACSettings
+from core.cache.invalidation import CommitInvalidator
+
 from core.database.core_models import User, Role, UserRole, Permission, RolePermission, UserPermission # Добавлена UserPermission
 from core.schemas.module_manifest import PermissionManifest as ModulePermissionManifestSchema
 
@@ -13,6 +18,8 @@ if TYPE_CHECKING:
     from core.services_provider import BotServicesProvider 
     from core.database.manager import DBManager 
     from core.module_loader import ModuleInfo 
+    from core.cache.manager import CacheManager
+    from core.users.context import UserContextCache
 
 # --- Стандартные Роли ---
 DEFAULT_ROLE_USER = "User"
@@ -110,6 +117,9 @@ DEFAULT_PERMISSIONS_FOR_CORE_ADMIN_ROLE: Set[str] = {
 
 DEFAULT_PERMISSIONS_FOR_CORE_USER_ROLE: Set[str] = set()
 
+# --- Кэш скомпилированных разрешений ---
+RBAC_CACHE_KEY_PREFIX = "sdb:rbac:"
+
 
 class RBACService:
     def __init__(self, services: Optional['BotServicesProvider'] = None, db_manager: Optional['DBManager'] = None):
@@ -124,8 +134,190 @@ class RBACService:
                            "Методы ensure_default_... потребуют явной передачи сессии или DBManager.")
             
         self._logger = logger.bind(service="RBACService")
+        if services is not None:
+            self._permissions_cache_ttl = services.config.core.rbac.permissions_cache_ttl_seconds
+        else: # CLI без BotServicesProvider кэш не использует
+            self._permissions_cache_ttl = RBACSettings.model_fields["permissions_cache_ttl_seconds"].default
+        self._invalidator = CommitInvalidator("RBACService")
         self._logger.info("RBACService инициализирован.")
 
+    # --- Кэш скомпилированных наборов разрешений ---
+    # Запись пользователя: {"role_ids", "direct", "effective", "epoch"} (имена разрешений в нижнем регистре).
+    # Запись роли: frozenset имен разрешений роли.
+    # Изменение разрешений роли удаляет только запись роли и меняет "эпоху" ролей: записи пользователей
+    # с устаревшей эпохой пересобирают effective из кэша ролей без обращения к БД за данными пользователя.
+
+    @staticmethod
+    def _user_perms_cache_key(user_telegram_id: int) -> str:
+        return f"{RBAC_CACHE_KEY_PREFIX}user_perms:{user_telegram_id}"
+
+    @staticmethod
+    def _role_perms_cache_key(role_id: int) -> str:
+        return f"{RBAC_CACHE_KEY_PREFIX}role_perms:{role_id}"
+
+    @staticmethod
+    def _roles_epoch_cache_key() -> str:
+        return f"{RBAC_CACHE_KEY_PREFIX}roles_epoch"
+
+    def _get_cache(self) -> Optional['CacheManager']:
+        if not self._services_provider_ref:
+            return None
+        try:
+            return self._services_provider_ref.cache
+        except AttributeError:
+            return None
+
+    async def _get_roles_epoch(self, cache: Optional['CacheManager']) -> int:
+        if cache is None:
+            return 0
+        epoch = await cache.get(self._roles_epoch_cache_key())
+        if epoch is None:
+            epoch = time.time_ns()
+            await cache.set(self._roles_epoch_cache_key(), epoch)
+        return epoch
+
+    @staticmethod
+    async def _query_role_permission_sets(session: AsyncSession, role_ids: Set[int]) -> Dict[int, FrozenSet[str]]:
+        stmt = (
+            select(RolePermission.role_id, Permission.name)
+            .join(Permission, Permission.id == RolePermission.permission_id)
+            .where(RolePermission.role_id.in_(role_ids))
+        )
+        loaded: Dict[int, Set[str]] = {role_id: set() for role_id in role_ids}
+        for role_id, perm_name in (await session.execute(stmt)).all():
+            loaded[role_id].add(perm_name.lower())
+        return {role_id: frozenset(names) for role_id, names in loaded.items()}
+
+    async def _load_role_permission_set_in_own_session(self, role_id: int) -> FrozenSet[str]:
+        # Загрузка общая для всех ожидающих (single-flight), поэтому не используем сессию вызывающего
+        async with self._db_manager.get_session() as session:
+            return (await self._query_role_permission_sets(session, {role_id}))[role_id]
+
+    async def _load_role_permission_sets(self, session: AsyncSession, role_ids: Iterable[int]) -> Dict[int, FrozenSet[str]]:
+        role_ids = set(role_ids)
+        if not role_ids:
+            return {}
+        cache = self._get_cache()
+        if cache is None or self._db_manager is None:
+            return await self._query_role_permission_sets(session, role_ids)
+
+        keys_by_role = {role_id: self._role_perms_cache_key(role_id) for role_id in role_ids}
+        cached = await cache.get_many(keys_by_role.values())
+        role_sets: Dict[int, FrozenSet[str]] = {
+            role_id: cached[key] for role_id, key in keys_by_role.items() if key in cached
+        }
+        missing_ids = sorted(role_ids - role_sets.keys())
+        if missing_ids:
+            # Наборы популярных ролей (например, User) истекают сразу у всех пользователей -
+            # get_or_load сводит одновременные промахи к одному запросу на роль
+            loaded = await asyncio.gather(*(
+                cache.get_or_load(
+                    keys_by_role[role_id],
+                    lambda role_id=role_id: self._load_role_permission_set_in_own_session(role_id),
+                    ttl_seconds=self._permissions_cache_ttl,
+                )
+                for role_id in missing_ids
+            ))
+            role_sets.update(zip(missing_ids, loaded))
+        return role_sets
+
+    async def get_effective_permissions(self, session: AsyncSession, user_telegram_id: int) -> Optional[FrozenSet[str]]:
+        """
+        Возвращает скомпилированный набор разрешений пользователя (прямые + через роли, в нижнем регистре)
+        или None, если пользователь не найден. Результат кэшируется в CacheManager.
+        """
+        cache = self._get_cache()
+        epoch = await self._get_roles_epoch(cache)
+        entry: Optional[Dict[str, Any]] = None
+        if cache is not None:
+            entry = await cache.get(self._user_perms_cache_key(user_telegram_id))
+            if entry is not None and entry["epoch"] == epoch:
+                return entry["effective"]
+
+        if entry is None:
+            user_id = (await session.execute(
+                select(User.id).where(User.telegram_id == user_telegram_id)
+            )).scalar_one_or_none()
+            if user_id is None:
+                return None
+            role_ids = frozenset((await session.execute(
+                select(UserRole.role_id).where(UserRole.user_id == user_id)
+            )).scalars().all())
+            direct = frozenset(name.lower() for name in (await session.execute(
+                select(Permission.name)
+                .join(UserPermission, UserPermission.permission_id == Permission.id)
+                .where(UserPermission.user_id == user_id)
+            )).scalars().all())
+        else:
+            # Данные пользователя актуальны, изменились только разрешения ролей
+            role_ids, direct = entry["role_ids"], entry["direct"]
+
+        effective: Set[str] = set(direct)
+        for role_perms in (await self._load_role_permission_sets(session, role_ids)).values():
+            effective |= role_perms
+        compiled = frozenset(effective)
+
+        if cache is not None:
+            await cache.set(
+                self._user_perms_cache_key(user_telegram_id),
+                {"role_ids": role_ids, "direct": direct, "effective": compiled, "epoch": epoch},
+                ttl_seconds=self._permissions_cache_ttl
+            )
+        self._logger.trace("Скомпилирован набор разрешений для TG ID {}: {} шт.", user_telegram_id, len(compiled))
+        return compiled
+
+    def _get_user_context(self) -> Optional['UserContextCache']:
+        if not self._services_provider_ref:
+            return None
+        try:
+            return self._services_provider_ref.user_service.context
+        except AttributeError:
+            return None
+
+    async def invalidate_user_permissions(self, user_telegram_id: int) -> None:
+        cache = self._get_cache()
+        if cache is not None:
+            await cache.delete(self._user_perms_cache_key(user_telegram_id))
+        # Контекст пользователя (UserContextCache) хранит его роли и прямые разрешения
+        user_context = self._get_user_context()
+        if user_context is not None:
+            await user_context.invalidate(user_telegram_id)
+
+    async def invalidate_role_permissions(self, role_id: int) -> None:
+        cache = self._get_cache()
+        if cache is not None:
+            await cache.delete(self._role_perms_cache_key(role_id))
+            await cache.set(self._roles_epoch_cache_key(), time.time_ns())
+        # ...и разрешения каждой своей роли, а кому назначена роль - неизвестно
+        user_context = self._get_user_context()
+        if user_context is not None:
+            await user_context.invalidate_all()
+
+    async def _schedule_invalidation(
+        self,
+        session: AsyncSession,
+        user_telegram_ids: Iterable[int] = (),
+        role_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        Инвалидирует кэш разрешений сразу и повторно после commit сессии
+        (изменения RBAC-методов применяются только при коммите вызывающего кода).
+        """
+        user_telegram_ids, role_ids = tuple(user_telegram_ids), tuple(role_ids)
+        if not user_telegram_ids and not role_ids:
+            return
+
+        async def _invalidate() -> None:
+            for tg_id in user_telegram_ids:
+                await self.invalidate_user_permissions(tg_id)
+            for role_id in role_ids:
+                await self.invalidate_role_permissions(role_id)
+
+        await self._invalidator.now_and_after_commit(session, _invalidate)
+
+    async def dispose(self) -> None:
+        await self._invalidator.drain()
+
     async def _get_role_by_name(self, session: AsyncSession, role_name: str) -> Optional[Role]:
         self._logger.trace(f"Получение роли по имени: '{role_name}'")
         stmt = select(Role).options(selectinload(Role.permissions)).where(Role.name == role_name)
@@ -256,6 +448,7 @@ class RBACService:
         }
         
         changes_in_role_perms_assignment = False
+        changed_role_ids: Set[int] = set()
         for role_name_to_setup, core_perm_names_to_assign in role_core_permission_map.items():
             role_obj = await self._get_role_by_name(session, role_name_to_setup) 
             if not role_obj or role_obj.id is None:
@@ -274,6 +467,7 @@ class RBACService:
                     if await self.assign_permission_to_role(session, role_obj, perm_obj_to_assign.name, auto_create_perm=False):
                         current_role_assigned_count +=1
                         changes_in_role_perms_assignment = True 
+                        changed_role_ids.add(role_obj.id)
             
             if current_role_assigned_count > 0:
                 assigned_perms_summary[role_name_to_setup] = current_role_assigned_count
@@ -298,6 +492,7 @@ class RBACService:
                                 self._logger.info(f"Автоматически назначено разрешение '{perm_obj.name}' роли '{DEFAULT_ROLE_USER}'.")
                                 auto_assigned_module_perms_count += 1
                                 changes_in_role_perms_assignment = True 
+                                changed_role_ids.add(role_user_obj.id)
                     else:
                         self._logger.warning(f"Не найдено зарегистрированное разрешение '{base_access_perm_name}' для модуля '{module_info.name}', "
                                              "хотя он помечен для авто-назначения роли User.")
@@ -327,6 +522,10 @@ class RBACService:
                 self._logger.error(f"Ошибка при коммите стандартных RBAC сущностей: {e}", exc_info=True)
                 await session.rollback()
                 return 0, 0, 0 
+            # Явно после commit: в Redis могут остаться наборы ролей с прошлого запуска,
+            # и новые права модулей иначе были бы не видны до истечения TTL
+            for role_id in changed_role_ids:
+                await self.invalidate_role_permissions(role_id)
         else:
             self._logger.info("Не было обнаружено фактических изменений в RBAC для коммита.")
 
@@ -376,6 +575,7 @@ class RBACService:
             new_user_role_link = UserRole(user_id=user.id, role_id=role_obj.id)
             session.add(new_user_role_link)
             self._logger.info(f"Роль '{role_name}' (RoleID: {role_obj.id}) добавлена пользователю UserID: {user.id} (ожидает commit).")
+            await self._schedule_invalidation(session, user_telegram_ids=[user.telegram_id])
             return True
         except Exception as e_assign:
             self._logger.error(f"Ошибка при назначении роли '{role_name}' пользователю {user.id}: {e_assign}", exc_info=True)
@@ -397,6 +597,7 @@ class RBACService:
             
             if result.rowcount > 0:
                 self._logger.info(f"Роль '{role_name}' снята с пользователя {user.id} (ожидает commit).")
+                await self._schedule_invalidation(session, user_telegram_ids=[user.telegram_id])
                 return True
             else:
                 self._logger.debug(f"Роль '{role_name}' не была назначена пользователю {user.id}. Снятие не требуется.")
@@ -469,6 +670,7 @@ class RBACService:
             await session.execute(delete(RolePermission).where(RolePermission.role_id == role.id))
             await session.delete(role)
             self._logger.warning(f"Роль '{role.name}' (ID: {role.id}) и ее связи с разрешениями помечены для удаления (ожидает commit).")
+            await self._schedule_invalidation(session, role_ids=[role.id])
             return True
         except Exception as e:
             self._logger.error(f"Ошибка при попытке удаления роли '{role.name}': {e}", exc_info=True)
@@ -533,6 +735,7 @@ class RBACService:
                 new_role_perm_link = RolePermission(role_id=role.id, permission_id=permission_obj.id)
                 session.add(new_role_perm_link)
                 self._logger.info(f"Разрешение '{permission_name}' (PermID: {permission_obj.id}) добавлено роли '{role.name}' (RoleID: {role.id}) (ожидает commit).")
+                await self._schedule_invalidation(session, role_ids=[role.id])
                 return True
             except Exception as e_add_link:
                 self._logger.error(f"Ошибка при создании объекта RolePermission для RoleID {role.id}, PermID {permission_obj.id}: {e_add_link}", exc_info=True)
@@ -566,6 +769,7 @@ class RBACService:
             result = await session.execute(stmt_delete)
             if result.rowcount > 0:
                 self._logger.info(f"Разрешение '{permission_name}' снято с роли '{role.name}' (ожидает commit).")
+                await self._schedule_invalidation(session, role_ids=[role.id])
                 return True
             else:
                 self._logger.debug(f"Разрешение '{permission_name}' не было назначено роли '{role.name}'. Снятие не требуется.")
@@ -578,49 +782,28 @@ class RBACService:
         # 1. Проверка на Владельца (высший приоритет)
         if self._services_provider_ref and self._services_provider_ref.config: 
             if user_telegram_id in self._services_provider_ref.config.core.super_admins:
-                self._logger.trace(f"Пользователь TG ID {user_telegram_id} является Владельцем, разрешение '{permission_name}' предоставлено.")
+                self._logger.trace("Пользователь TG ID {} является Владельцем, разрешение '{}' предоставлено.", user_telegram_id, permission_name)
                 return True
         
-        # Загружаем пользователя с его ролями и прямыми разрешениями
-        stmt = (
-            select(User)
-            .options(
-                selectinload(User.roles).selectinload(Role.permissions), # Роли и их разрешения
-                selectinload(User.direct_permissions) # Прямые разрешения пользователя
-            )
-            .where(User.telegram_id == user_telegram_id)
-        )
-        result = await session.execute(stmt)
-        user_db: Optional[User] = result.scalars().first()
-
-        if not user_db:
-            self._logger.trace(f"Пользователь TG ID {user_telegram_id} не найден при проверке разрешения '{permission_name}'.")
+        # 2. Прямые разрешения и разрешения через роли (скомпилированный набор из кэша)
+        effective_permissions = await self.get_effective_permissions(session, user_telegram_id)
+        if effective_permissions is None:
+            self._logger.trace("Пользователь TG ID {} не найден при проверке разрешения '{}'.", user_telegram_id, permission_name)
             return False
         
-        perm_name_lower = permission_name.lower()
-
-        # 2. Проверка прямых разрешений пользователя
-        if user_db.direct_permissions:
-            for perm_obj in user_db.direct_permissions:
-                if perm_obj.name.lower() == perm_name_lower:
-                    self._logger.trace(f"Пользователь TG ID {user_telegram_id} имеет прямое разрешение '{permission_name}'.")
-                    return True
-        
-        # 3. Проверка разрешений через роли
-        if not user_db.roles:
-            self._logger.trace(f"Пользователь TG ID {user_telegram_id} не имеет ролей при проверке разрешения '{permission_name}'.")
-            # (Если нет прямых прав и нет ролей, то права нет)
-            # return False # Это условие уже покрывается следующим return False
-        else: # Если есть роли, проверяем их
-            for role_obj in user_db.roles:
-                if role_obj.permissions: 
-                    for perm_obj in role_obj.permissions:
-                        if perm_obj.name.lower() == perm_name_lower:
-                            self._logger.trace(f"Пользователь TG ID {user_telegram_id} имеет разрешение '{permission_name}' через роль '{role_obj.name}'.")
-                            return True
-        
-        self._logger.trace(f"Пользователь TG ID {user_telegram_id} НЕ имеет разрешения '{permission_name}' (ни прямого, ни через роли).")
-        return False
+        has_permission = permission_name.lower() in effective_permissions
+        self._logger.trace("Пользователь TG ID {} {} разрешения '{}'.", user_telegram_id, "имеет" if has_permission else "НЕ имеет", permission_name)
+        return has_permission
+
+    async def user_has_permissions(self, session: AsyncSession, user_telegram_id: int, permission_names: Iterable[str]) -> Dict[str, bool]:
+        """Пакетная проверка: {имя_разрешения: есть_ли_оно} за одно получение набора разрешений."""
+        permission_names = list(permission_names)
+        if self._services_provider_ref and self._services_provider_ref.config: 
+            if user_telegram_id in self._services_provider_ref.config.core.super_admins:
+                return {name: True for name in permission_names}
+
+        effective_permissions = await self.get_effective_permissions(session, user_telegram_id) or frozenset()
+        return {name: name.lower() in effective_permissions for name in permission_names}
 
     async def get_all_permissions(self, session: AsyncSession) -> List[Permission]:
         stmt = select(Permission).order_by(Permission.name)
@@ -683,6 +866,7 @@ class RBACService:
         session.add(new_user_perm_link)
         
         self._logger.info(f"Прямое разрешение '{permission_name}' добавлено пользователю {user.telegram_id} (ожидает commit).")
+        await self._schedule_invalidation(session, user_telegram_ids=[user.telegram_id])
         return True
 
     async def remove_direct_permission_from_user(
@@ -717,6 +901,7 @@ class RBACService:
         result = await session.execute(stmt_delete)
         if result.rowcount > 0:
             self._logger.info(f"Прямое разрешение '{permission_name}' снято с пользователя {user.telegram_id} (ожидает commit).")
+            await self._schedule_invalidation(session, user_telegram_ids=[user.telegram_id])
             return True
         else:
             self._logger.debug(f"Прямое разрешение '{permission_name}' не было назначено пользователю {user.telegram_id}. Снятие не требуется.")
@@ -6,12 +6,23 @@ import re
 from loguru import logger 
 
 
+class RateLimitManifest(BaseModel):
+    limit: int = Field(..., ge=1, description="Сколько апдейтов один пользователь может отправить за окно.")
+    window_seconds: int = Field(default=60, ge=1, description="Длина скользящего окна (секунды).")
+
+class ModuleRateLimitManifest(RateLimitManifest):
+    callback_prefixes: List[str] = Field(
+        default_factory=list,
+        description="Префиксы callback_data модуля, на которые действует лимит. Команды модуля без своего rate_limit тоже под ним."
+    )
+
 class CommandManifest(BaseModel):
     command: str = Field(..., description="Сама команда (без '/'). Например, 'weather'.")
     description: str = Field(..., description="Описание команды для пользователя (например, для /help).")
     icon: Optional[str] = Field(default=None, description="Эмодзи-иконка для команды (опционально).")
     category: Optional[str] = Field(default=None, description="Категория для группировки команд (опционально).")
     admin_only: bool = Field(default=False, alias="admin", description="Требует ли команда прав администратора.")
+    rate_limit: Optional[RateLimitManifest] = Field(default=None, description="Лимит частоты вызова команды одним пользователем (опционально).")
 
 class SettingChoiceOption(BaseModel):
     value: Any
@@ -122,6 +133,7 @@ class ModuleManifest(BaseModel):
     settings: Dict[str, SettingManifest] = Field(default_factory=dict) 
     declared_permissions: List[PermissionManifest] = Field(default_factory=list, alias="permissions")
     background_tasks: Dict[str, BackgroundTaskManifest] = Field(default_factory=dict)
+    rate_limit: Optional[ModuleRateLimitManifest] = Field(default=None, description="Общий лимит частоты для команд и callback-ов модуля (опционально).")
     metadata: ModuleMetadata = Field(default_factory=ModuleMetadata) # <--- ИЗМЕНЕНО: metadata теперь не Optional, чтобы всегда было поле assign_default_access_to_user_role
 
     @field_validator('version', mode='before')
@@ -14,6 +14,12 @@ if TYPE_CHECKING:
     from core.ui.registry_ui import UIRegistry
     from core.rbac.service import RBACService
     from core.users.service import UserService
+    from core.monitoring.runtime_stats import RuntimeStatsPublisher
+    from core.monitoring.metrics_collector import MetricsCollector
+    from core.monitoring.prometheus import PrometheusExporter
+    from core.monitoring.loop_profiler import LoopProfiler
+    from core.tasks.service import TaskScheduler
+    from core.broadcast.service import BroadcastService
 
 
 class BotServicesProvider:
@@ -29,6 +35,12 @@ class BotServicesProvider:
         self._ui_registry: Optional['UIRegistry'] = None
         self._rbac_service: Optional['RBACService'] = None
         self._user_service: Optional['UserService'] = None
+        self._runtime_stats: Optional['RuntimeStatsPublisher'] = None
+        self._metrics_collector: Optional['MetricsCollector'] = None
+        self._prometheus_exporter: Optional['PrometheusExporter'] = None
+        self._loop_profiler: Optional['LoopProfiler'] = None
+        self._task_scheduler: Optional['TaskScheduler'] = None
+        self._broadcast_service: Optional['BroadcastService'] = None
 
         self._logger.info(f"BotServicesProvider создан (версия SDB: {settings.core.sdb_version}). Ожидает настройки сервисов.")
 
@@ -44,6 +56,91 @@ class BotServicesProvider:
             self._logger.critical(f"КРИТИЧЕСКАЯ ОШИБКА настройки DBManager: {e}", exc_info=True)
             raise
 
+        from core.monitoring.runtime_stats import RuntimeStatsPublisher, get_runtime_stats_path
+        self._runtime_stats = RuntimeStatsPublisher(
+            snapshot_path=get_runtime_stats_path(self._settings.core.project_data_path),
+            interval_seconds=self._settings.core.runtime_stats_interval_seconds,
+        )
+        self._runtime_stats.register("db_pool", self._db_manager.get_pool_stats)
+
+        metrics_settings = self._settings.core.metrics
+        if metrics_settings.enabled:
+            from core.monitoring.metrics_collector import MetricsCollector
+            from core.monitoring.metrics_store import MetricsStore, get_metrics_db_path
+            self._metrics_collector = MetricsCollector(
+                store=MetricsStore(
+                    get_metrics_db_path(self._settings.core.project_data_path),
+                    raw_retention_hours=metrics_settings.raw_retention_hours,
+                    minute_retention_days=metrics_settings.minute_retention_days,
+                    hour_retention_days=metrics_settings.hour_retention_days,
+                ),
+                sample_interval_seconds=metrics_settings.sample_interval_seconds,
+                flush_interval_seconds=metrics_settings.flush_interval_seconds,
+                bot_status="running",
+            )
+            self._runtime_stats.register("metrics_collector", self._metrics_collector.get_stats)
+
+        prometheus_settings = self._settings.core.prometheus
+        if prometheus_settings.enabled:
+            from core.monitoring.prometheus import PrometheusExporter
+            self._prometheus_exporter = PrometheusExporter(
+                host=prometheus_settings.host,
+                port=prometheus_settings.port,
+                path=prometheus_settings.path,
+                loop_lag_interval_seconds=prometheus_settings.loop_lag_probe_interval_seconds,
+            )
+
+        profiler_settings = self._settings.core.profiler
+        if profiler_settings.enabled:
+            from core.monitoring.loop_profiler import LoopProfiler, get_profiler_dir
+            self._loop_profiler = LoopProfiler(
+                output_dir=get_profiler_dir(self._settings.core.project_data_path),
+                slow_threshold_ms=profiler_settings.slow_threshold_ms,
+                heartbeat_interval_ms=profiler_settings.heartbeat_interval_ms,
+                sample_interval_ms=profiler_settings.sample_interval_ms,
+            )
+            self._runtime_stats.register("profiler", self._loop_profiler.get_stats)
+
+        tasks_settings = self._settings.core.tasks
+        if tasks_settings.enabled:
+            from core.tasks.service import TaskScheduler
+            self._task_scheduler = TaskScheduler(
+                sync_db_url=self._db_manager.build_sync_db_url(),
+                io_workers=tasks_settings.io_workers,
+                cpu_workers=tasks_settings.cpu_workers,
+                timezone=tasks_settings.timezone,
+                poll_interval_seconds=tasks_settings.poll_interval_seconds,
+                misfire_grace_time_seconds=tasks_settings.misfire_grace_time_seconds,
+                run_history_days=tasks_settings.run_history_days,
+                task_limits={name: limits.model_dump(exclude_none=True) for name, limits in tasks_settings.task_limits.items()},
+                task_context={
+                    "project_data_path": str(self._settings.core.project_data_path),
+                    "backup_dir": str(self._settings.core.project_data_path.parent / "backup"),
+                    "sqlite_path": self._settings.db.sqlite_path if self._settings.db.type == "sqlite" else None,
+                },
+            )
+            self._runtime_stats.register("tasks", self._task_scheduler.get_stats)
+
+        from core.broadcast.service import BroadcastService
+        self._broadcast_service = BroadcastService(db_manager=self._db_manager, settings=self._settings.core.broadcast)
+        self._runtime_stats.register("broadcast", self._broadcast_service.get_stats)
+
+        # Кэш нужен RBACService уже в ensure_default_entities_exist (инвалидация наборов разрешений)
+        from core.cache.manager import CacheManager 
+        try:
+            self._cache_manager = CacheManager(cache_settings=self._settings.cache)
+            await self._cache_manager.initialize()
+            self._runtime_stats.register("cache", self._cache_manager.get_stats)
+            if self._cache_manager.is_available():
+                 self._logger.success(f"Сервис CacheManager ({self._settings.cache.type}) успешно настроен.")
+            else:
+                 self._logger.warning(f"CacheManager ({self._settings.cache.type}) инициализирован, но кэш недоступен.")
+        except ImportError as e_cache_imp: 
+             self._logger.warning(f"Не удалось инициализировать CacheManager: {e_cache_imp}")
+        except Exception as e_cache:
+            self._logger.error(f"Ошибка настройки CacheManager: {e_cache}", exc_info=True)
+            self._cache_manager = None
+
         # Сначала инициализируем ModuleLoader, так как RBACService может от него зависеть для получения разрешений модулей
         from core.module_loader import ModuleLoader 
         try:
@@ -56,6 +153,14 @@ class BotServicesProvider:
             self._logger.critical(f"КРИТИЧЕСКАЯ ОШИБКА инициализации ModuleLoader: {e_mod_load}", exc_info=True)
             raise 
 
+        from core.users.service import UserService
+        try:
+            self._user_service = UserService(services_provider=self) 
+            self._logger.success("Сервис UserService успешно настроен.")
+        except Exception as e_user_svc:
+            self._logger.error(f"Не удалось настроить UserService: {e_user_svc}", exc_info=True)
+            self._user_service = None
+
         from core.rbac.service import RBACService 
         try:
             # Передаем self (BotServicesProvider) в RBACService
@@ -77,32 +182,11 @@ class BotServicesProvider:
             self._logger.error(f"Не удалось настроить RBACService: {e_rbac}", exc_info=True)
             self._rbac_service = None 
 
-        from core.users.service import UserService
-        try:
-            self._user_service = UserService(services_provider=self) 
-            self._logger.success("Сервис UserService успешно настроен.")
-        except Exception as e_user_svc:
-            self._logger.error(f"Не удалось настроить UserService: {e_user_svc}", exc_info=True)
-            self._user_service = None
-        
-        from core.cache.manager import CacheManager 
-        try:
-            self._cache_manager = CacheManager(cache_settings=self._settings.cache)
-            await self._cache_manager.initialize()
-            if self._cache_manager.is_available():
-                 self._logger.success(f"Сервис CacheManager ({self._settings.cache.type}) успешно настроен.")
-            else:
-                 self._logger.warning(f"CacheManager ({self._settings.cache.type}) инициализирован, но кэш недоступен.")
-        except ImportError as e_cache_imp: 
-             self._logger.warning(f"Не удалось инициализировать CacheManager: {e_cache_imp}")
-        except Exception as e_cache:
-            self._logger.error(f"Ошибка настройки CacheManager: {e_cache}", exc_info=True)
-            self._cache_manager = None
-
         from core.http_client.manager import HTTPClientManager 
         try:
-            self._http_client_manager = HTTPClientManager(app_settings=self._settings) 
+            self._http_client_manager = HTTPClientManager(app_settings=self._settings, cache_manager=self._cache_manager)
             await self._http_client_manager.initialize()
+            self._runtime_stats.register("http", self._http_client_manager.get_stats)
             if self._http_client_manager.is_available():
                 self._logger.success("Сервис HTTPClientManager успешно настроен.")
             else:
@@ -138,6 +222,24 @@ class BotServicesProvider:
         self._logger.info("Начало процедуры закрытия и освобождения ресурсов сервисов SDB...")
         
         if self._module_loader: self._logger.debug("ModuleLoader не требует специального dispose().")
+        if self._task_scheduler:
+            try: await self._task_scheduler.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке TaskScheduler: {e}", exc_info=True)
+        if self._broadcast_service:
+            try: await self._broadcast_service.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке рассылок: {e}", exc_info=True)
+        if self._loop_profiler:
+            try: await self._loop_profiler.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке LoopProfiler: {e}", exc_info=True)
+        if self._prometheus_exporter:
+            try: await self._prometheus_exporter.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке PrometheusExporter: {e}", exc_info=True)
+        if self._metrics_collector:
+            try: await self._metrics_collector.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке MetricsCollector: {e}", exc_info=True)
+        if self._runtime_stats:
+            try: await self._runtime_stats.stop()
+            except Exception as e: self._logger.error(f"Ошибка при остановке RuntimeStatsPublisher: {e}", exc_info=True)
         if self._ui_registry:
             try: await self._ui_registry.dispose(); self._logger.info("UIRegistry ресурсы освобождены.")
             except Exception as e: self._logger.error(f"Ошибка при освобождении UIRegistry: {e}", exc_info=True)
@@ -147,13 +249,17 @@ class BotServicesProvider:
         if self._http_client_manager:
             try: await self._http_client_manager.dispose(); self._logger.info("HTTPClientManager ресурсы освобождены.")
             except Exception as e: self._logger.error(f"Ошибка при освобождении HTTPClientManager: {e}", exc_info=True)
+        # UserService и RBACService дожидаются своих инвалидаций кэша, поэтому освобождаются раньше CacheManager
+        if self._user_service:
+            try: await self._user_service.dispose(); self._logger.info("UserService ресурсы освобождены (буфер активности сброшен).")
+            except Exception as e: self._logger.error(f"Ошибка при освобождении UserService: {e}", exc_info=True)
+        if self._rbac_service:
+            try: await self._rbac_service.dispose(); self._logger.info("RBACService ресурсы освобождены.")
+            except Exception as e: self._logger.error(f"Ошибка при освобождении RBACService: {e}", exc_info=True)
         if self._cache_manager:
             try: await self._cache_manager.dispose(); self._logger.info("CacheManager ресурсы освобождены.")
             except Exception as e: self._logger.error(f"Ошибка при освобождении CacheManager: {e}", exc_info=True)
         
-        if self._user_service: self._logger.debug("UserService не требует специального dispose().")
-        if self._rbac_service: self._logger.debug("RBACService не требует специального dispose().")
-        
         if self._db_manager:
             try: await self._db_manager.dispose(); self._logger.info("DBManager ресурсы освобождены.")
             except Exception as e: self._logger.error(f"Ошибка при освобождении DBManager: {e}", exc_info=True)
@@ -192,6 +298,42 @@ class BotServicesProvider:
             raise AttributeError(msg)
         return self._user_service
 
+    @property
+    def runtime_stats(self) -> 'RuntimeStatsPublisher':
+        if self._runtime_stats is None:
+            raise AttributeError("RuntimeStatsPublisher не инициализирован!")
+        return self._runtime_stats
+
+    @property
+    def metrics_collector(self) -> 'MetricsCollector':
+        if self._metrics_collector is None:
+            raise AttributeError("MetricsCollector не инициализирован (core.metrics.enabled = false?)")
+        return self._metrics_collector
+
+    @property
+    def prometheus_exporter(self) -> 'PrometheusExporter':
+        if self._prometheus_exporter is None:
+            raise AttributeError("PrometheusExporter не инициализирован (core.prometheus.enabled = false?)")
+        return self._prometheus_exporter
+
+    @property
+    def loop_profiler(self) -> 'LoopProfiler':
+        if self._loop_profiler is None:
+            raise AttributeError("LoopProfiler не инициализирован (core.profiler.enabled = false, `sdb run --profile`?)")
+        return self._loop_profiler
+
+    @property
+    def task_scheduler(self) -> 'TaskScheduler':
+        if self._task_scheduler is None:
+            raise AttributeError("TaskScheduler не инициализирован (core.tasks.enabled = false?)")
+        return self._task_scheduler
+
+    @property
+    def broadcast(self) -> 'BroadcastService':
+        if self._broadcast_service is None:
+            raise AttributeError("BroadcastService не инициализирован.")
+        return self._broadcast_service
+
     @property
     def cache(self) -> 'CacheManager':
         if self._cache_manager is None or not self._cache_manager.is_available():
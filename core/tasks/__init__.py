@@ -0,0 +1,10 @@
+# core/tasks/__init__.py
+from .registry import TaskType, register_task_type, get_task_type, list_task_types
+from .store import TaskRunStore
+from .service import TaskScheduler, TaskSchedulerClient, parse_schedule
+
+__all__ = [
+    "TaskType", "register_task_type", "get_task_type", "list_task_types",
+    "TaskRunStore",
+    "TaskScheduler", "TaskSchedulerClient", "parse_schedule",
+]
@@ -0,0 +1,145 @@
+# core/tasks/builtin.py
+"""
+Встроенные типы задач планировщика: backup, cleanup, custom, notifications.
+
+Функции "io"/"cpu" задач выполняются вне event loop (в потоке или отдельном процессе), поэтому
+принимают только простые значения. Параметры project_data_path, backup_dir и sqlite_path
+планировщик подставляет сам из настроек, если функция их объявляет.
+"""
+import asyncio
+import os
+import shlex
+import sqlite3
+import tarfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from .registry import TaskType, register_task_type
+
+DB_BACKUP_DIR_NAME = "database"
+DATA_FILES_BACKUP_DIR_NAME = "project_data_files"
+DEFAULT_BACKUP_DATA_DIRS = ("Config",)
+DEFAULT_CLEANUP_DIRS = ("temp", "monitor/profiling")
+
+
+def backup_task(project_data_path: str, backup_dir: str, sqlite_path: Optional[str] = None,
+                data_dirs: Sequence[str] = DEFAULT_BACKUP_DATA_DIRS, compress: bool = True,
+                name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Бэкап в формате `sdb backup create`: <backup_dir>/<name>/database/<файл БД> и
+    project_data_files/project_data_backup_<время>.tar.gz. SQLite копируется через online backup API -
+    согласованная копия без остановки бота (в отличие от копирования файла).
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    target = Path(backup_dir) / (name or f"scheduled_{timestamp}")
+    target.mkdir(parents=True, exist_ok=False)
+    result: Dict[str, Any] = {"path": str(target), "database": None, "data_archive": None}
+
+    if sqlite_path and Path(sqlite_path).is_file():
+        db_target_dir = target / DB_BACKUP_DIR_NAME
+        db_target_dir.mkdir()
+        db_target = db_target_dir / Path(sqlite_path).name
+        source = sqlite3.connect(sqlite_path, timeout=30)
+        try:
+            destination = sqlite3.connect(db_target)
+            try:
+                source.backup(destination, pages=1024)
+            finally:
+                destination.close()
+        finally:
+            source.close()
+        result["database"] = str(db_target)
+
+    project_data = Path(project_data_path)
+    sources = [(project_data / rel_dir, rel_dir) for rel_dir in data_dirs if (project_data / rel_dir).is_dir()]
+    if sources:
+        data_target_dir = target / DATA_FILES_BACKUP_DIR_NAME
+        data_target_dir.mkdir()
+        archive_path = data_target_dir / f"project_data_backup_{timestamp}{'.tar.gz' if compress else '.tar'}"
+        with tarfile.open(archive_path, "w:gz" if compress else "w") as tar:
+            for source_path, arcname in sources:
+                tar.add(str(source_path), arcname=arcname)
+        result["data_archive"] = str(archive_path)
+        result["archive_bytes"] = archive_path.stat().st_size
+    return result
+
+
+def cleanup_task(project_data_path: str, older_than_days: float = 7,
+                 dirs: Sequence[str] = DEFAULT_CLEANUP_DIRS) -> Dict[str, Any]:
+    """Удаляет файлы старше older_than_days из поддиректорий project_data (и опустевшие директории)."""
+    project_data = Path(project_data_path).resolve()
+    cutoff = time.time() - older_than_days * 86400
+    removed_files = 0
+    freed_bytes = 0
+    for rel_dir in dirs:
+        root = (project_data / rel_dir).resolve()
+        if root == project_data or project_data not in root.parents:
+            raise ValueError(f"Директория очистки должна быть внутри project_data: '{rel_dir}'")
+        if not root.is_dir():
+            continue
+        for dirpath, _, filenames in os.walk(root, topdown=False):
+            for filename in filenames:
+                file_path = Path(dirpath) / filename
+                try:
+                    stat = file_path.stat()
+                    if stat.st_mtime < cutoff:
+                        file_path.unlink()
+                        removed_files += 1
+                        freed_bytes += stat.st_size
+                except FileNotFoundError:
+                    continue
+            if Path(dirpath) != root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+    return {"removed_files": removed_files, "freed_bytes": freed_bytes}
+
+
+async def custom_command_task(command: str) -> Dict[str, Any]:
+    """Выполняет внешнюю команду (без shell) и падает, если код возврата не 0. При отмене/таймауте процесс убивается."""
+    process = await asyncio.create_subprocess_exec(
+        *shlex.split(command), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        raise RuntimeError(f"Команда завершилась с кодом {process.returncode}: {stderr.decode(errors='replace').strip()[-500:]}")
+    return {"returncode": 0, "stdout": stdout.decode(errors="replace").strip()[-2000:]}
+
+
+async def notifications_deliver_task(project_data_path: str, limit: int = 200,
+                                     purge_after_days: float = 7) -> Dict[str, Any]:
+    """Доставляет накопившиеся и отложенные уведомления из outbox (`sdb notifications`) и чистит старые."""
+    from core.notifications import NotificationDispatcher, NotificationOutbox, get_outbox_db_path, load_notification_channels
+
+    outbox = NotificationOutbox(get_outbox_db_path(Path(project_data_path)))
+    try:
+        async with NotificationDispatcher(load_notification_channels(Path(project_data_path)), outbox) as dispatcher:
+            result: Dict[str, Any] = await dispatcher.deliver_due(limit=limit)
+        result["purged"] = await asyncio.to_thread(outbox.purge, purge_after_days * 86400)
+    finally:
+        outbox.close()
+    return result
+
+
+BACKUP_TASK = register_task_type(TaskType(
+    name="backup", func=backup_task, executor="cpu", description="Бэкап БД (SQLite) и данных проекта в ./backup",
+    max_concurrency=1, max_retries=2, retry_backoff_seconds=60.0,
+))
+CLEANUP_TASK = register_task_type(TaskType(
+    name="cleanup", func=cleanup_task, executor="io", description="Удаление старых временных файлов из project_data",
+    max_concurrency=1, max_retries=1, retry_backoff_seconds=30.0,
+))
+CUSTOM_TASK = register_task_type(TaskType(
+    name="custom", func=custom_command_task, executor="async", description="Внешняя команда (params: command)",
+    max_concurrency=2, max_retries=0,
+))
+NOTIFICATIONS_TASK = register_task_type(TaskType(
+    name="notifications", func=notifications_deliver_task, executor="async",
+    description="Доставка уведомлений из outbox с повторами (params: limit, purge_after_days)",
+    max_concurrency=1, max_retries=0,
+))
@@ -0,0 +1,66 @@
+# core/tasks/registry.py
+import inspect
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+TaskExecutor = Literal["async", "io", "cpu"]
+
+
+@dataclass(frozen=True)
+class TaskType:
+    """
+    Тип фоновой задачи планировщика.
+
+    executor определяет, где выполняется func:
+    - "async" - корутина в event loop бота;
+    - "io" - синхронная функция в пуле потоков (файлы, сеть, subprocess);
+    - "cpu" - синхронная функция в пуле процессов (сжатие, бэкап). func и ее аргументы
+      должны сериализоваться pickle, поэтому это функция уровня модуля с простыми аргументами.
+    """
+    name: str
+    func: Callable[..., Any]
+    executor: TaskExecutor = "io"
+    description: str = ""
+    max_concurrency: int = 1
+    max_retries: int = 0
+    retry_backoff_seconds: float = 30.0
+    retry_backoff_max_seconds: float = 600.0
+    timeout_seconds: Optional[float] = None
+    accepted_params: frozenset = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.executor not in ("async", "io", "cpu"):
+            raise ValueError(f"Неизвестный executor '{self.executor}' для типа задачи '{self.name}'.")
+        if (self.executor == "async") != inspect.iscoroutinefunction(self.func):
+            raise ValueError(f"Тип задачи '{self.name}': executor 'async' требует корутину, 'io'/'cpu' - обычную функцию.")
+        if self.max_concurrency < 1:
+            raise ValueError(f"Тип задачи '{self.name}': max_concurrency должен быть >= 1.")
+        object.__setattr__(self, "accepted_params", frozenset(inspect.signature(self.func).parameters))
+
+    def retry_delay(self, attempt: int) -> float:
+        """Пауза перед повтором после неудачной попытки attempt (1, 2, ...): экспоненциально, с потолком."""
+        return min(self.retry_backoff_seconds * (2 ** (attempt - 1)), self.retry_backoff_max_seconds)
+
+    def with_limits(self, **limits: Any) -> "TaskType":
+        """Копия типа с переопределенными лимитами (None - оставить как есть)."""
+        changes = {key: value for key, value in limits.items() if value is not None}
+        return replace(self, **changes) if changes else self
+
+
+_TASK_TYPES: Dict[str, TaskType] = {}
+
+
+def register_task_type(task_type: TaskType, replace_existing: bool = False) -> TaskType:
+    """Регистрирует тип задачи (ядро - в core.tasks.builtin, модули - при загрузке)."""
+    if task_type.name in _TASK_TYPES and not replace_existing:
+        raise ValueError(f"Тип задачи '{task_type.name}' уже зарегистрирован.")
+    _TASK_TYPES[task_type.name] = task_type
+    return task_type
+
+
+def get_task_type(name: str) -> Optional[TaskType]:
+    return _TASK_TYPES.get(name)
+
+
+def list_task_types() -> List[TaskType]:
+    return sorted(_TASK_TYPES.values(), key=lambda task_type: task_type.name)
@@ -0,0 +1,423 @@
+# core/tasks/service.py
+import asyncio
+import functools
+import multiprocessing
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.job import Job
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from loguru import logger
+
+from core.monitoring.prometheus import REGISTRY
+from .registry import TaskType, get_task_type
+from .store import (
+    JOBS_TABLE_NAME, RUN_STATUS_CANCELLED, RUN_STATUS_COMPLETED, RUN_STATUS_FAILED, RUN_STATUS_INTERRUPTED,
+    TaskRunStore,
+)
+from . import builtin  # noqa: F401 - регистрация встроенных типов задач
+
+# Задания в БД ссылаются на функцию по строке - ее можно восстановить в любом процессе
+JOB_FUNC_REF = "core.tasks.service:run_scheduled_job"
+# Хранилище для служебных заданий ядра с bound-методами (LoggingManager), которые нельзя сохранить в БД
+MEMORY_JOBSTORE = "memory"
+
+TASK_RUNS_TOTAL = REGISTRY.counter("sdb_task_runs_total", "Завершенные запуски задач по типу и итоговому статусу.",
+                                   ("task_type", "status"))
+TASK_RUN_SECONDS = REGISTRY.histogram("sdb_task_run_duration_seconds", "Длительность запуска задачи (включая повторы).",
+                                      ("task_type",), buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0))
+TASK_RUNS_IN_PROGRESS = REGISTRY.gauge("sdb_task_runs_in_progress", "Задачи, выполняющиеся сейчас.", ("task_type",))
+TASK_RETRIES_TOTAL = REGISTRY.counter("sdb_task_retries_total", "Повторные попытки задач после ошибки.", ("task_type",))
+
+_INTERVAL_RE = re.compile(r"^every\s+(\d+)\s*([smhd])$", re.IGNORECASE)
+_INTERVAL_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+_active_scheduler: Optional["TaskScheduler"] = None
+
+
+async def run_scheduled_job(job_id: str, task_type: str, params: Optional[Dict[str, Any]] = None,
+                            job_name: Optional[str] = None) -> None:
+    """Точка входа заданий APScheduler: передает выполнение TaskScheduler этого процесса."""
+    if _active_scheduler is None:
+        raise RuntimeError("TaskScheduler не запущен в этом процессе.")
+    await _active_scheduler.execute(job_id, task_type, params or {}, job_name=job_name)
+
+
+def parse_schedule(schedule: str, timezone: str = "UTC") -> BaseTrigger:
+    """
+    Расписание задачи:
+    'now' - один раз сейчас; 'at 2025-01-31T03:00' - один раз в указанное время;
+    'every 30m' (s/m/h/d) - с интервалом; иначе - cron из 5 полей ('0 3 * * *').
+    """
+    value = schedule.strip()
+    if value.lower() == "now":
+        return DateTrigger(timezone=timezone)
+    if value.lower().startswith("at "):
+        try:
+            return DateTrigger(run_date=datetime.fromisoformat(value[3:].strip()), timezone=timezone)
+        except ValueError:
+            raise ValueError(f"Некорректная дата в расписании '{schedule}' (ожидается ISO, например 2025-01-31T03:00).") from None
+    interval_match = _INTERVAL_RE.match(value)
+    if interval_match:
+        amount, unit = int(interval_match.group(1)), interval_match.group(2).lower()
+        if amount <= 0:
+            raise ValueError(f"Интервал в расписании '{schedule}' должен быть больше нуля.")
+        return IntervalTrigger(timezone=timezone, **{_INTERVAL_UNITS[unit]: amount})
+    try:
+        return CronTrigger.from_crontab(value, timezone=timezone)
+    except ValueError as e:
+        raise ValueError(f"Некорректное расписание '{schedule}': {e}") from None
+
+
+def build_task_job(task_type: str, schedule: str, params: Optional[Dict[str, Any]] = None, name: Optional[str] = None,
+                   job_id: Optional[str] = None, timezone: str = "UTC") -> Dict[str, Any]:
+    """Аргументы задания APScheduler для задачи типа task_type (общие для бота и CLI)."""
+    definition = get_task_type(task_type)
+    if definition is None:
+        raise ValueError(f"Неизвестный тип задачи: '{task_type}'.")
+    params = params or {}
+    unknown_params = set(params) - definition.accepted_params
+    if unknown_params:
+        raise ValueError(f"Тип задачи '{task_type}' не принимает параметры: {', '.join(sorted(unknown_params))}.")
+    job_id = job_id or f"task_{uuid.uuid4().hex[:8]}"
+    job_name = name or f"{task_type} task"
+    return {
+        "func": JOB_FUNC_REF,
+        "trigger": parse_schedule(schedule, timezone=timezone),
+        "id": job_id,
+        "name": job_name,
+        "kwargs": {"job_id": job_id, "task_type": task_type, "params": params, "job_name": job_name},
+    }
+
+
+def describe_job(job: Job) -> Dict[str, Any]:
+    kwargs = job.kwargs or {}
+    next_run_time = getattr(job, "next_run_time", None)
+    return {
+        "id": job.id,
+        "name": job.name,
+        "task_type": kwargs.get("task_type"),
+        "params": kwargs.get("params") or {},
+        "trigger": str(job.trigger),
+        "next_run_time": next_run_time.isoformat(timespec="seconds") if next_run_time else None,
+    }
+
+
+class TaskScheduler:
+    """
+    Общий планировщик фоновых задач бота (BotServicesProvider.task_scheduler).
+
+    - APScheduler с хранилищем заданий в основной БД (sdb_scheduler_jobs): задания переживают
+      перезапуск, а `sdb tasks` добавляет и отменяет их из другого процесса;
+    - задания выполняются по типам (core.tasks.registry): "async" - в event loop, "io" - в пуле потоков,
+      "cpu" - в пуле процессов, чтобы сжатие и бэкап не блокировали бота;
+    - на тип задачи - лимит одновременных запусков, число повторов с экспоненциальной паузой и таймаут;
+    - каждый запуск пишется в журнал sdb_task_runs, откуда CLI читает текущее состояние.
+    """
+
+    def __init__(self, sync_db_url: str, io_workers: int = 4, cpu_workers: int = 2, timezone: str = "UTC",
+                 poll_interval_seconds: float = 5.0, misfire_grace_time_seconds: int = 300,
+                 run_history_days: int = 30, task_limits: Optional[Dict[str, Dict[str, Any]]] = None,
+                 task_context: Optional[Dict[str, Any]] = None):
+        self._store = TaskRunStore(sync_db_url)
+        self._io_workers = io_workers
+        self._cpu_workers = cpu_workers
+        self._poll_interval = poll_interval_seconds
+        self._run_history_days = run_history_days
+        self._task_limits = task_limits or {}
+        self._task_context = task_context or {}
+        self._scheduler = AsyncIOScheduler(
+            jobstores={
+                "default": SQLAlchemyJobStore(engine=self._store.engine, tablename=JOBS_TABLE_NAME),
+                MEMORY_JOBSTORE: MemoryJobStore(),
+            },
+            executors={"default": AsyncIOExecutor()},
+            job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": misfire_grace_time_seconds},
+            timezone=timezone,
+        )
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._running: Dict[int, Dict[str, Any]] = {}
+        self._cancel_requested: set = set()
+        self._poll_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._next_prune_at = 0.0
+        self._completed_total = 0
+        self._failed_total = 0
+        self._last_error: Optional[Dict[str, Any]] = None
+        self._logger = logger.bind(service="TaskScheduler")
+
+    @property
+    def scheduler(self) -> AsyncIOScheduler:
+        """Экземпляр APScheduler - для служебных заданий ядра (jobstore=MEMORY_JOBSTORE)."""
+        return self._scheduler
+
+    @property
+    def store(self) -> TaskRunStore:
+        return self._store
+
+    # --- Жизненный цикл ---
+
+    async def start(self) -> None:
+        global _active_scheduler
+        if self._scheduler.running:
+            return
+        interrupted = await asyncio.to_thread(self._store.mark_interrupted)
+        if interrupted:
+            self._logger.warning(f"Запусков задач, прерванных прошлой остановкой бота: {interrupted}.")
+        self._io_pool = ThreadPoolExecutor(max_workers=self._io_workers, thread_name_prefix="sdb-task-io")
+        # spawn: fork процесса с потоками (aiosqlite, пулы) небезопасен
+        self._cpu_pool = ProcessPoolExecutor(max_workers=self._cpu_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._stopping = False
+        _active_scheduler = self
+        self._scheduler.start()
+        self._poll_task = asyncio.create_task(self._poll_loop(), name="TaskScheduler-poll")
+        self._logger.info(f"Планировщик задач запущен (потоков I/O: {self._io_workers}, процессов CPU: {self._cpu_workers}, "
+                          f"заданий в БД: {len(self._scheduler.get_jobs(jobstore='default'))}).")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        global _active_scheduler
+        self._stopping = True
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        if self._scheduler.running:
+            # Отменяет и выполняющиеся сейчас задания - execute() отметит их как interrupted
+            self._scheduler.shutdown(wait=False)
+        running_tasks = [run["task"] for run in self._running.values()]
+        if running_tasks:
+            await asyncio.wait(running_tasks, timeout=timeout)
+        for pool in (self._io_pool, self._cpu_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._io_pool = self._cpu_pool = None
+        if _active_scheduler is self:
+            _active_scheduler = None
+        await asyncio.to_thread(self._store.close)
+        self._logger.info("Планировщик задач остановлен.")
+
+    async def _poll_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            try:
+                # Задания, добавленные `sdb tasks schedule`, появляются в БД без ведома этого процесса
+                self._scheduler.wakeup()
+                if self._running:
+                    cancelled = await asyncio.to_thread(self._store.get_cancel_requested, list(self._running))
+                    for run_id in cancelled:
+                        self._cancel_run(run_id)
+                if time.monotonic() >= self._next_prune_at:
+                    self._next_prune_at = time.monotonic() + 3600
+                    pruned = await asyncio.to_thread(self._store.prune, self._run_history_days)
+                    if pruned:
+                        self._logger.debug(f"Удалено старых записей журнала задач: {pruned}.")
+            except Exception as e:
+                self._logger.error(f"Ошибка фонового цикла планировщика задач: {e}")
+
+    # --- Задания ---
+
+    async def add_task(self, task_type: str, schedule: str, params: Optional[Dict[str, Any]] = None,
+                       name: Optional[str] = None, job_id: Optional[str] = None, replace_existing: bool = False) -> str:
+        job_spec = build_task_job(task_type, schedule, params, name, job_id, timezone=str(self._scheduler.timezone))
+        job = await asyncio.to_thread(self._scheduler.add_job, **job_spec, jobstore="default", replace_existing=replace_existing)
+        self._logger.info(f"Задание '{job.id}' ({task_type}, '{schedule}') добавлено в планировщик.")
+        return job.id
+
+    async def get_jobs(self) -> List[Dict[str, Any]]:
+        jobs = await asyncio.to_thread(self._scheduler.get_jobs, "default")
+        return [describe_job(job) for job in jobs]
+
+    async def cancel(self, job_id: str) -> bool:
+        """Удаляет задание из расписания и отменяет его текущий запуск, если он есть."""
+        removed = False
+        job = await asyncio.to_thread(self._scheduler.get_job, job_id, "default")
+        if job is not None:
+            await asyncio.to_thread(self._scheduler.remove_job, job_id, "default")
+            removed = True
+        for run_id, run in list(self._running.items()):
+            if run["job_id"] == job_id:
+                self._cancel_run(run_id)
+                removed = True
+        return removed
+
+    def _cancel_run(self, run_id: int) -> None:
+        run = self._running.get(run_id)
+        if run is None or run_id in self._cancel_requested:
+            return
+        self._cancel_requested.add(run_id)
+        run["task"].cancel()
+        self._logger.info(f"Запуск {run_id} задания '{run['job_id']}' отменяется по запросу.")
+
+    def get_task_type(self, name: str) -> Optional[TaskType]:
+        definition = get_task_type(name)
+        if definition is not None and name in self._task_limits:
+            definition = definition.with_limits(**self._task_limits[name])
+        return definition
+
+    # --- Выполнение ---
+
+    async def _run_once(self, definition: TaskType, call_params: Dict[str, Any]) -> Any:
+        if definition.executor == "async":
+            awaitable = definition.func(**call_params)
+        else:
+            pool = self._cpu_pool if definition.executor == "cpu" else self._io_pool
+            if pool is None:
+                raise RuntimeError("Пулы исполнителей не запущены.")
+            awaitable = asyncio.get_running_loop().run_in_executor(pool, functools.partial(definition.func, **call_params))
+        if definition.timeout_seconds:
+            # Для io/cpu по таймауту перестаем ждать результат; сама функция в потоке/процессе доработает
+            return await asyncio.wait_for(awaitable, timeout=definition.timeout_seconds)
+        return await awaitable
+
+    async def execute(self, job_id: str, task_type: str, params: Dict[str, Any], job_name: Optional[str] = None) -> None:
+        definition = self.get_task_type(task_type)
+        if definition is None:
+            self._logger.error(f"Задание '{job_id}': неизвестный тип задачи '{task_type}' - пропущено.")
+            return
+        call_params = {key: value for key, value in self._task_context.items() if key in definition.accepted_params}
+        call_params.update(params)
+
+        semaphore = self._semaphores.get(task_type)
+        if semaphore is None:
+            semaphore = self._semaphores[task_type] = asyncio.Semaphore(definition.max_concurrency)
+        async with semaphore:
+            run_id = await asyncio.to_thread(self._store.start_run, job_id, task_type, 1, job_name, os.getpid())
+            self._running[run_id] = {"task": asyncio.current_task(), "job_id": job_id, "task_type": task_type,
+                                     "attempt": 1, "started_at": datetime.now().isoformat(timespec="seconds")}
+            TASK_RUNS_IN_PROGRESS.inc(task_type=task_type)
+            started_at = time.perf_counter()
+            status, error, result = RUN_STATUS_FAILED, None, None
+            attempt = 1
+            try:
+                while True:
+                    try:
+                        result = await self._run_once(definition, call_params)
+                        status, error = RUN_STATUS_COMPLETED, None
+                        break
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                        if attempt > definition.max_retries:
+                            self._logger.error(f"Задача '{job_id}' ({task_type}) завершилась с ошибкой "
+                                               f"после {attempt} попыт(ок): {error}")
+                            break
+                        delay = definition.retry_delay(attempt)
+                        self._logger.warning(f"Задача '{job_id}' ({task_type}), попытка {attempt}: {error}. "
+                                             f"Повтор через {delay:.0f} сек.")
+                        attempt += 1
+                        self._running[run_id]["attempt"] = attempt
+                        TASK_RETRIES_TOTAL.inc(task_type=task_type)
+                        await asyncio.to_thread(self._store.record_retry, run_id, attempt, error)
+                        await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                user_cancelled = run_id in self._cancel_requested and not self._stopping
+                status = RUN_STATUS_CANCELLED if user_cancelled else RUN_STATUS_INTERRUPTED
+                error = "Отменена по запросу." if user_cancelled else "Бот остановлен во время выполнения задачи."
+                if not user_cancelled:
+                    raise
+            finally:
+                self._running.pop(run_id, None)
+                self._cancel_requested.discard(run_id)
+                TASK_RUNS_IN_PROGRESS.dec(task_type=task_type)
+                TASK_RUNS_TOTAL.inc(task_type=task_type, status=status)
+                TASK_RUN_SECONDS.observe(time.perf_counter() - started_at, task_type=task_type)
+                if status == RUN_STATUS_COMPLETED:
+                    self._completed_total += 1
+                elif status == RUN_STATUS_FAILED:
+                    self._failed_total += 1
+                    self._last_error = {"job_id": job_id, "task_type": task_type, "error": error,
+                                        "at": datetime.now().isoformat(timespec="seconds")}
+                try:
+                    await asyncio.to_thread(self._store.finish_run, run_id, status, error, result)
+                except Exception as e_store:
+                    self._logger.error(f"Не удалось записать итог запуска {run_id} задачи '{job_id}': {e_store}")
+        if status == RUN_STATUS_COMPLETED:
+            self._logger.info(f"Задача '{job_id}' ({task_type}) выполнена за {time.perf_counter() - started_at:.1f} сек.")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._scheduler.running,
+            "io_workers": self._io_workers,
+            "cpu_workers": self._cpu_workers,
+            "in_progress": [
+                {"run_id": run_id, "job_id": run["job_id"], "task_type": run["task_type"],
+                 "attempt": run["attempt"], "started_at": run["started_at"]}
+                for run_id, run in self._running.items()
+            ],
+            "completed_total": self._completed_total,
+            "failed_total": self._failed_total,
+            "last_error": self._last_error,
+        }
+
+
+class TaskSchedulerClient:
+    """
+    Доступ к заданиям и журналу запусков из другого процесса (`sdb tasks`).
+
+    Работает с хранилищем заданий напрямую, без запуска APScheduler: выполняет задания только
+    TaskScheduler бота, он подхватывает изменения при очередном опросе хранилища.
+    """
+
+    def __init__(self, sync_db_url: str, timezone: str = "UTC", misfire_grace_time_seconds: int = 300):
+        self.store = TaskRunStore(sync_db_url)
+        self._misfire_grace_time = misfire_grace_time_seconds
+        # Не запускается: нужен заданиям для часового пояса и восстановления из БД
+        self._scheduler = BackgroundScheduler(timezone=timezone)
+        self._jobstore = SQLAlchemyJobStore(engine=self.store.engine, tablename=JOBS_TABLE_NAME)
+
+    def __enter__(self) -> "TaskSchedulerClient":
+        self.store.initialize()
+        self._jobstore.start(self._scheduler, "default")
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.store.close()
+
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        return [describe_job(job) for job in self._jobstore.get_all_jobs()]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobstore.lookup_job(job_id)
+        return describe_job(job) if job is not None else None
+
+    def add_task(self, task_type: str, schedule: str, params: Optional[Dict[str, Any]] = None,
+                 name: Optional[str] = None) -> Dict[str, Any]:
+        job_spec = build_task_job(task_type, schedule, params, name, timezone=str(self._scheduler.timezone))
+        next_run_time = job_spec["trigger"].get_next_fire_time(None, datetime.now(self._scheduler.timezone))
+        if next_run_time is None:
+            raise ValueError(f"Расписание '{schedule}' не дает ни одного запуска.")
+        job = Job(self._scheduler, executor="default", args=(), misfire_grace_time=self._misfire_grace_time,
+                  coalesce=True, max_instances=1, next_run_time=next_run_time, **job_spec)
+        self._jobstore.add_job(job)
+        return describe_job(job)
+
+    def cancel(self, job_id: str, interrupt_running: bool = True) -> Dict[str, Any]:
+        """Удаляет задание из расписания; interrupt_running - попросить бота прервать и текущий запуск."""
+        removed = False
+        try:
+            self._jobstore.remove_job(job_id)
+            removed = True
+        except JobLookupError:
+            pass
+        cancel_requested = self.store.request_cancel(job_id) if interrupt_running else 0
+        return {"removed": removed, "cancel_requested": cancel_requested}
@@ -0,0 +1,203 @@
+# core/tasks/store.py
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Integer, LargeBinary, MetaData, String, Table, Text, Unicode, create_engine,
+    delete, func, insert, inspect, select, update,
+)
+from sqlalchemy.engine import Connection, Engine, make_url
+
+JOBS_TABLE_NAME = "sdb_scheduler_jobs"
+RUNS_TABLE_NAME = "sdb_task_runs"
+
+RUN_STATUS_RUNNING = "running"
+RUN_STATUS_COMPLETED = "completed"
+RUN_STATUS_FAILED = "failed"
+RUN_STATUS_CANCELLED = "cancelled"
+# Бот остановился (или упал), пока задача выполнялась
+RUN_STATUS_INTERRUPTED = "interrupted"
+FINISHED_RUN_STATUSES = (RUN_STATUS_COMPLETED, RUN_STATUS_FAILED, RUN_STATUS_CANCELLED, RUN_STATUS_INTERRUPTED)
+
+_metadata = MetaData()
+
+task_runs_table = Table(
+    RUNS_TABLE_NAME, _metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("job_id", String(191), nullable=False, index=True),
+    Column("job_name", String(255), nullable=True),
+    Column("task_type", String(64), nullable=False),
+    Column("status", String(16), nullable=False, index=True),
+    Column("attempt", Integer, nullable=False, default=1),
+    Column("pid", Integer, nullable=True),
+    Column("started_at", DateTime, nullable=False),
+    Column("finished_at", DateTime, nullable=True),
+    Column("error", Text, nullable=True),
+    Column("result", Text, nullable=True),
+    Column("cancel_requested", Boolean, nullable=False, default=False),
+)
+
+# Схема таблицы SQLAlchemyJobStore (APScheduler 3.x): таблицу создает миграция, а не jobstore при старте
+scheduler_jobs_table = Table(
+    JOBS_TABLE_NAME, _metadata,
+    Column("id", Unicode(191), primary_key=True),
+    Column("next_run_time", Float(25), index=True),
+    Column("job_state", LargeBinary, nullable=False),
+)
+
+
+def create_task_tables(bind: Union[Engine, Connection]) -> None:
+    """Создает таблицы планировщика в обход Alembic (тесты и 'sdb db init-core')."""
+    _metadata.create_all(bind, checkfirst=True)
+
+
+def create_sync_engine(sync_db_url: str) -> Engine:
+    if make_url(sync_db_url).get_backend_name() == "sqlite":
+        # Бот пишет в тот же файл через aiosqlite - ждем блокировку, а не падаем с "database is locked"
+        return create_engine(sync_db_url, connect_args={"timeout": 30})
+    return create_engine(sync_db_url, pool_pre_ping=True, pool_size=2, max_overflow=2)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _row_to_dict(row: Any) -> Dict[str, Any]:
+    data = dict(row._mapping)
+    for key in ("started_at", "finished_at"):
+        if data.get(key) is not None:
+            data[key] = data[key].replace(tzinfo=timezone.utc).isoformat(timespec="seconds")
+    if data.get("result"):
+        try:
+            data["result"] = json.loads(data["result"])
+        except ValueError:
+            pass
+    return data
+
+
+class TaskRunStore:
+    """
+    Журнал запусков задач планировщика (таблица sdb_task_runs в основной БД).
+
+    Сами задания (триггер, параметры, следующее время запуска) хранит APScheduler в sdb_scheduler_jobs;
+    здесь - история выполнений, текущие запуски и запросы на отмену, которые читает и пишет `sdb tasks`
+    из другого процесса. Методы синхронные: бот вызывает их через asyncio.to_thread.
+    Время хранится в UTC без tzinfo.
+    """
+
+    def __init__(self, sync_db_url: str, engine: Optional[Engine] = None):
+        self._engine = engine or create_sync_engine(sync_db_url)
+        self._owns_engine = engine is None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine
+
+    def initialize(self) -> None:
+        """Проверяет, что миграции с таблицами планировщика применены; сами таблицы создает Alembic."""
+        with self._init_lock:
+            if not self._initialized:
+                existing_tables = set(inspect(self._engine).get_table_names())
+                missing_tables = [name for name in (RUNS_TABLE_NAME, JOBS_TABLE_NAME) if name not in existing_tables]
+                if missing_tables:
+                    raise RuntimeError(f"Таблицы планировщика задач не найдены ({', '.join(missing_tables)}). "
+                                       "Примените миграции: 'sdb db upgrade head'.")
+                self._initialized = True
+
+    def close(self) -> None:
+        if self._owns_engine:
+            self._engine.dispose()
+
+    def start_run(self, job_id: str, task_type: str, attempt: int = 1, job_name: Optional[str] = None,
+                  pid: Optional[int] = None) -> int:
+        self.initialize()
+        with self._engine.begin() as conn:
+            result = conn.execute(insert(task_runs_table).values(
+                job_id=job_id, job_name=job_name, task_type=task_type, status=RUN_STATUS_RUNNING,
+                attempt=attempt, pid=pid, started_at=_utcnow(), cancel_requested=False,
+            ))
+            return int(result.inserted_primary_key[0])
+
+    def finish_run(self, run_id: int, status: str, error: Optional[str] = None, result: Any = None) -> None:
+        if status not in FINISHED_RUN_STATUSES:
+            raise ValueError(f"Некорректный итоговый статус запуска: '{status}'.")
+        with self._engine.begin() as conn:
+            conn.execute(update(task_runs_table).where(task_runs_table.c.id == run_id).values(
+                status=status,
+                finished_at=_utcnow(),
+                error=error,
+                result=json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+            ))
+
+    def record_retry(self, run_id: int, attempt: int, error: str) -> None:
+        """Запуск остается running: ошибка попытки сохраняется, счетчик попыток растет."""
+        with self._engine.begin() as conn:
+            conn.execute(update(task_runs_table).where(task_runs_table.c.id == run_id).values(
+                attempt=attempt, error=error,
+            ))
+
+    def request_cancel(self, job_id: str) -> int:
+        """Помечает текущие запуски задания на отмену; возвращает их количество."""
+        self.initialize()
+        with self._engine.begin() as conn:
+            result = conn.execute(update(task_runs_table).where(
+                task_runs_table.c.job_id == job_id, task_runs_table.c.status == RUN_STATUS_RUNNING,
+            ).values(cancel_requested=True))
+            return result.rowcount or 0
+
+    def get_cancel_requested(self, run_ids: Iterable[int]) -> List[int]:
+        run_ids = list(run_ids)
+        if not run_ids:
+            return []
+        with self._engine.connect() as conn:
+            rows = conn.execute(select(task_runs_table.c.id).where(
+                task_runs_table.c.id.in_(run_ids), task_runs_table.c.cancel_requested.is_(True),
+            ))
+            return [row.id for row in rows]
+
+    def mark_interrupted(self, pid: Optional[int] = None) -> int:
+        """Закрывает запуски, оставшиеся в статусе running от прошлого процесса бота."""
+        self.initialize()
+        condition = [task_runs_table.c.status == RUN_STATUS_RUNNING]
+        if pid is not None:
+            condition.append(task_runs_table.c.pid == pid)
+        with self._engine.begin() as conn:
+            result = conn.execute(update(task_runs_table).where(*condition).values(
+                status=RUN_STATUS_INTERRUPTED, finished_at=_utcnow(),
+                error="Бот остановлен во время выполнения задачи.",
+            ))
+            return result.rowcount or 0
+
+    def get_runs(self, job_id: Optional[str] = None, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        self.initialize()
+        query = select(task_runs_table).order_by(task_runs_table.c.id.desc()).limit(limit)
+        if job_id is not None:
+            query = query.where(task_runs_table.c.job_id == job_id)
+        if status is not None:
+            query = query.where(task_runs_table.c.status == status)
+        with self._engine.connect() as conn:
+            return [_row_to_dict(row) for row in conn.execute(query)]
+
+    def get_last_runs(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        self.initialize()
+        last_run_ids = select(func.max(task_runs_table.c.id)).where(
+            task_runs_table.c.job_id.in_(job_ids)
+        ).group_by(task_runs_table.c.job_id)
+        with self._engine.connect() as conn:
+            rows = conn.execute(select(task_runs_table).where(task_runs_table.c.id.in_(last_run_ids)))
+            return {row.job_id: _row_to_dict(row) for row in rows}
+
+    def prune(self, older_than_days: int) -> int:
+        cutoff = _utcnow() - timedelta(days=older_than_days)
+        with self._engine.begin() as conn:
+            result = conn.execute(delete(task_runs_table).where(
+                task_runs_table.c.status != RUN_STATUS_RUNNING, task_runs_table.c.started_at < cutoff,
+            ))
+            return result.rowcount or 0
@@ -0,0 +1,6 @@
+# core/throttling/__init__.py
+from .limiter import RateLimit, SlidingWindowLimiter
+from .rules import ThrottleRules, extract_command
+from .middleware import ThrottlingMiddleware
+
+__all__ = ["RateLimit", "SlidingWindowLimiter", "ThrottleRules", "extract_command", "ThrottlingMiddleware"]
@@ -0,0 +1,45 @@
+# core/throttling/limiter.py
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.cache.manager import CacheManager
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    window_seconds: int
+
+
+class SlidingWindowLimiter:
+    """
+    Счетчик скользящего окна поверх CacheManager.incr (атомарный INCRBY в Redis, счетчик шарда в памяти).
+
+    Окно аппроксимируется двумя фиксированными: текущим и предыдущим, вес предыдущего убывает
+    по мере прохождения текущего окна. Это два обращения к кэшу на проверку и без гонок между процессами,
+    в отличие от точного окна на отметках времени (ZSET + Lua).
+    Если кэш недоступен, incr возвращает 0 - апдейты пропускаются (fail open).
+    """
+
+    def __init__(self, cache: 'CacheManager', key_prefix: str = "sdb:throttle"):
+        self._cache = cache
+        self._prefix = key_prefix
+
+    async def hit(self, key: str, rate: RateLimit, now: Optional[float] = None) -> Tuple[bool, float]:
+        """Учитывает одно обращение. Возвращает (разрешено, оценка числа обращений в окне)."""
+        now = time.time() if now is None else now
+        window = rate.window_seconds
+        window_index = int(now // window)
+        base_key = f"{self._prefix}:{key}"
+        # Отброшенные апдейты тоже считаются: пока пользователь продолжает флудить, окно не освобождается
+        current = await self._cache.incr(f"{base_key}:{window_index}", ttl_seconds=window * 2)
+        if current == 0:
+            return True, 0.0
+        if current > rate.limit:
+            return False, float(current)
+        previous = int(await self._cache.get(f"{base_key}:{window_index - 1}") or 0)
+        elapsed_fraction = (now - window_index * window) / window
+        estimated = previous * (1.0 - elapsed_fraction) + current
+        return estimated <= rate.limit, estimated
@@ -0,0 +1,104 @@
+# core/throttling/middleware.py
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User as AiogramUser
+from loguru import logger as global_logger
+
+from core.monitoring.prometheus import REGISTRY
+from .limiter import RateLimit, SlidingWindowLimiter
+from .rules import ThrottleRules
+
+if TYPE_CHECKING:
+    from core.app_settings import ThrottlingSettings
+    from core.cache.manager import CacheManager
+
+logger = global_logger.bind(service="Throttling")
+
+THROTTLED_UPDATES_TOTAL = REGISTRY.counter(
+    "sdb_throttled_updates_total", "Апдейты, отброшенные антифлудом, по правилу (user, cmd:<команда>, module:<модуль>).", ("scope",)
+)
+
+THROTTLED_CALLBACK_TEXT = "Слишком много запросов. Подождите немного."
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Антифлуд для всех Update. Регистрируется перед I18nMiddleware и UserStatusMiddleware:
+    отброшенный апдейт не доходит до загрузки пользователя из БД и проверок RBAC.
+
+    Проверяются общий лимит пользователя и, если подходит, лимит команды/модуля из манифеста.
+    Отбрасывание - просто возврат без вызова handler; на callback один раз за окно
+    отвечаем предупреждением, чтобы у пользователя не висели "часики" на кнопке.
+    """
+
+    def __init__(self, cache: 'CacheManager', settings: 'ThrottlingSettings',
+                 rules: Optional[ThrottleRules] = None, exempt_user_ids: Iterable[int] = ()):
+        super().__init__()
+        self._settings = settings
+        self._limiter = SlidingWindowLimiter(cache, key_prefix=settings.key_prefix)
+        self._cache = cache
+        self._user_rate = RateLimit(settings.user_limit, settings.user_window_seconds)
+        self.rules = rules if rules is not None else ThrottleRules()
+        self._exempt_user_ids = frozenset(exempt_user_ids) if settings.exempt_super_admins else frozenset()
+        self._checked = 0
+        self._throttled: Dict[str, int] = {}
+
+    async def _notify_callback(self, event: Update, user_id: int, scope: str, rate: RateLimit) -> None:
+        notify_key = f"{self._settings.key_prefix}:notified:{scope}:{user_id}"
+        # Кто первым записал свой update_id, тот и отвечает - не больше одного ответа за окно
+        if await self._cache.get_or_set(notify_key, event.update_id, ttl_seconds=rate.window_seconds) != event.update_id:
+            return
+        try:
+            await event.callback_query.answer(THROTTLED_CALLBACK_TEXT)
+        except Exception as e:
+            logger.debug(f"Не удалось ответить на отброшенный callback пользователя {user_id}: {e}")
+
+    async def _is_throttled(self, event: Update, user_id: int) -> Optional[Tuple[str, RateLimit]]:
+        allowed, _ = await self._limiter.hit(f"user:{user_id}", self._user_rate)
+        if not allowed:
+            return "user", self._user_rate
+        matched = self.rules.match(event)
+        if matched is not None:
+            scope, rate = matched
+            allowed, _ = await self._limiter.hit(f"{scope}:{user_id}", rate)
+            if not allowed:
+                return scope, rate
+        return None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        aiogram_event_user: Optional[AiogramUser] = data.get("event_from_user")
+        if not self._settings.enabled or aiogram_event_user is None or aiogram_event_user.id in self._exempt_user_ids:
+            return await handler(event, data)
+
+        self._checked += 1
+        try:
+            throttled = await self._is_throttled(event, aiogram_event_user.id)
+        except Exception as e:
+            logger.warning(f"Ошибка проверки лимита для пользователя {aiogram_event_user.id}, апдейт пропущен без проверки: {e}")
+            throttled = None
+        if throttled is None:
+            return await handler(event, data)
+
+        scope, rate = throttled
+        self._throttled[scope] = self._throttled.get(scope, 0) + 1
+        THROTTLED_UPDATES_TOTAL.inc(scope=scope)
+        logger.trace("Апдейт {} пользователя {} отброшен (правило {}).", event.update_id, aiogram_event_user.id, scope)
+        if self._settings.notify_on_callback and event.callback_query is not None:
+            await self._notify_callback(event, aiogram_event_user.id, scope, rate)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._settings.enabled,
+            "user_limit": f"{self._user_rate.limit}/{self._user_rate.window_seconds}s",
+            "rules": len(self.rules),
+            "checked": self._checked,
+            "throttled_total": sum(self._throttled.values()),
+            "throttled_by_scope": dict(self._throttled),
+        }
@@ -0,0 +1,81 @@
+# core/throttling/rules.py
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from aiogram.types import Update
+from loguru import logger
+
+from .limiter import RateLimit
+
+if TYPE_CHECKING:
+    from core.module_loader import ModuleInfo
+
+
+def extract_command(text: Optional[str]) -> Optional[str]:
+    """'/Weather@my_bot Москва' -> 'weather'."""
+    if not text or not text.startswith("/"):
+        return None
+    command = text.split(maxsplit=1)[0][1:].split("@", 1)[0].lower()
+    return command or None
+
+
+class ThrottleRules:
+    """
+    Лимиты отдельных команд и callback-ов из манифестов модулей.
+
+    Outer middleware выполняется до роутинга, поэтому правило подбирается по самому апдейту:
+    команда - по первому слову текста сообщения, callback - по самому длинному подходящему префиксу callback_data.
+    """
+
+    def __init__(self):
+        self._commands: Dict[str, Tuple[str, RateLimit]] = {}
+        self._callback_prefixes: List[Tuple[str, str, RateLimit]] = []
+
+    def add_command(self, command: str, rate: RateLimit, scope: Optional[str] = None) -> None:
+        command = command.lstrip("/").lower()
+        self._commands[command] = (scope or f"cmd:{command}", rate)
+
+    def add_callback_prefix(self, prefix: str, rate: RateLimit, scope: str) -> None:
+        self._callback_prefixes = [item for item in self._callback_prefixes if item[0] != prefix]
+        self._callback_prefixes.append((prefix, scope, rate))
+        self._callback_prefixes.sort(key=lambda item: len(item[0]), reverse=True)
+
+    def load_from_modules(self, modules: Iterable['ModuleInfo']) -> int:
+        """Собирает rate_limit из манифестов загруженных модулей. Возвращает число правил."""
+        self._commands.clear()
+        self._callback_prefixes.clear()
+        for module_info in modules:
+            manifest = module_info.manifest
+            if manifest is None:
+                continue
+            module_rate = None
+            if manifest.rate_limit is not None:
+                module_rate = RateLimit(manifest.rate_limit.limit, manifest.rate_limit.window_seconds)
+                for prefix in manifest.rate_limit.callback_prefixes:
+                    self.add_callback_prefix(prefix, module_rate, scope=f"module:{manifest.name}")
+            for command in manifest.commands:
+                if command.rate_limit is not None:
+                    self.add_command(command.command, RateLimit(command.rate_limit.limit, command.rate_limit.window_seconds))
+                elif module_rate is not None:
+                    # Команды модуля без своего лимита делят общий счетчик модуля с его callback-ами
+                    self.add_command(command.command, module_rate, scope=f"module:{manifest.name}")
+        total = len(self)
+        if total:
+            logger.info(f"Антифлуд: загружено правил из манифестов модулей: {total}.")
+        return total
+
+    def match(self, update: Update) -> Optional[Tuple[str, RateLimit]]:
+        """Правило для апдейта: (scope, лимит) или None."""
+        if update.message is not None:
+            command = extract_command(update.message.text or update.message.caption)
+            if command is not None:
+                return self._commands.get(command)
+            return None
+        if update.callback_query is not None and update.callback_query.data:
+            data = update.callback_query.data
+            for prefix, scope, rate in self._callback_prefixes:
+                if data.startswith(prefix):
+                    return scope, rate
+        return None
+
+    def __len__(self) -> int:
+        return len(self._commands) + len(self._callback_prefixes)
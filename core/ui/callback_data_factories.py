@@ -41,6 +41,11 @@ class AdminUsersPanelNavigate(CallbackData, prefix=ADMIN_USERS_PREFIX):
     category_key: Optional[str] = None 
     entity_name: Optional[str] = None  
 
+    # Keyset-пагинация списка: курсор (ключ сортировки, id), направление и сортировка
+    cursor: Optional[str] = None
+    back: Optional[bool] = None
+    sort: Optional[str] = None
+
 
 ADMIN_ROLES_PREFIX = "sdb_admin_roles"
 class AdminRolesPanelNavigate(CallbackData, prefix=ADMIN_ROLES_PREFIX):
@@ -55,6 +60,11 @@ ADMIN_SYSINFO_PREFIX = "sdb_admin_sysinfo"
 class AdminSysInfoPanelNavigate(CallbackData, prefix=ADMIN_SYSINFO_PREFIX):
     action: str 
 
+ADMIN_BROADCAST_PREFIX = "sdb_admin_broadcast"
+class AdminBroadcastPanelNavigate(CallbackData, prefix=ADMIN_BROADCAST_PREFIX):
+    action: str
+    item_id: Optional[int] = None
+
 ADMIN_MODULES_PREFIX = "sdb_admin_modules"
 class AdminModulesPanelNavigate(CallbackData, prefix=ADMIN_MODULES_PREFIX):
     action: str 
@@ -72,6 +82,7 @@ ADMIN_LOGS_VIEWER_PREFIX = "sdb_admin_logs_viewer"
 class AdminLogsViewerNavigate(CallbackData, prefix=ADMIN_LOGS_VIEWER_PREFIX):
     action: str 
     payload: Optional[str] = None  # Для передачи имени файла
+    page: Optional[int] = None  # Страница содержимого, 0 - последние строки
 
 class AdminPanelNavigate(CallbackData, prefix=ADMIN_CALLBACK_PREFIX): 
     section: str 
@@ -158,13 +158,14 @@ async def get_modules_list_keyboard( # Остается инлайн
     
     accessible_module_entries: List['ModuleUIEntry'] = []
     if all_module_ui_entries:
-        async with services_provider.db.get_session() as session: 
-            for entry in all_module_ui_entries:
-                if entry.required_permission_to_view:
-                    if await services_provider.rbac.user_has_permission(session, user_telegram_id, entry.required_permission_to_view):
-                        accessible_module_entries.append(entry)
-                else:
-                    accessible_module_entries.append(entry)
+        required_permissions = {entry.required_permission_to_view for entry in all_module_ui_entries if entry.required_permission_to_view}
+        granted_permissions: Dict[str, bool] = {}
+        if required_permissions:
+            async with services_provider.db.get_session() as session: 
+                granted_permissions = await services_provider.rbac.user_has_permissions(session, user_telegram_id, required_permissions)
+        for entry in all_module_ui_entries:
+            if not entry.required_permission_to_view or granted_permissions.get(entry.required_permission_to_view):
+                accessible_module_entries.append(entry)
 
     if not accessible_module_entries:
         builder.button(
@@ -0,0 +1,282 @@
+# core/update_scheduler.py
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Literal, Optional
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import ErrorEvent, TelegramObject, Update
+from loguru import logger as global_logger
+
+logger = global_logger.bind(service="UpdateScheduler")
+
+OverflowPolicy = Literal["delay", "drop"]
+
+# Сколько последних замеров хранится для перцентилей ожидания/обработки
+LATENCY_WINDOW_SIZE = 1000
+
+
+def _percentile(samples: Deque[float], percentile: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+class _ScheduledUpdate:
+    __slots__ = ("handler", "event", "data", "enqueued_at")
+
+    def __init__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                 event: Update, data: Dict[str, Any]):
+        self.handler = handler
+        self.event = event
+        self.data = data
+        self.enqueued_at = time.monotonic()
+
+
+class _LatencyStats:
+    __slots__ = ("count", "total_ms", "max_ms", "recent_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW_SIZE)
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.recent_ms.append(value_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p95_ms": _percentile(self.recent_ms, 95),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class HandlerLatencyMiddleware(BaseMiddleware):
+    """Inner middleware: замеряет время работы хендлера и относит его к роутеру, который его обработал."""
+
+    def __init__(self, scheduler: 'UpdateScheduler'):
+        self._scheduler = scheduler
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        started_at = time.monotonic()
+        try:
+            return await handler(event, data)
+        finally:
+            router = data.get("event_router")
+            router_name = getattr(router, "name", None) or "unknown"
+            self._scheduler.observe_handler_latency(router_name, (time.monotonic() - started_at) * 1000)
+
+
+class UpdateScheduler(BaseMiddleware):
+    """
+    Планировщик обработки апдейтов (outer middleware уровня Update).
+
+    Апдейт ставится в очередь своего чата и обрабатывается одним из max_concurrency воркеров:
+    разные чаты обрабатываются параллельно, апдейты одного чата - строго по очереди.
+    Когда в очереди больше high_watermark апдейтов, новые либо ждут (policy "delay" -
+    поллинг/webhook перестают забирать апдейты у Telegram), либо отбрасываются ("drop").
+
+    Всё, что зарегистрировано после планировщика (middleware ядра, роутеры), выполняется
+    уже в воркере. Пока планировщик не запущен, апдейты обрабатываются напрямую.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        high_watermark: int = 1000,
+        overflow_policy: OverflowPolicy = "delay",
+        drain_timeout_seconds: float = 10.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.high_watermark = max(1, high_watermark)
+        self.overflow_policy: OverflowPolicy = overflow_policy
+        self.drain_timeout_seconds = drain_timeout_seconds
+
+        self._dispatcher: Optional[Dispatcher] = None
+        self._chat_queues: Dict[Hashable, Deque[_ScheduledUpdate]] = {}
+        self._ready: Optional["asyncio.Queue[Hashable]"] = None
+        self._workers: List[asyncio.Task] = []
+        self._state_changed = asyncio.Event()
+
+        self._pending = 0
+        self._active = 0
+        self._peak_pending = 0
+        self._enqueued_total = 0
+        self._processed_total = 0
+        self._failed_total = 0
+        self._dropped_total = 0
+        self._delayed_total = 0
+        self._wait_stats = _LatencyStats()
+        self._handler_stats: Dict[str, _LatencyStats] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    def install(self, dp: Dispatcher) -> None:
+        """
+        Регистрирует планировщик в Dispatcher. Вызывать до регистрации остальных
+        outer middleware, чтобы они тоже выполнялись в воркерах.
+        """
+        self._dispatcher = dp
+        dp.update.outer_middleware(self)
+        latency_middleware = HandlerLatencyMiddleware(self)
+        for event_name, observer in dp.observers.items():
+            if event_name not in ("update", "error"):
+                observer.middleware(latency_middleware)
+        dp.startup.register(self.start)
+        dp.shutdown.register(self.stop)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"UpdateScheduler-worker-{index}")
+            for index in range(self.max_concurrency)
+        ]
+        logger.info(f"Планировщик апдейтов запущен (воркеров: {self.max_concurrency}, "
+                    f"high_watermark: {self.high_watermark}, при переполнении: {self.overflow_policy}).")
+
+    async def stop(self) -> None:
+        if not self._workers:
+            return
+        if self._pending:
+            logger.info(f"Ожидание обработки {self._pending} апдейтов в очереди "
+                        f"(не дольше {self.drain_timeout_seconds} сек)...")
+            try:
+                await asyncio.wait_for(self._wait_until(lambda: self._pending == 0), timeout=self.drain_timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"Не дождались обработки {self._pending} апдейтов, они будут отброшены.")
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._chat_queues.clear()
+        self._pending = 0
+        self._active = 0
+        logger.info("Планировщик апдейтов остановлен.")
+
+    async def _wait_until(self, predicate: Callable[[], bool]) -> None:
+        while not predicate():
+            self._state_changed.clear()
+            await self._state_changed.wait()
+
+    @staticmethod
+    def _ordering_key(event: Update, data: Dict[str, Any]) -> Hashable:
+        chat = data.get("event_chat")
+        if chat is not None:
+            return ("chat", chat.id)
+        user = data.get("event_from_user")
+        if user is not None:
+            return ("user", user.id)
+        # Апдейты без чата и пользователя (опросы и т.п.) упорядочивать не нужно
+        return ("update", event.update_id)
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: Update, data: Dict[str, Any]) -> Any:
+        if not self._workers:
+            return await handler(event, data)
+
+        if self._pending >= self.high_watermark:
+            if self.overflow_policy == "drop":
+                self._dropped_total += 1
+                if self._dropped_total == 1 or self._dropped_total % 100 == 0:
+                    logger.warning(f"Очередь апдейтов переполнена ({self._pending} >= {self.high_watermark}), "
+                                   f"апдейт {event.update_id} отброшен (всего отброшено: {self._dropped_total}).")
+                return None
+            self._delayed_total += 1
+            await self._wait_until(lambda: self._pending < self.high_watermark or not self._workers)
+            if not self._workers:
+                return await handler(event, data)
+
+        key = self._ordering_key(event, data)
+        item = _ScheduledUpdate(handler, event, data)
+        queue = self._chat_queues.get(key)
+        if queue is None:
+            self._chat_queues[key] = deque((item,))
+            self._ready.put_nowait(key)  # type: ignore[union-attr]
+        else:
+            # Чат уже в работе или в очереди готовых - воркер заберет апдейт после предыдущих
+            queue.append(item)
+        self._pending += 1
+        self._enqueued_total += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        return None
+
+    async def _worker(self) -> None:
+        assert self._ready is not None
+        while True:
+            key = await self._ready.get()
+            queue = self._chat_queues[key]
+            item = queue.popleft()
+            self._active += 1
+            self._wait_stats.observe((time.monotonic() - item.enqueued_at) * 1000)
+            try:
+                await item.handler(item.event, item.data)
+                self._processed_total += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed_total += 1
+                await self._handle_error(item, e)
+            finally:
+                self._active -= 1
+                self._pending -= 1
+                if queue:
+                    # Обратно в конец очереди готовых: длинная очередь одного чата не блокирует остальные
+                    self._ready.put_nowait(key)
+                else:
+                    self._chat_queues.pop(key, None)
+                self._state_changed.set()
+
+    async def _handle_error(self, item: _ScheduledUpdate, error: Exception) -> None:
+        # ErrorsMiddleware aiogram стоит раньше планировщика, поэтому error-хендлеры вызываем сами
+        handled = UNHANDLED
+        if self._dispatcher is not None:
+            try:
+                handled = await self._dispatcher.propagate_event(
+                    update_type="error", event=ErrorEvent(update=item.event, exception=error), **item.data
+                )
+            except Exception as e_error_handler:
+                logger.error(f"Ошибка в error-хендлере при обработке апдейта {item.event.update_id}: {e_error_handler}",
+                             exc_info=True)
+                return
+        if handled is UNHANDLED:
+            logger.opt(exception=error).error(f"Необработанная ошибка при обработке апдейта {item.event.update_id}: {error}")
+
+    def observe_handler_latency(self, router_name: str, latency_ms: float) -> None:
+        stats = self._handler_stats.get(router_name)
+        if stats is None:
+            stats = self._handler_stats[router_name] = _LatencyStats()
+        stats.observe(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "max_concurrency": self.max_concurrency,
+            "high_watermark": self.high_watermark,
+            "overflow_policy": self.overflow_policy,
+            "queue_depth": self._pending - self._active,
+            "in_progress": self._active,
+            "peak_queue_depth": self._peak_pending,
+            "active_chats": len(self._chat_queues),
+            "enqueued_total": self._enqueued_total,
+            "processed_total": self._processed_total,
+            "failed_total": self._failed_total,
+            "dropped_total": self._dropped_total,
+            "delayed_total": self._delayed_total,
+            "wait": self._wait_stats.as_dict(),
+            "handlers": {name: stats.as_dict() for name, stats in sorted(self._handler_stats.items())},
+        }
@@ -0,0 +1,125 @@
+# core/users/activity.py
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+from loguru import logger
+from sqlalchemy import update
+
+from core.database.core_models import User as DBUser
+
+if TYPE_CHECKING:
+    from aiogram import types as aiogram_types
+    from core.services_provider import BotServicesProvider
+
+
+class UserActivityBuffer:
+    """
+    Write-behind буфер для last_activity_at и синхронизации профиля (username, имена).
+
+    Вместо транзакции на каждый апдейт пользователь помечается "грязным" только если
+    профиль реально изменился или last_activity_at старше granularity. Все грязные
+    пользователи сбрасываются в БД одним bulk UPDATE по таймеру и при остановке бота.
+    """
+
+    def __init__(
+        self,
+        services_provider: 'BotServicesProvider',
+        granularity_seconds: int = 300,
+        flush_interval_seconds: int = 10,
+    ):
+        self._services = services_provider
+        self._granularity = timedelta(seconds=granularity_seconds)
+        self._flush_interval_seconds = flush_interval_seconds
+        self._dirty: Dict[int, Dict[str, Any]] = {}  # DB ID -> изменившиеся колонки
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._logger = logger.bind(service="UserActivityBuffer")
+        self._logger.info(f"UserActivityBuffer инициализирован (granularity: {granularity_seconds} сек, "
+                          f"интервал сброса: {flush_interval_seconds} сек).")
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._dirty)
+
+    @staticmethod
+    def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+        # SQLite возвращает naive datetime, хотя пишем мы всегда UTC
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    def record(self, db_user: DBUser, tg_user: 'aiogram_types.User') -> bool:
+        """
+        Сравнивает профиль из Telegram с db_user, применяет изменения к объекту в памяти
+        и ставит их в очередь на запись. Возвращает True, если пользователь помечен грязным.
+        """
+        changes: Dict[str, Any] = {}
+        if db_user.username != tg_user.username:
+            changes["username"] = tg_user.username
+            changes["username_lower"] = tg_user.username.lower() if tg_user.username else None
+        if db_user.first_name != tg_user.first_name:
+            changes["first_name"] = tg_user.first_name
+        if db_user.last_name != tg_user.last_name:
+            changes["last_name"] = tg_user.last_name
+
+        now = datetime.now(timezone.utc)
+        last_activity = self._as_utc(db_user.last_activity_at)
+        if changes or last_activity is None or now - last_activity >= self._granularity:
+            changes["last_activity_at"] = now
+
+        if not changes:
+            return False
+
+        for column_name, value in changes.items():
+            setattr(db_user, column_name, value)
+        self._dirty.setdefault(db_user.id, {}).update(changes)
+        self._logger.trace(f"Пользователь DB ID {db_user.id} помечен для отложенной записи: {list(changes)}")
+        return True
+
+    def discard(self, user_id: int) -> None:
+        """Убирает пользователя из буфера (например, если его строку только что записали напрямую)."""
+        self._dirty.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """Записывает всех грязных пользователей одним bulk UPDATE. Возвращает число строк."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            rows = [{"id": user_id, **columns} for user_id, columns in batch.items()]
+            try:
+                async with self._services.db.get_session() as session:
+                    await session.execute(update(DBUser), rows)
+                    await session.commit()
+                self._logger.debug(f"Отложенная активность записана для {len(rows)} пользователей.")
+                return len(rows)
+            except Exception as e:
+                # Возвращаем батч в буфер, не затирая более свежие изменения
+                for user_id, columns in batch.items():
+                    newer = self._dirty.get(user_id, {})
+                    self._dirty[user_id] = {**columns, **newer}
+                self._logger.error(f"Ошибка bulk UPDATE активности пользователей ({len(rows)} шт.): {e}", exc_info=True)
+                return 0
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_seconds)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop(), name="sdb_user_activity_flush")
+            self._logger.info("Фоновый сброс активности пользователей запущен.")
+
+    async def stop(self) -> None:
+        """Останавливает таймер и сбрасывает остаток буфера."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        flushed = await self.flush()
+        self._logger.info(f"UserActivityBuffer остановлен (записано при остановке: {flushed}).")
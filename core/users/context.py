@@ -0,0 +1,126 @@
+# core/users/context.py
+import time
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+from loguru import logger
+from sqlalchemy import select, orm
+
+from core.database.core_models import User as DBUser, Role as DBRole, Permission as DBPermission
+
+if TYPE_CHECKING:
+    from core.services_provider import BotServicesProvider
+    from core.cache.manager import CacheManager
+
+# Ключ в data апдейта, под которым лежит уже загруженный DBUser (или None, если пользователя нет в БД)
+USER_CONTEXT_DATA_KEY = "sdb_user_context"
+USER_CONTEXT_CACHE_KEY_PREFIX = "sdb:user_ctx:"
+USER_CONTEXT_EPOCH_CACHE_KEY = f"{USER_CONTEXT_CACHE_KEY_PREFIX}epoch"
+
+_MISSING = object()
+
+
+class UserContextCache:
+    """
+    Загружает строку User один раз на апдейт и раздает один и тот же объект
+    I18nMiddleware, UserStatusMiddleware и хэндлерам.
+
+    Между апдейтами объект хранится в CacheManager (ключ по эпохе и telegram_id) с TTL.
+    Объект включает роли и их разрешения, поэтому изменение разрешений роли меняет эпоху (invalidate_all)
+    и разом делает устаревшими контексты всех пользователей.
+    Если кэш недоступен, остается только мемоизация в рамках одного апдейта.
+    """
+
+    def __init__(self, services_provider: 'BotServicesProvider', ttl_seconds: int = 60):
+        self._services = services_provider
+        self._ttl_seconds = ttl_seconds
+        self._logger = logger.bind(service="UserContextCache")
+        self._logger.info(f"UserContextCache инициализирован (TTL: {ttl_seconds} сек).")
+
+    @staticmethod
+    def _cache_key(telegram_id: int, epoch: int) -> str:
+        return f"{USER_CONTEXT_CACHE_KEY_PREFIX}{epoch}:{telegram_id}"
+
+    @staticmethod
+    async def _get_epoch(cache: 'CacheManager') -> int:
+        return await cache.get(USER_CONTEXT_EPOCH_CACHE_KEY) or 0
+
+    def _get_cache(self) -> Optional['CacheManager']:
+        if self._ttl_seconds <= 0:
+            return None
+        try:
+            return self._services.cache
+        except AttributeError:
+            return None
+
+    async def _load_from_db(self, telegram_id: int) -> Optional[DBUser]:
+        # Обратные связи (Role.users, Permission.roles, ...) не грузим: иначе selectin тянет весь граф пользователей
+        stmt = (
+            select(DBUser)
+            .options(
+                orm.selectinload(DBUser.roles).options(
+                    orm.lazyload(DBRole.users),
+                    orm.selectinload(DBRole.permissions).options(
+                        orm.lazyload(DBPermission.roles),
+                        orm.lazyload(DBPermission.users_with_direct_access),
+                    ),
+                ),
+                orm.selectinload(DBUser.direct_permissions).options(
+                    orm.lazyload(DBPermission.roles),
+                    orm.lazyload(DBPermission.users_with_direct_access),
+                ),
+            )
+            .where(DBUser.telegram_id == telegram_id)
+        )
+        async with self._services.db.get_session() as session:
+            result = await session.execute(stmt)
+            return result.scalars().first()
+
+    async def get_user(self, telegram_id: int, data: Optional[Dict[str, Any]] = None) -> Optional[DBUser]:
+        """
+        Возвращает DBUser для telegram_id.
+        Порядок: data текущего апдейта -> CacheManager -> БД.
+        """
+        if data is not None:
+            memo = data.get(USER_CONTEXT_DATA_KEY, _MISSING)
+            if memo is not _MISSING:
+                return memo
+
+        cache = self._get_cache()
+        if cache is not None:
+            # Несколько апдейтов одного пользователя подряд (альбомы, быстрые нажатия) грузят строку один раз
+            db_user = await cache.get_or_load(
+                self._cache_key(telegram_id, await self._get_epoch(cache)),
+                lambda: self._load_from_db(telegram_id),
+                ttl_seconds=self._ttl_seconds,
+            )
+        else:
+            db_user = await self._load_from_db(telegram_id)
+        self._logger.trace(f"Контекст пользователя TG ID {telegram_id} получен (найден: {db_user is not None}).")
+
+        if data is not None:
+            data[USER_CONTEXT_DATA_KEY] = db_user
+        return db_user
+
+    async def put(self, db_user: DBUser, data: Optional[Dict[str, Any]] = None) -> None:
+        """Кладет актуальный объект пользователя в контекст апдейта и в кэш."""
+        if data is not None:
+            data[USER_CONTEXT_DATA_KEY] = db_user
+        cache = self._get_cache()
+        if cache is not None:
+            key = self._cache_key(db_user.telegram_id, await self._get_epoch(cache))
+            await cache.set(key, db_user, ttl_seconds=self._ttl_seconds)
+
+    async def invalidate(self, telegram_id: int, data: Optional[Dict[str, Any]] = None) -> None:
+        if data is not None:
+            data.pop(USER_CONTEXT_DATA_KEY, None)
+        cache = self._get_cache()
+        if cache is not None:
+            await cache.delete(self._cache_key(telegram_id, await self._get_epoch(cache)))
+        self._logger.trace(f"Контекст пользователя TG ID {telegram_id} инвалидирован.")
+
+    async def invalidate_all(self) -> None:
+        """Устаревают контексты всех пользователей (записи прежней эпохи истекут по TTL)."""
+        cache = self._get_cache()
+        if cache is not None:
+            await cache.set(USER_CONTEXT_EPOCH_CACHE_KEY, time.time_ns())
+        self._logger.trace("Контексты всех пользователей инвалидированы.")
@@ -6,8 +6,6 @@ from loguru import logger
 from datetime import datetime, timezone 
 
 from core.database.core_models import User as DBUser
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from core.ui.keyboards_core import TEXTS_CORE_KEYBOARDS_EN
 
@@ -47,10 +45,8 @@ class UserStatusMiddleware(BaseMiddleware):
         user_was_created_in_this_middleware_call = False # Флаг для этого вызова middleware
 
         try:
-            async with services_provider.db.get_session() as session:
-                stmt = select(DBUser).where(DBUser.telegram_id == user_tg_id)
-                result = await session.execute(stmt)
-                db_user = result.scalars().first()
+            # Обычно пользователь уже загружен I18nMiddleware в рамках этого апдейта
+            db_user = await user_service.context.get_user(user_tg_id, data)
         except Exception as e_get_user:
             logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка БД при первоначальном получении пользователя {user_mention}: {e_get_user}", exc_info=True)
             if event.message: await event.message.reply("Внутренняя ошибка сервера. Попробуйте позже.")
@@ -68,6 +64,8 @@ class UserStatusMiddleware(BaseMiddleware):
                 try:
                     processed_user, created_flag = await user_service.process_user_on_start(aiogram_event_user)
                     db_user = processed_user
+                    if db_user:
+                        await user_service.context.put(db_user, data)
                     if created_flag: # Если UserService его ТОЛЬКО ЧТО СОЗДАЛ
                         user_was_created_in_this_middleware_call = True
                     
@@ -96,13 +94,15 @@ class UserStatusMiddleware(BaseMiddleware):
                     except Exception as e_answer: logger.error(f"Не удалось ответить на callback о регистр. {user_mention}: {e_answer}")
                 return None 
         elif not is_start_command: 
-            logger.trace(f"[{MODULE_NAME_FOR_LOG}] Пользователь {user_mention} найден. Вызов process_user_on_start для обновления...")
+            logger.trace("[{}] Пользователь {} найден. Отложенное обновление активности...", MODULE_NAME_FOR_LOG, user_mention)
             try:
-                processed_user, _ = await user_service.process_user_on_start(aiogram_event_user) # Флаг created здесь не так важен
+                processed_user = await user_service.record_user_activity(db_user, aiogram_event_user)
                 if processed_user:
+                    if processed_user is not db_user:
+                        await user_service.context.put(processed_user, data)
                     db_user = processed_user 
                 else: 
-                    logger.warning(f"[{MODULE_NAME_FOR_LOG}] process_user_on_start вернул None для существующего пользователя {user_mention} в middleware.")
+                    logger.warning(f"[{MODULE_NAME_FOR_LOG}] record_user_activity вернул None для существующего пользователя {user_mention} в middleware.")
             except Exception as e_update_mw:
                  logger.error(f"[{MODULE_NAME_FOR_LOG}] Ошибка при обновлении данных существующего пользователя {user_mention} в middleware: {e_update_mw}", exc_info=True)
         
@@ -121,11 +121,12 @@ class UserStatusMiddleware(BaseMiddleware):
             # ... (отправка сообщения и return None)
             return None 
             
-        logger.trace(f"[{MODULE_NAME_FOR_LOG}] Пользователь {user_mention} (DB ID: {db_user.id}) проверки прошел. Доступ разрешен.")
+        logger.trace("[{}] Пользователь {} (DB ID: {}) проверки прошел. Доступ разрешен.", MODULE_NAME_FOR_LOG, user_mention, db_user.id)
         data['sdb_user'] = db_user
         # --- ПЕРЕДАЕМ ФЛАГ О СОЗДАНИИ В ХЭНДЛЕР /start ---
         if is_start_command: # Только для команды /start передаем этот флаг
             data['user_was_just_created'] = user_was_created_in_this_middleware_call
-            logger.debug(f"[{MODULE_NAME_FOR_LOG}] Для /start пользователя {user_mention} установлен флаг user_was_just_created = {user_was_created_in_this_middleware_call}")
+            logger.debug("[{}] Для /start пользователя {} установлен флаг user_was_just_created = {}",
+                         MODULE_NAME_FOR_LOG, user_mention, user_was_created_in_this_middleware_call)
 
         return await handler(event, data)
\ No newline at end of file
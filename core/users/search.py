@@ -0,0 +1,173 @@
+# core/users/search.py
+"""
+Поиск пользователей по подстроке username / имени / фамилии (и точному TG ID / DB ID).
+
+Бэкенды:
+- SQLite: FTS5-таблица sdb_users_search (tokenize='trigram', external content) + триггеры синхронизации;
+- PostgreSQL: GIN-индекс pg_trgm по склеенной строке "username first_name last_name",
+  плюс нечеткое совпадение по слову (оператор <% , word_similarity) для опечаток;
+- иначе (MySQL, старый SQLite, не применена миграция): LIKE по префиксу - корректно, но без индекса по именам.
+
+Объекты индекса создает миграция Alembic или ensure_search_index() (для `sdb db init-core`).
+Результаты упорядочены по id (новые первыми) и листаются keyset-курсором.
+"""
+from typing import List, Optional
+
+from loguru import logger
+from sqlalchemy import Integer, String, and_, column, literal, literal_column, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.core_models import User as DBUser
+from core.database.pagination import KeysetPage, fetch_keyset_page
+
+SEARCH_BACKEND_FTS5 = "fts5"
+SEARCH_BACKEND_PG_TRGM = "pg_trgm"
+SEARCH_BACKEND_LIKE = "like"
+
+SQLITE_SEARCH_TABLE = "sdb_users_search"
+PG_SEARCH_INDEX = "ix_sdb_users_search_trgm"
+# Триграммный индекс не находит подстроки короче 3 символов - такие термы ищем префиксом
+MIN_TRIGRAM_TERM_LENGTH = 3
+MAX_SEARCH_QUERY_LENGTH = 100
+# Выражение должно совпадать с выражением индекса PG_SEARCH_INDEX символ в символ
+PG_SEARCH_EXPRESSION = (
+    "lower(coalesce(username_lower, '') || ' ' || coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+)
+
+SQLITE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_SEARCH_TABLE} USING fts5("
+    "username_lower, first_name, last_name, content='sdb_users', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ai AFTER INSERT ON sdb_users BEGIN "
+    f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, username_lower, first_name, last_name) "
+    "VALUES (new.id, new.username_lower, new.first_name, new.last_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_ad AFTER DELETE ON sdb_users BEGIN "
+    f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, username_lower, first_name, last_name) "
+    "VALUES ('delete', old.id, old.username_lower, old.first_name, old.last_name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SQLITE_SEARCH_TABLE}_au AFTER UPDATE OF username_lower, first_name, last_name "
+    f"ON sdb_users BEGIN "
+    f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}, rowid, username_lower, first_name, last_name) "
+    "VALUES ('delete', old.id, old.username_lower, old.first_name, old.last_name); "
+    f"INSERT INTO {SQLITE_SEARCH_TABLE}(rowid, username_lower, first_name, last_name) "
+    "VALUES (new.id, new.username_lower, new.first_name, new.last_name); END",
+    f"INSERT INTO {SQLITE_SEARCH_TABLE}({SQLITE_SEARCH_TABLE}) VALUES ('rebuild')",
+)
+
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS {PG_SEARCH_INDEX} ON sdb_users USING gin (({PG_SEARCH_EXPRESSION}) gin_trgm_ops)",
+)
+
+
+def sqlite_supports_trigram_fts(connection: Connection) -> bool:
+    """tokenize='trigram' появился в SQLite 3.34; FTS5 может быть не собран."""
+    version = connection.execute(text("SELECT sqlite_version()")).scalar_one()
+    if tuple(int(part) for part in version.split(".")[:2]) < (3, 34):
+        return False
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar_one())
+
+
+def ensure_search_index(connection: Connection) -> str:
+    """Создает объекты поискового индекса (идемпотентно) на синхронном соединении. Возвращает бэкенд."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite" and sqlite_supports_trigram_fts(connection):
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        return SEARCH_BACKEND_FTS5
+    if dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+        return SEARCH_BACKEND_PG_TRGM
+    return SEARCH_BACKEND_LIKE
+
+
+async def detect_search_backend(session: AsyncSession) -> str:
+    """Определяет, какой индекс реально есть в БД (миграция могла быть не применена)."""
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        result = await session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SQLITE_SEARCH_TABLE}
+        )
+        if result.scalar_one_or_none():
+            return SEARCH_BACKEND_FTS5
+    elif dialect == "postgresql":
+        result = await session.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": PG_SEARCH_INDEX})
+        if result.scalar_one():
+            return SEARCH_BACKEND_PG_TRGM
+    return SEARCH_BACKEND_LIKE
+
+
+def normalize_search_query(query: str) -> str:
+    """Нижний регистр, без ведущего '@' и лишних пробелов."""
+    return " ".join(query.strip().lstrip("@").lower().split())[:MAX_SEARCH_QUERY_LENGTH]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _prefix_condition(term: str):
+    pattern = f"{_escape_like(term)}%"
+    return or_(
+        DBUser.username_lower.like(pattern, escape="\\"),
+        DBUser.first_name.ilike(pattern, escape="\\"),
+        DBUser.last_name.ilike(pattern, escape="\\"),
+    )
+
+
+def _fts5_match_expression(terms: List[str]) -> str:
+    # Каждый терм - строка FTS5 в кавычках: спецсимволы запроса не интерпретируются
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def build_search_condition(backend: str, query: str):
+    """WHERE-условие для нормализованного запроса. None - запрос пустой."""
+    terms = query.split()
+    if not terms:
+        return None
+    long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM_LENGTH]
+    short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_TERM_LENGTH]
+
+    if backend == SEARCH_BACKEND_FTS5 and long_terms:
+        matching_ids = text(
+            f"SELECT rowid FROM {SQLITE_SEARCH_TABLE} WHERE {SQLITE_SEARCH_TABLE} MATCH :search_match"
+        ).bindparams(search_match=_fts5_match_expression(long_terms)).columns(column("rowid", Integer))
+        condition = and_(DBUser.id.in_(matching_ids), *(_prefix_condition(term) for term in short_terms))
+    elif backend == SEARCH_BACKEND_PG_TRGM:
+        search_expression = literal_column(PG_SEARCH_EXPRESSION, type_=String)
+        substring_match = and_(*(search_expression.like(f"%{_escape_like(term)}%", escape="\\") for term in terms))
+        if len(query) >= MIN_TRIGRAM_TERM_LENGTH:
+            # <% - "запрос похож на какое-то слово строки": находит username с опечаткой
+            condition = or_(substring_match, literal(query, type_=String).op("<%")(search_expression))
+        else:
+            condition = substring_match
+    else:
+        condition = and_(*(_prefix_condition(term) for term in terms))
+
+    if query.isdigit():
+        # Точные ID идут по своим индексам и не требуют полнотекстового поиска
+        number = int(query)
+        return or_(DBUser.telegram_id == number, DBUser.id == number, condition)
+    return condition
+
+
+async def search_users(
+    session: AsyncSession,
+    query: str,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    backward: bool = False,
+    backend: Optional[str] = None,
+) -> KeysetPage:
+    """Страница найденных пользователей (новые первыми). ValueError при битом курсоре."""
+    normalized = normalize_search_query(query)
+    if backend is None:
+        backend = await detect_search_backend(session)
+    condition = build_search_condition(backend, normalized)
+    if condition is None:
+        return KeysetPage()
+    logger.trace(f"Поиск пользователей '{normalized}' (бэкенд: {backend}, курсор: {cursor}).")
+    return await fetch_keyset_page(
+        session, select(DBUser).where(condition), DBUser.id, DBUser.id, limit,
+        descending=True, cursor=cursor, backward=backward,
+    )
@@ -10,6 +10,11 @@ from datetime import datetime, timezone
 
 from core.database.core_models import User as DBUser, Role as DBRole 
 from core.rbac.service import DEFAULT_ROLE_USER 
+from core.cache.invalidation import CommitInvalidator
+from core.users.context import UserContextCache
+from core.users.activity import UserActivityBuffer
+from core.users.search import SEARCH_BACKEND_LIKE, detect_search_backend, search_users
+from core.database.pagination import KeysetPage
 
 if TYPE_CHECKING:
     from core.services_provider import BotServicesProvider
@@ -21,8 +26,27 @@ class UserService:
     def __init__(self, services_provider: 'BotServicesProvider'):
         self._services = services_provider
         self._logger = logger.bind(service="UserService")
+        self.context = UserContextCache(
+            services_provider,
+            ttl_seconds=services_provider.config.cache.user_context_ttl_seconds
+        )
+        self.activity = UserActivityBuffer(
+            services_provider,
+            granularity_seconds=services_provider.config.core.user_activity_granularity_seconds,
+            flush_interval_seconds=services_provider.config.core.user_activity_flush_interval_seconds
+        )
+        self._context_invalidator = CommitInvalidator("UserService")
+        self._search_backend: Optional[str] = None
         self._logger.info("UserService инициализирован.")
 
+    async def _invalidate_context_on_commit(self, user: DBUser, session: AsyncSession) -> None:
+        """
+        Инвалидирует кэш контекста пользователя сразу и повторно после commit сессии,
+        чтобы параллельный апдейт не успел положить в кэш строку до коммита.
+        """
+        telegram_id = user.telegram_id
+        await self._context_invalidator.now_and_after_commit(session, lambda: self.context.invalidate(telegram_id))
+
     async def _get_user_by_telegram_id(self, telegram_id: int, session: AsyncSession, load_roles: bool = False, load_direct_perms: bool = False) -> Optional[DBUser]:
         self._logger.trace(f"Запрос пользователя из БД. TG ID: {telegram_id}, загрузка ролей: {load_roles}, прямых прав: {load_direct_perms}")
         stmt = select(DBUser).where(DBUser.telegram_id == telegram_id)
@@ -186,6 +210,7 @@ class UserService:
                                      f"Data changed: {data_actually_changed_in_db}, Dirty: {session.dirty}, New: {session.new}")
                     await session.commit()
                     self._logger.success(f"UserService: ПОСЛЕ session.commit() для TG ID {tg_user.id}.")
+                    if db_user: self.activity.discard(db_user.id)
                     if db_user: # Обновляем объект из БД
                         await session.refresh(db_user, attribute_names=['id', 'roles', 'direct_permissions', 'last_activity_at', 'is_active', 'is_bot_blocked'])
                         logger.debug(f"Пользователь {db_user.id} обновлен из БД после коммита в UserService.")
@@ -228,11 +253,55 @@ class UserService:
         self._logger.error(f"Выход из process_user_on_start для TG ID {tg_user.id} без явного возврата.")
         return None, False
     
+    async def record_user_activity(self, db_user: DBUser, tg_user: aiogram_types.User) -> Optional[DBUser]:
+        """
+        Горячий путь для любого апдейта от существующего пользователя.
+        Изменения профиля и last_activity_at уходят в write-behind буфер без отдельной транзакции.
+        Полная синхронизация (process_user_on_start) выполняется только если требуется
+        изменить статусы или роли пользователя.
+        """
+        is_owner = tg_user.id in self._services.config.core.super_admins
+        if is_owner:
+            needs_full_sync = bool(db_user.roles) or not db_user.is_active or db_user.is_bot_blocked
+        else:
+            needs_full_sync = not db_user.roles or not db_user.is_active or db_user.is_bot_blocked
+
+        if needs_full_sync:
+            self._logger.debug(f"Пользователь TG ID {tg_user.id} требует полной синхронизации (статусы/роли).")
+            processed_user, _ = await self.process_user_on_start(tg_user)
+            return processed_user
+
+        if self.activity.record(db_user, tg_user):
+            # Объект изменен в памяти, обновляем его в кэше контекста (актуально для Redis)
+            await self.context.put(db_user)
+        return db_user
+
+    async def search_users(self, query: str, session: AsyncSession, limit: int = 10,
+                           cursor: Optional[str] = None, backward: bool = False) -> KeysetPage:
+        """
+        Поиск по подстроке username/имени/фамилии или точному TG ID / DB ID (см. core.users.search).
+        Бэкенд индекса определяется один раз. ValueError при битом курсоре.
+        """
+        if self._search_backend is None:
+            self._search_backend = await detect_search_backend(session)
+            if self._search_backend == SEARCH_BACKEND_LIKE and session.get_bind().dialect.name in ("sqlite", "postgresql"):
+                self._logger.warning("Поисковый индекс пользователей не найден - поиск по LIKE без индекса. "
+                                     "Примените миграции: 'sdb db upgrade head'.")
+            else:
+                self._logger.debug(f"Поиск пользователей использует бэкенд '{self._search_backend}'.")
+        return await search_users(session, query, limit=limit, cursor=cursor, backward=backward,
+                                  backend=self._search_backend)
+
+    async def dispose(self) -> None:
+        await self._context_invalidator.drain()
+        await self.activity.stop()
+
     async def update_user_language(self, user: DBUser, language_code: str, session: AsyncSession) -> bool:
         if user.preferred_language_code != language_code:
             user.preferred_language_code = language_code
             if user not in session.dirty and user not in session.new : session.add(user) 
             self._logger.info(f"Язык для пользователя {user.telegram_id} (DB ID: {user.id}) изменен на '{language_code}' (добавлен в сессию).")
+            await self._invalidate_context_on_commit(user, session)
             return True
         return False
 
@@ -245,6 +314,7 @@ class UserService:
             user.is_active = is_active
             if user not in session.dirty and user not in session.new : session.add(user)
             self._logger.info(f"Статус активности для пользователя {user.telegram_id} (DB ID: {user.id}) изменен на {is_active} (добавлен в сессию).")
+            await self._invalidate_context_on_commit(user, session)
             return True
         return False
 
@@ -257,5 +327,6 @@ class UserService:
             user.is_bot_blocked = is_bot_blocked
             if user not in session.dirty and user not in session.new : session.add(user)
             self._logger.info(f"Статус блокировки бота для пользователя {user.telegram_id} (DB ID: {user.id}) изменен на {is_bot_blocked} (добавлен в сессию).")
+            await self._invalidate_context_on_commit(user, session)
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,390 @@
+# core/users/transfer.py
+"""
+Потоковый экспорт/импорт пользователей, их ролей и прямых разрешений (sdb user export/import).
+
+Экспорт - каталог с файлами users.<ext>, user_roles.<ext>, user_permissions.<ext> и manifest.json.
+Роли и разрешения в файлах указаны по имени, пользователи - по telegram_id: DB ID в разных БД не совпадают.
+Строки читаются серверным курсором (stream + yield_per) и пишутся пачками, импорт идет пачками
+INSERT ... ON CONFLICT (upsert) с коммитом на каждую пачку - память не зависит от числа пользователей.
+"""
+import csv
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import Table, func, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.core_models import Permission, Role, User, UserPermission, UserRole
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+    PYARROW_AVAILABLE = False
+
+TRANSFER_FORMATS = ("jsonl", "csv", "parquet")
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_BATCH_SIZE = 5000
+# Размер IN (...) при поиске DB ID по telegram_id: старые SQLite ограничены 999 параметрами
+ID_LOOKUP_CHUNK_SIZE = 500
+
+USERS_DATASET = "users"
+USER_ROLES_DATASET = "user_roles"
+USER_PERMISSIONS_DATASET = "user_permissions"
+
+# Поле -> тип в файле. Порядок полей = порядок колонок в CSV/Parquet
+USER_FIELDS: Dict[str, str] = {
+    "telegram_id": "int",
+    "username": "str",
+    "username_lower": "str",
+    "first_name": "str",
+    "last_name": "str",
+    "preferred_language_code": "str",
+    "is_active": "bool",
+    "is_bot_blocked": "bool",
+    "last_activity_at": "datetime",
+    "created_at": "datetime",
+}
+USER_ROLE_FIELDS: Dict[str, str] = {"telegram_id": "int", "role": "str"}
+USER_PERMISSION_FIELDS: Dict[str, str] = {"telegram_id": "int", "permission": "str"}
+DATASET_FIELDS = {
+    USERS_DATASET: USER_FIELDS,
+    USER_ROLES_DATASET: USER_ROLE_FIELDS,
+    USER_PERMISSIONS_DATASET: USER_PERMISSION_FIELDS,
+}
+
+ProgressCallback = Callable[[str, int], None]
+
+
+@dataclass
+class TransferStats:
+    users: int = 0
+    user_roles: int = 0
+    user_permissions: int = 0
+    unknown_roles: int = 0
+    unknown_permissions: int = 0
+    unknown_users: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# --- Значения ---
+
+def _to_naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _coerce_value(value: Any, kind: str) -> Any:
+    """Приводит значение из файла (в CSV все - строки) к типу колонки."""
+    if value is None or value == "":
+        return None
+    if kind == "int":
+        return int(value)
+    if kind == "bool":
+        if isinstance(value, bool):
+            return value
+        normalized = str(value).strip().lower()
+        if normalized in ("1", "true", "yes"):
+            return True
+        if normalized in ("0", "false", "no"):
+            return False
+        raise ValueError(f"Некорректное логическое значение: '{value}'")
+    if kind == "datetime":
+        return _to_naive_utc(value if isinstance(value, datetime) else datetime.fromisoformat(str(value)))
+    return str(value)
+
+
+def _coerce_record(record: Dict[str, Any], fields: Dict[str, str]) -> Dict[str, Any]:
+    return {name: _coerce_value(record.get(name), kind) for name, kind in fields.items()}
+
+
+def _to_text_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _to_naive_utc(value).isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+# --- Писатели и читатели форматов ---
+
+class _JsonlWriter:
+    def __init__(self, path: Path, fields: Dict[str, str]):
+        self._file = path.open("w", encoding="utf-8")
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._file.writelines(
+            json.dumps({key: _to_text_value(value) for key, value in record.items()}, ensure_ascii=False) + "\n"
+            for record in records
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, fields: Dict[str, str]):
+        self._file = path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(fields))
+        self._writer.writeheader()
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._writer.writerows({key: _to_text_value(value) for key, value in record.items()} for record in records)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+_ARROW_TYPES = {"int": "int64", "str": "string", "bool": "bool_", "datetime": "timestamp"}
+
+
+def _arrow_schema(fields: Dict[str, str]):
+    arrow_fields = []
+    for name, kind in fields.items():
+        arrow_type = pa.timestamp("us") if kind == "datetime" else getattr(pa, _ARROW_TYPES[kind])()
+        arrow_fields.append(pa.field(name, arrow_type))
+    return pa.schema(arrow_fields)
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, fields: Dict[str, str]):
+        self._schema = _arrow_schema(fields)
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._writer.write_table(pa.Table.from_pylist(records, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_WRITERS = {"jsonl": _JsonlWriter, "csv": _CsvWriter, "parquet": _ParquetWriter}
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in TRANSFER_FORMATS:
+        raise ValueError(f"Неизвестный формат '{fmt}'. Доступны: {', '.join(TRANSFER_FORMATS)}")
+    if fmt == "parquet" and not PYARROW_AVAILABLE:
+        raise ValueError("Для формата parquet нужен пакет pyarrow: pip install pyarrow")
+
+
+def _dataset_path(directory: Path, dataset: str, fmt: str) -> Path:
+    return directory / f"{dataset}.{fmt}"
+
+
+def _iter_batches(path: Path, fmt: str, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Пачки сырых записей из файла, не читая его целиком."""
+    if fmt == "parquet":
+        for record_batch in pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size):
+            yield record_batch.to_pylist()
+        return
+
+    with path.open("r", encoding="utf-8", newline="" if fmt == "csv" else None) as file:
+        records = csv.DictReader(file) if fmt == "csv" else (json.loads(line) for line in file if line.strip())
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# --- Экспорт ---
+
+def _export_statements():
+    users = User.__table__
+    return {
+        USERS_DATASET: select(*(users.c[name] for name in USER_FIELDS)).order_by(users.c.id),
+        USER_ROLES_DATASET: (
+            select(User.telegram_id, Role.name.label("role"))
+            .select_from(UserRole)
+            .join(User, User.id == UserRole.user_id)
+            .join(Role, Role.id == UserRole.role_id)
+            .order_by(UserRole.id)
+        ),
+        USER_PERMISSIONS_DATASET: (
+            select(User.telegram_id, Permission.name.label("permission"))
+            .select_from(UserPermission)
+            .join(User, User.id == UserPermission.user_id)
+            .join(Permission, Permission.id == UserPermission.permission_id)
+            .order_by(UserPermission.id)
+        ),
+    }
+
+
+async def export_users(
+    session: AsyncSession,
+    output_dir: Path,
+    fmt: str = "jsonl",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> TransferStats:
+    """Выгружает пользователей, их роли и прямые разрешения в output_dir. Возвращает число строк."""
+    _check_format(fmt)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stats = TransferStats()
+
+    for dataset, stmt in _export_statements().items():
+        writer = _WRITERS[fmt](_dataset_path(output_dir, dataset, fmt), DATASET_FIELDS[dataset])
+        exported = 0
+        try:
+            # Core-select (без ORM-объектов): нет selectin-подгрузки связей и identity map
+            result = await session.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                writer.write_batch([dict(row) for row in partition])
+                exported += len(partition)
+                if progress:
+                    progress(dataset, exported)
+        finally:
+            writer.close()
+        setattr(stats, dataset, exported)
+        logger.info(f"Экспорт '{dataset}': {exported} строк.")
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "format": fmt,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "counts": {dataset: getattr(stats, dataset) for dataset in DATASET_FIELDS},
+    }
+    (output_dir / MANIFEST_FILE_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return stats
+
+
+# --- Импорт ---
+
+def read_manifest(input_dir: Path) -> Dict[str, Any]:
+    manifest_path = input_dir / MANIFEST_FILE_NAME
+    if not manifest_path.is_file():
+        raise ValueError(f"В '{input_dir}' нет {MANIFEST_FILE_NAME} - это не каталог экспорта 'sdb user export'.")
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+def _insert_statement(dialect_name: str, table: Table, conflict_columns: Sequence[str],
+                      update_columns: Optional[Sequence[str]]):
+    """INSERT с обработкой конфликта по уникальному ключу: обновить update_columns или пропустить строку."""
+    if dialect_name in ("sqlite", "postgresql"):
+        stmt = (sqlite.insert if dialect_name == "sqlite" else postgresql.insert)(table)
+        if update_columns:
+            set_values = {name: stmt.excluded[name] for name in update_columns}
+            set_values["updated_at"] = func.now()
+            return stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_values)
+        return stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        if update_columns:
+            set_values = {name: stmt.inserted[name] for name in update_columns}
+            set_values["updated_at"] = func.now()
+            return stmt.on_duplicate_key_update(set_values)
+        return stmt.prefix_with("IGNORE")
+    raise ValueError(f"Импорт пользователей не поддерживает СУБД '{dialect_name}'.")
+
+
+async def _load_name_map(session: AsyncSession, model) -> Dict[str, int]:
+    result = await session.execute(select(model.name, model.id))
+    return {name: row_id for name, row_id in result.all()}
+
+
+async def _resolve_user_ids(session: AsyncSession, telegram_ids: Sequence[int]) -> Dict[int, int]:
+    user_ids: Dict[int, int] = {}
+    unique_ids = list(set(telegram_ids))
+    for start in range(0, len(unique_ids), ID_LOOKUP_CHUNK_SIZE):
+        chunk = unique_ids[start:start + ID_LOOKUP_CHUNK_SIZE]
+        result = await session.execute(select(User.telegram_id, User.id).where(User.telegram_id.in_(chunk)))
+        user_ids.update((telegram_id, user_id) for telegram_id, user_id in result.all())
+    return user_ids
+
+
+async def import_users(
+    session: AsyncSession,
+    input_dir: Path,
+    on_conflict: str = "update",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> TransferStats:
+    """
+    Загружает каталог 'sdb user export' пачками с коммитом на каждую пачку.
+
+    on_conflict: "update" - существующие (по telegram_id) пользователи обновляются, "skip" - остаются как есть.
+    Роли и прямые разрешения только добавляются; неизвестные роли/разрешения/пользователи пропускаются
+    и считаются в статистике.
+    """
+    if on_conflict not in ("update", "skip"):
+        raise ValueError("on_conflict должен быть 'update' или 'skip'.")
+    manifest = read_manifest(input_dir)
+    fmt = manifest.get("format", "")
+    _check_format(fmt)
+    dialect_name = session.get_bind().dialect.name
+    stats = TransferStats()
+
+    user_update_columns = None
+    if on_conflict == "update":
+        user_update_columns = [name for name in USER_FIELDS if name not in ("telegram_id", "created_at")]
+    users_stmt = _insert_statement(dialect_name, User.__table__, ["telegram_id"], user_update_columns)
+    users_path = _dataset_path(input_dir, USERS_DATASET, fmt)
+    if users_path.is_file():
+        for raw_batch in _iter_batches(users_path, fmt, batch_size):
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            rows = []
+            for raw in raw_batch:
+                row = _coerce_record(raw, USER_FIELDS)
+                if row["telegram_id"] is None:
+                    raise ValueError(f"Запись пользователя без telegram_id: {raw}")
+                if row["username_lower"] is None and row["username"]:
+                    row["username_lower"] = row["username"].lower()
+                row["is_active"] = True if row["is_active"] is None else row["is_active"]
+                row["is_bot_blocked"] = bool(row["is_bot_blocked"])
+                row["created_at"] = row["created_at"] or now
+                row["updated_at"] = now
+                rows.append(row)
+            await session.execute(users_stmt, rows)
+            await session.commit()
+            stats.users += len(rows)
+            if progress:
+                progress(USERS_DATASET, stats.users)
+        logger.info(f"Импорт '{USERS_DATASET}': {stats.users} строк.")
+
+    relations = (
+        (USER_ROLES_DATASET, UserRole.__table__, Role, "role", "role_id", "unknown_roles"),
+        (USER_PERMISSIONS_DATASET, UserPermission.__table__, Permission, "permission", "permission_id", "unknown_permissions"),
+    )
+    for dataset, table, target_model, name_field, target_column, unknown_counter in relations:
+        path = _dataset_path(input_dir, dataset, fmt)
+        if not path.is_file():
+            continue
+        target_ids = await _load_name_map(session, target_model)
+        stmt = _insert_statement(dialect_name, table, ["user_id", target_column], None)
+        imported = 0
+        for raw_batch in _iter_batches(path, fmt, batch_size):
+            records = [_coerce_record(raw, DATASET_FIELDS[dataset]) for raw in raw_batch]
+            user_ids = await _resolve_user_ids(session, [record["telegram_id"] for record in records])
+            rows = []
+            for record in records:
+                user_id = user_ids.get(record["telegram_id"])
+                target_id = target_ids.get(record[name_field])
+                if user_id is None:
+                    stats.unknown_users += 1
+                elif target_id is None:
+                    setattr(stats, unknown_counter, getattr(stats, unknown_counter) + 1)
+                else:
+                    rows.append({"user_id": user_id, target_column: target_id})
+            if rows:
+                await session.execute(stmt, rows)
+                await session.commit()
+            imported += len(rows)
+            if progress:
+                progress(dataset, imported)
+        setattr(stats, dataset, imported)
+        logger.info(f"Импорт '{dataset}': {imported} строк.")
+    return stats
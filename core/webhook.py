@@ -0,0 +1,86 @@
+# core/webhook.py
+
+import asyncio
+import signal
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from loguru import logger as global_logger
+
+if TYPE_CHECKING:
+    from core.app_settings import TelegramSettings
+
+logger = global_logger.bind(service="WebhookServer")
+
+
+def get_webhook_url(telegram_settings: 'TelegramSettings') -> str:
+    return f"{str(telegram_settings.webhook_url).rstrip('/')}/{telegram_settings.webhook_path.lstrip('/')}"
+
+
+def build_webhook_app(dp: Dispatcher, bot: Bot, telegram_settings: 'TelegramSettings',
+                      handle_in_background: bool = True, **workflow_data: Any) -> web.Application:
+    """
+    aiohttp-приложение, которое принимает апдейты Telegram по webhook_path и передает их
+    в тот же Dispatcher, что и polling. Startup/shutdown хуки Dispatcher'а привязаны к
+    жизненному циклу приложения.
+
+    handle_in_background=False - ответ Telegram отправляется после передачи апдейта в Dispatcher
+    (используется вместе с UpdateScheduler, который сам ставит апдейт в очередь).
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=handle_in_background,
+        secret_token=telegram_settings.webhook_secret_token,
+        **workflow_data,
+    ).register(app, path=telegram_settings.webhook_path)
+    setup_application(app, dp, bot=bot, **workflow_data)
+    return app
+
+
+async def set_telegram_webhook(bot: Bot, dp: Dispatcher, telegram_settings: 'TelegramSettings') -> None:
+    url = get_webhook_url(telegram_settings)
+    await bot.set_webhook(
+        url=url,
+        secret_token=telegram_settings.webhook_secret_token,
+        max_connections=telegram_settings.webhook_max_connections,
+        allowed_updates=dp.resolve_used_update_types(),
+        drop_pending_updates=telegram_settings.webhook_drop_pending_updates,
+    )
+    logger.info(f"Webhook установлен: {url} (max_connections: {telegram_settings.webhook_max_connections}, "
+                f"secret_token: {'задан' if telegram_settings.webhook_secret_token else 'не задан'}).")
+
+
+async def run_webhook_server(dp: Dispatcher, bot: Bot, telegram_settings: 'TelegramSettings',
+                             handle_in_background: bool = True) -> None:
+    """Поднимает aiohttp-сервер и работает до SIGINT/SIGTERM (или отмены задачи)."""
+    app = build_webhook_app(dp, bot, telegram_settings, handle_in_background=handle_in_background)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=telegram_settings.webhook_listen_host, port=telegram_settings.webhook_listen_port)
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    installed_signals = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+            installed_signals.append(sig)
+        except (NotImplementedError, RuntimeError):
+            # Windows: остановка через KeyboardInterrupt/отмену задачи
+            pass
+
+    try:
+        await site.start()
+        logger.info(f"Webhook-сервер слушает {telegram_settings.webhook_listen_host}:{telegram_settings.webhook_listen_port}"
+                    f"{telegram_settings.webhook_path}")
+        await stop_event.wait()
+        logger.info("Получен сигнал остановки, webhook-сервер останавливается...")
+    finally:
+        for sig in installed_signals:
+            loop.remove_signal_handler(sig)
+        # cleanup() вызывает on_shutdown приложения -> shutdown-хуки Dispatcher'а
+        await runner.cleanup()
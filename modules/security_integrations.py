@@ -7,27 +7,82 @@ import asyncio
 import aiohttp
 import json
 import hashlib
-import hmac
 import time
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Tuple, TYPE_CHECKING
 from pathlib import Path
 import logging
-from datetime import datetime, timedelta
-import ssl
-import socket
-import subprocess
+from datetime import datetime
 import platform
 import os
 import shutil
 
+from core.app_settings import HttpClientSettings, settings
+from core.cache.manager import CacheManager
+from core.http_client.manager import HTTPClientManager
+
+if TYPE_CHECKING:
+    from core.http_client.manager import HTTPResponse
+
 logger = logging.getLogger(__name__)
 
+RESULT_CACHE_KEY_PREFIX = "sdb:security:"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Кэш результатов при cache.type: memory (или недоступном Redis) - один на процесс для всех экземпляров
+_process_memory_cache: Optional[CacheManager] = None
+
+
+class ProviderRateLimiter:
+    """Не больше max_concurrency одновременных вызовов и не чаще requests_per_minute запросов в минуту."""
+
+    def __init__(self, requests_per_minute: float = 0, max_concurrency: int = 0):
+        self._interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self):
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        try:
+            if self._interval:
+                async with self._lock:
+                    now = time.monotonic()
+                    wait = self._next_slot - now
+                    self._next_slot = max(now, self._next_slot) + self._interval
+                if wait > 0:
+                    await asyncio.sleep(wait)
+        except BaseException:
+            if self._semaphore is not None:
+                self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+class _UncacheableResult(Exception):
+    """Результат с ошибкой: возвращается вызывающим, но не кэшируется."""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("error"))
+        self.result = result
+
+
 class SecurityIntegrations:
     """Класс для интеграций с внешними сервисами безопасности"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[HTTPClientManager] = None, cache_manager: Optional[CacheManager] = None):
         self.config = self._load_config()
-        self.session = None
+        self.http = http_client
+        self.cache = cache_manager
+        self._cache_injected = cache_manager is not None
+        self._owned_http: Optional[HTTPClientManager] = None
+        self._owned_cache: Optional[CacheManager] = None
+        self._enter_count = 0
+        self._limiters: Dict[str, ProviderRateLimiter] = {}
         self.system_info = self._detect_system()
     
     def _detect_system(self) -> Dict[str, Any]:
@@ -55,15 +110,24 @@ class SecurityIntegrations:
             return False
     
     def _load_config(self) -> Dict[str, Any]:
-        """Загрузка конфигурации интеграций"""
+        """Загрузка конфигурации интеграций (недостающие ключи берутся из значений по умолчанию)"""
+        config = self._default_config()
         config_file = Path("config/security_integrations.json")
         if config_file.exists():
             try:
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    loaded = json.load(f)
+                for section, value in loaded.items():
+                    if isinstance(value, dict) and isinstance(config.get(section), dict):
+                        config[section].update(value)
+                    else:
+                        config[section] = value
             except Exception as e:
                 logger.error(f"Ошибка загрузки конфигурации: {e}")
-        
+        return config
+    
+    @staticmethod
+    def _default_config() -> Dict[str, Any]:
         return {
             "virustotal": {
                 "enabled": False,
@@ -94,18 +158,165 @@ class SecurityIntegrations:
                 "privileged_mode": False,
                 "timeout": 300,
                 "max_retries": 3
+            },
+            # Лимиты на провайдера: бесплатные тарифы API ограничены по частоте, локальные сканеры - по CPU/сети
+            "rate_limits": {
+                "virustotal": {"requests_per_minute": 4, "max_concurrency": 1},
+                "shodan": {"requests_per_minute": 60, "max_concurrency": 1},
+                "abuseipdb": {"requests_per_minute": 60, "max_concurrency": 2},
+                "securitytrails": {"requests_per_minute": 30, "max_concurrency": 2},
+                "nmap": {"max_concurrency": 1},
+                "sslyze": {"max_concurrency": 2},
+                "openssl": {"max_concurrency": 4}
+            },
+            # Кэш результатов по (провайдер, цель); 0 - не кэшировать
+            "result_cache": {
+                "ttl_seconds": 3600,
+                "provider_ttl_seconds": {"nmap": 1800, "sslyze": 21600, "openssl": 21600}
             }
         }
     
     async def __aenter__(self):
-        """Асинхронный контекстный менеджер"""
-        self.session = aiohttp.ClientSession()
+        """Асинхронный контекстный менеджер: HTTP-клиент и кэш, если они не переданы извне"""
+        self._enter_count += 1
+        if self._enter_count > 1:
+            return self
+        try:
+            if self.cache is None:
+                self.cache = await self._default_cache()
+            if self.http is None:
+                self._owned_http = self.http = HTTPClientManager(
+                    http_settings=HttpClientSettings(cache_enabled=False), cache_manager=self.cache
+                )
+                await self.http.initialize()
+        except BaseException:
+            await self.__aexit__(None, None, None)
+            raise
+        # Примитивы asyncio создаются заново: CLI запускает каждый вызов в своем event loop
+        self._limiters = {
+            provider: ProviderRateLimiter(limits.get("requests_per_minute", 0), limits.get("max_concurrency", 0))
+            for provider, limits in self.config.get("rate_limits", {}).items()
+        }
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Закрытие сессии"""
-        if self.session:
-            await self.session.close()
+        """Освобождение HTTP-клиента и кэша, созданных в __aenter__"""
+        self._enter_count = max(0, self._enter_count - 1)
+        if self._enter_count:
+            return
+        if self._owned_http is not None:
+            await self._owned_http.dispose()
+            self.http = self._owned_http = None
+        if self._owned_cache is not None:
+            await self._owned_cache.dispose()
+            self._owned_cache = None
+        if not self._cache_injected:
+            self.cache = None
+    
+    async def _default_cache(self) -> CacheManager:
+        """
+        Кэш по settings.cache, если он не передан извне. С Redis/tiered результаты видят следующие
+        запуски CLI и бот; memory-кэш общий для процесса и не закрывается на выходе из контекста.
+        """
+        global _process_memory_cache
+        if settings.cache.type != "memory":
+            cache = CacheManager(cache_settings=settings.cache)
+            await cache.initialize()
+            if cache.is_available():
+                self._owned_cache = cache
+                return cache
+            await cache.dispose()
+            logger.warning(f"Кэш '{settings.cache.type}' недоступен, результаты проверок кэшируются только в памяти процесса")
+        if _process_memory_cache is None:
+            _process_memory_cache = CacheManager(cache_settings=settings.cache.model_copy(update={"type": "memory"}))
+            await _process_memory_cache.initialize()
+        return _process_memory_cache
+    
+    # === ОБЩИЕ ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ===
+    
+    def _limiter(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            limiter = self._limiters[provider] = ProviderRateLimiter()
+        return limiter
+    
+    def _result_ttl(self, provider: str) -> int:
+        cache_config = self.config.get("result_cache", {})
+        return int(cache_config.get("provider_ttl_seconds", {}).get(provider, cache_config.get("ttl_seconds", 0)))
+    
+    async def _cached(self, provider: str, target: str, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Результат loader() из кэша по (provider, target). Одновременные запросы одной цели
+        выполняются один раз; результаты с ошибкой не кэшируются.
+        """
+        ttl = self._result_ttl(provider)
+        if self.cache is None or not self.cache.is_available() or ttl <= 0:
+            return await loader()
+        
+        async def load() -> Dict[str, Any]:
+            result = await loader()
+            if result.get("error") or result.get("success") is False:
+                raise _UncacheableResult(result)
+            return {**result, "cached_at": datetime.now().isoformat()}
+        
+        key = f"{RESULT_CACHE_KEY_PREFIX}{provider}:{hashlib.sha256(target.encode('utf-8')).hexdigest()[:32]}"
+        try:
+            return await self.cache.get_or_load(
+                key, load, ttl_seconds=ttl, lock_timeout_seconds=float(self.config["scan_options"]["timeout"])
+            )
+        except _UncacheableResult as e:
+            return e.result
+    
+    async def _request_json(self, provider: str, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        """HTTP-запрос к API провайдера через общий пул соединений с учетом лимитов провайдера"""
+        if self.http is None:
+            raise RuntimeError("HTTP-клиент не инициализирован: используйте `async with SecurityIntegrations()`")
+        async with self._limiter(provider):
+            response: 'HTTPResponse' = await self.http.request(method, url, **kwargs)
+        payload = await response.json(content_type=None)
+        if response.ok:
+            return payload
+        # Ответ API с ошибкой (лимит, неверный ключ...) отдается как есть, но помечается для кэша
+        if isinstance(payload, dict):
+            return {**payload, "success": False, "status": response.status}
+        return {"error": f"HTTP {response.status}", "response": payload, "status": response.status}
+    
+    @staticmethod
+    def _command_result(returncode: int, stdout: str, stderr: str, **fields: Any) -> Dict[str, Any]:
+        """Результат локального сканера: stderr отдельно, error - только при ненулевом коде возврата"""
+        result = {"success": returncode == 0, "output": stdout, "stderr": stderr, **fields}
+        if returncode != 0:
+            result["error"] = stderr.strip() or f"Код возврата {returncode}"
+        return result
+    
+    async def _run_command(self, provider: str, args: List[str], timeout: float,
+                           stdin_data: Optional[bytes] = None) -> Tuple[int, str, str]:
+        """Запуск локального сканера без блокировки event loop. asyncio.TimeoutError при превышении timeout."""
+        async with self._limiter(provider):
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(stdin_data), timeout=timeout)
+            except BaseException:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+        return (process.returncode,
+                stdout.decode("utf-8", errors="replace"),
+                stderr.decode("utf-8", errors="replace"))
+    
+    @staticmethod
+    def _sha256_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
     
     # === VIRUSTOTAL INTEGRATION ===
     
@@ -115,12 +326,8 @@ class SecurityIntegrations:
             return {"error": "VirusTotal не настроен"}
         
         try:
-            # Читаем файл
-            with open(file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Вычисляем SHA-256 хеш
-            file_hash = hashlib.sha256(file_content).hexdigest()
+            # SHA-256 считается по кускам в потоке: файл не читается в память целиком и не блокирует loop
+            file_hash = await asyncio.to_thread(self._sha256_file, file_path)
             
             # Проверяем хеш в VirusTotal
             result = await self._virustotal_check_hash(file_hash)
@@ -143,19 +350,24 @@ class SecurityIntegrations:
             "resource": file_hash
         }
         
-        async with self.session.get(url, params=params) as response:
-            return await response.json()
+        async def load() -> Dict[str, Any]:
+            result = await self._request_json("virustotal", "GET", url, params=params)
+            # Неизвестный VirusTotal файл (response_code 0) будет загружен - такой ответ не кэшируем
+            return result if result.get("response_code") != 0 else {**result, "success": False}
+        
+        result = await self._cached("virustotal_file", file_hash, load)
+        return {key: value for key, value in result.items() if key != "success"}
     
     async def _virustotal_upload_file(self, file_path: str) -> Dict[str, Any]:
         """Загрузка файла в VirusTotal для сканирования"""
         url = f"{self.config['virustotal']['base_url']}/file/scan"
         
         with open(file_path, 'rb') as f:
-            files = {"file": f}
-            data = {"apikey": self.config["virustotal"]["api_key"]}
-            
-            async with self.session.post(url, data=data, files=files) as response:
-                return await response.json()
+            # Файл передается потоком, не читаясь в память целиком
+            form = aiohttp.FormData()
+            form.add_field("apikey", self.config["virustotal"]["api_key"])
+            form.add_field("file", f, filename=Path(file_path).name)
+            return await self._request_json("virustotal", "POST", url, data=form)
     
     async def virustotal_scan_url(self, url: str) -> Dict[str, Any]:
         """Сканирование URL через VirusTotal"""
@@ -169,8 +381,8 @@ class SecurityIntegrations:
                 "resource": url
             }
             
-            async with self.session.get(vt_url, params=params) as response:
-                return await response.json()
+            return await self._cached("virustotal_url", url,
+                                      lambda: self._request_json("virustotal", "GET", vt_url, params=params))
                 
         except Exception as e:
             logger.error(f"Ошибка сканирования URL в VirusTotal: {e}")
@@ -187,8 +399,8 @@ class SecurityIntegrations:
             url = f"{self.config['shodan']['base_url']}/shodan/host/{ip}"
             params = {"key": self.config["shodan"]["api_key"]}
             
-            async with self.session.get(url, params=params) as response:
-                return await response.json()
+            return await self._cached("shodan_host", ip,
+                                      lambda: self._request_json("shodan", "GET", url, params=params))
                 
         except Exception as e:
             logger.error(f"Ошибка получения информации о хосте в Shodan: {e}")
@@ -207,8 +419,8 @@ class SecurityIntegrations:
                 "limit": limit
             }
             
-            async with self.session.get(url, params=params) as response:
-                return await response.json()
+            return await self._cached("shodan_search", f"{query}\n{limit}",
+                                      lambda: self._request_json("shodan", "GET", url, params=params))
                 
         except Exception as e:
             logger.error(f"Ошибка поиска в Shodan: {e}")
@@ -232,8 +444,8 @@ class SecurityIntegrations:
                 "Accept": "application/json"
             }
             
-            async with self.session.get(url, params=params, headers=headers) as response:
-                return await response.json()
+            return await self._cached("abuseipdb", ip,
+                                      lambda: self._request_json("abuseipdb", "GET", url, params=params, headers=headers))
                 
         except Exception as e:
             logger.error(f"Ошибка проверки IP в AbuseIPDB: {e}")
@@ -257,8 +469,7 @@ class SecurityIntegrations:
                 "Content-Type": "application/x-www-form-urlencoded"
             }
             
-            async with self.session.post(url, data=data, headers=headers) as response:
-                return await response.json()
+            return await self._request_json("abuseipdb", "POST", url, data=data, headers=headers)
                 
         except Exception as e:
             logger.error(f"Ошибка отправки жалобы в AbuseIPDB: {e}")
@@ -277,8 +488,8 @@ class SecurityIntegrations:
                 "APIKEY": self.config["securitytrails"]["api_key"]
             }
             
-            async with self.session.get(url, headers=headers) as response:
-                return await response.json()
+            return await self._cached("securitytrails_domain", domain,
+                                      lambda: self._request_json("securitytrails", "GET", url, headers=headers))
                 
         except Exception as e:
             logger.error(f"Ошибка получения информации о домене в SecurityTrails: {e}")
@@ -295,8 +506,8 @@ class SecurityIntegrations:
                 "APIKEY": self.config["securitytrails"]["api_key"]
             }
             
-            async with self.session.get(url, headers=headers) as response:
-                return await response.json()
+            return await self._cached("securitytrails_subdomains", domain,
+                                      lambda: self._request_json("securitytrails", "GET", url, headers=headers))
                 
         except Exception as e:
             logger.error(f"Ошибка получения поддоменов в SecurityTrails: {e}")
@@ -312,40 +523,37 @@ class SecurityIntegrations:
         if not self.system_info["available_tools"]["nmap"]:
             return {"error": "Nmap не установлен в системе"}
         
-        try:
-            # Определяем параметры сканирования в зависимости от прав
-            if scan_type == "basic":
-                if self.system_info["is_root"] and not self.system_info["is_container"]:
-                    args = ["nmap", "-sS", "-sV", "-O", target]
-                else:
-                    args = ["nmap", "-sV", target]
-            elif scan_type == "full":
-                if self.system_info["is_root"] and not self.system_info["is_container"]:
-                    args = ["nmap", "-sS", "-sV", "-O", "-A", "--script=vuln", target]
-                else:
-                    args = ["nmap", "-sV", "-A", target]
-            elif scan_type == "quick":
-                args = ["nmap", "-F", target]
+        privileged = self.system_info["is_root"] and not self.system_info["is_container"]
+        # Определяем параметры сканирования в зависимости от прав
+        if scan_type == "basic":
+            if privileged:
+                args = ["nmap", "-sS", "-sV", "-O", target]
             else:
-                return {"error": f"Неизвестный тип сканирования: {scan_type}"}
-            
-            # Выполняем сканирование
-            result = subprocess.run(args, capture_output=True, text=True, timeout=self.config["scan_options"]["timeout"])
-            
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-                "scan_type": scan_type,
-                "target": target,
-                "privileged": self.system_info["is_root"] and not self.system_info["is_container"]
-            }
-            
-        except subprocess.TimeoutExpired:
-            return {"error": "Сканирование Nmap превысило лимит времени"}
-        except Exception as e:
-            logger.error(f"Ошибка сканирования Nmap: {e}")
-            return {"error": str(e), "error_details": f"Exception: {type(e).__name__}: {e}"}
+                args = ["nmap", "-sV", target]
+        elif scan_type == "full":
+            if privileged:
+                args = ["nmap", "-sS", "-sV", "-O", "-A", "--script=vuln", target]
+            else:
+                args = ["nmap", "-sV", "-A", target]
+        elif scan_type == "quick":
+            args = ["nmap", "-F", target]
+        else:
+            return {"error": f"Неизвестный тип сканирования: {scan_type}"}
+        
+        async def scan() -> Dict[str, Any]:
+            try:
+                returncode, stdout, stderr = await self._run_command(
+                    "nmap", args, timeout=self.config["scan_options"]["timeout"]
+                )
+                return self._command_result(returncode, stdout, stderr, scan_type=scan_type, target=target,
+                                            privileged=privileged)
+            except asyncio.TimeoutError:
+                return {"error": "Сканирование Nmap превысило лимит времени"}
+            except Exception as e:
+                logger.error(f"Ошибка сканирования Nmap: {e}")
+                return {"error": str(e), "error_details": f"Exception: {type(e).__name__}: {e}"}
+        
+        return await self._cached("nmap", f"{target}\n{scan_type}", scan)
     
     async def sslyze_scan(self, target: str, port: int = 443) -> Dict[str, Any]:
         """Сканирование SSL с помощью SSLyze"""
@@ -355,46 +563,44 @@ class SecurityIntegrations:
         if not self.system_info["available_tools"]["sslyze"]:
             return {"error": "SSLyze не установлен в системе"}
         
-        try:
-            # Выполняем сканирование
-            args = ["sslyze", "--regular", f"{target}:{port}"]
-            result = subprocess.run(args, capture_output=True, text=True, timeout=60)
-            
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-                "target": f"{target}:{port}"
-            }
-            
-        except subprocess.TimeoutExpired:
-            return {"error": "Сканирование SSLyze превысило лимит времени"}
-        except Exception as e:
-            logger.error(f"Ошибка сканирования SSLyze: {e}")
-            return {"error": str(e)}
+        async def scan() -> Dict[str, Any]:
+            try:
+                returncode, stdout, stderr = await self._run_command(
+                    "sslyze", ["sslyze", "--regular", f"{target}:{port}"], timeout=60
+                )
+                return self._command_result(returncode, stdout, stderr, target=f"{target}:{port}")
+            except asyncio.TimeoutError:
+                return {"error": "Сканирование SSLyze превысило лимит времени"}
+            except Exception as e:
+                logger.error(f"Ошибка сканирования SSLyze: {e}")
+                return {"error": str(e)}
+        
+        return await self._cached("sslyze", f"{target}:{port}", scan)
     
     async def openssl_scan(self, target: str, port: int = 443) -> Dict[str, Any]:
         """Сканирование SSL с помощью OpenSSL"""
         if not self.system_info["available_tools"]["openssl"]:
             return {"error": "OpenSSL не установлен в системе"}
         
-        try:
-            # Проверяем SSL сертификат
-            cmd = f"echo | openssl s_client -servername {target} -connect {target}:{port} 2>/dev/null | openssl x509 -noout -dates"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-            
-            return {
-                "success": result.returncode == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-                "target": f"{target}:{port}"
-            }
-            
-        except subprocess.TimeoutExpired:
-            return {"error": "Сканирование OpenSSL превысило лимит времени"}
-        except Exception as e:
-            logger.error(f"Ошибка сканирования OpenSSL: {e}")
-            return {"error": str(e)}
+        async def scan() -> Dict[str, Any]:
+            try:
+                # Аналог `echo | openssl s_client ... | openssl x509 -noout -dates` без shell
+                _, certificate, _ = await self._run_command(
+                    "openssl", ["openssl", "s_client", "-servername", target, "-connect", f"{target}:{port}"],
+                    timeout=30, stdin_data=b"",
+                )
+                returncode, stdout, stderr = await self._run_command(
+                    "openssl", ["openssl", "x509", "-noout", "-dates"],
+                    timeout=30, stdin_data=certificate.encode("utf-8"),
+                )
+                return self._command_result(returncode, stdout, stderr, target=f"{target}:{port}")
+            except asyncio.TimeoutError:
+                return {"error": "Сканирование OpenSSL превысило лимит времени"}
+            except Exception as e:
+                logger.error(f"Ошибка сканирования OpenSSL: {e}")
+                return {"error": str(e)}
+        
+        return await self._cached("openssl", f"{target}:{port}", scan)
     
     # === SYSTEM INFORMATION ===
     
@@ -440,29 +646,30 @@ class SecurityIntegrations:
             "results": {}
         }
         
+        # Проверки независимы: выполняются одновременно, каждая - в пределах лимитов своего провайдера
+        checks: Dict[str, Awaitable[Dict[str, Any]]] = {}
+        if self.config["abuseipdb"]["enabled"]:
+            checks["abuseipdb"] = self.abuseipdb_check_ip(target)
+        if self.config["shodan"]["enabled"]:
+            checks["shodan"] = self.shodan_host_info(target)
+        if self.config["local_scanners"]["nmap"] and self.system_info["available_tools"]["nmap"]:
+            checks["nmap"] = self.nmap_scan(target, "basic")
+        if self.config["local_scanners"]["sslyze"] and self.system_info["available_tools"]["sslyze"]:
+            checks["sslyze"] = self.sslyze_scan(target)
+        elif self.system_info["available_tools"]["openssl"]:
+            checks["openssl"] = self.openssl_scan(target)
+        if "." in target and self.config["securitytrails"]["enabled"]:
+            checks["securitytrails"] = self.securitytrails_domain_info(target)
+        
         try:
-            # 1. Проверка в AbuseIPDB
-            if self.config["abuseipdb"]["enabled"]:
-                audit_results["results"]["abuseipdb"] = await self.abuseipdb_check_ip(target)
-            
-            # 2. Информация о хосте в Shodan
-            if self.config["shodan"]["enabled"]:
-                audit_results["results"]["shodan"] = await self.shodan_host_info(target)
-            
-            # 3. Nmap сканирование
-            if self.config["local_scanners"]["nmap"] and self.system_info["available_tools"]["nmap"]:
-                audit_results["results"]["nmap"] = await self.nmap_scan(target, "basic")
-            
-            # 4. SSL сканирование
-            if self.config["local_scanners"]["sslyze"] and self.system_info["available_tools"]["sslyze"]:
-                audit_results["results"]["sslyze"] = await self.sslyze_scan(target)
-            elif self.system_info["available_tools"]["openssl"]:
-                audit_results["results"]["openssl"] = await self.openssl_scan(target)
-            
-            # 5. Проверка DNS и доменной информации
-            if "." in target and self.config["securitytrails"]["enabled"]:
-                audit_results["results"]["securitytrails"] = await self.securitytrails_domain_info(target)
-            
+            started = time.monotonic()
+            results = await asyncio.gather(*checks.values(), return_exceptions=True)
+            for name, result in zip(checks, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Ошибка проверки {name} в комплексном аудите: {result}")
+                    result = {"error": str(result)}
+                audit_results["results"][name] = result
+            audit_results["duration_seconds"] = round(time.monotonic() - started, 3)
             return audit_results
             
         except Exception as e:
@@ -0,0 +1,255 @@
+"""
+Tests for the broadcast engine: rate limiting, keyset delivery, blocked users, retry_after and resume
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+import pytest_asyncio
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.app_settings import BroadcastSettings
+from core.broadcast import BroadcastService, TelegramRateLimiter
+from core.database.base import Base
+from core.database.core_models import Broadcast, User
+
+BLOCKED_CHAT = 1003
+BAD_CHAT = 1005
+
+
+class FakeDBManager:
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def get_session(self):
+        async with self._session_factory() as session:
+            yield session
+
+
+class FakeBot:
+    """Records deliveries; scripted chats raise Telegram errors"""
+
+    def __init__(self, retry_after_once=None, network_errors=0, delay=0.0):
+        self.sent = []
+        self.copied = []
+        self.attempted_at = []
+        self._retry_after_once = dict(retry_after_once or {})
+        self._network_errors = network_errors
+        self._delay = delay
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        method = SendMessage(chat_id=chat_id, text=text)
+        self.attempted_at.append(time.monotonic())
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        if chat_id in self._retry_after_once:
+            raise TelegramRetryAfter(method, "Too Many Requests", self._retry_after_once.pop(chat_id))
+        if self._network_errors:
+            self._network_errors -= 1
+            raise TelegramNetworkError(method, "Connection reset")
+        if chat_id == BLOCKED_CHAT:
+            raise TelegramForbiddenError(method, "Forbidden: bot was blocked by the user")
+        if chat_id == BAD_CHAT:
+            raise TelegramBadRequest(method, "Bad Request: chat not found")
+        self.sent.append((chat_id, text, parse_mode))
+
+    async def copy_message(self, chat_id, from_chat_id, message_id):
+        self.copied.append((chat_id, from_chat_id, message_id))
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'broadcast.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        for i in range(1, 9):
+            # 1007 - неактивен, 1008 - уже заблокировал бота: им не отправляем
+            session.add(User(telegram_id=1000 + i, first_name=f"user{i}", is_active=i != 7, is_bot_blocked=i == 8))
+        await session.commit()
+    yield FakeDBManager(session_factory)
+    await engine.dispose()
+
+
+def _service(db, **overrides):
+    settings = BroadcastSettings(**{
+        "global_rate_per_second": 1000, "private_chat_interval_seconds": 0, "batch_size": 2,
+        "concurrency": 4, "max_retries": 1, **overrides,
+    })
+    return BroadcastService(db_manager=db, settings=settings)
+
+
+async def _user_blocked(db, telegram_id):
+    async with db.get_session() as session:
+        return (await session.execute(select(User.is_bot_blocked).where(User.telegram_id == telegram_id))).scalar_one()
+
+
+@pytest.mark.core
+class TestTelegramRateLimiter:
+    """Tests for core.broadcast.limiter"""
+
+    @pytest.mark.asyncio
+    async def test_global_rate_and_per_chat_interval(self):
+        """Messages are paced by the global rate; one chat waits its own interval"""
+        limiter = TelegramRateLimiter(rate_per_second=50, private_chat_interval_seconds=0.2)
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(chat_id) for chat_id in range(10)))
+        assert 0.15 <= time.monotonic() - started < 0.5
+
+        started = time.monotonic()
+        await limiter.acquire(77)
+        await limiter.acquire(77)
+        await limiter.acquire(-77)
+        assert 0.19 <= time.monotonic() - started < 0.5
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_all_chats(self):
+        """After pause() no chat gets a slot until retry_after elapses"""
+        limiter = TelegramRateLimiter(rate_per_second=1000, private_chat_interval_seconds=0)
+        limiter.pause(0.2)
+        started = time.monotonic()
+        await limiter.acquire(1)
+        assert time.monotonic() - started >= 0.19
+        assert limiter.get_stats()["retry_after_total"] == 1
+
+
+@pytest.mark.core
+class TestBroadcastService:
+    """Tests for core.broadcast.service"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_delivers_to_active_users_and_marks_blocked(self, db):
+        """Inactive and blocked users are skipped; Forbidden marks the user blocked; progress is persisted"""
+        service = _service(db)
+        broadcast = await service.create(text="<b>Новости</b>", created_by=42)
+        bot = FakeBot()
+        updates = []
+
+        result = await service.run(bot, broadcast.id, on_progress=lambda progress: updates.append(progress.processed))
+
+        assert result.status == "completed"
+        assert (result.total, result.sent, result.blocked, result.failed) == (6, 4, 1, 1)
+        assert sorted(chat_id for chat_id, _, _ in bot.sent) == [1001, 1002, 1004, 1006]
+        assert {parse_mode for _, _, parse_mode in bot.sent} == {"HTML"}
+        assert updates == [2, 4, 6, 6]
+        assert await _user_blocked(db, BLOCKED_CHAT) is True
+
+        stored = await service.get(broadcast.id)
+        assert stored.status == "completed" and stored.finished_at is not None
+        assert (stored.sent_count, stored.blocked_count, stored.failed_count) == (4, 1, 1)
+        assert "chat not found" in stored.last_error
+
+    @pytest.mark.asyncio
+    async def test_retry_after_and_network_errors_are_retried(self, db):
+        """429 waits retry_after and resends; a transient network error is retried"""
+        service = _service(db)
+        broadcast = await service.create(source_chat_id=42, source_message_id=7)
+        copy_bot = FakeBot()
+        assert (await service.run(copy_bot, broadcast.id)).sent == 6
+        assert {(from_chat, message_id) for _, from_chat, message_id in copy_bot.copied} == {(42, 7)}
+
+        bot = FakeBot(retry_after_once={1002: 0}, network_errors=1)
+        broadcast = await service.create(text="hello")
+        result = await service.run(bot, broadcast.id)
+        assert (result.sent, result.blocked, result.failed) == (4, 1, 1)
+        assert sorted(chat_id for chat_id, _, _ in bot.sent) == [1001, 1002, 1004, 1006]
+
+    @pytest.mark.asyncio
+    async def test_paused_broadcast_resumes_from_cursor(self, db):
+        """Pause from another caller stops at the next checkpoint; resume continues without duplicates"""
+        service = _service(db)
+        broadcast = await service.create(text="hello")
+        bot = FakeBot()
+
+        async def pause_after_first_batch(progress):
+            if progress.processed == 2:
+                assert await service.pause(broadcast.id)
+
+        first = await service.run(bot, broadcast.id, on_progress=pause_after_first_batch)
+        assert first.status == "paused"
+        assert first.processed == 4
+        assert [chat_id for chat_id, _, _ in bot.sent] == [1001, 1002, 1004]
+
+        second = await service.run(bot, broadcast.id)
+        assert second.status == "completed"
+        assert sorted(chat_id for chat_id, _, _ in bot.sent) == [1001, 1002, 1004, 1006]
+        assert (second.total, second.processed) == (6, 6)
+
+        with pytest.raises(ValueError):
+            await service.run(bot, broadcast.id)
+
+    @pytest.mark.asyncio
+    async def test_interrupted_broadcast_is_resumed_on_startup(self, db):
+        """Stopping the process marks running broadcasts interrupted; resume_unfinished picks them up"""
+        service = _service(db, batch_size=1, concurrency=1)
+        broadcast = await service.create(text="hello")
+        bot = FakeBot(delay=0.05)
+        task = service.start(bot, broadcast.id)
+        while len(bot.sent) < 1:
+            await asyncio.sleep(0.01)
+        assert service.is_running_here(broadcast.id)
+
+        await service.stop()
+        assert task.cancelled()
+        assert (await service.get(broadcast.id)).status == "interrupted"
+
+        other_process = _service(db)
+        with pytest.raises(ValueError):
+            # Свежая running-рассылка другого процесса не забирается
+            await other_process._set_status(broadcast.id, "running", ("interrupted",))
+            await other_process.run(bot, broadcast.id)
+
+        await other_process._set_status(broadcast.id, "interrupted", ("running",))
+        assert await other_process.resume_unfinished(bot) == [broadcast.id]
+        await asyncio.gather(*other_process._tasks.values())
+        stored = await other_process.get(broadcast.id)
+        assert stored.status == "completed"
+        assert stored.processed_count == 6
+        assert len({chat_id for chat_id, _, _ in bot.sent}) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrent_broadcasts_share_the_bot_rate_limit(self, db):
+        """Two broadcasts at once stay within one global rate; retry_after in one pauses the other"""
+        service = _service(db, global_rate_per_second=20, concurrency=10, batch_size=10)
+        first = await service.create(text="first")
+        second = await service.create(text="second")
+        bot = FakeBot()
+
+        results = await asyncio.gather(service.run(bot, first.id), service.run(bot, second.id))
+        assert [result.processed for result in results] == [6, 6]
+        # 12 отправок при 20 в секунду на двоих: не меньше 11 интервалов по 50 мс
+        assert len(bot.attempted_at) == 12
+        assert bot.attempted_at[-1] - bot.attempted_at[0] >= 11 / 20 - 0.03
+        assert service.get_stats()["limiter"]["rate_per_second"] == 20
+
+        service = _service(db)
+        flooded, other = await service.create(text="flooded"), await service.create(text="other")
+        flooded_bot, other_bot = FakeBot(retry_after_once={1001: 0.3}), FakeBot()
+        started = time.monotonic()
+        flooded_task = asyncio.create_task(service.run(flooded_bot, flooded.id))
+        while not flooded_bot.attempted_at:
+            await asyncio.sleep(0)
+        await service.run(other_bot, other.id)
+        await flooded_task
+        assert other_bot.attempted_at[0] - started >= 0.25
+        assert service.get_stats()["limiter"]["retry_after_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_create_requires_content_and_cancel_is_final(self, db):
+        service = _service(db)
+        with pytest.raises(ValueError):
+            await service.create(text="   ")
+        broadcast = await service.create(text="hello")
+        assert await service.cancel(broadcast.id)
+        assert not await service.pause(broadcast.id)
+        with pytest.raises(ValueError):
+            await service.run(FakeBot(), broadcast.id)
+        async with db.get_session() as session:
+            assert (await session.get(Broadcast, broadcast.id)).finished_at is not None
@@ -0,0 +1,78 @@
+"""
+Tests for CacheManager.get_or_load single-flight loading
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from core.cache.manager import CacheManager
+
+
+def _memory_cache_settings(**overrides):
+    settings = dict(
+        type="memory", redis_url=None, default_ttl_seconds=300, memory_maxsize=100,
+        memory_max_bytes=0, memory_eviction_policy="lru", memory_shards=1,
+    )
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+
+@pytest_asyncio.fixture
+async def cache_manager():
+    manager = CacheManager(cache_settings=_memory_cache_settings())
+    await manager.initialize()
+    yield manager
+    await manager.dispose()
+
+
+@pytest.mark.unit
+class TestGetOrLoad:
+    """Tests for CacheManager.get_or_load"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_call_loader_once(self, cache_manager):
+        """Concurrent misses on one key share a single loader call"""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache_manager.get_or_load("key", loader, ttl_seconds=60) for _ in range(10)))
+
+        assert results == ["value"] * 10
+        assert calls == 1
+        assert await cache_manager.get("key") == "value"
+
+    @pytest.mark.asyncio
+    async def test_loader_error_is_not_cached(self, cache_manager):
+        """A failing loader raises for every waiter and leaves the key empty"""
+        async def loader():
+            raise RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            await cache_manager.get_or_load("key", loader, ttl_seconds=60)
+        assert await cache_manager.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_stale_value_is_served_while_refreshing(self, cache_manager, monkeypatch):
+        """After ttl the stale value is returned and a background refresh stores the new one"""
+        import core.cache.manager as manager_module
+        values = iter(["old", "new"])
+
+        async def loader():
+            return next(values)
+
+        assert await cache_manager.get_or_load("key", loader, ttl_seconds=10, stale_ttl_seconds=60) == "old"
+
+        real_time = manager_module.time.time
+        monkeypatch.setattr(manager_module.time, "time", lambda: real_time() + 20)
+        assert await cache_manager.get_or_load("key", loader, ttl_seconds=10, stale_ttl_seconds=60) == "old"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await cache_manager.get_or_load("key", loader, ttl_seconds=10, stale_ttl_seconds=60) == "new"
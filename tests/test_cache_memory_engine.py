@@ -0,0 +1,101 @@
+"""
+Tests for the in-process cache engine used by MemoryCache
+"""
+
+import pytest
+
+from core.cache import memory_engine
+from core.cache.memory_engine import ShardedMemoryStore
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(memory_engine.time, "monotonic", lambda: clock["now"])
+    return clock
+
+
+@pytest.mark.unit
+class TestShardedMemoryStore:
+    """Tests for ShardedMemoryStore"""
+
+    def test_per_key_ttl(self, fake_clock):
+        """Each key expires on its own TTL instead of a global one"""
+        store = ShardedMemoryStore(maxsize=10, shards=1, default_ttl=300)
+        store.set("short", 1, ttl_seconds=5)
+        store.set("long", 2, ttl_seconds=60)
+        store.set("default", 3)
+
+        fake_clock["now"] += 10
+        assert store.get("short") is None
+        assert store.get("long") == 2
+        assert store.get("default") == 3
+
+        fake_clock["now"] += 300
+        assert store.get("long") is None
+        assert store.get("default") is None
+        assert store.get_stats()["expirations"] == 3
+
+    def test_lru_eviction_keeps_recently_used(self, fake_clock):
+        """Reading a key protects it from LRU eviction"""
+        store = ShardedMemoryStore(maxsize=2, shards=1)
+        store.set("a", 1)
+        store.set("b", 2)
+        assert store.get("a") == 1
+        store.set("c", 3)
+
+        assert store.contains("a")
+        assert not store.contains("b")
+        assert store.get_stats()["evictions"] == 1
+
+    def test_lfu_eviction_drops_least_used(self, fake_clock):
+        """LFU evicts the least used key among the oldest entries"""
+        store = ShardedMemoryStore(maxsize=3, shards=1, policy="lfu")
+        store.set("a", 1)
+        store.set("b", 2)
+        store.set("c", 3)
+        for _ in range(3):
+            store.get("a")
+            store.get("c")
+        store.set("d", 4)
+
+        assert not store.contains("b")
+        assert store.contains("a") and store.contains("c") and store.contains("d")
+
+    def test_byte_size_bound(self, fake_clock):
+        """Byte accounting evicts entries once max_bytes is exceeded"""
+        store = ShardedMemoryStore(maxsize=100, max_bytes=100, shards=1, size_estimator=len)
+        store.set("a", "x" * 60)
+        store.set("b", "y" * 60)
+
+        assert not store.contains("a")
+        assert store.get_stats()["bytes_used"] == 60
+
+    def test_batch_operations_and_counters(self, fake_clock):
+        """get_many/set_many/delete_many work across shards and update counters"""
+        store = ShardedMemoryStore(maxsize=100, shards=4)
+        store.set_many({f"k{i}": i for i in range(10)}, ttl_seconds=30)
+
+        found = store.get_many(["k1", "k2", "missing"])
+        assert found == {"k1": 1, "k2": 2}
+        assert store.delete_many(["k1", "k2", "missing"]) == 2
+        assert len(store) == 8
+
+        stats = store.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    def test_incr_keeps_original_ttl(self, fake_clock):
+        """incr creates a counter with TTL and later increments do not extend it"""
+        store = ShardedMemoryStore(maxsize=10, shards=1)
+        assert store.incr("counter", ttl_seconds=10) == 1
+        fake_clock["now"] += 5
+        assert store.incr("counter", 2, ttl_seconds=10) == 3
+        fake_clock["now"] += 6
+        assert store.get("counter") is None
+
+    def test_get_or_set_returns_existing_value(self, fake_clock):
+        """get_or_set only writes when the key is absent"""
+        store = ShardedMemoryStore(maxsize=10, shards=1)
+        assert store.get_or_set("key", "first") == "first"
+        assert store.get_or_set("key", "second") == "first"
@@ -0,0 +1,68 @@
+"""
+Tests for CacheSerializer used by RedisCache
+"""
+
+import pickle
+import pytest
+
+from core.cache.serializers import MSGPACK_AVAILABLE, CacheSerializer
+
+FORMATS = ["json", pytest.param("msgpack", marks=pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed"))]
+
+
+@pytest.mark.unit
+class TestCacheSerializer:
+    """Tests for CacheSerializer"""
+
+    @pytest.mark.parametrize("serializer", ["pickle", "json"])
+    def test_roundtrip(self, serializer):
+        """Values survive dumps/loads for each format"""
+        codec = CacheSerializer(serializer=serializer)
+        value = {"roles": ["admin", "user"], "count": 3}
+        assert codec.loads(codec.dumps(value)) == value
+
+    def test_json_falls_back_to_pickle_for_unsupported_values(self):
+        """Values json cannot represent are stored with pickle and still decode"""
+        codec = CacheSerializer(serializer="json")
+        value = {1, 2, 3}
+        assert codec.loads(codec.dumps(value)) == value
+
+    @pytest.mark.parametrize("serializer", FORMATS)
+    @pytest.mark.parametrize("value", [
+        (1, "a"),
+        {"pair": (1, 2), "nested": [(3, 4)]},
+        {1: "one", 2: "two"},
+        {"by_id": {10: [1, 2]}},
+    ], ids=["tuple", "nested_tuple", "int_keys", "nested_int_keys"])
+    def test_values_come_back_unchanged(self, serializer, value):
+        """Tuples and int-keyed dicts are restored as stored, not as lists / str-keyed dicts"""
+        codec = CacheSerializer(serializer=serializer)
+        restored = codec.loads(codec.dumps(value))
+        assert restored == value
+        assert type(restored) is type(value)
+        assert [type(key) for key in restored] == [type(key) for key in value]
+
+    def test_format_is_kept_only_for_exact_roundtrips(self):
+        """json is used while the value survives it unchanged, pickle otherwise"""
+        codec = CacheSerializer(serializer="json")
+        assert codec._encode({"roles": ["admin"], "count": 3})[0] == "json"
+        assert codec._encode({1: "one"})[0] == "pickle"
+        assert codec._encode([("a", 1)])[0] == "pickle"
+        if MSGPACK_AVAILABLE:
+            assert CacheSerializer(serializer="msgpack")._encode({1: "one"})[0] == "msgpack"
+
+    def test_compression_above_threshold(self):
+        """Large values are compressed, small ones are left as is"""
+        codec = CacheSerializer(serializer="json", compression="zlib", compression_min_bytes=64)
+        small, large = "x" * 10, "y" * 4096
+        assert len(codec.dumps(small)) < 64
+        large_raw = codec.dumps(large)
+        assert len(large_raw) < 1024
+        assert codec.loads(large_raw) == large
+
+    def test_reads_legacy_pickle_and_plain_counters(self):
+        """Bare pickle from the old RedisCache and INCRBY counters are readable"""
+        codec = CacheSerializer()
+        assert codec.loads(pickle.dumps({"a": 1})) == {"a": 1}
+        assert codec.loads(b"42") == 42
+        assert codec.loads(b"-7") == -7
@@ -0,0 +1,189 @@
+"""
+Tests for the two-level TieredCache: L1 hits, L2 fallback, L1 TTL capping and pub/sub invalidation between processes
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from core.cache.manager import BaseCache, MemoryCache, TieredCache
+
+CHANNEL = "sdb:test:invalidate"
+
+
+class FakeRedisServer:
+    """Shared state of one Redis: keys with expiry and pub/sub subscribers"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self._server = server
+        self._queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self._server.subscribers.append((channel, self._queue))
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        # Без asyncio.wait_for: на 3.11 он может проглотить отмену слушателя при готовом сообщении
+        if self._queue.empty():
+            await asyncio.sleep(min(timeout, 0.01))
+            return None
+        return self._queue.get_nowait()
+
+    async def aclose(self):
+        self._server.subscribers = [item for item in self._server.subscribers if item[1] is not self._queue]
+
+
+class FakeRedisClient:
+    def __init__(self, server):
+        self._server = server
+
+    async def publish(self, channel, data):
+        for subscribed_channel, queue in self._server.subscribers:
+            if subscribed_channel == channel:
+                queue.put_nowait({"type": "message", "data": data})
+
+    def pubsub(self):
+        return FakePubSub(self._server)
+
+
+class FakeRedisCache(BaseCache):
+    """L2 with the RedisCache interface used by TieredCache, over FakeRedisServer"""
+
+    def __init__(self, server):
+        self._server = server
+        self._client = FakeRedisClient(server)
+        self.reads = 0
+
+    async def initialize(self):
+        pass
+
+    async def dispose(self):
+        pass
+
+    def _live(self, key):
+        value, expires_at = self._server.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._server.data.pop(key, None)
+            return None, None
+        return value, expires_at
+
+    async def get_with_ttl(self, key):
+        self.reads += 1
+        value, expires_at = self._live(key)
+        return value, None if expires_at is None else expires_at - time.monotonic()
+
+    async def get_many_with_ttl(self, keys):
+        found = {}
+        for key in keys:
+            value, remaining_ttl = await self.get_with_ttl(key)
+            if value is not None:
+                found[key] = (value, remaining_ttl)
+        return found
+
+    async def get(self, key):
+        return (await self.get_with_ttl(key))[0]
+
+    async def set(self, key, value, ttl_seconds=None):
+        self._server.data[key] = (value, time.monotonic() + ttl_seconds if ttl_seconds else None)
+
+    async def delete(self, key):
+        return self._server.data.pop(key, None) is not None
+
+    async def exists(self, key):
+        return self._live(key)[0] is not None
+
+    async def clear(self):
+        self._server.data.clear()
+
+    def get_client_instance(self):
+        return self._client
+
+
+def _tiered(server, l1_ttl_seconds=30):
+    return TieredCache(MemoryCache(maxsize=100, shards=1), FakeRedisCache(server), CHANNEL, l1_ttl_seconds=l1_ttl_seconds)
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "условие не выполнилось за отведенное время"
+        await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def server():
+    return FakeRedisServer()
+
+
+@pytest_asyncio.fixture
+async def instances(server):
+    first, second = _tiered(server), _tiered(server)
+    await first.initialize()
+    await second.initialize()
+    await _wait_for(lambda: len(server.subscribers) == 2)
+    yield first, second
+    await first.dispose()
+    await second.dispose()
+
+
+@pytest.mark.unit
+class TestTieredCache:
+    """Tests for core.cache.manager.TieredCache"""
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, instances):
+        cache, _ = instances
+        await cache.set("user:1", {"name": "Ivan"}, ttl_seconds=60)
+        assert await cache.get("user:1") == {"name": "Ivan"}
+        assert cache._l2.reads == 0
+
+    @pytest.mark.asyncio
+    async def test_l2_fallback_fills_l1(self, server, instances):
+        _, cache = instances
+        await FakeRedisCache(server).set("user:1", "from-redis", ttl_seconds=60)
+        await FakeRedisCache(server).set("user:2", "other", ttl_seconds=60)
+
+        assert await cache.get("user:1") == "from-redis"
+        assert await cache.get("user:1") == "from-redis"
+        assert cache._l2.reads == 1
+        assert await cache.get_many(["user:1", "user:2", "user:3"]) == {"user:1": "from-redis", "user:2": "other"}
+        assert cache._l2.reads == 3  # user:1 уже в L1, в Redis идут только user:2 и user:3
+
+    @pytest.mark.asyncio
+    async def test_l1_copy_never_outlives_redis_key(self, server, instances):
+        _, cache = instances
+        await FakeRedisCache(server).set("session", "value", ttl_seconds=0.2)
+        await FakeRedisCache(server).set("forever", "value")
+
+        assert await cache.get("session") == "value"
+        assert await cache.get_many(["forever"]) == {"forever": "value"}
+        await asyncio.sleep(0.3)
+        assert await cache.get("session") is None
+        reads = cache._l2.reads
+        assert await cache.get("forever") == "value"
+        assert cache._l2.reads == reads  # ключ без срока живет в L1 обычный l1_ttl
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate_l1_of_other_instances(self, instances):
+        first, second = instances
+        await first.set("config", "v1", ttl_seconds=60)
+        await _wait_for(lambda: second.get_stats()["invalidations_received"] == 1)
+        assert await second.get("config") == "v1"
+
+        await first.set("config", "v2", ttl_seconds=60)
+        await _wait_for(lambda: second.get_stats()["invalidations_received"] == 2)
+        assert await second.get("config") == "v2"
+
+        await second.delete("config")
+        await _wait_for(lambda: first.get_stats()["invalidations_received"] == 1)
+        assert await first.get("config") is None
+        # Собственные сообщения экземпляр пропускает
+        assert first.get_stats()["invalidations_published"] == 2
+        assert second.get_stats()["invalidations_received"] == 2
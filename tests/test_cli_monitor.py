@@ -573,4 +573,47 @@ class TestMonitorHelpers:
         assert _format_uptime(86400) == "1 дней"
         
         # Тест для 0 секунд
-        assert _format_uptime(0) == "0 секунд" 
\ No newline at end of file
+        assert _format_uptime(0) == "0 секунд" 
+
+    @pytest.mark.monitor
+    @pytest.mark.unit
+    def test_db_pool_stats_prefers_bot_snapshot(self, tmp_path):
+        """Test _get_db_pool_stats reads pool stats published by the running bot"""
+        import time
+        from cli.monitor import _get_db_pool_stats
+        from core.monitoring.runtime_stats import get_runtime_stats_path
+
+        snapshot_path = get_runtime_stats_path(tmp_path)
+        snapshot_path.parent.mkdir(parents=True)
+        snapshot_path.write_text(json.dumps({
+            "pid": 4242,
+            "timestamp": time.time(),
+            "sections": {"db_pool": {"pool_class": "AsyncAdaptedQueuePool", "size": 5, "checked_out": 2,
+                                     "checked_in": 3, "overflow": 0}},
+        }))
+        settings = Mock()
+        settings.core.project_data_path = tmp_path
+        db_manager = Mock()
+
+        stats = _get_db_pool_stats(settings, db_manager)
+
+        assert stats["source"] == "bot"
+        assert stats["pid"] == 4242
+        assert stats["checked_out"] == 2
+        db_manager.get_pool_stats.assert_not_called()
+
+    @pytest.mark.monitor
+    @pytest.mark.unit
+    def test_db_pool_stats_falls_back_to_cli_pool(self, tmp_path):
+        """Test _get_db_pool_stats uses the CLI process pool when no fresh snapshot exists"""
+        from cli.monitor import _get_db_pool_stats
+
+        settings = Mock()
+        settings.core.project_data_path = tmp_path
+        db_manager = Mock()
+        db_manager.get_pool_stats.return_value = {"pool_class": "AsyncAdaptedQueuePool", "checked_out": 0}
+
+        stats = _get_db_pool_stats(settings, db_manager)
+
+        assert stats["source"] == "cli"
+        assert stats["checked_out"] == 0
@@ -0,0 +1,264 @@
+"""
+Tests for HTTPClientManager: retries, per-host concurrency, response cache and streaming
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientResponseError, web
+from aiohttp.test_utils import TestServer
+
+from core.app_settings import HttpClientSettings
+from core.cache.manager import CacheManager
+from core.cache.serializers import CacheSerializer
+from core.http_client.manager import HTTPClientManager, freshness_lifetime, retry_after_seconds
+
+
+class FakeUpstream:
+    """aiohttp app with scripted behaviour per route and a request log"""
+
+    def __init__(self):
+        self.hits = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.etag = '"v1"'
+        self.app = web.Application()
+        self.app.router.add_get("/flaky", self.flaky)
+        self.app.router.add_post("/flaky", self.flaky)
+        self.app.router.add_get("/slow", self.slow)
+        self.app.router.add_get("/fresh", self.fresh)
+        self.app.router.add_get("/etag", self.etag_route)
+        self.app.router.add_get("/no-store", self.no_store)
+        self.app.router.add_get("/big", self.big)
+        self.app.router.add_get("/binary", self.binary)
+
+    def _hit(self, request: web.Request) -> int:
+        key = f"{request.method} {request.path}"
+        self.hits[key] = self.hits.get(key, 0) + 1
+        return self.hits[key]
+
+    async def flaky(self, request):
+        if self._hit(request) < 3:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return web.json_response({"ok": True})
+
+    async def slow(self, request):
+        self._hit(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        return web.Response(text="done")
+
+    async def fresh(self, request):
+        number = self._hit(request)
+        return web.json_response({"n": number}, headers={"Cache-Control": "max-age=60"})
+
+    async def etag_route(self, request):
+        number = self._hit(request)
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag, "Cache-Control": "no-cache"})
+        return web.json_response({"n": number}, headers={"ETag": self.etag, "Cache-Control": "no-cache"})
+
+    async def no_store(self, request):
+        number = self._hit(request)
+        return web.json_response({"n": number}, headers={"Cache-Control": "no-store"})
+
+    async def binary(self, request):
+        self._hit(request)
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304, headers={"ETag": self.etag, "Cache-Control": "no-cache"})
+        response = web.Response(body=bytes(range(256)), content_type="application/octet-stream",
+                                headers={"ETag": self.etag, "Cache-Control": "no-cache"})
+        response.headers.add("X-Tag", "a")
+        response.headers.add("X-Tag", "b")
+        return response
+
+    async def big(self, request):
+        self._hit(request)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(8):
+            await response.write(b"x" * 1024)
+        await response.write_eof()
+        return response
+
+
+class SerializingCache:
+    """CacheManager stand-in that stores values the way RedisCache does, through CacheSerializer"""
+
+    def __init__(self, serializer):
+        self._serializer = CacheSerializer(serializer=serializer)
+        self.data = {}
+        self.formats = []
+
+    def is_available(self):
+        return True
+
+    async def get(self, key):
+        raw_value = self.data.get(key)
+        return self._serializer.loads(raw_value) if raw_value is not None else None
+
+    async def set(self, key, value, ttl_seconds=None):
+        self.formats.append(self._serializer._encode(value)[0])
+        self.data[key] = self._serializer.dumps(value)
+
+
+def _memory_cache_settings():
+    return SimpleNamespace(
+        type="memory", redis_url=None, default_ttl_seconds=300, memory_maxsize=100,
+        memory_max_bytes=0, memory_eviction_policy="lru", memory_shards=1,
+    )
+
+
+@pytest_asyncio.fixture
+async def upstream():
+    fake = FakeUpstream()
+    server = TestServer(fake.app)
+    await server.start_server()
+    fake.url = lambda path: str(server.make_url(path))
+    yield fake
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def cache_manager():
+    manager = CacheManager(cache_settings=_memory_cache_settings())
+    await manager.initialize()
+    yield manager
+    await manager.dispose()
+
+
+@pytest_asyncio.fixture
+async def make_client(cache_manager):
+    clients = []
+
+    async def factory(**overrides):
+        settings = HttpClientSettings(retry_backoff_seconds=0.01, **overrides)
+        client = HTTPClientManager(http_settings=settings, cache_manager=cache_manager)
+        await client.initialize()
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        await client.dispose()
+
+
+@pytest.mark.core
+class TestHTTPClientManager:
+    """Tests for core.http_client.manager"""
+
+    def test_freshness_lifetime_headers(self):
+        """max-age minus Age wins over Expires; no-cache means zero lifetime"""
+        assert freshness_lifetime({"Cache-Control": "public, max-age=120", "Age": "20"}) == 100
+        assert freshness_lifetime({"Cache-Control": "max-age=120, no-cache"}) == 0
+        assert freshness_lifetime({"Expires": "Thu, 01 Jan 2026 00:01:00 GMT",
+                                   "Date": "Thu, 01 Jan 2026 00:00:00 GMT"}) == 60
+        assert freshness_lifetime({}) == 0
+
+    def test_retry_after_parsing(self):
+        """Retry-After accepts seconds and HTTP dates"""
+        assert retry_after_seconds({"Retry-After": "5"}) == 5.0
+        assert retry_after_seconds({"Retry-After": "Thu, 01 Jan 2026 00:00:30 GMT"}, now=1767225600.0) == 30.0
+        assert retry_after_seconds({}) is None
+
+    @pytest.mark.asyncio
+    async def test_idempotent_request_is_retried(self, upstream, make_client):
+        """GET is retried on 503 until it succeeds; the body is readable after return"""
+        client = await make_client(retry_attempts=2)
+        response = await client.request("GET", upstream.url("/flaky"))
+
+        assert response.status == 200
+        assert await response.json() == {"ok": True}
+        assert upstream.hits["GET /flaky"] == 3
+        assert client.get_stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_post_is_not_retried(self, upstream, make_client):
+        """Non-idempotent methods get exactly one attempt"""
+        client = await make_client(retry_attempts=2)
+        with pytest.raises(ClientResponseError) as exc_info:
+            await client.request("POST", upstream.url("/flaky"), raise_for_status=True)
+
+        assert exc_info.value.status == 503
+        assert upstream.hits["POST /flaky"] == 1
+
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_limit(self, upstream, make_client):
+        """No more than max_concurrency_per_host requests reach one host at a time"""
+        client = await make_client(max_concurrency_per_host=2)
+        await asyncio.gather(*(client.request("GET", upstream.url("/slow")) for _ in range(6)))
+
+        assert upstream.hits["GET /slow"] == 6
+        assert upstream.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_fresh_response_served_from_cache(self, upstream, make_client):
+        """A response with max-age is served from CacheManager without a second request"""
+        client = await make_client()
+        first = await client.get_json(upstream.url("/fresh"))
+        second = await client.request("GET", upstream.url("/fresh"))
+
+        assert first == {"n": 1}
+        assert second.from_cache and await second.json() == {"n": 1}
+        assert upstream.hits["GET /fresh"] == 1
+        assert (await client.request("GET", upstream.url("/fresh"), use_cache=False)).from_cache is False
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation(self, upstream, make_client):
+        """A stale response with an ETag is revalidated and a 304 returns the cached body"""
+        client = await make_client()
+        await client.request("GET", upstream.url("/etag"))
+        revalidated = await client.request("GET", upstream.url("/etag"))
+
+        assert upstream.hits["GET /etag"] == 2
+        assert revalidated.status == 200 and revalidated.from_cache
+        assert await revalidated.json() == {"n": 1}
+        assert client.get_stats()["cache_revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_store_and_oversized_responses_not_cached(self, upstream, make_client):
+        """no-store responses and bodies above cache_max_body_bytes are never cached"""
+        client = await make_client(cache_max_body_bytes=1024)
+        for _ in range(2):
+            await client.request("GET", upstream.url("/no-store"))
+            await client.request("GET", upstream.url("/big"))
+
+        assert upstream.hits["GET /no-store"] == 2
+        assert upstream.hits["GET /big"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_entries_survive_json_serializer(self, upstream):
+        """Cache entries are plain JSON (base64 body, header lists), so cache.serializer: json really stores them"""
+        cache = SerializingCache("json")
+        client = HTTPClientManager(http_settings=HttpClientSettings(), cache_manager=cache)
+        await client.initialize()
+        try:
+            await client.request("GET", upstream.url("/fresh"))
+            cached = await client.request("GET", upstream.url("/fresh"))
+            await client.request("GET", upstream.url("/binary"))
+            revalidated = await client.request("GET", upstream.url("/binary"))
+        finally:
+            await client.dispose()
+
+        assert cache.formats == ["json"] * 3  # /fresh, /binary и обновление /binary после 304
+        assert cached.from_cache and await cached.json() == {"n": 1}
+        assert upstream.hits["GET /fresh"] == 1
+        assert revalidated.from_cache and revalidated.body == bytes(range(256))
+        assert revalidated.headers.getall("X-Tag") == ["a", "b"]
+        assert client.get_stats()["cache_revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_reads_body_in_chunks(self, upstream, make_client):
+        """stream() yields the live response for chunked reading"""
+        client = await make_client()
+        received = 0
+        async with client.stream("GET", upstream.url("/big")) as response:
+            async for chunk in response.content.iter_chunked(1024):
+                received += len(chunk)
+
+        assert response.status == 200
+        assert received == 8 * 1024
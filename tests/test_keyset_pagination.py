@@ -0,0 +1,145 @@
+"""
+Tests for keyset pagination: cursor encoding, forward/backward traversal with NULLs and row counts
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.database.base import Base
+from core.database.core_models import User
+from core.database.pagination import decode_cursor, encode_cursor, estimate_row_count, fetch_keyset_page
+from core.ui.callback_data_factories import AdminUsersPanelNavigate
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, 0, 123456)
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as db_session:
+        for i in range(1, 24):
+            # Повторяющиеся значения и NULL проверяют развязку по id
+            activity = None if i % 5 == 0 else BASE_TIME + timedelta(minutes=i // 3)
+            db_session.add(User(telegram_id=1000 + i, first_name=f"user{i}", last_activity_at=activity))
+        await db_session.commit()
+        yield db_session
+    await engine.dispose()
+
+
+def _expected_order(users, descending):
+    with_value = sorted((u for u in users if u.last_activity_at is not None),
+                        key=lambda u: (u.last_activity_at, u.id), reverse=descending)
+    without_value = sorted((u for u in users if u.last_activity_at is None), key=lambda u: u.id, reverse=descending)
+    return [u.id for u in with_value + without_value]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", [None, 0, -42, 10**15, True, BASE_TIME, "имя:с_разделителем"])
+def test_cursor_roundtrip(value):
+    cursor = encode_cursor(value, 123456)
+    assert ":" not in cursor
+    decoded_value, row_id = decode_cursor(cursor)
+    assert row_id == 123456
+    assert decoded_value == (int(value) if isinstance(value, bool) else value)
+
+
+@pytest.mark.unit
+def test_invalid_cursor_is_rejected():
+    for cursor in ("", "garbage", "x1.1", "i1.!"):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+@pytest.mark.unit
+def test_admin_callback_with_cursor_fits_telegram_limit():
+    cursor = encode_cursor(datetime(2099, 12, 31, 23, 59, 59, 999999), 2_000_000_000)
+    packed = AdminUsersPanelNavigate(action="list", page=99999, cursor=cursor, back=True, sort="act").pack()
+    assert len(packed.encode()) <= 64
+    assert AdminUsersPanelNavigate.unpack(packed).cursor == cursor
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("descending", [False, True])
+async def test_forward_and_backward_traversal(session, descending):
+    all_users = list((await session.execute(select(User))).scalars().all())
+    expected = _expected_order(all_users, descending)
+
+    pages, cursor = [], None
+    while True:
+        page = await fetch_keyset_page(session, select(User), User.last_activity_at, User.id, 5,
+                                       descending=descending, cursor=cursor)
+        pages.append(page)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    assert [u.id for page in pages for u in page.items] == expected
+    assert not pages[0].has_prev
+
+    # Назад от последней страницы получаем те же страницы
+    cursor = pages[-1].prev_cursor
+    for expected_page in reversed(pages[:-1]):
+        page = await fetch_keyset_page(session, select(User), User.last_activity_at, User.id, 5,
+                                       descending=descending, cursor=cursor, backward=True)
+        assert [u.id for u in page.items] == [u.id for u in expected_page.items]
+        assert page.has_next
+        cursor = page.prev_cursor
+    assert cursor is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backward", [False, True])
+async def test_nullable_sort_key_pages_through_index(session, backward):
+    """Every page query is served by the (key, id) index: no temp b-tree sort and no multi-index OR"""
+    first = await fetch_keyset_page(session, select(User), User.last_activity_at, User.id, 5, descending=True)
+    middle = await fetch_keyset_page(session, select(User), User.last_activity_at, User.id, 5,
+                                     descending=True, cursor=first.next_cursor)
+    null_cursor = encode_cursor(None, 20)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        # Только сами страницы: связи User (роли) догружаются отдельными запросами
+        if "FROM sdb_users" in statement and "ORDER BY" in statement:
+            statements.append((statement, parameters))
+
+    sync_engine = session.get_bind()
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        for cursor in (None, middle.next_cursor, null_cursor):
+            await fetch_keyset_page(session, select(User), User.last_activity_at, User.id, 5,
+                                    descending=True, cursor=cursor, backward=backward and cursor is not None)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    assert statements
+    for statement, parameters in statements:
+        plan = await _query_plan(session, statement, parameters)
+        assert "TEMP B-TREE" not in plan and "MULTI-INDEX OR" not in plan, plan
+        assert "ix_sdb_users_last_activity_at_id" in plan, plan
+
+
+async def _query_plan(session, statement, parameters):
+    connection = await session.connection()
+    raw = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters))
+    return " ".join(str(row[-1]) for row in raw.all())
+
+
+@pytest.mark.asyncio
+async def test_non_nullable_sort_key(session):
+    page = await fetch_keyset_page(session, select(User), User.id, User.id, 10, descending=True)
+    next_page = await fetch_keyset_page(session, select(User), User.id, User.id, 10,
+                                        descending=True, cursor=page.next_cursor)
+
+    assert [u.id for u in page.items] == list(range(23, 13, -1))
+    assert [u.id for u in next_page.items] == list(range(13, 3, -1))
+
+
+@pytest.mark.asyncio
+async def test_row_count_on_sqlite_is_exact(session):
+    assert await estimate_row_count(session, User.__table__) == (23, False)
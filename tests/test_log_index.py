@@ -0,0 +1,100 @@
+"""
+Tests for the SQLite log index used by `sdb monitor logs` and the admin logs viewer
+"""
+
+import json
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.log_index import LogIndex, get_log_index_path, is_live_log_file, parse_json_line
+
+PAST_HOUR = datetime(2024, 1, 15, 10, tzinfo=timezone.utc)
+
+
+def _hour_dir(root, moment):
+    path = root / moment.strftime("%Y") / f"{moment.strftime('%m')}-{moment.strftime('%B')}" / moment.strftime("%d")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _text_line(moment, level, message, name="core.test"):
+    return f"{moment.strftime('%Y-%m-%d %H:%M:%S')}.000 | {level: <8} | {name}:func:10 - {message}\n"
+
+
+@pytest.fixture
+def logs_root(tmp_path):
+    root = tmp_path / "Logs"
+    hour_dir = _hour_dir(root, PAST_HOUR)
+    lines = [
+        _text_line(PAST_HOUR, "INFO", "Bot started"),
+        _text_line(PAST_HOUR + timedelta(minutes=1), "ERROR", "Connection timeout"),
+        "Traceback (most recent call last):\n",
+        _text_line(PAST_HOUR + timedelta(minutes=2), "ERROR", "Connection timeout"),
+        _text_line(PAST_HOUR + timedelta(minutes=3), "WARNING", "Slow query 100%_done", name="core.database"),
+    ]
+    (hour_dir / "10_sdb.log").write_text("".join(lines), encoding="utf-8")
+    with zipfile.ZipFile(hour_dir / "09_sdb.2024-01-15_09-30-00_000000.log.zip", "w") as archive:
+        archive.writestr("09_sdb.log", _text_line(PAST_HOUR - timedelta(minutes=30), "CRITICAL", "Disk full"))
+    return root
+
+
+@pytest.fixture
+def log_index(logs_root):
+    return LogIndex(get_log_index_path(logs_root), logs_root)
+
+
+@pytest.mark.unit
+class TestLogIndex:
+    """Tests for core.log_index.LogIndex"""
+
+    def test_update_indexes_closed_files_once(self, log_index):
+        """Past-hour files and archives are indexed once; continuation lines are skipped"""
+        assert log_index.update() == {"files_indexed": 2, "entries_indexed": 5, "files_forgotten": 0}
+        assert log_index.update()["files_indexed"] == 0
+
+    def test_query_filters_by_level_and_search(self, log_index):
+        """Queries filter by minimum level and message substring, newest first"""
+        log_index.update()
+        errors = log_index.query(min_level="ERROR", include_live=False)
+        assert [entry["message"] for entry in errors] == ["Connection timeout", "Connection timeout", "Disk full"]
+        found = log_index.query(search="100%_d", include_live=False)
+        assert [(entry["logger"], entry["level"]) for entry in found] == [("core.database", "WARNING")]
+        assert log_index.query(search="100%_x", include_live=False) == []
+
+    def test_summary_counts_levels_and_top_errors(self, log_index):
+        """Summary reports real counts per level and the most frequent errors"""
+        log_index.update()
+        summary = log_index.summary()
+        assert summary["total"] == 5
+        assert summary["by_level"] == {"INFO": 1, "ERROR": 2, "WARNING": 1, "CRITICAL": 1}
+        assert summary["top_errors"][0] == {"message": "Connection timeout", "count": 2}
+
+    def test_removed_files_are_forgotten(self, log_index, logs_root):
+        """Entries of files removed by retention cleanup disappear from the index"""
+        log_index.update()
+        next(logs_root.rglob("*.zip")).unlink()
+        assert log_index.update()["files_forgotten"] == 1
+        assert log_index.summary()["total"] == 4
+
+    def test_live_file_is_parsed_on_the_fly(self, log_index, logs_root):
+        """The current hour's file is not indexed but is included in queries"""
+        now = datetime.now(timezone.utc)
+        live_path = _hour_dir(logs_root, now) / f"{now.strftime('%H')}_sdb.log"
+        live_path.write_text(_text_line(now.astimezone(), "ERROR", "Live failure"), encoding="utf-8")
+
+        assert is_live_log_file(live_path)
+        assert log_index.update()["files_indexed"] == 2
+        assert log_index.query(min_level="ERROR", limit=1)[0]["message"] == "Live failure"
+
+    def test_json_lines_keep_bound_fields(self):
+        """JSON sink lines keep bind() extras as separate fields"""
+        line = json.dumps({
+            "ts": "2024-01-15T10:00:00+00:00", "level": "ERROR", "level_no": 40, "logger": "core.users",
+            "message": "boom", "service": "UserService", "user_id": 42, "update_id": "7",
+        })
+        entry = parse_json_line(line)
+        assert entry["ts"] == PAST_HOUR.timestamp()
+        assert (entry["service"], entry["user_id"], entry["update_id"]) == ("UserService", 42, 7)
+        assert parse_json_line("not json") is None
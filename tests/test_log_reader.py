@@ -0,0 +1,92 @@
+"""
+Tests for LogReader: tail, indexed paging, search and zip archives
+"""
+
+import zipfile
+
+import pytest
+
+from core.log_reader import LogReader
+
+
+def _write_lines(path, count, start=0):
+    with open(path, "a", encoding="utf-8") as f:
+        for number in range(start, start + count):
+            f.write(f"line {number}\n")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "12_sdb.log"
+    _write_lines(path, 2500)
+    return path
+
+
+@pytest.mark.unit
+class TestLogReader:
+    """Tests for core.log_reader.LogReader"""
+
+    @pytest.mark.asyncio
+    async def test_tail_reads_last_lines_across_blocks(self, log_file, monkeypatch):
+        """Tail returns the last lines even when they span several backward blocks"""
+        monkeypatch.setattr("core.log_reader.TAIL_BLOCK_SIZE", 64)
+        lines = await LogReader().tail(log_file, 30)
+        assert lines == [f"line {n}" for n in range(2470, 2500)]
+
+    @pytest.mark.asyncio
+    async def test_tail_of_short_file(self, tmp_path):
+        """Tail of a file shorter than requested returns the whole file"""
+        path = tmp_path / "short.log"
+        path.write_text("a\nb", encoding="utf-8")
+        assert await LogReader().tail(path, 10) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_read_lines_uses_sparse_index(self, log_file):
+        """Pages are read from the nearest index anchor"""
+        reader = LogReader(stride=100)
+        assert await reader.count_lines(log_file) == 2500
+        assert await reader.read_lines(log_file, 1234, 3) == ["line 1234", "line 1235", "line 1236"]
+        assert await reader.read_lines(log_file, 2498, 10) == ["line 2498", "line 2499"]
+        assert await reader.read_lines(log_file, 5000, 10) == []
+
+    @pytest.mark.asyncio
+    async def test_index_follows_growing_file(self, log_file):
+        """Appended lines, including a completed partial line, are picked up incrementally"""
+        reader = LogReader(stride=100)
+        assert await reader.count_lines(log_file) == 2500
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("partial")
+        assert await reader.count_lines(log_file) == 2501
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(" done\n")
+        _write_lines(log_file, 10, start=2501)
+        assert await reader.count_lines(log_file) == 2511
+        assert await reader.read_lines(log_file, 2500, 2) == ["partial done", "line 2501"]
+
+    @pytest.mark.asyncio
+    async def test_index_is_rebuilt_after_truncation(self, log_file):
+        """A truncated file is indexed from scratch"""
+        reader = LogReader(stride=100)
+        assert await reader.count_lines(log_file) == 2500
+        log_file.write_text("fresh\n", encoding="utf-8")
+        assert await reader.count_lines(log_file) == 1
+        assert await reader.read_lines(log_file, 0, 5) == ["fresh"]
+
+    @pytest.mark.asyncio
+    async def test_zip_archive_is_read_without_extracting(self, log_file, tmp_path):
+        """Rotated .zip archives are tailed, paged and searched in place"""
+        archive_path = tmp_path / "12_sdb.2024-01-01_12-00-00_000000.log.zip"
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(log_file, arcname=log_file.name)
+        reader = LogReader(stride=100)
+
+        assert await reader.tail(archive_path, 2) == ["line 2498", "line 2499"]
+        assert await reader.count_lines(archive_path) == 2500
+        assert await reader.read_lines(archive_path, 777, 2) == ["line 777", "line 778"]
+        assert {path.name for path in tmp_path.iterdir()} == {log_file.name, archive_path.name}
+
+    @pytest.mark.asyncio
+    async def test_search_returns_last_matches(self, log_file):
+        """Search keeps the last max_results matches with 1-based line numbers"""
+        matches = await LogReader().search(log_file, r"line 24\d9$", max_results=3)
+        assert matches == [(2480, "line 2479"), (2490, "line 2489"), (2500, "line 2499")]
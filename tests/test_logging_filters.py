@@ -0,0 +1,60 @@
+"""
+Tests for LogVolumeFilter: per-logger levels, sampling and rate limiting of file log records
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from core.logging_filters import LogVolumeFilter
+
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+
+def _record(level="DEBUG", name="core.users.middleware", service=None):
+    extra = {"service": service} if service else {}
+    return {"level": SimpleNamespace(name=level, no=LEVELS[level]), "name": name, "extra": extra}
+
+
+@pytest.mark.unit
+class TestLogVolumeFilter:
+    """Tests for core.logging_filters.LogVolumeFilter"""
+
+    def test_level_overrides_use_longest_prefix(self):
+        """The longest matching module prefix decides the minimum level"""
+        volume_filter = LogVolumeFilter(
+            default_level="DEBUG", level_overrides={"core": "INFO", "core.database": "TRACE"},
+        )
+        assert volume_filter.min_level_no == LEVELS["TRACE"]
+        assert volume_filter(_record("TRACE", name="core.database.manager"))
+        assert not volume_filter(_record("DEBUG", name="core.rbac.service"))
+        assert volume_filter(_record("INFO", name="core.rbac.service"))
+        assert volume_filter(_record("DEBUG", name="modules.example"))
+        # "core" не должен совпадать с "core_extra"
+        assert volume_filter(_record("DEBUG", name="core_extra"))
+        assert volume_filter.get_stats()["dropped_by_level"] == 1
+
+    def test_sampling_keeps_one_in_n_per_service(self):
+        """Only every N-th low-level record of a sampled service is written"""
+        volume_filter = LogVolumeFilter(sampling={"RBACService": 5})
+        kept = sum(volume_filter(_record("DEBUG", service="RBACService")) for _ in range(20))
+        assert kept == 4
+        # Другие service и записи уровня INFO и выше не сэмплируются
+        assert all(volume_filter(_record("DEBUG", service="DBManager")) for _ in range(5))
+        assert all(volume_filter(_record("WARNING", service="RBACService")) for _ in range(5))
+        stats = volume_filter.get_stats()
+        assert stats["sampled_out"] == 16
+        assert stats["sampled_out_by_key"] == {"RBACService": 16}
+
+    def test_sampling_falls_back_to_module_name(self):
+        """Records without a service binding are sampled by module name"""
+        volume_filter = LogVolumeFilter(sampling={"core.users.middleware": 2})
+        assert [volume_filter(_record("DEBUG")) for _ in range(4)] == [True, False, True, False]
+
+    def test_rate_limit_per_key(self):
+        """No more than N low-level records per second pass for one key"""
+        volume_filter = LogVolumeFilter(rate_limit_per_second=3)
+        results = [volume_filter(_record("DEBUG", service="DBManager")) for _ in range(10)]
+        assert results.count(True) in (3, 6)  # граница секунды могла попасть внутрь цикла
+        assert volume_filter(_record("ERROR", service="DBManager"))
+        assert volume_filter.get_stats()["rate_limited"] == results.count(False)
@@ -0,0 +1,117 @@
+"""
+Tests for the event loop profiler: stall detection, sampling profiles and CLI profile requests
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from loguru import logger
+
+from core.admin.sys_info import handlers_sys_info
+from core.monitoring.loop_profiler import LoopProfiler, read_last_profile, request_profile
+
+
+def _blocking_call(seconds):
+    time.sleep(seconds)
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return LoopProfiler(tmp_path / "profiling", slow_threshold_ms=50, heartbeat_interval_ms=10, sample_interval_ms=2)
+
+
+@pytest.mark.monitor
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_stack(profiler):
+    profiler.start()
+    try:
+        await asyncio.sleep(0.05)
+        _blocking_call(0.2)
+        await asyncio.sleep(0.05)
+        stats = profiler.get_stats()
+    finally:
+        await profiler.stop()
+
+    assert stats["stalls_total"] == 1
+    assert "_blocking_call" in stats["last_stall"]["where"]
+    assert stats["last_stall"]["blocked_ms"] >= 150
+    assert stats["lag_max_ms"] >= 150
+
+
+@pytest.mark.monitor
+@pytest.mark.asyncio
+async def test_profile_writes_collapsed_stacks(profiler):
+    profiler.start()
+    try:
+        profile_task = asyncio.create_task(profiler.profile(duration_seconds=0.2))
+        await asyncio.sleep(0.05)
+        _blocking_call(0.1)
+        result = await profile_task
+    finally:
+        await profiler.stop()
+
+    lines = open(result["path"], encoding="utf-8").read().splitlines()
+    assert result["samples"] > 0
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("_blocking_call (" in line for line in lines)
+
+
+@pytest.mark.monitor
+@pytest.mark.asyncio
+async def test_profile_request_from_another_process(profiler):
+    profiler.start()
+    try:
+        request_id = request_profile(profiler.output_dir, duration_seconds=0.1)
+        result = None
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            result = read_last_profile(profiler.output_dir)
+            if result and result.get("request_id") == request_id:
+                break
+    finally:
+        await profiler.stop()
+
+    assert result is not None and result["request_id"] == request_id
+    assert result["samples"] > 0
+    assert not (profiler.output_dir / "profile_request.json").exists()
+
+
+@pytest.mark.monitor
+@pytest.mark.asyncio
+async def test_admin_profile_task_is_tracked_and_errors_logged():
+    release = asyncio.Event()
+    answers = []
+
+    class BusyProfiler:
+        async def profile(self, duration_seconds):
+            await release.wait()
+            raise RuntimeError("Профиль уже снимается.")
+
+    async def failing_send_message(*_args):
+        raise ConnectionError("telegram is down")
+
+    async def answer(text, show_alert=False):
+        answers.append(text)
+
+    query = SimpleNamespace(from_user=SimpleNamespace(id=1), answer=answer)
+    services = SimpleNamespace(config=SimpleNamespace(core=SimpleNamespace(super_admins=[1])), loop_profiler=BusyProfiler())
+    bot = SimpleNamespace(send_message=failing_send_message)
+    errors = []
+    sink_id = logger.add(lambda message: errors.append(message.record), level="ERROR")
+    try:
+        await handlers_sys_info.cq_admin_sys_info_profile(query, services, bot)
+        task = handlers_sys_info._profile_task
+        assert task is not None and not task.done()
+        await handlers_sys_info.cq_admin_sys_info_profile(query, services, bot)
+        assert handlers_sys_info._profile_task is task and "уже снимается" in answers[-1]
+
+        release.set()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+    finally:
+        logger.remove(sink_id)
+
+    assert handlers_sys_info._profile_task is None
+    assert [type(record["exception"].value) for record in errors] == [ConnectionError]
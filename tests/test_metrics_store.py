@@ -0,0 +1,109 @@
+"""
+Tests for the metrics store (batched writes, 1m/1h rollups, retention) and the background collector
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.monitoring.metrics_collector import MetricsCollector
+from core.monitoring.metrics_store import MetricsStore
+
+NOW = datetime(2024, 1, 15, 12, 0, 0)
+
+
+def _sample(moment, cpu, memory=50.0, sent=0):
+    return {
+        "timestamp": moment,
+        "cpu_percent": cpu,
+        "memory_percent": memory,
+        "disk_percent": 40.0,
+        "network_bytes_sent": sent,
+        "network_bytes_recv": sent,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    metrics_store = MetricsStore(tmp_path / "monitor" / "metrics.db", raw_retention_hours=48,
+                                 minute_retention_days=14, hour_retention_days=400)
+    yield metrics_store
+    metrics_store.close()
+
+
+@pytest.mark.monitor
+@pytest.mark.unit
+class TestMetricsStore:
+    def test_raw_history_is_newest_first(self, store):
+        store.insert_samples([_sample(NOW - timedelta(minutes=i), cpu=float(i)) for i in range(5)])
+
+        history = store.get_history(hours=1, now=NOW)
+
+        assert [record["cpu_percent"] for record in history] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert history[0]["timestamp"] == "2024-01-15 12:00:00"
+
+    def test_rollup_aggregates_minutes_and_hours(self, store):
+        base = datetime(2024, 1, 10, 10, 0, 0)
+        store.insert_samples([
+            _sample(base, cpu=10.0, sent=100),
+            _sample(base + timedelta(seconds=30), cpu=30.0, sent=200),
+            _sample(base + timedelta(minutes=1), cpu=50.0, sent=300),
+        ])
+        store.rollup()
+
+        minutes = store.get_history(hours=24 * 7, now=datetime(2024, 1, 10, 12, 0, 0))
+        assert [record["timestamp"] for record in minutes] == ["2024-01-10 10:01:00", "2024-01-10 10:00:00"]
+        assert minutes[1]["cpu_percent"] == pytest.approx(20.0)
+        assert minutes[1]["cpu_max"] == 30.0
+        assert minutes[1]["network_bytes_sent"] == 200
+
+        hours = store.get_history(hours=24 * 30, now=datetime(2024, 1, 10, 12, 0, 0))
+        assert len(hours) == 1
+        assert hours[0]["timestamp"] == "2024-01-10 10:00:00"
+        # Среднее по часу взвешено по числу замеров, а не по минутам
+        assert hours[0]["cpu_percent"] == pytest.approx(30.0)
+        assert hours[0]["cpu_max"] == 50.0
+        assert hours[0]["samples"] == 3
+
+    def test_rollup_is_incremental(self, store):
+        base = datetime(2024, 1, 10, 10, 0, 0)
+        store.insert_samples([_sample(base, cpu=10.0)])
+        store.rollup()
+        # Дописанная в ту же минуту точка пересчитывает последний бакет
+        store.insert_samples([_sample(base + timedelta(seconds=20), cpu=30.0)])
+        store.rollup()
+
+        minutes = store.get_history(hours=48, now=datetime(2024, 1, 11, 9, 0, 0))
+        assert len(minutes) == 1
+        assert minutes[0]["cpu_percent"] == pytest.approx(20.0)
+        assert minutes[0]["samples"] == 2
+
+    def test_resolution_depends_on_period(self, store):
+        assert store.resolution_for(6) == "raw"
+        assert store.resolution_for(72) == "1m"
+        assert store.resolution_for(720) == "1h"
+
+    def test_retention_removes_old_rows(self, store):
+        store.insert_samples([_sample(NOW - timedelta(days=3), cpu=1.0), _sample(NOW, cpu=2.0)])
+        store.rollup()
+        store.apply_retention(now=NOW)
+
+        assert [record["cpu_percent"] for record in store.get_history(hours=24, now=NOW)] == [2.0]
+        # Минутный агрегат трехдневной давности еще хранится
+        assert len(store.get_history(hours=96, now=NOW)) == 2
+
+
+@pytest.mark.monitor
+@pytest.mark.asyncio
+async def test_collector_flushes_buffer_on_stop(store):
+    collector = MetricsCollector(store, sample_interval_seconds=60, flush_interval_seconds=600)
+    collector.take_sample()
+    collector.take_sample()
+    assert collector.get_stats()["buffered"] == 2
+
+    await collector.stop()
+
+    stats = collector.get_stats()
+    assert stats["buffered"] == 0
+    assert stats["samples_written"] == 2
+    assert len(store.get_history(hours=1)) == 2
@@ -0,0 +1,288 @@
+"""
+Tests for the notification outbox, dispatcher (digests, retries, Telegram rate limits) and SMTP pool
+"""
+
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from core.notifications import NotificationDispatcher, NotificationOutbox, SmtpConnectionPool
+
+
+class FakeReceiver:
+    """Webhook and Telegram Bot API stand-in with a scripted status sequence"""
+
+    def __init__(self):
+        self.webhook_statuses = []
+        self.webhook_bodies = []
+        self.telegram_calls = []
+        self.telegram_retry_after = 0
+        self.app = web.Application()
+        self.app.router.add_post("/hook", self.hook)
+        self.app.router.add_post("/bot{token}/sendMessage", self.telegram)
+
+    async def hook(self, request):
+        self.webhook_bodies.append(await request.json())
+        status = self.webhook_statuses.pop(0) if self.webhook_statuses else 200
+        return web.json_response({}, status=status)
+
+    async def telegram(self, request):
+        payload = await request.json()
+        self.telegram_calls.append((time.monotonic(), payload))
+        if self.telegram_retry_after:
+            retry_after, self.telegram_retry_after = self.telegram_retry_after, 0
+            return web.json_response({"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                      "parameters": {"retry_after": retry_after}}, status=429)
+        return web.json_response({"ok": True, "result": {}})
+
+
+@pytest_asyncio.fixture
+async def receiver():
+    fake = FakeReceiver()
+    server = TestServer(fake.app)
+    await server.start_server()
+    fake.base_url = str(server.make_url("")).rstrip("/")
+    yield fake
+    await server.close()
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    store = NotificationOutbox(tmp_path / "outbox.db")
+    yield store
+    store.close()
+
+
+class _SlowClaimConnection:
+    """Wraps the outbox connection and stalls between the claim SELECT and its UPDATE"""
+
+    def __init__(self, conn, selected: threading.Event):
+        self._conn = conn
+        self._selected = selected
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def execute(self, sql, params=()):
+        cursor = self._conn.execute(sql, params)
+        if sql.startswith("SELECT") and "next_attempt_at <=" in sql:
+            rows = cursor.fetchall()
+            self._selected.set()
+            time.sleep(0.3)
+            return SimpleNamespace(fetchall=lambda: rows)
+        return cursor
+
+
+def _channels(receiver):
+    return {
+        "hook": {"type": "webhook", "status": "active", "config": {"url": f"{receiver.base_url}/hook"}},
+        "tg": {"type": "telegram", "status": "active",
+               "config": {"chat_id": "1001", "bot_token": "42:TEST", "api_url": receiver.base_url}},
+        "off": {"type": "webhook", "status": "inactive", "config": {"url": f"{receiver.base_url}/hook"}},
+    }
+
+
+@pytest.mark.core
+class TestNotificationOutbox:
+    """Tests for core.notifications.outbox"""
+
+    def test_claim_leases_rows_until_acknowledged(self, outbox):
+        """Claimed rows are invisible to other claimers until the lease expires"""
+        first = outbox.enqueue("hook", "one")
+        outbox.enqueue("hook", "two")
+
+        claimed = outbox.claim_due(limit=10, lease_seconds=60)
+        assert [row["message"] for row in claimed] == ["one", "two"]
+        assert all(row["attempts"] == 1 for row in claimed)
+        assert outbox.claim_due(limit=10) == []
+
+        outbox.mark_sent([first])
+        relaunched = outbox.claim_due(limit=10, now=time.time() + 61)
+        assert [row["message"] for row in relaunched] == ["two"]
+        assert relaunched[0]["attempts"] == 2
+
+    def test_two_processes_never_claim_the_same_row(self, outbox, tmp_path):
+        """A second connection (the CLI next to the bot) waits for an in-flight claim instead of re-reading its rows"""
+        outbox.enqueue("hook", "one")
+        outbox.enqueue("hook", "two")
+        other_process = NotificationOutbox(tmp_path / "outbox.db")
+        other_process.initialize()
+        selected = threading.Event()
+        outbox.initialize()
+        outbox._conn = _SlowClaimConnection(outbox._conn, selected)
+        claimed_here = []
+        claimer = threading.Thread(target=lambda: claimed_here.extend(outbox.claim_due(limit=10, lease_seconds=60)))
+        try:
+            claimer.start()
+            assert selected.wait(5)
+            claimed_there = other_process.claim_due(limit=10, lease_seconds=60)
+            claimer.join(5)
+        finally:
+            outbox._conn = outbox._conn._conn
+            other_process.close()
+
+        assert [row["message"] for row in claimed_here] == ["one", "two"]
+        assert claimed_there == []
+
+    def test_dedup_key_suppresses_repeats_within_cooldown(self, outbox):
+        """The same alert is enqueued once per cooldown, dead rows do not block it"""
+        assert outbox.enqueue("hook", "cpu", dedup_key="alert:cpu", cooldown_seconds=300) is not None
+        assert outbox.enqueue("hook", "cpu", dedup_key="alert:cpu", cooldown_seconds=300) is None
+        assert outbox.enqueue("tg", "cpu", dedup_key="alert:cpu", cooldown_seconds=300) is not None
+
+        outbox.mark_dead([row["id"] for row in outbox.claim_due()], "boom")
+        assert outbox.enqueue("hook", "cpu", dedup_key="alert:cpu", cooldown_seconds=300) is not None
+
+    def test_stats_requeue_and_purge(self, outbox):
+        """Dead rows can be requeued; old sent rows are purged"""
+        sent_id = outbox.enqueue("hook", "sent")
+        dead_id = outbox.enqueue("hook", "dead")
+        outbox.claim_due()
+        outbox.mark_sent([sent_id])
+        outbox.mark_dead([dead_id], "HTTP 400")
+
+        assert outbox.get_stats()["dead"] == 1
+        assert outbox.requeue_dead() == 1
+        assert outbox.get_stats()["pending"] == 1
+        assert outbox.purge(older_than_seconds=-1) == 1
+        assert outbox.get_stats()["sent"] == 0
+
+
+@pytest.mark.core
+class TestNotificationDispatcher:
+    """Tests for core.notifications.dispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced_into_digest(self, receiver, outbox):
+        """Several pending notifications for one channel go out as one message"""
+        async with NotificationDispatcher(_channels(receiver), outbox) as dispatcher:
+            for number in range(5):
+                await dispatcher.enqueue("hook", f"alert {number}", priority="urgent" if number == 3 else "high")
+            stats = await dispatcher.deliver_due()
+
+        assert stats == {"sent": 5, "retry": 0, "dead": 0}
+        assert len(receiver.webhook_bodies) == 1
+        body = receiver.webhook_bodies[0]
+        assert body["priority"] == "urgent"
+        assert all(f"alert {number}" in body["message"] for number in range(5))
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried_with_backoff(self, receiver, outbox):
+        """5xx keeps the notification pending with a delayed next attempt"""
+        receiver.webhook_statuses = [503]
+        async with NotificationDispatcher(_channels(receiver), outbox, retry_base_seconds=10) as dispatcher:
+            await dispatcher.enqueue("hook", "disk almost full")
+            assert (await dispatcher.deliver_due())["retry"] == 1
+            assert (await dispatcher.deliver_due())["sent"] == 0
+
+            pending = outbox.list_recent("pending")
+            assert pending[0]["last_error"] == "HTTP 503"
+            assert 5 <= pending[0]["next_attempt_at"] - time.time() <= 10
+
+            outbox.reschedule([pending[0]["id"]], time.time(), "forced")
+            assert (await dispatcher.deliver_due())["sent"] == 1
+        assert len(receiver.webhook_bodies) == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_failures_and_exhausted_attempts_are_dead(self, receiver, outbox):
+        """4xx, inactive channels and the last allowed attempt end as dead"""
+        receiver.webhook_statuses = [400, 503]
+        async with NotificationDispatcher(_channels(receiver), outbox, max_attempts=1) as dispatcher:
+            await dispatcher.enqueue("hook", "bad request")
+            await dispatcher.enqueue("off", "inactive channel")
+            first = await dispatcher.deliver_due()
+            await dispatcher.enqueue("hook", "server down")
+            second = await dispatcher.deliver_due()
+
+        assert first == {"sent": 0, "retry": 0, "dead": 2}
+        assert second == {"sent": 0, "retry": 0, "dead": 1}
+        assert outbox.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_telegram_respects_retry_after_and_chat_interval(self, receiver, outbox):
+        """429 retry_after postpones the row; messages to one chat are spaced out"""
+        receiver.telegram_retry_after = 7
+        async with NotificationDispatcher(_channels(receiver), outbox, telegram_chat_interval_seconds=0.2) as dispatcher:
+            await dispatcher.enqueue("tg", "<b>not html</b>")
+            assert (await dispatcher.deliver_due())["retry"] == 1
+            assert outbox.list_recent("pending")[0]["next_attempt_at"] - time.time() >= 6
+
+            dispatcher._chat_next_slot.clear()
+            channel = _channels(receiver)["tg"]
+            await dispatcher.send(channel, "first")
+            await dispatcher.send(channel, "second")
+
+        (_, rejected), (first_at, _), (second_at, payload) = receiver.telegram_calls
+        assert "&lt;b&gt;not html&lt;/b&gt;" in rejected["text"]
+        assert second_at - first_at >= 0.19
+        assert payload["chat_id"] == "1001" and payload["parse_mode"] == "HTML"
+
+
+class FakeSMTP:
+    """smtplib.SMTP replacement that records connections and can drop the link once"""
+
+    instances = []
+    fail_next_send = False
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.closed = False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def send_message(self, message):
+        if FakeSMTP.fail_next_send:
+            FakeSMTP.fail_next_send = False
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(message["Subject"])
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.core
+class TestSmtpConnectionPool:
+    """Tests for core.notifications.smtp"""
+
+    @pytest.mark.asyncio
+    async def test_connection_is_reused_and_reopened_after_disconnect(self, monkeypatch):
+        """Consecutive mails share one login; a dropped pooled connection is replaced transparently"""
+        FakeSMTP.instances = []
+        monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+        config = {"smtp_server": "smtp.example.com", "smtp_port": 587, "username": "bot", "password": "secret"}
+        pool = SmtpConnectionPool()
+        try:
+            for number in range(3):
+                message = EmailMessage()
+                message["Subject"] = f"mail {number}"
+                if number == 2:
+                    FakeSMTP.fail_next_send = True
+                await pool.send_message(config, message)
+        finally:
+            await pool.close()
+
+        assert len(FakeSMTP.instances) == 2
+        assert FakeSMTP.instances[0].sent == ["mail 0", "mail 1"]
+        assert FakeSMTP.instances[1].sent == ["mail 2"]
+        assert all(instance.closed for instance in FakeSMTP.instances)
@@ -0,0 +1,71 @@
+"""
+Tests for the in-process Prometheus metrics registry
+"""
+
+import pytest
+
+from core.monitoring.prometheus import MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.mark.monitor
+@pytest.mark.unit
+class TestMetricsRegistry:
+    def test_counter_render(self, registry):
+        counter = registry.counter("sdb_test_total", "Test counter.", ("kind",))
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind='quote"d')
+
+        text = registry.render()
+
+        assert "# HELP sdb_test_total Test counter." in text
+        assert "# TYPE sdb_test_total counter" in text
+        assert 'sdb_test_total{kind="a"} 3' in text
+        assert 'sdb_test_total{kind="quote\\"d"} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        histogram = registry.histogram("sdb_test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+
+        assert 'sdb_test_seconds_bucket{le="0.1"} 2' in lines
+        assert 'sdb_test_seconds_bucket{le="1"} 3' in lines
+        assert 'sdb_test_seconds_bucket{le="+Inf"} 4' in lines
+        assert "sdb_test_seconds_count 4" in lines
+        assert "sdb_test_seconds_sum 3.65" in lines
+
+    def test_labels_must_match(self, registry):
+        gauge = registry.gauge("sdb_test_gauge", "Test gauge.", ("pool",))
+        with pytest.raises(ValueError):
+            gauge.set(1)
+        with pytest.raises(ValueError):
+            gauge.set(1, pool="main", extra="x")
+
+    def test_register_is_idempotent(self, registry):
+        first = registry.counter("sdb_same_total", "Same.")
+        assert registry.counter("sdb_same_total", "Same.") is first
+        with pytest.raises(ValueError):
+            registry.gauge("sdb_same_total", "Same.")
+
+    def test_collect_hooks_run_before_render(self, registry):
+        gauge = registry.gauge("sdb_queue_depth", "Queue depth.")
+        registry.add_collect_hook(lambda: gauge.set(7))
+
+        assert "sdb_queue_depth 7" in registry.render()
+
+    def test_failing_collect_hook_does_not_break_render(self, registry):
+        registry.counter("sdb_ok_total", "Ok.").inc()
+
+        def broken_hook():
+            raise RuntimeError("boom")
+
+        registry.add_collect_hook(broken_hook)
+
+        assert "sdb_ok_total 1" in registry.render()
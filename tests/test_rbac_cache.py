@@ -0,0 +1,183 @@
+"""
+Tests for compiled RBAC permission sets: caching, batch checks and invalidation by every mutator
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.app_settings import RBACSettings
+from core.cache.manager import CacheManager
+from core.database.base import Base
+from core.database.core_models import Role, User
+from core.rbac.service import DEFAULT_ROLE_ADMIN, DEFAULT_ROLE_USER, RBACService
+from core.schemas.module_manifest import PermissionManifest
+
+TG_ID = 2001
+OWNER_TG_ID = 1
+MODULE_PERMISSION = "weather.access_user_features"
+
+
+class FakeDBManager:
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def get_session(self):
+        async with self._session_factory() as session:
+            yield session
+
+
+class FakeModuleLoader:
+    def __init__(self):
+        self.modules = []
+
+    def get_all_declared_permissions_from_active_modules(self):
+        return [perm for module in self.modules for perm in module.manifest.declared_permissions]
+
+    def get_all_modules_info(self):
+        return self.modules
+
+
+def _memory_cache_settings():
+    return SimpleNamespace(
+        type="memory", redis_url=None, default_ttl_seconds=300, memory_maxsize=1000,
+        memory_max_bytes=0, memory_eviction_policy="lru", memory_shards=1,
+    )
+
+
+@pytest_asyncio.fixture
+async def env(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rbac.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    queries = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    cache = CacheManager(cache_settings=_memory_cache_settings())
+    await cache.initialize()
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    services = SimpleNamespace(
+        db=FakeDBManager(session_factory),
+        cache=cache,
+        modules=FakeModuleLoader(),
+        config=SimpleNamespace(core=SimpleNamespace(super_admins=[OWNER_TG_ID], rbac=RBACSettings())),
+    )
+    rbac = RBACService(services=services)
+    async with session_factory() as session:
+        await rbac.ensure_default_entities_exist(session)
+        session.add(User(telegram_id=TG_ID, first_name="Ivan"))
+        await session.commit()
+        user = await _user(session)
+        assert await rbac.assign_role_to_user(session, user, DEFAULT_ROLE_ADMIN)
+        assert await rbac.assign_direct_permission_to_user(session, user, "core.settings.view")
+        await session.commit()
+    await rbac.dispose()
+
+    yield SimpleNamespace(rbac=rbac, services=services, cache=cache, session_factory=session_factory, queries=queries)
+    await cache.dispose()
+    await engine.dispose()
+
+
+async def _user(session):
+    return (await session.execute(select(User).where(User.telegram_id == TG_ID))).scalar_one()
+
+
+async def _role(session, name):
+    return (await session.execute(select(Role).where(Role.name == name))).scalar_one()
+
+
+async def _effective(env):
+    async with env.session_factory() as session:
+        return await env.rbac.get_effective_permissions(session, TG_ID)
+
+
+@pytest.mark.core
+class TestCompiledPermissions:
+    """Tests for RBACService.get_effective_permissions and permission checks"""
+
+    @pytest.mark.asyncio
+    async def test_compiled_set_joins_roles_and_direct_permissions(self, env):
+        effective = await _effective(env)
+        assert "core.settings.view" in effective  # прямое
+        assert {"core.admin.view_panel", "core.roles.edit"} <= effective  # через роль Admin
+        assert "core.settings.edit" not in effective
+
+        env.queries.clear()
+        assert await _effective(env) == effective
+        assert env.queries == []
+
+    @pytest.mark.asyncio
+    async def test_user_has_permissions_is_one_lookup(self, env):
+        async with env.session_factory() as session:
+            checked = await env.rbac.user_has_permissions(
+                session, TG_ID, ["core.admin.view_panel", "CORE.SETTINGS.VIEW", "core.settings.edit"]
+            )
+            assert checked == {"core.admin.view_panel": True, "CORE.SETTINGS.VIEW": True, "core.settings.edit": False}
+            assert await env.rbac.user_has_permissions(session, OWNER_TG_ID, ["core.settings.edit"]) == {"core.settings.edit": True}
+            assert await env.rbac.user_has_permissions(session, 404, ["core.admin.view_panel"]) == {"core.admin.view_panel": False}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mutate, permission, expected", [
+        (lambda rbac, s, user, role: rbac.remove_role_from_user(s, user, DEFAULT_ROLE_ADMIN), "core.roles.edit", False),
+        (lambda rbac, s, user, role: rbac.remove_permission_from_role(s, role, "core.roles.edit"), "core.roles.edit", False),
+        (lambda rbac, s, user, role: rbac.assign_permission_to_role(s, role, "core.settings.edit"), "core.settings.edit", True),
+        (lambda rbac, s, user, role: rbac.remove_direct_permission_from_user(s, user, "core.settings.view"), "core.settings.view", False),
+        (lambda rbac, s, user, role: rbac.assign_direct_permission_to_user(s, user, "core.users.delete"), "core.users.delete", True),
+    ], ids=["remove_role", "remove_role_perm", "assign_role_perm", "remove_direct", "assign_direct"])
+    async def test_every_mutator_invalidates_after_commit(self, env, mutate, permission, expected):
+        assert (permission in await _effective(env)) is not expected
+        async with env.session_factory() as session:
+            user, role = await _user(session), await _role(session, DEFAULT_ROLE_ADMIN)
+            assert await mutate(env.rbac, session, user, role)
+            # Проверка до commit кэширует старый набор...
+            assert (permission in await _effective(env)) is not expected
+            await session.commit()
+        # ...и повторная инвалидация после commit его сбрасывает
+        await env.rbac.dispose()
+        assert (permission in await _effective(env)) is expected
+
+    @pytest.mark.asyncio
+    async def test_assign_role_and_delete_role_invalidate(self, env):
+        async with env.session_factory() as session:
+            user = await _user(session)
+            assert await env.rbac.assign_role_to_user(session, user, "Support")
+            assert await env.rbac.assign_permission_to_role(session, await _role(session, "Support"), "core.system.manage_backups")
+            await session.commit()
+        await env.rbac.dispose()
+        assert "core.system.manage_backups" in await _effective(env)
+
+        async with env.session_factory() as session:
+            assert await env.rbac.remove_permission_from_role(session, await _role(session, "Support"), "core.system.manage_backups")
+            assert await env.rbac.remove_role_from_user(session, await _user(session), "Support")
+            await session.commit()
+        async with env.session_factory() as session:
+            assert await env.rbac.delete_role(session, "Support")
+            await session.commit()
+        await env.rbac.dispose()
+        assert "core.system.manage_backups" not in await _effective(env)
+
+    @pytest.mark.asyncio
+    async def test_synced_module_permissions_are_visible_without_waiting_for_ttl(self, env):
+        async with env.session_factory() as session:
+            assert await env.rbac.assign_role_to_user(session, await _user(session), DEFAULT_ROLE_USER)
+            await session.commit()
+        await env.rbac.dispose()
+        assert MODULE_PERMISSION not in await _effective(env)
+
+        # Перезапуск бота с новым модулем: наборы ролей с прошлого запуска еще лежат в кэше
+        manifest = SimpleNamespace(
+            declared_permissions=[PermissionManifest(name=MODULE_PERMISSION, description="Погода")],
+            metadata=SimpleNamespace(assign_default_access_to_user_role=True),
+        )
+        env.services.modules.modules.append(SimpleNamespace(name="weather", manifest=manifest))
+        restarted = RBACService(services=env.services)
+        async with env.session_factory() as session:
+            assert (await restarted.ensure_default_entities_exist(session))[2] == 1
+
+        async with env.session_factory() as session:
+            assert MODULE_PERMISSION in await restarted.get_effective_permissions(session, TG_ID)
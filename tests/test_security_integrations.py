@@ -4,15 +4,21 @@
 """
 
 import asyncio
+import hashlib
 import sys
+import time
 import pytest
 from pathlib import Path
 
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
 # Добавляем корень проекта в sys.path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from modules.security_integrations import SecurityIntegrations
+import modules.security_integrations as security_module
+from modules.security_integrations import ProviderRateLimiter, SecurityIntegrations
 
 @pytest.mark.asyncio
 async def test_security_integrations():
@@ -44,4 +50,192 @@ async def test_security_integrations():
         print(f"  Результат: {audit_result}")
 
 if __name__ == "__main__":
-    asyncio.run(test_security_integrations()) 
\ No newline at end of file
+    asyncio.run(test_security_integrations()) 
+
+class FakeProviders:
+    """AbuseIPDB/Shodan/VirusTotal stand-ins that count calls"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = {}
+        self.app = web.Application()
+        self.app.router.add_get("/abuseipdb/check", self.abuseipdb_check)
+        self.app.router.add_get("/shodan/shodan/host/{ip}", self.shodan_host)
+        self.app.router.add_get("/virustotal/file/report", self.virustotal_report)
+
+    def _count(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    async def abuseipdb_check(self, request):
+        self._count("abuseipdb")
+        await asyncio.sleep(self.delay)
+        if request.query["ipAddress"] == "10.0.0.13":
+            return web.json_response({"errors": [{"detail": "rate limited"}]}, status=503)
+        return web.json_response({"data": {"ipAddress": request.query["ipAddress"], "abuseConfidenceScore": 0}})
+
+    async def shodan_host(self, request):
+        self._count("shodan")
+        await asyncio.sleep(self.delay)
+        return web.json_response({"ip_str": request.match_info["ip"], "ports": [22, 443]})
+
+    async def virustotal_report(self, request):
+        self._count("virustotal")
+        return web.json_response({"response_code": 1, "resource": request.query["resource"], "positives": 0})
+
+
+async def _start_providers(delay: float = 0.0):
+    fake = FakeProviders(delay)
+    server = TestServer(fake.app)
+    await server.start_server()
+    return fake, server
+
+
+def _integrations_for(server: TestServer) -> SecurityIntegrations:
+    si = SecurityIntegrations()
+    si.config = SecurityIntegrations._default_config()
+    for provider in ("abuseipdb", "shodan", "virustotal"):
+        si.config[provider].update(enabled=True, api_key="test", base_url=str(server.make_url(f"/{provider}")))
+    si.config["rate_limits"] = {}
+    si.system_info["available_tools"] = {tool: False for tool in si.system_info["available_tools"]}
+    return si
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_cache(monkeypatch):
+    monkeypatch.setattr(security_module, "_process_memory_cache", None)
+
+
+@pytest.mark.core
+class TestSecurityIntegrationsPerformance:
+    """Shared HTTP client, result cache, rate limits and concurrent audit"""
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_spaces_requests(self):
+        """requests_per_minute spreads calls evenly, max_concurrency caps overlap"""
+        limiter = ProviderRateLimiter(requests_per_minute=600, max_concurrency=1)
+        started = time.monotonic()
+        for _ in range(3):
+            async with limiter:
+                pass
+        assert time.monotonic() - started >= 0.19
+
+        limiter = ProviderRateLimiter(max_concurrency=2)
+        active = peak = 0
+
+        async def worker():
+            nonlocal active, peak
+            async with limiter:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(worker() for _ in range(6)))
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_results_cached_per_provider_and_target(self):
+        """Repeated and concurrent lookups of one target hit the provider once"""
+        fake, server = await _start_providers(delay=0.05)
+        try:
+            async with _integrations_for(server) as si:
+                results = await asyncio.gather(*(si.abuseipdb_check_ip("10.0.0.1") for _ in range(5)))
+                again = await si.abuseipdb_check_ip("10.0.0.1")
+                other = await si.abuseipdb_check_ip("10.0.0.2")
+        finally:
+            await server.close()
+
+        assert all(result["data"]["ipAddress"] == "10.0.0.1" for result in results)
+        assert again["data"] == results[0]["data"] and "cached_at" in again
+        assert other["data"]["ipAddress"] == "10.0.0.2"
+        assert fake.calls["abuseipdb"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_outlives_context_and_instance(self):
+        """A new instance in a new context (the next CLI audit) reuses results of the previous one"""
+        fake, server = await _start_providers()
+        try:
+            async with _integrations_for(server) as si:
+                first = await si.abuseipdb_check_ip("10.0.0.1")
+            async with _integrations_for(server) as si:
+                second = await si.abuseipdb_check_ip("10.0.0.1")
+                assert si.cache is security_module._process_memory_cache
+        finally:
+            await server.close()
+
+        assert second == first and "cached_at" in second
+        assert fake.calls["abuseipdb"] == 1
+
+    @pytest.mark.asyncio
+    async def test_scanner_stderr_does_not_block_caching(self):
+        """Warnings on stderr of a successful scan are kept apart from errors; only failures skip the cache"""
+        runs, returncode = [], 0
+
+        async def fake_run_command(provider, args, timeout, stdin_data=None):
+            runs.append(args[1])
+            return returncode, "notAfter=Jan  1 00:00:00 2030 GMT", "depth=2 verify warning"
+
+        async with SecurityIntegrations() as si:
+            si.system_info["available_tools"]["openssl"] = True
+            si._run_command = fake_run_command
+            ok = await si.openssl_scan("good.example")
+            assert await si.openssl_scan("good.example") == ok
+            returncode = 1
+            failed = [await si.openssl_scan("bad.example") for _ in range(2)]
+
+        assert ok["success"] and ok["stderr"] == "depth=2 verify warning" and "error" not in ok
+        assert failed[0]["error"] == "depth=2 verify warning" and not failed[0]["success"]
+        assert runs == ["s_client", "x509"] + ["s_client", "x509"] * 2
+
+    @pytest.mark.asyncio
+    async def test_error_results_are_not_cached(self):
+        """A failed lookup is returned as an error and retried on the next call"""
+        fake, server = await _start_providers()
+        try:
+            async with _integrations_for(server) as si:
+                si.http._settings.retry_attempts = 0
+                first = await si.abuseipdb_check_ip("10.0.0.13")
+                second = await si.abuseipdb_check_ip("10.0.0.13")
+        finally:
+            await server.close()
+
+        assert "errors" in first and "errors" in second
+        assert fake.calls["abuseipdb"] == 2
+
+    @pytest.mark.asyncio
+    async def test_comprehensive_audit_runs_checks_concurrently(self):
+        """Independent providers are queried at the same time, not one after another"""
+        fake, server = await _start_providers(delay=0.2)
+        try:
+            async with _integrations_for(server) as si:
+                audit = await si.comprehensive_audit("10.0.0.1")
+        finally:
+            await server.close()
+
+        assert set(audit["results"]) == {"abuseipdb", "shodan"}
+        assert audit["results"]["shodan"]["ports"] == [22, 443]
+        assert audit["duration_seconds"] < 0.38
+
+    @pytest.mark.asyncio
+    async def test_virustotal_file_hash_is_streamed(self, tmp_path):
+        """The file is hashed in chunks and looked up by its SHA-256"""
+        sample = tmp_path / "sample.bin"
+        sample.write_bytes(b"sdb" * 500_000)
+        fake, server = await _start_providers()
+        try:
+            async with _integrations_for(server) as si:
+                result = await si.virustotal_scan_file(str(sample))
+        finally:
+            await server.close()
+
+        assert result["resource"] == hashlib.sha256(sample.read_bytes()).hexdigest()
+        assert fake.calls["virustotal"] == 1
+
+    @pytest.mark.asyncio
+    async def test_local_command_timeout_kills_process(self):
+        """Local scanners run as async subprocesses and are killed on timeout"""
+        async with SecurityIntegrations() as si:
+            returncode, stdout, _ = await si._run_command("openssl", [sys.executable, "-c", "print('ok')"], timeout=10)
+            assert (returncode, stdout.strip()) == (0, "ok")
+            with pytest.raises(asyncio.TimeoutError):
+                await si._run_command("openssl", [sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2)
@@ -0,0 +1,237 @@
+"""
+Tests for the persistent task scheduler: schedules, run journal, retries, limits and CLI-side control
+"""
+
+import asyncio
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import inspect
+
+from core.tasks import TaskRunStore, TaskScheduler, TaskSchedulerClient, TaskType, parse_schedule, register_task_type
+from core.tasks.builtin import backup_task, cleanup_task
+from core.tasks.store import JOBS_TABLE_NAME, RUNS_TABLE_NAME, _metadata, create_sync_engine, create_task_tables
+
+MIGRATION_PATH = (Path(__file__).resolve().parent.parent / "alembic_migrations" / "versions"
+                  / "e5b2f8a4c917_add_task_scheduler_tables.py")
+
+_calls = {"flaky": 0}
+_concurrency = {"current": 0, "max": 0}
+
+
+def _flaky_io_task(fail_times: int = 1) -> str:
+    _calls["flaky"] += 1
+    if _calls["flaky"] <= fail_times:
+        raise RuntimeError("temporary failure")
+    return "ok"
+
+
+async def _tracked_async_task(delay: float = 0.05) -> None:
+    _concurrency["current"] += 1
+    _concurrency["max"] = max(_concurrency["max"], _concurrency["current"])
+    try:
+        await asyncio.sleep(delay)
+    finally:
+        _concurrency["current"] -= 1
+
+
+register_task_type(TaskType(name="test_flaky", func=_flaky_io_task, executor="io",
+                            max_retries=2, retry_backoff_seconds=0), replace_existing=True)
+register_task_type(TaskType(name="test_tracked", func=_tracked_async_task, executor="async",
+                            max_concurrency=1), replace_existing=True)
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'sdb.db'}"
+    engine = create_sync_engine(url)
+    create_task_tables(engine)
+    engine.dispose()
+    return url
+
+
+@pytest_asyncio.fixture
+async def scheduler(db_url):
+    task_scheduler = TaskScheduler(db_url, io_workers=2, cpu_workers=1, poll_interval_seconds=0.05)
+    await task_scheduler.start()
+    yield task_scheduler
+    await task_scheduler.stop()
+
+
+async def _wait_for_run(store, job_id, statuses=("completed", "failed", "cancelled"), timeout=5.0):
+    for _ in range(int(timeout / 0.05)):
+        runs = await asyncio.to_thread(store.get_runs, job_id)
+        if runs and runs[0]["status"] in statuses:
+            return runs[0]
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"Запуск задания {job_id} не завершился")
+
+
+@pytest.mark.unit
+class TestParseSchedule:
+    def test_supported_formats(self):
+        assert type(parse_schedule("now")).__name__ == "DateTrigger"
+        assert type(parse_schedule("at 2030-01-31T03:00")).__name__ == "DateTrigger"
+        assert parse_schedule("every 30m").interval.total_seconds() == 1800
+        assert type(parse_schedule("0 3 * * *")).__name__ == "CronTrigger"
+
+    def test_invalid_schedule(self):
+        with pytest.raises(ValueError):
+            parse_schedule("every 0m")
+        with pytest.raises(ValueError):
+            parse_schedule("sometimes")
+
+
+@pytest.mark.unit
+def test_run_store_lifecycle(db_url):
+    store = TaskRunStore(db_url)
+    run_id = store.start_run("job_1", "cleanup", job_name="Cleanup", pid=1)
+    store.record_retry(run_id, 2, "boom")
+    assert store.request_cancel("job_1") == 1
+    assert store.get_cancel_requested([run_id]) == [run_id]
+    store.finish_run(run_id, "completed", result={"removed_files": 3})
+
+    stale_run_id = store.start_run("job_2", "backup", pid=2)
+    assert store.mark_interrupted() == 1
+
+    last_runs = store.get_last_runs(["job_1", "job_2"])
+    assert last_runs["job_1"]["attempt"] == 2
+    assert last_runs["job_1"]["result"] == {"removed_files": 3}
+    assert last_runs["job_2"]["id"] == stale_run_id
+    assert last_runs["job_2"]["status"] == "interrupted"
+    store.close()
+
+
+def _apply_migration(engine, direction="upgrade"):
+    spec = importlib.util.spec_from_file_location("task_tables_migration", MIGRATION_PATH)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as conn, Operations.context(MigrationContext.configure(conn)):
+        getattr(migration, direction)()
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        name: ({column["name"] for column in inspector.get_columns(name)},
+               {index["name"] for index in inspector.get_indexes(name)})
+        for name in (RUNS_TABLE_NAME, JOBS_TABLE_NAME)
+    }
+
+
+@pytest.mark.unit
+def test_store_requires_migrated_tables(tmp_path):
+    store = TaskRunStore(f"sqlite:///{tmp_path / 'empty.db'}")
+    with pytest.raises(RuntimeError, match="sdb db upgrade head"):
+        store.start_run("job_1", "cleanup")
+    assert inspect(store.engine).get_table_names() == []
+    store.close()
+
+
+@pytest.mark.unit
+def test_migration_matches_store_schema(tmp_path, db_url):
+    migrated = create_sync_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    _apply_migration(migrated)
+    reference = create_sync_engine(db_url)
+    assert _schema(migrated) == _schema(reference)
+    assert set(_metadata.tables) == {RUNS_TABLE_NAME, JOBS_TABLE_NAME}
+
+    # БД, где таблицы уже создал бот до появления миграции
+    _apply_migration(reference)
+    _apply_migration(migrated, "downgrade")
+    assert inspect(migrated).get_table_names() == []
+    migrated.dispose()
+    reference.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_attempts_are_retried(scheduler):
+    _calls["flaky"] = 0
+
+    await scheduler.execute("job_flaky", "test_flaky", {"fail_times": 1})
+
+    run = scheduler.store.get_runs("job_flaky")[0]
+    assert run["status"] == "completed"
+    assert run["attempt"] == 2
+    assert run["result"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_retries_are_limited(scheduler):
+    _calls["flaky"] = 0
+
+    await scheduler.execute("job_broken", "test_flaky", {"fail_times": 10})
+
+    run = scheduler.store.get_runs("job_broken")[0]
+    assert run["status"] == "failed"
+    assert run["attempt"] == 3
+    assert "temporary failure" in run["error"]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_per_task_type(scheduler):
+    _concurrency["max"] = 0
+
+    await asyncio.gather(*(scheduler.execute(f"job_{i}", "test_tracked", {}) for i in range(3)))
+
+    assert _concurrency["max"] == 1
+
+
+@pytest.mark.asyncio
+async def test_job_added_from_another_process_is_executed(scheduler, db_url):
+    with TaskSchedulerClient(db_url) as client:
+        job = client.add_task("test_tracked", "now", {"delay": 0.01}, name="from cli")
+
+    run = await _wait_for_run(scheduler.store, job["id"])
+
+    assert run["status"] == "completed"
+    assert run["job_name"] == "from cli"
+
+
+@pytest.mark.asyncio
+async def test_cancel_from_another_process_interrupts_run(scheduler, db_url):
+    with TaskSchedulerClient(db_url) as client:
+        job = client.add_task("test_tracked", "now", {"delay": 30})
+    await _wait_for_run(scheduler.store, job["id"], statuses=("running",))
+
+    with TaskSchedulerClient(db_url) as client:
+        result = client.cancel(job["id"])
+    run = await _wait_for_run(scheduler.store, job["id"])
+
+    assert result["cancel_requested"] == 1
+    assert run["status"] == "cancelled"
+
+
+@pytest.mark.unit
+def test_unknown_params_are_rejected(db_url):
+    with TaskSchedulerClient(db_url) as client:
+        with pytest.raises(ValueError):
+            client.add_task("cleanup", "now", {"no_such_param": 1})
+        assert client.get_jobs() == []
+
+
+@pytest.mark.unit
+def test_backup_task_makes_consistent_sqlite_copy(tmp_path):
+    db_path = tmp_path / "sdb.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER)")
+        conn.execute("INSERT INTO items VALUES (1)")
+    (tmp_path / "project_data" / "Config").mkdir(parents=True)
+    (tmp_path / "project_data" / "Config" / "config.yaml").write_text("core: {}")
+
+    result = backup_task(str(tmp_path / "project_data"), str(tmp_path / "backup"), sqlite_path=str(db_path), name="b1")
+
+    with sqlite3.connect(result["database"]) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+    assert result["data_archive"].endswith(".tar.gz")
+
+
+@pytest.mark.unit
+def test_cleanup_task_stays_inside_project_data(tmp_path):
+    with pytest.raises(ValueError):
+        cleanup_task(str(tmp_path / "project_data"), dirs=("../outside",))
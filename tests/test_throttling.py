@@ -0,0 +1,158 @@
+"""
+Tests for the anti-flood middleware: sliding window counters in CacheManager and manifest rate limits
+"""
+
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from core.app_settings import ThrottlingSettings
+from core.cache.manager import CacheManager
+from core.schemas.module_manifest import ModuleManifest
+from core.throttling import RateLimit, SlidingWindowLimiter, ThrottleRules, ThrottlingMiddleware, extract_command
+
+_update_ids = count(1)
+
+
+def _memory_cache_settings():
+    return SimpleNamespace(
+        type="memory", redis_url=None, default_ttl_seconds=300, memory_maxsize=1000,
+        memory_max_bytes=0, memory_eviction_policy="lru", memory_shards=1,
+    )
+
+
+def _message_update(user_id, text="hello"):
+    event = SimpleNamespace(update_id=next(_update_ids), message=SimpleNamespace(text=text, caption=None), callback_query=None)
+    return event, {"event_from_user": SimpleNamespace(id=user_id)}
+
+
+def _callback_update(user_id, data, answers):
+    async def answer(text=None, show_alert=False):
+        answers.append(text)
+
+    callback_query = SimpleNamespace(data=data, answer=answer)
+    event = SimpleNamespace(update_id=next(_update_ids), message=None, callback_query=callback_query)
+    return event, {"event_from_user": SimpleNamespace(id=user_id)}
+
+
+@pytest_asyncio.fixture
+async def cache_manager():
+    manager = CacheManager(cache_settings=_memory_cache_settings())
+    await manager.initialize()
+    yield manager
+    await manager.dispose()
+
+
+async def _feed(middleware, updates):
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event.update_id)
+        return "ok"
+
+    for event, data in updates:
+        await middleware(handler, event, data)
+    return handled
+
+
+@pytest.mark.core
+class TestSlidingWindowLimiter:
+    """Tests for core.throttling.limiter"""
+
+    @pytest.mark.asyncio
+    async def test_previous_window_is_weighted_by_overlap(self, cache_manager):
+        """Hits of the previous window count proportionally to how much of it the sliding window still covers"""
+        limiter = SlidingWindowLimiter(cache_manager, key_prefix="test")
+        rate = RateLimit(limit=4, window_seconds=10)
+        for second in (1000.0, 1001.0, 1002.0, 1003.0):
+            assert (await limiter.hit("user:1", rate, now=second))[0]
+        assert not (await limiter.hit("user:1", rate, now=1004.0))[0]
+
+        # 1012: окно [1002, 1012] еще покрывает 80% предыдущего окна -> 5 * 0.8 + 1 = 5 > 4
+        allowed, estimated = await limiter.hit("user:1", rate, now=1012.0)
+        assert not allowed and estimated == pytest.approx(5.0)
+        # 1018: 5 * 0.2 + 2 = 3
+        assert (await limiter.hit("user:1", rate, now=1018.0))[0]
+        # Другой ключ считается отдельно
+        assert (await limiter.hit("user:2", rate, now=1004.0))[0]
+
+    @pytest.mark.asyncio
+    async def test_unavailable_cache_fails_open(self):
+        """Without a cache backend every hit is allowed"""
+        limiter = SlidingWindowLimiter(CacheManager(cache_settings=_memory_cache_settings()))
+        assert await limiter.hit("user:1", RateLimit(1, 1)) == (True, 0.0)
+
+
+@pytest.mark.core
+class TestThrottleRules:
+    """Tests for core.throttling.rules"""
+
+    def test_rules_are_loaded_from_manifests(self):
+        """Command limits win over the module limit; callbacks match the longest declared prefix"""
+        manifest = ModuleManifest(
+            name="weather", display_name="Weather", version="1.0.0",
+            commands=[
+                {"command": "weather", "description": "Погода", "rate_limit": {"limit": 2, "window_seconds": 30}},
+                {"command": "forecast", "description": "Прогноз"},
+            ],
+            rate_limit={"limit": 10, "window_seconds": 60, "callback_prefixes": ["weather", "weather_admin"]},
+        )
+        rules = ThrottleRules()
+        assert rules.load_from_modules([SimpleNamespace(manifest=manifest), SimpleNamespace(manifest=None)]) == 4
+
+        assert rules.match(_message_update(1, "/Weather@my_bot Москва")[0]) == ("cmd:weather", RateLimit(2, 30))
+        assert rules.match(_message_update(1, "/forecast")[0]) == ("module:weather", RateLimit(10, 60))
+        assert rules.match(_message_update(1, "/start")[0]) is None
+        assert rules.match(_message_update(1, "weather")[0]) is None
+        assert rules.match(_callback_update(1, "weather_admin:reload", [])[0])[0] == "module:weather"
+        assert rules.match(_callback_update(1, "sdb_admin:main", [])[0]) is None
+
+    def test_extract_command(self):
+        assert extract_command("/help") == "help"
+        assert extract_command("/Help@SomeBot arg") == "help"
+        assert extract_command("/") is None
+        assert extract_command("help") is None
+        assert extract_command(None) is None
+
+
+@pytest.mark.core
+class TestThrottlingMiddleware:
+    """Tests for core.throttling.middleware"""
+
+    @pytest.mark.asyncio
+    async def test_user_flood_is_dropped_before_handler(self, cache_manager):
+        """Updates over the user limit never reach the handler; other users and super admins are unaffected"""
+        settings = ThrottlingSettings(user_limit=3, user_window_seconds=60)
+        middleware = ThrottlingMiddleware(cache_manager, settings, exempt_user_ids=[99])
+
+        flood = [_message_update(1) for _ in range(5)]
+        handled = await _feed(middleware, flood + [_message_update(2)] + [_message_update(99) for _ in range(5)])
+
+        assert handled[:3] == [event.update_id for event, _ in flood[:3]]
+        assert len(handled) == 3 + 1 + 5
+        stats = middleware.get_stats()
+        assert stats["throttled_total"] == 2 and stats["throttled_by_scope"] == {"user": 2}
+
+    @pytest.mark.asyncio
+    async def test_command_limit_and_single_callback_warning(self, cache_manager):
+        """A manifest command limit applies per command; throttled callbacks get one warning per window"""
+        rules = ThrottleRules()
+        rules.add_command("weather", RateLimit(1, 60))
+        rules.add_callback_prefix("weather", RateLimit(1, 60), scope="module:weather")
+        middleware = ThrottlingMiddleware(cache_manager, ThrottlingSettings(user_limit=100), rules=rules)
+
+        handled = await _feed(middleware, [_message_update(1, "/weather"), _message_update(1, "/weather"), _message_update(1, "/help")])
+        assert len(handled) == 2
+
+        answers = []
+        handled = await _feed(middleware, [_callback_update(1, "weather:refresh", answers) for _ in range(4)])
+        assert len(handled) == 1
+        assert answers == ["Слишком много запросов. Подождите немного."]
+        assert middleware.get_stats()["throttled_by_scope"] == {"cmd:weather": 1, "module:weather": 3}
+
+    @pytest.mark.asyncio
+    async def test_disabled_middleware_passes_everything(self, cache_manager):
+        middleware = ThrottlingMiddleware(cache_manager, ThrottlingSettings(enabled=False, user_limit=1))
+        assert len(await _feed(middleware, [_message_update(1) for _ in range(5)])) == 5
@@ -0,0 +1,161 @@
+"""
+Tests for UpdateScheduler: per-chat ordering, bounded concurrency and overflow handling
+"""
+
+import asyncio
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+
+from core.update_scheduler import UpdateScheduler
+
+_update_ids = count(1)
+
+
+def _update(chat_id=None):
+    event = SimpleNamespace(update_id=next(_update_ids))
+    data = {"event_chat": SimpleNamespace(id=chat_id) if chat_id is not None else None}
+    return event, data
+
+
+async def _wait_idle(scheduler: UpdateScheduler) -> None:
+    for _ in range(200):
+        stats = scheduler.get_stats()
+        if stats["queue_depth"] == 0 and stats["in_progress"] == 0:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("scheduler did not drain")
+
+
+@pytest_asyncio.fixture
+async def scheduler():
+    update_scheduler = UpdateScheduler(max_concurrency=4, high_watermark=100)
+    await update_scheduler.start()
+    yield update_scheduler
+    await update_scheduler.stop()
+
+
+@pytest.mark.core
+class TestUpdateScheduler:
+    """Tests for core.update_scheduler.UpdateScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_updates_of_one_chat_are_processed_in_order(self, scheduler):
+        """Updates of the same chat never overlap and keep their order"""
+        processed = []
+        running_per_chat = {}
+
+        async def handler(event, data):
+            chat_id = data["event_chat"].id
+            assert not running_per_chat.get(chat_id)
+            running_per_chat[chat_id] = True
+            await asyncio.sleep(0.001 * (event.update_id % 3))
+            processed.append((chat_id, event.update_id))
+            running_per_chat[chat_id] = False
+
+        sent = []
+        for index in range(30):
+            event, data = _update(chat_id=index % 3)
+            sent.append((data["event_chat"].id, event.update_id))
+            await scheduler(handler, event, data)
+        await _wait_idle(scheduler)
+
+        for chat_id in range(3):
+            assert [u for c, u in processed if c == chat_id] == [u for c, u in sent if c == chat_id]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, scheduler):
+        """Different chats run in parallel, but never more than max_concurrency at once"""
+        running = 0
+        peak = 0
+
+        async def handler(event, data):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for chat_id in range(20):
+            await scheduler(handler, *_update(chat_id=chat_id))
+        await _wait_idle(scheduler)
+
+        assert peak == 4
+        assert scheduler.get_stats()["processed_total"] == 20
+
+    @pytest.mark.asyncio
+    async def test_drop_policy_sheds_updates_past_watermark(self):
+        """With the 'drop' policy new updates are discarded while the queue is full"""
+        update_scheduler = UpdateScheduler(max_concurrency=1, high_watermark=2, overflow_policy="drop")
+        await update_scheduler.start()
+        release = asyncio.Event()
+
+        async def handler(event, data):
+            await release.wait()
+
+        try:
+            for _ in range(5):
+                await update_scheduler(handler, *_update(chat_id=1))
+            assert update_scheduler.get_stats()["dropped_total"] == 3
+            release.set()
+            await _wait_idle(update_scheduler)
+            assert update_scheduler.get_stats()["processed_total"] == 2
+        finally:
+            release.set()
+            await update_scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_delay_policy_waits_for_queue_to_shrink(self):
+        """With the 'delay' policy the producer is held until the queue drops below the watermark"""
+        update_scheduler = UpdateScheduler(max_concurrency=1, high_watermark=1, overflow_policy="delay")
+        await update_scheduler.start()
+        release = asyncio.Event()
+
+        async def handler(event, data):
+            await release.wait()
+
+        try:
+            await update_scheduler(handler, *_update(chat_id=1))
+            producer = asyncio.create_task(update_scheduler(handler, *_update(chat_id=2)))
+            await asyncio.sleep(0.02)
+            assert not producer.done()
+            release.set()
+            await asyncio.wait_for(producer, timeout=1)
+            await _wait_idle(update_scheduler)
+            stats = update_scheduler.get_stats()
+            assert stats["delayed_total"] == 1
+            assert stats["processed_total"] == 2
+        finally:
+            release.set()
+            await update_scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_failing_handler_does_not_stop_the_chat_queue(self, scheduler):
+        """A handler error is counted and the next update of the chat is still processed"""
+        processed = []
+
+        async def handler(event, data):
+            if not processed:
+                processed.append("failed")
+                raise RuntimeError("boom")
+            processed.append(event.update_id)
+
+        await scheduler(handler, *_update(chat_id=7))
+        event, data = _update(chat_id=7)
+        await scheduler(handler, event, data)
+        await _wait_idle(scheduler)
+
+        assert processed == ["failed", event.update_id]
+        assert scheduler.get_stats()["failed_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_started_scheduler_calls_handler_directly(self):
+        """Before start() updates pass straight through to the handler"""
+        update_scheduler = UpdateScheduler()
+
+        async def handler(event, data):
+            return "handled"
+
+        assert await update_scheduler(handler, *_update(chat_id=1)) == "handled"
@@ -0,0 +1,155 @@
+"""
+Tests for the write-behind user activity buffer: dirty tracking, granularity, bulk flush and the flush at shutdown
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import core.bot_entrypoint as bot_entrypoint
+from core.database.base import Base
+from core.database.core_models import User
+from core.users.activity import UserActivityBuffer
+
+
+class FakeDBManager:
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def get_session(self):
+        async with self._session_factory() as session:
+            yield session
+
+
+def _tg_user(db_user, **overrides):
+    fields = {"id": db_user.telegram_id, "username": db_user.username,
+              "first_name": db_user.first_name, "last_name": db_user.last_name}
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'activity.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    recent = datetime.now(timezone.utc) - timedelta(seconds=10)
+    async with session_factory() as session:
+        session.add_all([
+            User(telegram_id=100 + i, username=f"user{i}", username_lower=f"user{i}", first_name=f"Name{i}",
+                 last_activity_at=recent)
+            for i in range(3)
+        ])
+        await session.commit()
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    yield SimpleNamespace(manager=FakeDBManager(session_factory), session_factory=session_factory, statements=statements)
+    await engine.dispose()
+
+
+async def _users(db):
+    async with db.session_factory() as session:
+        return list((await session.execute(select(User).order_by(User.id))).scalars().all())
+
+
+def _buffer(db, granularity_seconds=300):
+    return UserActivityBuffer(SimpleNamespace(db=db.manager), granularity_seconds=granularity_seconds, flush_interval_seconds=60)
+
+
+@pytest.mark.core
+class TestUserActivityBuffer:
+    """Tests for core.users.activity"""
+
+    @pytest.mark.asyncio
+    async def test_user_is_dirty_only_when_profile_changes(self, db):
+        buffer = _buffer(db)
+        user = (await _users(db))[0]
+
+        assert not buffer.record(user, _tg_user(user))
+        assert buffer.pending_count == 0
+
+        assert buffer.record(user, _tg_user(user, username="New_Name"))
+        assert user.username == "New_Name" and user.username_lower == "new_name"
+        assert buffer.record(user, _tg_user(user, last_name="Petrov"))
+        assert buffer.pending_count == 1
+        # Повтор того же профиля уже ничего не меняет
+        assert not buffer.record(user, _tg_user(user))
+
+    @pytest.mark.asyncio
+    async def test_last_activity_is_written_once_per_granularity(self, db):
+        buffer = _buffer(db, granularity_seconds=60)
+        user = (await _users(db))[0]
+        now = datetime.now(timezone.utc)
+
+        user.last_activity_at = now - timedelta(seconds=50)
+        assert not buffer.record(user, _tg_user(user))
+        # SQLite отдает naive datetime - он считается UTC
+        user.last_activity_at = (now - timedelta(seconds=70)).replace(tzinfo=None)
+        assert buffer.record(user, _tg_user(user))
+        assert user.last_activity_at >= now
+        user.last_activity_at = None
+        assert buffer.record(user, _tg_user(user))
+
+    @pytest.mark.asyncio
+    async def test_flush_is_one_bulk_update(self, db):
+        buffer = _buffer(db, granularity_seconds=0)
+        for user in await _users(db):
+            assert buffer.record(user, _tg_user(user, first_name=f"{user.first_name}!"))
+
+        db.statements.clear()
+        assert await buffer.flush() == 3
+        assert len(db.statements) == 1 and db.statements[0].lstrip().upper().startswith("UPDATE")
+        assert [user.first_name for user in await _users(db)] == ["Name0!", "Name1!", "Name2!"]
+        assert buffer.pending_count == 0
+        assert await buffer.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_run_sdb_bot_flushes_buffer_at_shutdown(self, db, tmp_path, monkeypatch):
+        buffer = _buffer(db)
+        user = (await _users(db))[0]
+        assert buffer.record(user, _tg_user(user, first_name="Renamed"))
+
+        def stop_polling(*_args):
+            raise SystemExit()
+
+        pending_at_close = []
+
+        class FakeServicesProvider:
+            def __init__(self, settings):
+                self.user_service = SimpleNamespace(activity=buffer)
+                self.runtime_stats = SimpleNamespace(register=stop_polling)
+
+            async def setup_services(self):
+                pass
+
+            async def close_services(self):
+                pending_at_close.append(buffer.pending_count)
+
+        class FakeLoggingManager:
+            _is_initialized = False
+
+            def __init__(self, app_settings):
+                pass
+
+            async def initialize_logging(self):
+                pass
+
+            def get_stats(self):
+                return {}
+
+        monkeypatch.setattr(bot_entrypoint, "BotServicesProvider", FakeServicesProvider)
+        monkeypatch.setattr(bot_entrypoint, "LoggingManager", FakeLoggingManager)
+        monkeypatch.setattr(bot_entrypoint.settings.core, "project_data_path", tmp_path)
+
+        assert await bot_entrypoint.run_sdb_bot() == 0
+        # Буфер сброшен до закрытия сервисов (и DBManager)
+        assert pending_at_close == [0]
+        assert (await _users(db))[0].first_name == "Renamed"
+        assert not (tmp_path / bot_entrypoint.PID_FILENAME).exists()
@@ -0,0 +1,164 @@
+"""
+Tests for the per-update user context: one load per update, the CacheManager between updates and invalidation
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.app_settings import RBACSettings
+from core.cache.manager import CacheManager
+from core.database.base import Base
+from core.database.core_models import Role, User
+from core.i18n.middleware import I18nMiddleware
+from core.rbac.service import DEFAULT_ROLE_MODERATOR, DEFAULT_ROLE_USER, RBACService
+from core.users.middleware import UserStatusMiddleware
+from core.users.service import UserService
+
+TG_ID = 1001
+
+
+class CountingDBManager:
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+        self.sessions_opened = 0
+
+    @asynccontextmanager
+    async def get_session(self):
+        self.sessions_opened += 1
+        async with self._session_factory() as session:
+            yield session
+
+
+def _memory_cache_settings():
+    return SimpleNamespace(
+        type="memory", redis_url=None, default_ttl_seconds=300, memory_maxsize=1000,
+        memory_max_bytes=0, memory_eviction_policy="lru", memory_shards=1,
+    )
+
+
+@pytest_asyncio.fixture
+async def services(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        user_role = Role(name=DEFAULT_ROLE_USER)
+        session.add_all([user_role, Role(name=DEFAULT_ROLE_MODERATOR)])
+        session.add(User(telegram_id=TG_ID, first_name="Ivan", username="ivan", preferred_language_code="en",
+                         roles=[user_role]))
+        await session.commit()
+
+    cache = CacheManager(cache_settings=_memory_cache_settings())
+    await cache.initialize()
+    provider = SimpleNamespace(
+        db=CountingDBManager(session_factory),
+        cache=cache,
+        config=SimpleNamespace(
+            cache=SimpleNamespace(user_context_ttl_seconds=60),
+            core=SimpleNamespace(super_admins=[], user_activity_granularity_seconds=300,
+                                 user_activity_flush_interval_seconds=10, rbac=RBACSettings()),
+        ),
+    )
+    provider.user_service = UserService(provider)
+    provider.rbac = RBACService(services=provider)
+    yield provider
+    await provider.user_service.dispose()
+    await cache.dispose()
+    await engine.dispose()
+
+
+def _update(text="hello"):
+    tg_user = SimpleNamespace(id=TG_ID, username="ivan", first_name="Ivan", last_name=None, language_code="en")
+    event = SimpleNamespace(message=SimpleNamespace(text=text), callback_query=None)
+    return event, tg_user
+
+
+async def _dispatch(services, text="hello"):
+    """Runs an update through I18nMiddleware -> UserStatusMiddleware like the dispatcher does"""
+    translator = SimpleNamespace(default_locale="en", available_locales=["en", "ru"])
+    i18n, user_status = I18nMiddleware(translator), UserStatusMiddleware()
+    event, tg_user = _update(text)
+    data = {"event_from_user": tg_user, "services_provider": services}
+
+    async def handler(_event, handler_data):
+        return handler_data
+
+    async def after_i18n(inner_event, inner_data):
+        return await user_status(handler, inner_event, inner_data)
+
+    return await i18n(after_i18n, event, data)
+
+
+async def _load_user(services, session):
+    return (await session.execute(select(User).where(User.telegram_id == TG_ID))).scalar_one()
+
+
+@pytest.mark.core
+class TestUserContext:
+    """Tests for core.users.context"""
+
+    @pytest.mark.asyncio
+    async def test_one_load_per_update_shared_by_both_middlewares(self, services):
+        data = await _dispatch(services)
+        assert services.db.sessions_opened == 1
+        assert data["user_locale"] == "en"
+        assert data["sdb_user"].telegram_id == TG_ID
+
+    @pytest.mark.asyncio
+    async def test_next_update_is_served_from_cache(self, services):
+        await _dispatch(services)
+        data = await _dispatch(services)
+        assert services.db.sessions_opened == 1
+        assert data["sdb_user"].telegram_id == TG_ID
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("mutate, check", [
+        (lambda us, user, session: us.update_user_language(user, "ru", session),
+         lambda user: user.preferred_language_code == "ru"),
+        (lambda us, user, session: us.set_user_active_status(user, False, session),
+         lambda user: user.is_active is False),
+        (lambda us, user, session: us.set_user_bot_blocked_status(user, True, session),
+         lambda user: user.is_bot_blocked is True),
+    ], ids=["language", "active", "bot_blocked"])
+    async def test_user_mutators_invalidate_after_commit(self, services, mutate, check):
+        context = services.user_service.context
+        assert not check(await context.get_user(TG_ID))
+
+        async with services.db.get_session() as session:
+            user = await _load_user(services, session)
+            assert await mutate(services.user_service, user, session)
+            # Апдейт между изменением и commit кэширует еще старую строку...
+            assert not check(await context.get_user(TG_ID))
+            await session.commit()
+        # ...но после commit кэш инвалидируется повторно
+        await services.user_service.dispose()
+        assert check(await context.get_user(TG_ID))
+
+    @pytest.mark.asyncio
+    async def test_rbac_changes_invalidate_user_context(self, services):
+        context, rbac = services.user_service.context, services.rbac
+        assert [role.name for role in (await context.get_user(TG_ID)).roles] == [DEFAULT_ROLE_USER]
+
+        async with services.db.get_session() as session:
+            user = await _load_user(services, session)
+            assert await rbac.assign_role_to_user(session, user, DEFAULT_ROLE_MODERATOR)
+            await session.commit()
+        await rbac.dispose()
+        roles = {role.name: role for role in (await context.get_user(TG_ID)).roles}
+        assert set(roles) == {DEFAULT_ROLE_USER, DEFAULT_ROLE_MODERATOR}
+        assert roles[DEFAULT_ROLE_MODERATOR].permissions == []
+
+        # Разрешения роли лежат в контексте каждого ее пользователя
+        async with services.db.get_session() as session:
+            role = (await session.execute(select(Role).where(Role.name == DEFAULT_ROLE_MODERATOR))).scalar_one()
+            assert await rbac.assign_permission_to_role(session, role, "core.admin.view_panel")
+            await session.commit()
+        await rbac.dispose()
+        roles = {role.name: role for role in (await context.get_user(TG_ID)).roles}
+        assert [perm.name for perm in roles[DEFAULT_ROLE_MODERATOR].permissions] == ["core.admin.view_panel"]
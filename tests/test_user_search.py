@@ -0,0 +1,122 @@
+"""
+Tests for user search: FTS5 trigram index on SQLite, LIKE fallback, pagination and the PostgreSQL condition
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.database.base import Base
+from core.database.core_models import User
+from core.users.search import (
+    PG_SEARCH_EXPRESSION, SEARCH_BACKEND_FTS5, SEARCH_BACKEND_LIKE, SEARCH_BACKEND_PG_TRGM,
+    build_search_condition, detect_search_backend, ensure_search_index, search_users,
+)
+
+USERS = [
+    (101, "ivan_petrov", "Иван", "Петров"),
+    (102, "maria", "Мария", "Иванова"),
+    (103, None, "John", "Smith"),
+    (104, "jo_hn", "Jo", None),
+    (105, "alex", "Alexander", "Ivanov"),
+]
+
+
+async def _make_session(tmp_path, with_index: bool):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'users.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if with_index:
+            assert await conn.run_sync(ensure_search_index) == SEARCH_BACKEND_FTS5
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    db_session = session_factory()
+    for telegram_id, username, first_name, last_name in USERS:
+        db_session.add(User(telegram_id=telegram_id, username=username, first_name=first_name, last_name=last_name,
+                            username_lower=username.lower() if username else None))
+    await db_session.commit()
+    return engine, db_session
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    engine, db_session = await _make_session(tmp_path, with_index=True)
+    yield db_session
+    await db_session.close()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session_without_index(tmp_path):
+    engine, db_session = await _make_session(tmp_path, with_index=False)
+    yield db_session
+    await db_session.close()
+    await engine.dispose()
+
+
+async def _telegram_ids(session, query, **kwargs):
+    page = await search_users(session, query, **kwargs)
+    return sorted(user.telegram_id for user in page.items)
+
+
+@pytest.mark.asyncio
+async def test_fts_backend_is_detected(session):
+    assert await detect_search_backend(session) == SEARCH_BACKEND_FTS5
+
+
+@pytest.mark.asyncio
+async def test_substring_search_is_case_insensitive(session):
+    assert await _telegram_ids(session, "иван") == [101, 102]
+    assert await _telegram_ids(session, "@IVAN") == [101, 105]
+    assert await _telegram_ids(session, "etro") == [101]
+
+
+@pytest.mark.asyncio
+async def test_terms_are_combined_and_short_terms_match_prefix(session):
+    assert await _telegram_ids(session, "john smi") == [103]
+    assert await _telegram_ids(session, "jo") == [103, 104]
+    assert await _telegram_ids(session, "jo_") == [104]
+
+
+@pytest.mark.asyncio
+async def test_numeric_query_matches_ids(session):
+    assert await _telegram_ids(session, "103") == [103]
+
+
+@pytest.mark.asyncio
+async def test_index_follows_updates_and_deletes(session):
+    await session.execute(update(User).where(User.telegram_id == 103).values(first_name="Jonathan"))
+    await session.execute(delete(User).where(User.telegram_id == 105))
+    await session.commit()
+
+    assert await _telegram_ids(session, "jonathan") == [103]
+    assert await _telegram_ids(session, "alexander") == []
+
+
+@pytest.mark.asyncio
+async def test_results_are_paginated(session):
+    first = await search_users(session, "ivan", limit=1)
+    second = await search_users(session, "ivan", limit=1, cursor=first.next_cursor)
+    back = await search_users(session, "ivan", limit=1, cursor=second.prev_cursor, backward=True)
+
+    assert [u.telegram_id for u in first.items] == [105]
+    assert [u.telegram_id for u in second.items] == [101]
+    assert not second.has_next
+    assert [u.id for u in back.items] == [u.id for u in first.items]
+
+
+@pytest.mark.asyncio
+async def test_like_fallback_without_index(session_without_index):
+    assert await detect_search_backend(session_without_index) == SEARCH_BACKEND_LIKE
+    assert await _telegram_ids(session_without_index, "ivan") == [101, 105]
+    assert await _telegram_ids(session_without_index, "jo_") == [104]
+
+
+@pytest.mark.unit
+def test_postgres_condition_uses_index_expression():
+    condition = build_search_condition(SEARCH_BACKEND_PG_TRGM, "ivan")
+    sql = str(condition.compile(dialect=postgresql.dialect()))
+    assert PG_SEARCH_EXPRESSION in sql
+    assert "<%" in sql
+    assert build_search_condition(SEARCH_BACKEND_PG_TRGM, "   ") is None
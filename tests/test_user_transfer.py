@@ -0,0 +1,109 @@
+"""
+Tests for streaming user export/import: formats, upserts, relations by name and idempotency
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.database.base import Base
+from core.database.core_models import Permission, Role, User, UserPermission, UserRole
+from core.users.transfer import MANIFEST_FILE_NAME, export_users, import_users
+
+
+async def _open_db(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)()
+
+
+@pytest_asyncio.fixture
+async def source(tmp_path):
+    engine, session = await _open_db(tmp_path / "source.db")
+    admin, user_role, legacy = Role(name="Admin"), Role(name="User"), Role(name="Legacy")
+    manage = Permission(name="core.users.manage")
+    session.add_all([admin, user_role, legacy, manage])
+    for i in range(1, 8):
+        session.add(User(telegram_id=500 + i, username=f"User_{i}", first_name=f"Имя {i}",
+                         is_active=i != 3, last_activity_at=datetime(2026, 5, i, 10, 30, 15, 250000),
+                         roles=[user_role] + ([admin, legacy] if i == 1 else []),
+                         direct_permissions=[manage] if i == 2 else []))
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def target(tmp_path):
+    engine, session = await _open_db(tmp_path / "target.db")
+    session.add_all([Role(name="Admin"), Role(name="User"), Permission(name="core.users.manage")])
+    session.add(User(telegram_id=501, username="old_name", first_name="Старое"))
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+
+async def _count(session, model):
+    return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["jsonl", "csv", "parquet"])
+async def test_export_import_roundtrip(source, target, tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    export_dir = tmp_path / "export"
+
+    exported = await export_users(source, export_dir, fmt=fmt, batch_size=3)
+    imported = await import_users(target, export_dir, batch_size=3)
+
+    manifest = json.loads((export_dir / MANIFEST_FILE_NAME).read_text(encoding="utf-8"))
+    assert manifest["counts"] == {"users": 7, "user_roles": 9, "user_permissions": 1}
+    assert (exported.users, exported.user_roles, exported.user_permissions) == (7, 9, 1)
+    # Роли Legacy в целевой БД нет - связь пропускается
+    assert (imported.users, imported.user_roles, imported.user_permissions) == (7, 8, 1)
+    assert imported.unknown_roles == 1
+
+    target.expire_all()
+    users = {u.telegram_id: u for u in (await target.execute(select(User))).scalars().all()}
+    assert len(users) == 7
+    assert users[501].username == "User_1" and users[501].username_lower == "user_1"
+    assert sorted(role.name for role in users[501].roles) == ["Admin", "User"]
+    assert users[503].is_active is False
+    assert users[504].first_name == "Имя 4"
+    assert users[505].last_activity_at == datetime(2026, 5, 5, 10, 30, 15, 250000)
+    assert [perm.name for perm in users[502].direct_permissions] == ["core.users.manage"]
+
+
+@pytest.mark.asyncio
+async def test_import_is_idempotent_and_can_skip_existing(source, target, tmp_path):
+    export_dir = tmp_path / "export"
+    await export_users(source, export_dir)
+
+    await import_users(target, export_dir, on_conflict="skip")
+    await import_users(target, export_dir, on_conflict="skip")
+
+    assert await _count(target, User) == 7
+    assert await _count(target, UserRole) == 8
+    assert await _count(target, UserPermission) == 1
+    existing = (await target.execute(select(User.username).where(User.telegram_id == 501))).scalar_one()
+    assert existing == "old_name"
+
+
+@pytest.mark.asyncio
+async def test_import_requires_manifest(target, tmp_path):
+    with pytest.raises(ValueError):
+        await import_users(target, tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_unknown_format_is_rejected(source, tmp_path):
+    with pytest.raises(ValueError):
+        await export_users(source, tmp_path / "export", fmt="xml")
@@ -0,0 +1,113 @@
+"""
+Tests for webhook mode: a fake Telegram sender posts updates into the aiohttp app
+"""
+
+import asyncio
+import time
+from itertools import count
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Bot, Dispatcher, types
+
+from core.webhook import build_webhook_app, get_webhook_url
+
+SECRET_TOKEN = "test-secret"
+
+
+def _telegram_settings(**overrides):
+    settings = dict(
+        webhook_url="https://bot.example.com/", webhook_path="/telegram/webhook",
+        webhook_secret_token=SECRET_TOKEN, webhook_max_connections=40, webhook_drop_pending_updates=False,
+    )
+    settings.update(overrides)
+    return SimpleNamespace(**settings)
+
+
+class FakeTelegramSender:
+    """Posts updates to the webhook the same way Telegram does"""
+
+    def __init__(self, client: TestClient, path: str, secret_token: Optional[str]):
+        self._client = client
+        self._path = path
+        self._secret_token = secret_token
+        self._update_ids = count(1)
+
+    def make_text_update(self, text: str, user_id: int = 1001) -> Dict[str, Any]:
+        update_id = next(self._update_ids)
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "Tester"},
+                "text": text,
+            },
+        }
+
+    async def send(self, update: Dict[str, Any], secret_token: Optional[str] = None) -> int:
+        headers = {}
+        token = secret_token if secret_token is not None else self._secret_token
+        if token:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = token
+        response = await self._client.post(self._path, json=update, headers=headers)
+        return response.status
+
+
+@pytest.mark.core
+class TestWebhookServer:
+    """Tests for core.webhook"""
+
+    def test_webhook_url_joins_base_and_path(self):
+        """Base URL and path are joined with exactly one slash"""
+        assert get_webhook_url(_telegram_settings()) == "https://bot.example.com/telegram/webhook"
+
+    @pytest.mark.asyncio
+    async def test_updates_reach_dispatcher_handlers(self):
+        """Updates posted to the webhook are handled by the same Dispatcher"""
+        received = []
+        dp = Dispatcher()
+
+        @dp.message()
+        async def on_message(message: types.Message):
+            received.append(message.text)
+
+        bot = Bot(token="42:TEST-TOKEN")
+        settings = _telegram_settings()
+        app = build_webhook_app(dp, bot, settings)
+
+        async with TestClient(TestServer(app)) as client:
+            sender = FakeTelegramSender(client, settings.webhook_path, SECRET_TOKEN)
+            assert await sender.send(sender.make_text_update("hello")) == 200
+            assert await sender.send(sender.make_text_update("world")) == 200
+
+            for _ in range(100):
+                if len(received) == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert sorted(received) == ["hello", "world"]
+
+    @pytest.mark.asyncio
+    async def test_wrong_secret_token_is_rejected(self):
+        """Requests without the configured secret token never reach handlers"""
+        received = []
+        dp = Dispatcher()
+
+        @dp.message()
+        async def on_message(message: types.Message):
+            received.append(message.text)
+
+        bot = Bot(token="42:TEST-TOKEN")
+        settings = _telegram_settings()
+        app = build_webhook_app(dp, bot, settings)
+
+        async with TestClient(TestServer(app)) as client:
+            sender = FakeTelegramSender(client, settings.webhook_path, SECRET_TOKEN)
+            assert await sender.send(sender.make_text_update("spoofed"), secret_token="wrong") == 401
+            await asyncio.sleep(0.05)
+
+        assert received == []